@@ -0,0 +1,909 @@
+#!/usr/bin/env python
+"""
+Implementação de uma Graph API do Meta ADS simulada, para testes de integração e benchmarks sem contas reais
+
+O servidor mantém em memória campanhas, conjuntos de anúncios, anúncios, criativos,
+imagens e vídeos, gera insights determinísticos e devolve os headers de uso do Meta.
+Latência e erros (transitórios e de limitação) são configuráveis. Para apontar os
+clientes para ele, defina META_GRAPH_URL (Ex: http://127.0.0.1:8999).
+
+Não faz parte do pacote da aplicação; é usada pelos testes e pelo benchmark de implantação.
+"""
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Tipos de objeto e as arestas (edges) que levam a seus filhos
+_ARESTAS = {
+    "account": {"campaigns": "campaign", "adsets": "adset", "ads": "ad", "adcreatives": "adcreative"},
+    "campaign": {"adsets": "adset", "ads": "ad"},
+    "adset": {"ads": "ad"},
+    "ad": {},
+    "adcreative": {},
+    "advideo": {},
+}
+
+# Campo que liga cada tipo ao seu pai
+_CAMPO_PAI = {"adset": "campaign_id", "ad": "adset_id"}
+
+# Campos que podem ser alterados por POST /{id}
+_CAMPOS_EDITAVEIS = {
+    "campaign": {"name", "status", "daily_budget", "lifetime_budget", "bid_strategy", "start_time", "stop_time"},
+    "adset": {"name", "status", "daily_budget", "lifetime_budget", "bid_amount", "bid_strategy",
+              "targeting", "optimization_goal", "start_time", "end_time"},
+    "ad": {"name", "status", "creative"},
+    "adcreative": {"name"},
+}
+
+_STATUS_VALIDOS = {"ACTIVE", "PAUSED", "ARCHIVED", "DELETED"}
+
+_SUFIXOS_INTERESSES = ["", "Online", "Brasil", "Marketing", "Profissional", "Digital", "Comunidade",
+                       "Iniciantes", "Avançado", "Notícias", "Eventos", "Produtos", "Cursos", "Moda",
+                       "Tecnologia", "Saúde", "Viagens", "Esportes", "Família", "Negócios"]
+
+_PADRAO_REFERENCIA = re.compile(r"\{result=([A-Za-z0-9_]+):\$\.id\}")
+
+TAMANHO_MAXIMO_LOTE = 50
+
+
+class ConfiguracaoGraphSimulada(BaseModel):
+    """
+    Parâmetros de comportamento da Graph API simulada.
+    """
+    latencia: float = 0.05  # Segundos por requisição HTTP
+    variacao_latencia: float = 0.0  # Acréscimo aleatório máximo, em segundos
+    latencia_por_operacao: float = 0.002  # Segundos adicionais por operação de um lote
+    taxa_erros: float = 0.0  # Probabilidade de erro transitório (código 2) por requisição
+    taxa_limitacao: float = 0.0  # Probabilidade de erro de limitação (código 17) por requisição
+    chamadas_por_janela: int = 600  # Chamadas por conta na janela que levam o uso a 100%
+    janela_uso: float = 60.0  # Segundos da janela de uso
+    tamanho_trecho_video: int = 4 * 1024 * 1024  # Bytes pedidos por trecho no upload de vídeos
+    tempo_codificacao_video: float = 0.0  # Segundos até um vídeo finalizado ficar pronto
+    tempo_relatorio: float = 0.0  # Segundos até um relatório assíncrono de insights ficar pronto
+    semente: Optional[int] = None  # Semente das falhas e latências aleatórias
+
+
+def _erro(mensagem: str, codigo: int = 100, status: int = 400, subcodigo: Optional[int] = None,
+          transitorio: bool = False, dados: Optional[Dict[str, Any]] = None,
+          tipo: str = "OAuthException") -> Tuple[int, Dict[str, Any]]:
+    erro = {"message": mensagem, "type": tipo, "code": codigo, "is_transient": transitorio,
+            "fbtrace_id": base64.b32encode(random.randbytes(10)).decode()}
+    if subcodigo is not None:
+        erro["error_subcode"] = subcodigo
+    if dados is not None:
+        erro["error_data"] = json.dumps(dados)
+    return status, {"error": erro}
+
+
+def _decodificar(valor: Any) -> Any:
+    # Objetos e listas chegam codificados em JSON, como nos clientes e no SDK
+    if isinstance(valor, str) and valor[:1] in ("{", "["):
+        try:
+            return json.loads(valor)
+        except ValueError:
+            return valor
+    return valor
+
+
+def _texto_campos(campos: Any) -> str:
+    # O SDK envia listas de campos codificadas em JSON; os clientes HTTP, separadas por vírgula
+    return ",".join(campos) if isinstance(campos, list) else str(campos or "")
+
+
+def interpretar_campos(campos: Any) -> Optional[Dict[str, Any]]:
+    """
+    Interpreta o parâmetro fields, incluindo expansão de arestas (Ex: name,adsets{name,ads{name}}).
+
+    Modificadores como .limit(10) são aceitos e ignorados.
+
+    Args:
+        campos (str|list, optional): Valor do parâmetro fields
+
+    Returns:
+        Optional[Dict[str, Any]]: Campo -> subcampos (ou None), ou None se fields não foi informado
+    """
+    campos = _texto_campos(campos)
+    if not campos:
+        return None
+
+    def ler(texto: str, i: int) -> Tuple[Dict[str, Any], int]:
+        resultado, nome = {}, ""
+        while i < len(texto):
+            caractere = texto[i]
+            if caractere == "{":
+                subcampos, i = ler(texto, i + 1)
+                resultado[nome.split(".")[0].strip()] = subcampos
+                nome = ""
+            elif caractere == "}":
+                if nome.strip():
+                    resultado.setdefault(nome.split(".")[0].strip(), None)
+                return resultado, i
+            elif caractere == "," and "(" not in nome[nome.rfind(")") + 1:]:
+                if nome.strip():
+                    resultado.setdefault(nome.split(".")[0].strip(), None)
+                nome = ""
+            else:
+                nome += caractere
+            i += 1
+        if nome.strip():
+            resultado.setdefault(nome.split(".")[0].strip(), None)
+        return resultado, i
+
+    return ler(campos, 0)[0]
+
+
+def _cursor(posicao: int) -> str:
+    return base64.urlsafe_b64encode(str(posicao).encode()).decode()
+
+
+def _posicao(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except ValueError:
+        return 0
+
+
+class GraphAPISimulada:
+    """
+    Estado e regras da Graph API simulada.
+
+    Os métodos síncronos processam uma operação; a aplicação FastAPI criada por
+    criar_app acrescenta latência, erros injetados e headers de uso.
+    """
+
+    def __init__(self, configuracao: Optional[ConfiguracaoGraphSimulada] = None):
+        """
+        Inicializa o simulador com o estado vazio.
+
+        Args:
+            configuracao (ConfiguracaoGraphSimulada, optional): Comportamento do simulador
+        """
+        self.configuracao = configuracao or ConfiguracaoGraphSimulada()
+        self._lock = threading.RLock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """
+        Descarta todos os objetos, uploads, relatórios e estatísticas.
+        """
+        with self._lock:
+            self._aleatorio = random.Random(self.configuracao.semente)
+            self._ids = itertools.count(120200000000000001)
+            self.objetos: Dict[str, Dict[str, Any]] = {}
+            self.filhos: Dict[str, List[str]] = defaultdict(list)
+            self.imagens: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+            self.uploads: Dict[str, Dict[str, Any]] = {}
+            self.relatorios: Dict[str, Dict[str, Any]] = {}
+            self._chamadas: Dict[str, deque] = defaultdict(deque)
+            self.estatisticas = Counter()
+
+    def configurar(self, **valores):
+        """
+        Altera parâmetros da configuração (Ex: configurar(latencia=0.2, taxa_erros=0.05)).
+        """
+        with self._lock:
+            self.configuracao = self.configuracao.model_copy(update=valores)
+            if "semente" in valores:
+                self._aleatorio = random.Random(self.configuracao.semente)
+
+    # Objetos
+
+    def _novo_id(self) -> str:
+        return str(next(self._ids))
+
+    def _criar_objeto(self, tipo: str, conta: str, campos: Dict[str, Any]) -> Dict[str, Any]:
+        objeto = {"id": self._novo_id(), "account_id": conta.replace("act_", ""),
+                  "created_time": datetime.now().strftime("%Y-%m-%dT%H:%M:%S+0000"), **campos}
+        if "status" in objeto:
+            objeto["effective_status"] = objeto["status"]
+        objeto["_tipo"] = tipo
+        self.objetos[objeto["id"]] = objeto
+        self.filhos[conta].append(objeto["id"])
+        pai = objeto.get(_CAMPO_PAI.get(tipo, ""))
+        if pai:
+            self.filhos[pai].append(objeto["id"])
+            if tipo == "ad":
+                objeto["campaign_id"] = self.objetos[pai]["campaign_id"]
+                self.filhos[objeto["campaign_id"]].append(objeto["id"])
+        self.estatisticas["objetos_criados"] += 1
+        return objeto
+
+    def _tipo(self, objeto_id: str) -> Optional[str]:
+        if objeto_id.startswith("act_"):
+            return "account"
+        objeto = self.objetos.get(objeto_id)
+        return objeto["_tipo"] if objeto else None
+
+    def _filhos(self, objeto_id: str, tipo: str) -> List[Dict[str, Any]]:
+        return [self.objetos[i] for i in self.filhos.get(objeto_id, [])
+                if self.objetos[i]["_tipo"] == tipo and self.objetos[i].get("status") != "DELETED"]
+
+    def _representar(self, objeto_id: str, campos: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        tipo = self._tipo(objeto_id)
+        if tipo == "account":
+            objeto = {"id": objeto_id, "account_id": objeto_id.replace("act_", ""),
+                      "name": f"Conta simulada {objeto_id.replace('act_', '')}", "account_status": 1,
+                      "currency": "BRL", "timezone_name": "America/Sao_Paulo"}
+        else:
+            objeto = self.objetos[objeto_id]
+
+        resultado = {"id": objeto["id"]}
+        for campo, subcampos in (campos or {}).items():
+            if campo in _ARESTAS[tipo]:
+                filhos = self._filhos(objeto_id, _ARESTAS[tipo][campo])
+                resultado[campo] = {"data": [self._representar(f["id"], subcampos) for f in filhos]}
+            elif campo == "creative" and tipo == "ad":
+                resultado[campo] = self._representar(objeto["creative"]["creative_id"], subcampos)
+            elif campo in ("campaign", "adset") and tipo in ("adset", "ad") and f"{campo}_id" in objeto:
+                resultado[campo] = self._representar(objeto[f"{campo}_id"], subcampos)
+            elif campo in objeto and not campo.startswith("_"):
+                resultado[campo] = objeto[campo]
+        return resultado
+
+    def _listar(self, objeto_id: str, aresta: str, params: Dict[str, Any], url: str) -> Dict[str, Any]:
+        tipo = self._tipo(objeto_id)
+        filhos = self._filhos(objeto_id, _ARESTAS[tipo][aresta])
+        filtro = params.get("effective_status")
+        if filtro:
+            filhos = [f for f in filhos if f.get("effective_status") in filtro]
+        for condicao in params.get("filtering") or []:
+            valores = condicao.get("value")
+            valores = {str(v) for v in (valores if isinstance(valores, list) else [valores])}
+            filhos = [f for f in filhos if str(f.get(condicao.get("field"))) in valores]
+        campos = interpretar_campos(params.get("fields"))
+        itens = [self._representar(f["id"], campos) for f in filhos]
+        return self._paginar(itens, params, url)
+
+    def _paginar(self, itens: List[Dict[str, Any]], params: Dict[str, Any], url: str) -> Dict[str, Any]:
+        limite = int(params.get("limit") or 25)
+        inicio = _posicao(params.get("after"))
+        pagina = itens[inicio:inicio + limite]
+        resposta = {"data": pagina}
+        if pagina:
+            resposta["paging"] = {"cursors": {"before": _cursor(inicio), "after": _cursor(inicio + len(pagina))}}
+            if inicio + limite < len(itens):
+                resposta["paging"]["next"] = f"{url}?after={_cursor(inicio + len(pagina))}&limit={limite}"
+        return resposta
+
+    def _criar(self, conta: str, aresta: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        tipo = _ARESTAS["account"][aresta]
+        if not params.get("name"):
+            return _erro("(#100) The parameter name is required")
+
+        if tipo == "campaign":
+            if not params.get("objective"):
+                return _erro("(#100) The parameter objective is required")
+            if "special_ad_categories" not in params:
+                return _erro("(#100) The parameter special_ad_categories is required")
+        elif tipo == "adset":
+            campanha = self.objetos.get(str(params.get("campaign_id")))
+            if not campanha or campanha["_tipo"] != "campaign" or campanha["account_id"] != conta[4:]:
+                return _erro("(#100) Param campaign_id must be a valid campaign id", subcodigo=1885014)
+            if not isinstance(params.get("targeting"), dict):
+                return _erro("(#100) The parameter targeting is required")
+            if not params.get("optimization_goal"):
+                return _erro("(#100) The parameter optimization_goal is required")
+        elif tipo == "adcreative":
+            invalido = self._validar_criativo(conta, params.get("object_story_spec"))
+            if invalido:
+                return invalido
+        elif tipo == "ad":
+            conjunto = self.objetos.get(str(params.get("adset_id")))
+            if not conjunto or conjunto["_tipo"] != "adset":
+                return _erro("(#100) Param adset_id must be a valid ad set id")
+            criativo = (params.get("creative") or {}).get("creative_id")
+            if str(criativo) not in self.objetos:
+                return _erro("(#100) Param creative must contain a valid creative_id", subcodigo=1487229)
+            params = {**params, "creative": {"creative_id": str(criativo)}}
+
+        campos = {chave: valor for chave, valor in params.items() if chave not in ("access_token", "appsecret_proof")}
+        if tipo == "campaign" and "end_time" in campos:
+            campos["stop_time"] = campos.pop("end_time")
+        if tipo in ("campaign", "adset", "ad"):
+            campos.setdefault("status", "PAUSED")
+        return 200, {"id": self._criar_objeto(tipo, conta, campos)["id"]}
+
+    def _validar_criativo(self, conta: str, especificacao: Any) -> Optional[Tuple[int, Dict[str, Any]]]:
+        if not isinstance(especificacao, dict):
+            return _erro("(#100) The parameter object_story_spec is required")
+        dados_link = especificacao.get("link_data") or {}
+        dados_video = especificacao.get("video_data") or {}
+        hash_imagem = dados_link.get("image_hash") or dados_video.get("image_hash")
+        if hash_imagem and hash_imagem not in self.imagens[conta]:
+            return _erro("(#100) Invalid image hash", subcodigo=1487242)
+        if dados_video:
+            video = self.objetos.get(str(dados_video.get("video_id")))
+            if not video or video["_tipo"] != "advideo":
+                return _erro("(#100) Invalid video id", subcodigo=1487242)
+            if self._status_video(video)["video_status"] != "ready":
+                return _erro("The video is still being processed", subcodigo=1885252)
+        return None
+
+    def _atualizar(self, objeto_id: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        objeto = self.objetos[objeto_id]
+        editaveis = _CAMPOS_EDITAVEIS.get(objeto["_tipo"], set())
+        desconhecidos = [c for c in params if c not in editaveis and c not in ("access_token", "appsecret_proof")]
+        if desconhecidos:
+            return _erro(f"(#100) Param {desconhecidos[0]} is not allowed for this object")
+        if "status" in params and params["status"] not in _STATUS_VALIDOS:
+            return _erro(f"(#100) Param status must be one of {{{', '.join(sorted(_STATUS_VALIDOS))}}}")
+        if "daily_budget" in params and int(params["daily_budget"]) < 100:
+            return _erro("(#100) The daily budget is too low", subcodigo=1885272)
+
+        for campo in editaveis & params.keys():
+            objeto[campo] = params[campo]
+        if "status" in params:
+            objeto["effective_status"] = params["status"]
+            # Pausar ou arquivar um objeto afeta o status efetivo dos descendentes
+            for tipo in ("adset", "ad"):
+                for filho in self._filhos(objeto_id, tipo):
+                    if params["status"] != "ACTIVE":
+                        filho["effective_status"] = f"{objeto['_tipo'].upper()}_PAUSED"
+                    elif filho.get("status") == "ACTIVE":
+                        filho["effective_status"] = "ACTIVE"
+        return 200, {"success": True}
+
+    # Imagens e vídeos
+
+    def _carregar_imagens(self, conta: str, arquivos: Dict[str, Tuple[str, bytes]]) -> Tuple[int, Dict[str, Any]]:
+        if not arquivos:
+            return _erro("(#100) No image file was uploaded")
+        imagens = {}
+        for nome, conteudo in arquivos.values():
+            hash_imagem = hashlib.md5(conteudo).hexdigest()
+            imagem = {"hash": hash_imagem, "url": f"https://graph-simulada.local/imagens/{hash_imagem}.jpg",
+                      "name": nome}
+            self.imagens[conta][hash_imagem] = imagem
+            imagens[nome] = {"hash": hash_imagem, "url": imagem["url"]}
+        return 200, {"images": imagens}
+
+    def _carregar_video(self, conta: str, params: Dict[str, Any],
+                        arquivos: Dict[str, Tuple[str, bytes]]) -> Tuple[int, Dict[str, Any]]:
+        fase = params.get("upload_phase")
+        if fase == "start":
+            tamanho = int(params.get("file_size") or 0)
+            if tamanho <= 0:
+                return _erro("(#100) file_size must be positive")
+            video = self._criar_objeto("advideo", conta, {"title": None, "_tamanho": tamanho,
+                                                          "_recebido": 0, "_pronto_em": None})
+            sessao_id = self._novo_id()
+            self.uploads[sessao_id] = {"video_id": video["id"], "tamanho": tamanho, "recebido": 0}
+            return 200, {"upload_session_id": sessao_id, "video_id": video["id"],
+                         "start_offset": "0", "end_offset": str(min(tamanho, self.configuracao.tamanho_trecho_video))}
+
+        sessao = self.uploads.get(str(params.get("upload_session_id")))
+        if not sessao:
+            return _erro("Invalid upload session", codigo=6000, subcodigo=1363019)
+
+        if fase == "transfer":
+            inicio = int(params.get("start_offset") or 0)
+            trecho = arquivos.get("video_file_chunk", ("", b""))[1]
+            if inicio != sessao["recebido"]:
+                fim = min(sessao["tamanho"], sessao["recebido"] + self.configuracao.tamanho_trecho_video)
+                return _erro("The start offset of this chunk does not match the expected offset", codigo=6001,
+                             subcodigo=1363037, dados={"start_offset": sessao["recebido"], "end_offset": fim})
+            sessao["recebido"] = min(sessao["tamanho"], inicio + len(trecho))
+            fim = min(sessao["tamanho"], sessao["recebido"] + self.configuracao.tamanho_trecho_video)
+            return 200, {"start_offset": str(sessao["recebido"]), "end_offset": str(fim)}
+
+        if fase == "finish":
+            if sessao["recebido"] < sessao["tamanho"]:
+                return _erro("Upload incomplete", codigo=6001, subcodigo=1363030)
+            video = self.objetos[sessao["video_id"]]
+            video["title"] = params.get("title")
+            video["_pronto_em"] = time.monotonic() + self.configuracao.tempo_codificacao_video
+            del self.uploads[str(params["upload_session_id"])]
+            return 200, {"success": True}
+
+        return _erro("(#100) Invalid upload_phase")
+
+    def _status_video(self, video: Dict[str, Any]) -> Dict[str, Any]:
+        if video["_pronto_em"] is None:
+            return {"video_status": "upload", "processing_progress": 0}
+        restante = video["_pronto_em"] - time.monotonic()
+        if restante <= 0:
+            return {"video_status": "ready", "processing_progress": 100}
+        total = self.configuracao.tempo_codificacao_video or 1
+        return {"video_status": "processing", "processing_progress": int(100 * (1 - restante / total))}
+
+    # Busca de interesses
+
+    def _buscar_interesses(self, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if params.get("type") != "adinterest":
+            return _erro("(#100) Unsupported search type")
+        termo = " ".join(str(params.get("q") or "").split())
+        if not termo:
+            return _erro("(#100) The parameter q is required")
+        limite = min(int(params.get("limit") or 25), len(_SUFIXOS_INTERESSES))
+
+        interesses = []
+        for sufixo in _SUFIXOS_INTERESSES[:limite]:
+            nome = f"{termo.title()} {sufixo}".strip()
+            semente = int(hashlib.md5(nome.lower().encode()).hexdigest()[:12], 16)
+            inferior = 10000 + semente % 50000000
+            interesses.append({
+                "id": str(6000000000000 + semente % 999999999999),
+                "name": nome,
+                "audience_size_lower_bound": inferior,
+                "audience_size_upper_bound": int(inferior * 1.18),
+                "path": ["Interesses", termo.title(), nome],
+                "topic": termo.title(),
+            })
+        return 200, {"data": interesses}
+
+    # Insights
+
+    @staticmethod
+    def _metricas_dia(objeto_id: str, dia: date) -> Dict[str, float]:
+        # Determinístico por anúncio e dia: consultas repetidas retornam os mesmos números
+        gerador = random.Random(f"{objeto_id}:{dia.isoformat()}")
+        impressoes = gerador.randint(500, 5000)
+        cliques = int(impressoes * gerador.uniform(0.005, 0.03))
+        return {
+            "impressions": impressoes,
+            "clicks": cliques,
+            "reach": int(impressoes / gerador.uniform(1.1, 2.5)),
+            "spend": round(impressoes * gerador.uniform(5, 30) / 1000, 2),
+            "conversions": int(cliques * gerador.uniform(0.02, 0.1)),
+        }
+
+    @staticmethod
+    def _periodos(inicio: date, fim: date, incremento: Any) -> List[Tuple[date, date]]:
+        if incremento in (None, "", "all_days"):
+            return [(inicio, fim)]
+        if incremento == "monthly":
+            periodos, atual = [], inicio
+            while atual <= fim:
+                proximo = (atual.replace(day=1) + timedelta(days=32)).replace(day=1)
+                periodos.append((atual, min(fim, proximo - timedelta(days=1))))
+                atual = proximo
+            return periodos
+        passo = max(1, int(incremento))
+        return [(inicio + timedelta(days=d), min(fim, inicio + timedelta(days=d + passo - 1)))
+                for d in range(0, (fim - inicio).days + 1, passo)]
+
+    def _linhas_insights(self, objeto_id: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        tipo = self._tipo(objeto_id)
+        nivel = params.get("level") or tipo
+        intervalo = params.get("time_range") or {}
+        hoje = date.today()
+        fim = min(date.fromisoformat(intervalo["until"]) if "until" in intervalo else hoje, hoje)
+        inicio = date.fromisoformat(intervalo["since"]) if "since" in intervalo else fim - timedelta(days=29)
+        campos = [c for c in (_texto_campos(params.get("fields")) or "impressions,spend").split(",") if c]
+
+        anuncios = [self.objetos[objeto_id]] if tipo == "ad" else self._filhos(objeto_id, "ad")
+        for filtro in params.get("filtering") or []:
+            campo = filtro.get("field", "").split(".")[0]
+            valores = filtro.get("value")
+            valores = {str(v) for v in (valores if isinstance(valores, list) else [valores])}
+            anuncios = [a for a in anuncios if str(a.get("id" if campo == "ad" else f"{campo}_id")) in valores]
+
+        chave_nivel = {"account": None, "campaign": "campaign_id", "adset": "adset_id", "ad": "id"}[nivel]
+        linhas = []
+        for periodo_inicio, periodo_fim in self._periodos(inicio, fim, params.get("time_increment")):
+            grupos: Dict[Any, Dict[str, Any]] = {}
+            for anuncio in anuncios:
+                chave = anuncio[chave_nivel] if chave_nivel else objeto_id
+                soma = grupos.setdefault(chave, {"anuncio": anuncio, "impressions": 0, "clicks": 0,
+                                                 "reach": 0, "spend": 0.0, "conversions": 0})
+                dia = periodo_inicio
+                while dia <= periodo_fim:
+                    for metrica, valor in self._metricas_dia(anuncio["id"], dia).items():
+                        soma[metrica] += valor
+                    dia += timedelta(days=1)
+
+            for soma in grupos.values():
+                linha = self._linha_insight(soma, nivel, campos)
+                linha["date_start"], linha["date_stop"] = periodo_inicio.isoformat(), periodo_fim.isoformat()
+                linhas.append(linha)
+        return linhas
+
+    def _linha_insight(self, soma: Dict[str, Any], nivel: str, campos: List[str]) -> Dict[str, Any]:
+        anuncio = soma["anuncio"]
+        impressoes, cliques, gasto = soma["impressions"], soma["clicks"], soma["spend"]
+        valores = {
+            "account_id": anuncio["account_id"],
+            "campaign_id": anuncio["campaign_id"],
+            "campaign_name": self.objetos[anuncio["campaign_id"]]["name"],
+            "adset_id": anuncio["adset_id"],
+            "adset_name": self.objetos[anuncio["adset_id"]]["name"],
+            "ad_id": anuncio["id"],
+            "ad_name": anuncio["name"],
+            "impressions": str(impressoes),
+            "clicks": str(cliques),
+            "inline_link_clicks": str(cliques),
+            "reach": str(soma["reach"]),
+            "spend": f"{gasto:.2f}",
+            "ctr": f"{100 * cliques / impressoes:.6f}" if impressoes else "0",
+            "cpc": f"{gasto / cliques:.6f}" if cliques else "0",
+            "cpm": f"{1000 * gasto / impressoes:.6f}" if impressoes else "0",
+            "frequency": f"{impressoes / soma['reach']:.6f}" if soma["reach"] else "0",
+            "actions": [
+                {"action_type": "link_click", "value": str(cliques)},
+                {"action_type": "purchase", "value": str(soma["conversions"])},
+            ],
+        }
+        # Campos de identificação de níveis abaixo do pedido não se aplicam
+        proibidos = {"account": ("campaign", "adset", "ad"), "campaign": ("adset", "ad"),
+                     "adset": ("ad",), "ad": ()}[nivel]
+        return {c: valores[c] for c in campos if c in valores and not c.startswith(tuple(f"{p}_" for p in proibidos))}
+
+    def _insights(self, objeto_id: str, params: Dict[str, Any], url: str) -> Tuple[int, Dict[str, Any]]:
+        relatorio = self.relatorios.get(objeto_id)
+        if relatorio:
+            if relatorio["pronto_em"] > time.monotonic():
+                return _erro("Report not ready", codigo=2601)
+            return 200, self._paginar(relatorio["linhas"], params, url)
+        try:
+            linhas = self._linhas_insights(objeto_id, params)
+        except (KeyError, ValueError) as e:
+            return _erro(f"(#100) Invalid insights parameter: {e}")
+        return 200, self._paginar(linhas, params, url)
+
+    def _criar_relatorio(self, conta: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        try:
+            linhas = self._linhas_insights(conta, params)
+        except (KeyError, ValueError) as e:
+            return _erro(f"(#100) Invalid insights parameter: {e}")
+        relatorio_id = self._novo_id()
+        self.relatorios[relatorio_id] = {"linhas": linhas, "criado_em": time.monotonic(),
+                                         "pronto_em": time.monotonic() + self.configuracao.tempo_relatorio}
+        return 200, {"report_run_id": relatorio_id}
+
+    def _status_relatorio(self, relatorio_id: str) -> Dict[str, Any]:
+        relatorio = self.relatorios[relatorio_id]
+        total = max(relatorio["pronto_em"] - relatorio["criado_em"], 1e-9)
+        progresso = min(1.0, (time.monotonic() - relatorio["criado_em"]) / total)
+        return {
+            "id": relatorio_id,
+            "async_status": "Job Completed" if progresso >= 1 else "Job Running",
+            "async_percent_completion": int(100 * progresso),
+        }
+
+    # Roteamento
+
+    def processar(self, metodo: str, caminho: str, params: Dict[str, Any],
+                  arquivos: Optional[Dict[str, Tuple[str, bytes]]] = None,
+                  url: str = "") -> Tuple[int, Any]:
+        """
+        Processa uma operação da Graph API (sem latência nem erros injetados).
+
+        Args:
+            metodo (str): Método HTTP
+            caminho (str): Caminho relativo à versão (Ex: act_123/campaigns)
+            params (Dict[str, Any]): Parâmetros já decodificados
+            arquivos (Dict[str, Tuple[str, bytes]], optional): Arquivos multipart (nome, conteúdo) por campo
+            url (str, optional): URL absoluta da requisição, usada nos links de paginação
+
+        Returns:
+            tuple: Status HTTP e corpo da resposta
+        """
+        arquivos = arquivos or {}
+        partes = [p for p in caminho.strip("/").split("/") if p]
+        with self._lock:
+            self.estatisticas["operacoes"] += 1
+
+            if not partes:
+                if metodo == "POST" and "batch" in params:
+                    return self._lote(params["batch"], url)
+                return _erro("(#100) Missing batch parameter")
+
+            if partes == ["search"] and metodo == "GET":
+                return self._buscar_interesses(params)
+
+            objeto_id = partes[0]
+            tipo = self._tipo(objeto_id)
+            if tipo is None and objeto_id in self.relatorios:
+                if len(partes) == 1:
+                    return 200, self._status_relatorio(objeto_id)
+                return self._insights(objeto_id, params, url)
+            if tipo is None:
+                return _erro(f"Unsupported {metodo.lower()} request. Object with ID '{objeto_id}' does not exist",
+                             subcodigo=33)
+
+            if len(partes) == 1:
+                if metodo == "GET":
+                    if tipo == "advideo":
+                        return 200, {"id": objeto_id, "status": self._status_video(self.objetos[objeto_id])}
+                    return 200, self._representar(objeto_id, interpretar_campos(params.get("fields"))
+                                                  or {"name": None})
+                if metodo == "POST" and tipo != "account":
+                    return self._atualizar(objeto_id, params)
+                if metodo == "DELETE" and tipo != "account":
+                    return self._atualizar(objeto_id, {"status": "DELETED"})
+                return _erro(f"(#100) Unsupported {metodo.lower()} request")
+
+            aresta = partes[1]
+            if aresta == "insights":
+                if metodo == "POST" and tipo == "account":
+                    return self._criar_relatorio(objeto_id, params)
+                return self._insights(objeto_id, params, url)
+            if tipo == "account" and aresta == "adimages" and metodo == "POST":
+                return self._carregar_imagens(objeto_id, arquivos)
+            if tipo == "account" and aresta == "advideos" and metodo == "POST":
+                return self._carregar_video(objeto_id, params, arquivos)
+            if aresta in _ARESTAS[tipo]:
+                if metodo == "GET":
+                    return 200, self._listar(objeto_id, aresta, params, url)
+                if metodo == "POST" and tipo == "account":
+                    return self._criar(objeto_id, aresta, params)
+            return _erro(f"(#100) Unknown path components: /{aresta}", codigo=2500)
+
+    def _lote(self, itens: Any, url: str) -> Tuple[int, Any]:
+        if not isinstance(itens, list) or not itens:
+            return _erro("(#100) The batch parameter must be a JSON array")
+        if len(itens) > TAMANHO_MAXIMO_LOTE:
+            return _erro(f"(#1) Too many requests in batch message. Maximum batch size is {TAMANHO_MAXIMO_LOTE}",
+                         codigo=1)
+
+        ids: Dict[str, Optional[str]] = {}
+        respostas = []
+        for item in itens:
+            texto = item.get("relative_url", "") + "\n" + item.get("body", "")
+            dependencias = _PADRAO_REFERENCIA.findall(texto)
+            # Operações cuja dependência falhou não são executadas (resposta nula, como na Graph API)
+            if any(not ids.get(d) for d in dependencias):
+                respostas.append(None)
+                if item.get("name"):
+                    ids[item["name"]] = None
+                continue
+            texto = _PADRAO_REFERENCIA.sub(lambda m: ids[m.group(1)], texto)
+            relativa, corpo = texto.split("\n", 1)
+
+            partes_url = urlsplit(relativa)
+            params = {chave: _decodificar(valor) for chave, valor in parse_qsl(partes_url.query, keep_blank_values=True)}
+            params.update({chave: _decodificar(valor) for chave, valor in parse_qsl(corpo, keep_blank_values=True)})
+            status, resposta = self.processar(item.get("method", "GET").upper(), partes_url.path, params, url=url)
+
+            if item.get("name"):
+                ids[item["name"]] = resposta.get("id") if status == 200 and isinstance(resposta, dict) else None
+            respostas.append({"code": status, "headers": [], "body": json.dumps(resposta)})
+        return 200, respostas
+
+    # Uso e limitação
+
+    def registrar_chamadas(self, conta: Optional[str], quantidade: int = 1) -> Dict[str, Any]:
+        """
+        Registra chamadas de uma conta na janela de uso e calcula o percentual de uso.
+
+        Args:
+            conta (str, optional): Conta publicitária (act_...), se identificada
+            quantidade (int, optional): Número de chamadas (operações de um lote contam individualmente)
+
+        Returns:
+            Dict[str, Any]: Percentual de uso da conta e do app e segundos até a janela liberar
+        """
+        agora = time.monotonic()
+        janela = self.configuracao.janela_uso
+        with self._lock:
+            for chamadas in self._chamadas.values():
+                while chamadas and chamadas[0] <= agora - janela:
+                    chamadas.popleft()
+            if conta:
+                self._chamadas[conta].extend([agora] * quantidade)
+            chamadas_conta = self._chamadas.get(conta) or deque()
+            total = sum(len(c) for c in self._chamadas.values())
+
+        capacidade = max(1, self.configuracao.chamadas_por_janela)
+        return {
+            "uso": min(100, int(100 * len(chamadas_conta) / capacidade)),
+            "uso_app": min(100, int(100 * total / (capacidade * 10))),
+            "recuperacao": max(0.0, chamadas_conta[0] + janela - agora) if chamadas_conta else 0.0,
+        }
+
+    def headers_uso(self, conta: Optional[str], uso: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Monta os headers de uso do Meta para a resposta.
+        """
+        headers = {"x-app-usage": json.dumps({"call_count": uso["uso_app"], "total_cputime": uso["uso_app"] // 2,
+                                              "total_time": uso["uso_app"] // 2})}
+        if conta:
+            espera_minutos = math.ceil(uso["recuperacao"] / 60) if uso["uso"] >= 100 else 0
+            headers["x-business-use-case-usage"] = json.dumps({conta.replace("act_", ""): [{
+                "type": "ads_management", "call_count": uso["uso"], "total_cputime": uso["uso"] // 2,
+                "total_time": uso["uso"] // 2, "estimated_time_to_regain_access": espera_minutos,
+            }]})
+            headers["x-ad-account-usage"] = json.dumps({
+                "acc_id_util_pct": uso["uso"], "reset_time_duration": int(uso["recuperacao"]),
+                "ads_api_access_tier": "development_access",
+            })
+        return headers
+
+    def conta_da_requisicao(self, caminho: str, params: Dict[str, Any]) -> Tuple[Optional[str], int]:
+        """
+        Identifica a conta publicitária afetada por uma requisição e o número de chamadas que ela representa.
+
+        Returns:
+            tuple: Conta (act_...) ou None e número de chamadas
+        """
+        partes = [p for p in caminho.strip("/").split("/") if p]
+        if not partes and isinstance(params.get("batch"), list):
+            for item in params["batch"]:
+                conta, _ = self.conta_da_requisicao(urlsplit(item.get("relative_url", "")).path, {})
+                if conta:
+                    return conta, len(params["batch"])
+            return None, len(params["batch"])
+        if not partes:
+            return None, 1
+        if partes[0].startswith("act_"):
+            return partes[0], 1
+        objeto = self.objetos.get(partes[0])
+        return (f"act_{objeto['account_id']}" if objeto else None), 1
+
+    def sortear_falha(self) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Sorteia um erro injetado conforme as taxas configuradas.
+        """
+        with self._lock:
+            sorteio = self._aleatorio.random()
+        if sorteio < self.configuracao.taxa_limitacao:
+            self.estatisticas["limitacoes_injetadas"] += 1
+            return _erro("(#17) User request limit reached", codigo=17, subcodigo=2446079)
+        if sorteio < self.configuracao.taxa_limitacao + self.configuracao.taxa_erros:
+            self.estatisticas["erros_injetados"] += 1
+            return _erro("An unexpected error has occurred. Please retry your request later.",
+                         codigo=2, status=500, transitorio=True)
+        return None
+
+    def latencia(self, operacoes: int = 1) -> float:
+        """
+        Sorteia a latência de uma requisição com o número de operações informado.
+        """
+        configuracao = self.configuracao
+        with self._lock:
+            variacao = self._aleatorio.uniform(0, configuracao.variacao_latencia)
+        return configuracao.latencia + variacao + configuracao.latencia_por_operacao * max(0, operacoes - 1)
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas do simulador e a quantidade de objetos por tipo.
+        """
+        with self._lock:
+            objetos = Counter(o["_tipo"] for o in self.objetos.values())
+            return {
+                "estatisticas": dict(self.estatisticas),
+                "objetos": dict(objetos),
+                "imagens": sum(len(i) for i in self.imagens.values()),
+                "configuracao": self.configuracao.model_dump(),
+            }
+
+    def popular_conta(self, account_id: str, campanhas: int = 10, conjuntos_por_campanha: int = 3,
+                      anuncios_por_conjunto: int = 3) -> Dict[str, int]:
+        """
+        Cria uma estrutura de campanhas ativas na conta, para benchmarks de leitura e de insights.
+
+        Args:
+            account_id (str): ID da conta publicitária (sem o prefixo act_)
+            campanhas (int, optional): Número de campanhas
+            conjuntos_por_campanha (int, optional): Conjuntos de anúncios por campanha
+            anuncios_por_conjunto (int, optional): Anúncios por conjunto
+
+        Returns:
+            Dict[str, int]: Quantidade de objetos criados por tipo
+        """
+        conta = f"act_{account_id}"
+        with self._lock:
+            criativo = self._criar_objeto("adcreative", conta, {"name": "Criativo simulado",
+                                                                "object_story_spec": {}})
+            for c in range(campanhas):
+                campanha = self._criar_objeto("campaign", conta, {
+                    "name": f"Campanha {c + 1}", "objective": "OUTCOME_TRAFFIC", "status": "ACTIVE",
+                    "daily_budget": "5000", "special_ad_categories": []})
+                for s in range(conjuntos_por_campanha):
+                    conjunto = self._criar_objeto("adset", conta, {
+                        "name": f"Conjunto {c + 1}.{s + 1}", "campaign_id": campanha["id"], "status": "ACTIVE",
+                        "optimization_goal": "LINK_CLICKS", "billing_event": "IMPRESSIONS",
+                        "targeting": {"geo_locations": {"countries": ["BR"]}}})
+                    for a in range(anuncios_por_conjunto):
+                        self._criar_objeto("ad", conta, {
+                            "name": f"Anúncio {c + 1}.{s + 1}.{a + 1}", "adset_id": conjunto["id"],
+                            "creative": {"creative_id": criativo["id"]}, "status": "ACTIVE"})
+        return {"campanhas": campanhas, "conjuntos": campanhas * conjuntos_por_campanha,
+                "anuncios": campanhas * conjuntos_por_campanha * anuncios_por_conjunto}
+
+
+async def _ler_requisicao(request: Request) -> Tuple[Dict[str, Any], Dict[str, Tuple[str, bytes]]]:
+    params = {chave: _decodificar(valor) for chave, valor in request.query_params.items()}
+    arquivos = {}
+    if request.method == "POST":
+        formulario = await request.form()
+        for chave, valor in formulario.multi_items():
+            if hasattr(valor, "read"):
+                arquivos[chave] = (valor.filename, await valor.read())
+            else:
+                params[chave] = _decodificar(valor)
+    return params, arquivos
+
+
+def criar_app(simulador: Optional[GraphAPISimulada] = None) -> FastAPI:
+    """
+    Cria a aplicação FastAPI da Graph API simulada.
+
+    Além das rotas da Graph API (/{versão}/...), expõe rotas de controle em /_simulador
+    para consultar estatísticas, alterar a configuração, popular contas e reiniciar o estado.
+
+    Args:
+        simulador (GraphAPISimulada, optional): Estado usado. Se None, cria um novo
+
+    Returns:
+        FastAPI: Aplicação pronta para o uvicorn (o simulador fica em app.state.simulador)
+    """
+    simulador = simulador or GraphAPISimulada()
+    app = FastAPI(title="Graph API simulada", docs_url=None, redoc_url=None)
+    app.state.simulador = simulador
+
+    @app.get("/_simulador/metricas")
+    async def metricas():
+        return simulador.metricas()
+
+    @app.post("/_simulador/configuracao")
+    async def configurar(valores: Dict[str, Any]):
+        simulador.configurar(**valores)
+        return simulador.configuracao.model_dump()
+
+    @app.post("/_simulador/contas/{account_id}/popular")
+    async def popular(account_id: str, campanhas: int = 10, conjuntos_por_campanha: int = 3,
+                      anuncios_por_conjunto: int = 3):
+        return simulador.popular_conta(account_id, campanhas, conjuntos_por_campanha, anuncios_por_conjunto)
+
+    @app.post("/_simulador/reiniciar")
+    async def reiniciar():
+        simulador.reiniciar()
+        return {"success": True}
+
+    @app.api_route("/{versao}/{caminho:path}", methods=["GET", "POST", "DELETE"])
+    async def graph(versao: str, caminho: str, request: Request):
+        params, arquivos = await _ler_requisicao(request)
+        simulador.estatisticas["requisicoes"] += 1
+        conta, chamadas = simulador.conta_da_requisicao(caminho, params)
+
+        await asyncio.sleep(simulador.latencia(chamadas))
+
+        uso = simulador.registrar_chamadas(conta, chamadas)
+        headers = simulador.headers_uso(conta, uso)
+
+        if not params.get("access_token"):
+            status, corpo = _erro("An active access token must be used to query information.", codigo=2500)
+        elif conta and uso["uso"] >= 100:
+            simulador.estatisticas["limitacoes"] += 1
+            status, corpo = _erro("There have been too many calls to this ad-account. Wait a bit and try again.",
+                                  codigo=80004, subcodigo=2446079)
+        else:
+            falha = simulador.sortear_falha()
+            url = str(request.url).split("?")[0]
+            status, corpo = falha or simulador.processar(request.method, caminho, params, arquivos, url)
+
+        if status != 200:
+            simulador.estatisticas["respostas_erro"] += 1
+        return JSONResponse(corpo, status_code=status, headers=headers)
+
+    return app
+
+
+if __name__ == "__main__":
+    # Servidor avulso: python benchmarks/graph_api_simulada.py [porta]
+    import sys
+    import uvicorn
+
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(criar_app(), host="127.0.0.1", port=int(sys.argv[1]) if len(sys.argv) > 1 else 8999)
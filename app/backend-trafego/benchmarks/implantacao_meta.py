@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+"""
+Benchmark da implantação de campanhas contra a Graph API simulada, sem contas reais.
+
+Sobe a Graph API simulada em uma porta local, aponta os clientes do Meta ADS para ela
+(META_GRAPH_URL) e implanta campanhas completas com o cliente assíncrono e com o
+síncrono, medindo vazão, latência por campanha, requisições e limitações.
+
+Exemplos:
+    python benchmarks/implantacao_meta.py
+    python benchmarks/implantacao_meta.py --campanhas 40 --contas 4 --concorrencia 8 --latencia 0.1
+    python benchmarks/implantacao_meta.py --taxa-limitacao 0.05 --espera-limitacao 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Garantir que o diretório raiz do projeto está no sys.path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(root_dir))
+
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark de implantação de campanhas na Graph API simulada")
+    parser.add_argument("--campanhas", type=int, default=20, help="Campanhas implantadas por cliente")
+    parser.add_argument("--contas", type=int, default=2, help="Contas publicitárias usadas")
+    parser.add_argument("--conjuntos", type=int, default=3, help="Conjuntos de anúncios por campanha")
+    parser.add_argument("--anuncios", type=int, default=3, help="Anúncios por conjunto")
+    parser.add_argument("--concorrencia", type=int, default=4, help="Implantações simultâneas")
+    parser.add_argument("--latencia", type=float, default=0.05, help="Latência base da Graph API (s)")
+    parser.add_argument("--taxa-erros", type=float, default=0.0, help="Probabilidade de erro transitório")
+    parser.add_argument("--taxa-limitacao", type=float, default=0.0, help="Probabilidade de erro de limitação")
+    parser.add_argument("--espera-limitacao", type=float, default=1.0,
+                        help="Espera após limitação sem tempo informado (META_ESPERA_LIMITE_PADRAO)")
+    parser.add_argument("--taxa-requisicoes", type=float, default=10.0,
+                        help="Requisições por segundo por conta no agendador (META_TAXA_REQUISICOES)")
+    parser.add_argument("--clientes", default="async,sync", help="Clientes medidos (async, sync)")
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON")
+    return parser.parse_args()
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(app, porta: int):
+    import uvicorn
+
+    servidor = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=porta, log_level="warning"))
+    threading.Thread(target=servidor.run, daemon=True).start()
+    while not servidor.started:
+        time.sleep(0.05)
+    return servidor
+
+
+def criar_imagens(diretorio: str, quantidade: int):
+    caminhos = []
+    for i in range(quantidade):
+        caminho = os.path.join(diretorio, f"criativo_{i}.jpg")
+        with open(caminho, "wb") as f:
+            f.write(os.urandom(32 * 1024))
+        caminhos.append(caminho)
+    return caminhos
+
+
+def arvore_campanha(indice: int, conjuntos: int, anuncios: int, imagens):
+    return {
+        "campanha": {"nome": f"Benchmark {indice}", "objetivo": "OUTCOME_TRAFFIC", "orcamento_diario": 50},
+        "conjuntos": [{
+            "nome": f"Conjunto {indice}.{s}",
+            "objetivo_otimizacao": "LINK_CLICKS",
+            "segmentacao": {"geo_locations": {"countries": ["BR"]}, "age_min": 18, "age_max": 65},
+            "anuncios": [{
+                "nome": f"Anúncio {indice}.{s}.{a}",
+                "criativo": {
+                    "titulo": f"Oferta {a}",
+                    "texto": "Conheça a nova coleção",
+                    "cta": "LEARN_MORE",
+                    "url_destino": "https://example.com",
+                    "imagem_url": imagens[(indice + a) % len(imagens)],
+                },
+            } for a in range(anuncios)],
+        } for s in range(conjuntos)],
+    }
+
+
+def resumir(nome, contas, duracoes, resultados, inicio, simulador, antes, agendador_meta):
+    depois = simulador.metricas()["estatisticas"]
+    delta = {chave: depois.get(chave, 0) - antes.get(chave, 0) for chave in depois}
+    total = time.perf_counter() - inicio
+    duracoes = sorted(duracoes)
+    return {
+        "cliente": nome,
+        "campanhas": len(resultados),
+        "sucesso": sum(1 for r in resultados if r.get("sucesso")),
+        "tempo_total_s": round(total, 2),
+        "campanhas_por_s": round(len(resultados) / total, 2),
+        "p50_s": round(statistics.median(duracoes), 3),
+        "p95_s": round(duracoes[int(0.95 * (len(duracoes) - 1))], 3),
+        "requisicoes_http": delta.get("requisicoes", 0),
+        "operacoes": delta.get("operacoes", 0),
+        "erros_injetados": delta.get("erros_injetados", 0),
+        "limitacoes": delta.get("limitacoes_injetadas", 0) + delta.get("limitacoes", 0),
+        "novas_tentativas": sum(m["limitacoes"] for conta, m in agendador_meta.metricas().items() if conta in contas),
+    }
+
+
+async def medir_async(args, url, arvores, contas, simulador, agendador_meta):
+    from backend.trafego_ai.tools.meta_ads_async import MetaAdsAsyncAPI, criar_cliente_http
+
+    antes = simulador.metricas()["estatisticas"]
+    semaforo = asyncio.Semaphore(args.concorrencia)
+    duracoes, resultados = [], []
+
+    async with criar_cliente_http() as cliente_http:
+        clientes = [MetaAdsAsyncAPI(access_token="token-benchmark", account_id=conta, app_secret="segredo",
+                                    cliente_http=cliente_http, base_url=url) for conta in contas]
+
+        async def implantar(i, arvore):
+            async with semaforo:
+                comeco = time.perf_counter()
+                try:
+                    resultado = await clientes[i % len(clientes)].implantar_campanha(arvore)
+                except Exception as e:
+                    resultado = {"sucesso": False, "erro": str(e)}
+                duracoes.append(time.perf_counter() - comeco)
+                resultados.append(resultado)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(implantar(i, arvore) for i, arvore in enumerate(arvores)))
+    return resumir("async", contas, duracoes, resultados, inicio, simulador, antes, agendador_meta)
+
+
+def medir_sync(args, arvores, contas, simulador, agendador_meta):
+    from backend.trafego_ai.tools.meta_ads_api import MetaAdsAPI
+
+    antes = simulador.metricas()["estatisticas"]
+    clientes = [MetaAdsAPI(app_id="app-benchmark", app_secret="segredo", access_token="token-benchmark",
+                           account_id=conta) for conta in contas]
+    duracoes, resultados = [], []
+
+    def implantar(i, arvore):
+        comeco = time.perf_counter()
+        try:
+            resultado = clientes[i % len(clientes)].implantar_campanha(arvore)
+        except Exception as e:
+            resultado = {"sucesso": False, "erro": str(e)}
+        duracoes.append(time.perf_counter() - comeco)
+        resultados.append(resultado)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concorrencia) as executor:
+        list(executor.map(implantar, range(len(arvores)), arvores))
+    return resumir("sync", contas, duracoes, resultados, inicio, simulador, antes, agendador_meta)
+
+
+def main():
+    args = ler_argumentos()
+    porta = porta_livre()
+    url = f"http://127.0.0.1:{porta}"
+    temporario = tempfile.mkdtemp(prefix="benchmark_meta_")
+
+    # As configurações são lidas na importação dos módulos: definir o ambiente antes de importá-los
+    os.environ["META_GRAPH_URL"] = url
+    os.environ["META_ESPERA_LIMITE_PADRAO"] = str(args.espera_limitacao)
+    os.environ["META_TAXA_REQUISICOES"] = str(args.taxa_requisicoes)
+    os.environ["IMAGENS_DB"] = os.path.join(temporario, "imagens.db")
+    os.environ["VIDEOS_ESTADO_DIR"] = os.path.join(temporario, "videos")
+    os.environ["METRICAS_DIR"] = os.path.join(temporario, "metricas")
+
+    from backend.benchmarks.graph_api_simulada import GraphAPISimulada, ConfiguracaoGraphSimulada, criar_app
+    from backend.trafego_ai.tools.agendador_meta import agendador_meta
+
+    simulador = GraphAPISimulada(ConfiguracaoGraphSimulada(
+        latencia=args.latencia, taxa_erros=args.taxa_erros, taxa_limitacao=args.taxa_limitacao, semente=42
+    ))
+    servidor = iniciar_servidor(criar_app(simulador), porta)
+
+    imagens = criar_imagens(temporario, 5)
+    contas = [str(1000 + i) for i in range(args.contas)]
+    resultados = []
+    try:
+        for cliente in args.clientes.split(","):
+            # Contas novas a cada cliente, para que o registro de imagens não favoreça a segunda medição
+            contas_cliente = [f"{conta}{len(resultados)}" for conta in contas]
+            arvores = [arvore_campanha(i, args.conjuntos, args.anuncios, imagens) for i in range(args.campanhas)]
+            if cliente == "async":
+                resultados.append(asyncio.run(medir_async(args, url, arvores, contas_cliente,
+                                                          simulador, agendador_meta)))
+            elif cliente == "sync":
+                resultados.append(medir_sync(args, arvores, contas_cliente, simulador, agendador_meta))
+    finally:
+        servidor.should_exit = True
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+
+    colunas = list(resultados[0]) if resultados else []
+    print(" | ".join(colunas))
+    for resultado in resultados:
+        print(" | ".join(str(resultado[c]) for c in colunas))
+
+
+if __name__ == "__main__":
+    main()
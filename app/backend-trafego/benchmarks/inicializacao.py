@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Benchmark da inicialização da API: tempo de importação e tempo até a primeira requisição.
+
+Cada medida roda em um processo novo, sem módulos em cache na memória. Além dos tempos,
+lista quais SDKs pesados (CrewAI, LangChain, OpenAI, Facebook) foram carregados na
+importação; o esperado é que nenhum seja carregado antes da primeira sessão.
+
+Exemplos:
+    python benchmarks/inicializacao.py
+    python benchmarks/inicializacao.py --repeticoes 10 --primeira-sessao
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# Garantir que o diretório raiz do projeto está no sys.path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(root_dir))
+
+MODULO_APP = "backend.trafego_ai.api.main"
+
+# SDKs cuja importação deve ser adiada até o primeiro uso
+MODULOS_PESADOS = ["crewai", "langchain", "langchain_openai", "openai", "facebook_business", "numpy", "httpx"]
+
+_SCRIPT_IMPORTACAO = f"""
+import json, sys, time
+inicio = time.perf_counter()
+import {MODULO_APP}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{"importacao_ms": duracao * 1000,
+                   "carregados": [m for m in {MODULOS_PESADOS!r} if m in sys.modules]}}))
+"""
+
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização da API")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Processos medidos por etapa")
+    parser.add_argument("--primeira-sessao", action="store_true",
+                        help="Mede também a primeira criação de sessão (carrega o CrewAI)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Espera máxima pelo servidor (s)")
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON")
+    return parser.parse_args()
+
+
+def ambiente():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.dirname(root_dir), env.get("PYTHONPATH")]))
+    return env
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def medir_importacao():
+    saida = subprocess.run([sys.executable, "-c", _SCRIPT_IMPORTACAO], env=ambiente(),
+                           capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def requisitar(url: str, metodo: str = "GET") -> bool:
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, method=metodo), timeout=30) as resposta:
+            return resposta.status == 200
+    except (urllib.error.URLError, ConnectionError):
+        return False
+
+
+def medir_primeira_requisicao(timeout: float, primeira_sessao: bool):
+    porta = porta_livre()
+    comando = [sys.executable, "-m", "uvicorn", f"{MODULO_APP}:app",
+               "--host", "127.0.0.1", "--port", str(porta), "--log-level", "warning"]
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(comando, env=ambiente(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        while not requisitar(f"http://127.0.0.1:{porta}/"):
+            if processo.poll() is not None:
+                raise RuntimeError(f"Servidor encerrou: {processo.stderr.read().decode()[-500:]}")
+            if time.perf_counter() - inicio > timeout:
+                raise TimeoutError("Servidor não respondeu a tempo")
+            time.sleep(0.01)
+        medida = {"primeira_requisicao_ms": (time.perf_counter() - inicio) * 1000}
+
+        if primeira_sessao:
+            inicio_sessao = time.perf_counter()
+            ok = requisitar(f"http://127.0.0.1:{porta}/api/trafego/session", "POST")
+            medida["primeira_sessao_ms"] = (time.perf_counter() - inicio_sessao) * 1000 if ok else None
+        return medida
+    finally:
+        processo.terminate()
+        processo.wait(timeout=10)
+
+
+def main():
+    args = ler_argumentos()
+
+    importacoes = [medir_importacao() for _ in range(args.repeticoes)]
+    requisicoes = [medir_primeira_requisicao(args.timeout, args.primeira_sessao) for _ in range(args.repeticoes)]
+
+    resultados = {
+        "importacao_ms": round(statistics.median(m["importacao_ms"] for m in importacoes), 1),
+        "primeira_requisicao_ms": round(statistics.median(m["primeira_requisicao_ms"] for m in requisicoes), 1),
+        "sdks_carregados_na_importacao": importacoes[-1]["carregados"],
+    }
+    if args.primeira_sessao:
+        sessoes = [m["primeira_sessao_ms"] for m in requisicoes if m.get("primeira_sessao_ms") is not None]
+        resultados["primeira_sessao_ms"] = round(statistics.median(sessoes), 1) if sessoes else None
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+
+    for chave, valor in resultados.items():
+        print(f"{chave}: {valor}")
+
+
+if __name__ == "__main__":
+    main()
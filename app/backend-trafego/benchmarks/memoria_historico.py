@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Benchmark da memória ocupada pelo histórico de mensagens das sessões.
+
+Compara o registro anterior (um dicionário por mensagem, com data e hora em texto ISO)
+com o registro colunar de HistoricoSessao, medindo com tracemalloc a memória alocada
+pelos registros. Os textos das mensagens são criados antes da medição e compartilhados
+pelos dois formatos, então os números refletem apenas o custo por mensagem.
+
+Exemplos:
+    python benchmarks/memoria_historico.py
+    python benchmarks/memoria_historico.py --mensagens 100000 --sessoes 1000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Garantir que o diretório raiz do projeto está no sys.path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(root_dir))
+
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark da memória do histórico de mensagens")
+    parser.add_argument("--mensagens", type=int, default=10000, help="Total de mensagens")
+    parser.add_argument("--sessoes", type=int, default=100, help="Sessões entre as quais as mensagens se dividem")
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON")
+    return parser.parse_args()
+
+
+def medir(construir):
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    estrutura = construir()
+    duracao = time.perf_counter() - inicio
+    alocado, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return estrutura, alocado, duracao
+
+
+def main():
+    from backend.trafego_ai.api.historico import HistoricoSessao
+
+    args = ler_argumentos()
+    papeis = ["user", "assistant", "system"]
+    textos = [f"Mensagem {i} sobre a campanha" for i in range(args.mensagens)]
+
+    def dicionarios():
+        historicos = {f"sessao_{s}": [] for s in range(args.sessoes)}
+        for i, texto in enumerate(textos):
+            historicos[f"sessao_{i % args.sessoes}"].append({
+                "role": papeis[i % 3],
+                "content": texto,
+                "timestamp": datetime.now().isoformat()
+            })
+        return historicos
+
+    def colunar():
+        historicos = {f"sessao_{s}": HistoricoSessao() for s in range(args.sessoes)}
+        for i, texto in enumerate(textos):
+            historicos[f"sessao_{i % args.sessoes}"].adicionar(papeis[i % 3], texto)
+        return historicos
+
+    resultados = []
+    for formato, construir in (("dicionarios", dicionarios), ("colunar", colunar)):
+        _, alocado, duracao = medir(construir)
+        resultados.append({
+            "formato": formato,
+            "bytes_totais": alocado,
+            "bytes_por_mensagem": round(alocado / args.mensagens, 1),
+            "kb_por_10k_mensagens": round(alocado / args.mensagens * 10000 / 1024, 1),
+            "insercao_ms": round(duracao * 1000, 1)
+        })
+
+    base = resultados[0]["bytes_totais"]
+    for resultado in resultados:
+        resultado["reducao"] = round(base / resultado["bytes_totais"], 2)
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+
+    colunas = ["formato", "bytes_por_mensagem", "kb_por_10k_mensagens", "insercao_ms", "reducao"]
+    print(" | ".join(colunas))
+    for resultado in resultados:
+        print(" | ".join(str(resultado[c]) for c in colunas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+Benchmark da serialização JSON das respostas da API, por endpoint.
+
+Compara o caminho padrão do FastAPI (validação pelo response_model e JSONResponse com
+json.dumps) com o caminho otimizado da API (RespostaJSON com orjson quando instalado e
+histórico pré-serializado), sem subir o servidor nem chamar os agentes.
+
+Exemplos:
+    python benchmarks/serializacao_respostas.py
+    python benchmarks/serializacao_respostas.py --mensagens 500 --tamanho-texto 8000 --repeticoes 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+# Garantir que o diretório raiz do projeto está no sys.path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(root_dir))
+
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark da serialização das respostas da API")
+    parser.add_argument("--mensagens", type=int, default=200, help="Mensagens no histórico da sessão")
+    parser.add_argument("--tamanho-texto", type=int, default=4000,
+                        help="Caracteres das respostas longas (estratégias, estruturas técnicas)")
+    parser.add_argument("--objetos", type=int, default=200, help="Objetos no relatório de alterações em massa")
+    parser.add_argument("--repeticoes", type=int, default=30, help="Serializações medidas por caminho")
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON")
+    return parser.parse_args()
+
+
+def texto_longo(tamanho: int, semente: int) -> str:
+    base = (f"Estratégia {semente}: público de 25 a 40 anos, interesses em fitness e nutrição; "
+            "orçamento diário de R$ 150,00 dividido em 3 conjuntos com criativos em vídeo.\n")
+    return (base * (tamanho // len(base) + 1))[:tamanho]
+
+
+def payloads(args) -> Dict[str, Any]:
+    from backend.trafego_ai.api.historico import HistoricoSessao
+
+    historico = HistoricoSessao()
+    for i in range(args.mensagens):
+        if i % 2:
+            historico.adicionar("assistant", texto_longo(args.tamanho_texto, i))
+        else:
+            historico.adicionar("user", f"Mensagem {i} do usuário sobre a campanha")
+
+    campanha = {
+        "id": "b5d1c4e2-0000-4000-8000-000000000000",
+        "estrategia": texto_longo(args.tamanho_texto, 1),
+        "estrutura_tecnica": texto_longo(args.tamanho_texto, 2),
+        "especificacoes_anuncios": texto_longo(args.tamanho_texto, 3),
+        "is_complete": True,
+        "error": None
+    }
+
+    mutacoes = {
+        "objetos": [{
+            "id": str(120000000000 + i), "tipo": "conjunto", "alteracao": {"daily_budget": 15000},
+            "anterior": {"daily_budget": 10000}, "erro": None, "status": "aplicado"
+        } for i in range(args.objetos)],
+        "contagem": {"aplicado": args.objetos},
+        "requisicoes": 8,
+        "sucesso": True
+    }
+    return {"historico": historico, "campanha": campanha, "mutacoes": mutacoes}
+
+
+async def medir(funcao, repeticoes: int) -> Dict[str, float]:
+    tempos, tamanho = [], 0
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        corpo = await funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        tamanho = len(corpo)
+    return {"mediana_ms": round(statistics.median(tempos), 3), "bytes": tamanho}
+
+
+async def executar(args) -> List[Dict[str, Any]]:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from backend.trafego_ai.api.historico import HistoricoSessao
+    from backend.trafego_ai.api.serializacao import RespostaJSON, RespostaJSONPronta, orjson
+    from backend.trafego_ai.models import CampanhaResponse
+
+    dados = payloads(args)
+    modelos = {
+        "historico": List[Dict[str, Any]],
+        "campanha": CampanhaResponse,
+        "mutacoes": Dict[str, Any],
+    }
+
+    resultados = []
+    for endpoint, modelo in modelos.items():
+        campo = create_response_field(name=f"resposta_{endpoint}", type_=modelo)
+        conteudo = dados[endpoint].mensagens() if endpoint == "historico" else dados[endpoint]
+
+        async def padrao():
+            serializado = await serialize_response(field=campo, response_content=conteudo)
+            return JSONResponse(serializado).body
+
+        async def otimizado():
+            serializado = await serialize_response(field=campo, response_content=conteudo)
+            return RespostaJSON(serializado).body
+
+        caminhos = {"padrao": padrao, "otimizado": otimizado}
+
+        if endpoint == "historico":
+            historico = dados["historico"]
+
+            async def pre_serializado():
+                return RespostaJSONPronta(historico.json()).body
+
+            async def sem_cache():
+                novo = HistoricoSessao()
+                for mensagem in conteudo:
+                    novo.adicionar(mensagem["role"], mensagem["content"], mensagem["timestamp"])
+                return RespostaJSONPronta(novo.json()).body
+
+            caminhos = {"padrao": padrao, "otimizado_sem_cache": sem_cache, "otimizado": pre_serializado}
+            historico.json()  # Aquecer o cache, como após a primeira consulta
+
+        base = None
+        for caminho, funcao in caminhos.items():
+            medida = await medir(funcao, args.repeticoes)
+            base = base or medida["mediana_ms"]
+            resultados.append({
+                "endpoint": endpoint,
+                "caminho": caminho,
+                **medida,
+                "ganho": round(base / medida["mediana_ms"], 1) if medida["mediana_ms"] else None
+            })
+
+    for resultado in resultados:
+        resultado["encoder"] = "json" if resultado["caminho"] == "padrao" or orjson is None else "orjson"
+    return resultados
+
+
+def main():
+    args = ler_argumentos()
+    resultados = asyncio.run(executar(args))
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+
+    colunas = ["endpoint", "caminho", "encoder", "mediana_ms", "bytes", "ganho"]
+    print(" | ".join(colunas))
+    for resultado in resultados:
+        print(" | ".join(str(resultado[c]) for c in colunas))
+
+
+if __name__ == "__main__":
+    main()
@@ -20,15 +20,10 @@ else:
     print(f"Arquivo .env não encontrado em {env_file}")
     print("Usando variáveis de ambiente do sistema ou valores padrão.")
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO if os.getenv("DEBUG", "False").lower() != "true" else logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(os.path.join(root_dir, "trafego_ai.log"))
-    ]
-)
+# Configurar logging: registros enfileirados e gravados em segundo plano (console e JSON em arquivo)
+from backend.trafego_ai.utils.logs import configurar_logs
+
+configurar_logs(nivel="DEBUG" if os.getenv("DEBUG", "False").lower() == "true" else None)
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +44,8 @@ def main():
             "backend.trafego_ai.api.main:app",
             host=settings.host,
             port=settings.port,
-            reload=settings.debug
+            reload=settings.debug,
+            log_config=None  # Os logs do uvicorn seguem para a fila configurada acima
         )
     except Exception as e:
         logger.error(f"Erro ao iniciar o servidor: {e}", exc_info=True)
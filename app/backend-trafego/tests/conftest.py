@@ -0,0 +1,24 @@
+"""
+Configuração dos testes: importa o pacote como backend.trafego_ai e isola os dados em disco
+"""
+import os
+import sys
+import tempfile
+import types
+
+# O projeto é importado como backend.trafego_ai (o diretório é montado como "backend" na implantação)
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if "backend" not in sys.modules:
+    pacote = types.ModuleType("backend")
+    pacote.__path__ = [root_dir]
+    sys.modules["backend"] = pacote
+
+# Bancos, caches e logs dos testes ficam em um diretório temporário, fora de trafego_ai/data
+_dados = tempfile.mkdtemp(prefix="trafego_ai_testes_")
+os.environ.setdefault("PESQUISA_CACHE_DB", os.path.join(_dados, "pesquisas.db"))
+os.environ.setdefault("IMAGENS_DB", os.path.join(_dados, "imagens_meta.db"))
+os.environ.setdefault("VIDEOS_ESTADO_DIR", os.path.join(_dados, "uploads_video"))
+os.environ.setdefault("METRICAS_DIR", os.path.join(_dados, "metricas"))
+os.environ.setdefault("MEMORIA_DIR", os.path.join(_dados, "memoria"))
+os.environ.setdefault("DOCUMENTOS_DIR", os.path.join(_dados, "documentos"))
+os.environ.setdefault("LOG_ARQUIVO", "")
@@ -0,0 +1,75 @@
+"""
+Testes da fila de prioridade assíncrona do agendador de chamadas à Graph API
+"""
+import asyncio
+import threading
+import time
+
+from backend.trafego_ai.tools.agendador_meta import (
+    LimitadorConta,
+    PRIORIDADE_INTERATIVA,
+    PRIORIDADE_SEGUNDO_PLANO
+)
+
+
+def test_cancelar_espera_assincrona_libera_a_senha():
+    limitador = LimitadorConta(taxa=1000, rajada=1)
+    limitador.registrar_limitacao(espera=60)
+
+    async def cenario():
+        tarefa = asyncio.create_task(limitador.adquirir_async())
+        await asyncio.sleep(0.01)
+        assert limitador.metricas()["fila"] == 1
+
+        tarefa.cancel()
+        await asyncio.gather(tarefa, return_exceptions=True)
+        assert tarefa.cancelled()
+
+    threads = threading.active_count()
+    asyncio.run(cenario())
+
+    # A espera não ocupou uma thread e a senha cancelada não consome token depois
+    assert threading.active_count() == threads
+    assert limitador.metricas()["fila"] == 0
+    assert limitador.requisicoes == 0
+    assert not limitador._despertadores
+
+
+def test_esperas_assincronas_respeitam_a_prioridade():
+    limitador = LimitadorConta(taxa=1000, rajada=1)
+    limitador.registrar_limitacao(espera=0.05)
+    ordem = []
+
+    async def chamar(nome, prioridade_chamada):
+        await limitador.adquirir_async(prioridade_chamada)
+        ordem.append(nome)
+
+    async def cenario():
+        segundo_plano = asyncio.create_task(chamar("sincronizacao", PRIORIDADE_SEGUNDO_PLANO))
+        await asyncio.sleep(0)
+        interativa = asyncio.create_task(chamar("implantacao", PRIORIDADE_INTERATIVA))
+        await asyncio.gather(segundo_plano, interativa)
+
+    asyncio.run(cenario())
+
+    assert ordem == ["implantacao", "sincronizacao"]
+    assert limitador.requisicoes == 2
+
+
+def test_espera_assincrona_acorda_quando_uma_thread_libera_a_fila():
+    limitador = LimitadorConta(taxa=1000, rajada=1)
+    limitador.registrar_limitacao(espera=60)
+
+    def desbloquear():
+        time.sleep(0.05)
+        with limitador._condicao:
+            limitador.bloqueado_ate = 0.0
+            limitador._notificar()
+
+    async def cenario():
+        threading.Thread(target=desbloquear).start()
+        await asyncio.wait_for(limitador.adquirir_async(), 5)
+
+    asyncio.run(cenario())
+
+    assert limitador.requisicoes == 1
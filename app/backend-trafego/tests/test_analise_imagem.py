@@ -0,0 +1,70 @@
+"""
+Testes da análise local de criativos de imagem
+"""
+import os
+
+from PIL import Image
+
+from backend.trafego_ai.tools.analise_imagem import analisar_imagem, fatos_compactos
+
+
+def _salvar(imagem, tmp_path, nome="criativo.png"):
+    caminho = str(tmp_path / nome)
+    imagem.save(caminho)
+    return caminho
+
+
+def test_imagem_lisa_aprovada_sem_avisos(tmp_path):
+    caminho = _salvar(Image.new("RGB", (1080, 1080), (30, 120, 200)), tmp_path)
+
+    analise = analisar_imagem(caminho)
+
+    assert analise["aprovado"]
+    assert analise["falhas"] == [] and analise["avisos"] == []
+    assert (analise["largura"], analise["altura"], analise["proporcao"]) == (1080, 1080, 1.0)
+    assert analise["cores_dominantes"][0] == {"cor": "#1e78c8", "percentual": 1.0}
+    assert analise["cobertura_texto"] == 0
+
+
+def test_textura_densa_gera_aviso_mas_nao_reprova(tmp_path):
+    # Ruído tem bordas densas em toda a imagem, como texto; a estimativa não deve reprovar o criativo
+    ruido = Image.frombytes("L", (1080, 1080), os.urandom(1080 * 1080)).convert("RGB")
+    caminho = _salvar(ruido, tmp_path)
+
+    analise = analisar_imagem(caminho)
+
+    assert analise["cobertura_texto"] > 0.5
+    assert analise["aprovado"]
+    assert analise["falhas"] == []
+    assert len(analise["avisos"]) == 1
+    assert "avisos" in fatos_compactos(analise)
+
+
+def test_resolucao_e_proporcao_fora_dos_requisitos(tmp_path):
+    caminho = _salvar(Image.new("RGB", (400, 100), "white"), tmp_path)
+
+    analise = analisar_imagem(caminho)
+
+    assert not analise["aprovado"]
+    assert len(analise["falhas"]) == 2
+
+
+def test_arquivo_invalido_reprovado(tmp_path):
+    caminho = tmp_path / "criativo.jpg"
+    caminho.write_bytes(b"nao e uma imagem")
+
+    analise = analisar_imagem(str(caminho))
+
+    assert not analise["aprovado"]
+    assert analise["falhas"][0].startswith("Não foi possível ler a imagem")
+
+
+def test_bomba_de_descompressao_reprovada_sem_excecao(tmp_path, monkeypatch):
+    caminho = _salvar(Image.new("RGB", (1080, 1080), "white"), tmp_path)
+    # Acima de 2x o limite de pixels o Pillow recusa abrir a imagem
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1080 * 1080 // 4)
+
+    analise = analisar_imagem(caminho)
+
+    assert not analise["aprovado"]
+    assert analise["falhas"][0].startswith("Resolução grande demais")
@@ -0,0 +1,142 @@
+"""
+Testes do motor de KPIs, tendências, fadiga e anomalias das métricas diárias
+"""
+import json
+
+import numpy as np
+
+from backend.trafego_ai.utils.analise_metricas import (
+    achados_compactos,
+    analisar_desempenho,
+    analisar_series,
+    calcular_kpis
+)
+from backend.trafego_ai.utils.metricas_locais import DTYPE_METRICAS
+
+INICIO = 20000
+
+
+def _serie(ad_id, impressoes, cliques, alcance=None, gasto=None):
+    dias = len(impressoes)
+    dados = np.zeros(dias, dtype=DTYPE_METRICAS)
+    dados["campaign_id"] = 1
+    dados["adset_id"] = 2
+    dados["ad_id"] = ad_id
+    dados["data"] = np.arange(INICIO, INICIO + dias)
+    dados["impressions"] = impressoes
+    dados["clicks"] = cliques
+    dados["reach"] = impressoes if alcance is None else alcance
+    dados["spend"] = np.full(dias, 10.0) if gasto is None else gasto
+    return dados
+
+
+def _estavel(ad_id, dias=21):
+    # CTR oscilando entre 1,9% e 2,1%: variância pequena, mas não nula
+    return _serie(ad_id, np.full(dias, 1000), np.where(np.arange(dias) % 2, 19, 21))
+
+
+def test_calcular_kpis_indefinidos_viram_nan():
+    kpis = calcular_kpis(np.array([1000, 0]), np.array([20, 0]), np.array([10.0, 5.0]),
+                         np.array([500, 0]), np.array([2, 0]))
+
+    assert np.allclose(kpis["ctr"][0], 2.0)
+    assert np.allclose(kpis["cpc"][0], 0.5)
+    assert np.allclose(kpis["cpm"][0], 10.0)
+    assert np.allclose(kpis["frequency"][0], 2.0)
+    assert np.allclose(kpis["taxa_conversao"][0], 10.0)
+    assert np.allclose(kpis["cpa"][0], 5.0)
+    assert all(np.isnan(valores[1]) for valores in kpis.values())
+
+
+def test_series_nao_misturam_anuncios():
+    dados = np.concatenate([_serie(3, [1000, 1000], [10, 30]), _serie(4, [1000, 1000], [50, 50])])
+
+    series = analisar_series(dados, janela=2)
+
+    assert series["grupo"].tolist() == [0, 0, 1, 1]
+    # A média móvel ponderada soma cliques e impressões da janela antes de dividir
+    assert np.allclose(series["ctr_movel"], [1.0, 2.0, 5.0, 5.0])
+    # A variação dia a dia não atravessa a fronteira entre anúncios
+    assert np.isnan(series["ctr_delta"][0]) and np.isnan(series["ctr_delta"][2])
+    assert np.allclose(series["ctr_delta"][[1, 3]], [2.0, 0.0])
+
+
+def test_variacao_ignora_dias_nao_consecutivos():
+    dados = _serie(3, [1000, 1000], [10, 30])
+    dados["data"][1] += 1
+
+    assert np.isnan(analisar_series(dados, janela=2)["ctr_delta"][1])
+
+
+def test_escore_exige_historico_minimo():
+    dados = _estavel(3, dias=5)
+
+    series = analisar_series(dados, janela=7)
+
+    assert np.isnan(series["ctr_z"]).all()
+
+
+def test_detecta_anomalia_no_ultimo_dia():
+    dados = _estavel(3)
+    dados["clicks"][-1] = 80
+
+    analise = analisar_desempenho(dados, janela=7)
+
+    anomalias = [a for a in analise["achados"] if a["tipo"] == "anomalia" and a["metrica"] == "ctr"]
+    assert len(anomalias) == 1
+    assert anomalias[0]["ad_id"] == 3
+    assert anomalias[0]["valor"] == 8.0
+    assert anomalias[0]["z"] > 3
+
+
+def test_serie_estavel_nao_gera_achados():
+    analise = analisar_desempenho(_estavel(3), janela=7)
+
+    assert analise["anuncios"] == 1
+    assert analise["anuncios_avaliados"] == 1
+    assert analise["achados"] == []
+
+
+def test_detecta_fadiga():
+    # Frequência 4 e CTR caindo de 2% para 1% entre as duas últimas janelas
+    impressoes = np.full(14, 1000)
+    cliques = np.array([20] * 7 + [10] * 7)
+    dados = _serie(3, impressoes, cliques, alcance=impressoes // 4)
+
+    analise = analisar_desempenho(dados, janela=7)
+
+    fadiga = [a for a in analise["achados"] if a["tipo"] == "fadiga"]
+    assert len(fadiga) == 1
+    assert fadiga[0]["frequencia"] == 4.0
+    assert fadiga[0]["queda_ctr"] == 0.5
+
+
+def test_anuncios_com_poucas_impressoes_nao_sao_avaliados():
+    dados = _estavel(3)
+    dados["impressions"] = 10
+    dados["clicks"][-1] = 10
+
+    analise = analisar_desempenho(dados, janela=7, min_impressoes=1000)
+
+    assert analise["anuncios_avaliados"] == 0
+    assert analise["achados"] == []
+
+
+def test_analise_vazia():
+    analise = analisar_desempenho(np.empty(0, dtype=DTYPE_METRICAS))
+
+    assert analise["achados"] == [] and analise["periodo"] is None
+
+
+def test_achados_limitados_e_compactos():
+    dados = np.concatenate([_estavel(ad_id) for ad_id in (3, 4, 5)])
+    dados["clicks"][dados["data"] == dados["data"].max()] = 80
+
+    analise = analisar_desempenho(dados, janela=7, max_achados=2)
+    assert len(analise["achados"]) == 2
+    assert analise["achados_omitidos"] > 0
+
+    compacto = json.loads(achados_compactos(analise, ad_id=analise["achados"][0]["ad_id"]))
+    assert compacto["omitidos"] == analise["achados_omitidos"]
+    assert {achado["ad_id"] for achado in compacto["achados"]} == {analise["achados"][0]["ad_id"]}
+    assert all("severidade" not in achado for achado in compacto["achados"])
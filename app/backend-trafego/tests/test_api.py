@@ -0,0 +1,50 @@
+"""
+Testes da aplicação FastAPI que não dependem dos agentes
+"""
+from fastapi.testclient import TestClient
+
+from backend.trafego_ai.api import routers
+from backend.trafego_ai.api.main import app
+from backend.trafego_ai.config.settings import CRIATIVOS_LOTE_MAX_ITENS
+from backend.trafego_ai.utils.memoria import gerenciador_memoria
+
+
+def test_encerramento_persiste_memorias(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(gerenciador_memoria, "salvar_todas", lambda: chamadas.append(True))
+
+    with TestClient(app) as cliente:
+        assert cliente.get("/").status_code == 200
+        assert chamadas == []
+
+    assert chamadas == [True]
+
+
+def _lote(session_id, quantidade):
+    return {
+        "session_id": session_id,
+        "objetivo": "Tráfego",
+        "criativos": [{"descricao": f"Criativo {i}", "formato": "imagem"} for i in range(quantidade)],
+    }
+
+
+def test_lote_acima_do_limite_rejeitado_antes_do_fluxo():
+    with TestClient(app) as cliente:
+        resposta = cliente.post("/api/trafego/criativos/lote", json=_lote("sessao", CRIATIVOS_LOTE_MAX_ITENS + 1))
+
+    assert resposta.status_code == 422
+    assert "application/x-ndjson" not in resposta.headers["content-type"]
+
+
+def test_erro_de_validacao_do_lote_vira_400(monkeypatch):
+    class GerenciadorRecusaLote:
+        def analisar_criativos_em_lote(self, criativos, objetivo_campanha, max_concorrencia=None):
+            raise ValueError("Lote inválido.")
+
+    monkeypatch.setitem(routers.crew_managers, "sessao", GerenciadorRecusaLote())
+
+    with TestClient(app) as cliente:
+        resposta = cliente.post("/api/trafego/criativos/lote", json=_lote("sessao", 2))
+
+    assert resposta.status_code == 400
+    assert resposta.json() == {"detail": "Lote inválido."}
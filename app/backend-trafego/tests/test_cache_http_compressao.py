@@ -0,0 +1,133 @@
+"""
+Testes das requisições condicionais (ETag) e do middleware de compressão
+"""
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.trafego_ai.api import compressao
+from backend.trafego_ai.api.cache_http import etag_corresponde, etag_forte, resposta_condicional
+from backend.trafego_ai.api.compressao import CompressaoMiddleware, escolher_codificacao
+
+CORPO_GRANDE = b'{"dados":"' + b"x" * 4096 + b'"}'
+
+
+def test_etag_forte_depende_apenas_do_corpo():
+    assert etag_forte(b"[]") == etag_forte(b"[]")
+    assert etag_forte(b"[]") != etag_forte(b"[1]")
+    assert etag_forte(b"[]").startswith('"') and etag_forte(b"[]").endswith('"')
+
+
+@pytest.mark.parametrize("if_none_match, esperado", [
+    (None, False),
+    ("", False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"abc-gzip"', True),
+    ('"abc-br"', True),
+    ('"outro", "abc-gzip"', True),
+    ("*", True),
+    ('"abcd"', False),
+    ('"abc-deflate"', False),
+])
+def test_etag_corresponde(if_none_match, esperado):
+    assert etag_corresponde(if_none_match, '"abc"') is esperado
+
+
+@pytest.fixture
+def sem_brotli(monkeypatch):
+    monkeypatch.setattr(compressao, "brotli", None)
+
+
+@pytest.mark.parametrize("accept_encoding, esperado", [
+    ("gzip, deflate", "gzip"),
+    ("GZIP;q=0.5", "gzip"),
+    ("br", None),
+    ("gzip;q=0, deflate", None),
+    ("gzip;q=abc", None),
+    ("*", "gzip"),
+    ("*, gzip;q=0", None),
+    ("", None),
+])
+def test_escolher_codificacao_sem_brotli(sem_brotli, accept_encoding, esperado):
+    assert escolher_codificacao(accept_encoding) == esperado
+
+
+def test_escolher_codificacao_prefere_brotli_quando_instalado(monkeypatch):
+    monkeypatch.setattr(compressao, "brotli", object())
+
+    assert escolher_codificacao("gzip, br") == "br"
+    assert escolher_codificacao("gzip, br;q=0") == "gzip"
+
+
+@pytest.fixture
+def cliente(sem_brotli):
+    app = FastAPI()
+    app.add_middleware(CompressaoMiddleware, tamanho_minimo=1024)
+
+    @app.get("/grande")
+    async def grande(request: Request):
+        return resposta_condicional(request, CORPO_GRANDE)
+
+    @app.get("/pequeno")
+    async def pequeno(request: Request):
+        return resposta_condicional(request, b'{"ok":true}')
+
+    @app.get("/fluxo")
+    async def fluxo():
+        async def eventos():
+            for _ in range(3):
+                yield b'{"evento":"' + b"x" * 1024 + b'"}\n'
+        return StreamingResponse(eventos(), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+
+def test_resposta_grande_comprimida_com_etag_da_codificacao(cliente):
+    resposta = cliente.get("/grande", headers={"Accept-Encoding": "gzip"})
+
+    assert resposta.headers["content-encoding"] == "gzip"
+    assert resposta.headers["etag"] == etag_forte(CORPO_GRANDE)[:-1] + '-gzip"'
+    assert resposta.headers["vary"] == "Accept-Encoding"
+    assert resposta.headers["cache-control"] == "no-cache"
+    assert int(resposta.headers["content-length"]) < len(CORPO_GRANDE)
+    assert resposta.content == CORPO_GRANDE
+
+
+def test_etag_da_versao_comprimida_gera_304(cliente):
+    etag = cliente.get("/grande", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+
+    resposta = cliente.get("/grande", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+    assert resposta.status_code == 304
+    assert resposta.content == b""
+    assert resposta.headers["etag"] == etag
+
+
+def test_sem_accept_encoding_nao_comprime(cliente):
+    resposta = cliente.get("/grande", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in resposta.headers
+    assert resposta.headers["etag"] == etag_forte(CORPO_GRANDE)
+
+
+def test_resposta_pequena_nao_comprimida(cliente):
+    resposta = cliente.get("/pequeno", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in resposta.headers
+    assert resposta.headers["vary"] == "Accept-Encoding"
+
+
+def test_resposta_em_fluxo_nao_comprimida(cliente):
+    resposta = cliente.get("/fluxo", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in resposta.headers
+    assert len(resposta.text.splitlines()) == 3
+
+
+def test_gzip_deterministico():
+    assert compressao.comprimir(CORPO_GRANDE, "gzip") == compressao.comprimir(CORPO_GRANDE, "gzip")
+    assert gzip.decompress(compressao.comprimir(CORPO_GRANDE, "gzip")) == CORPO_GRANDE
@@ -0,0 +1,82 @@
+"""
+Testes do cache de buscas de interesses e do índice de prefixos
+"""
+from backend.trafego_ai.tools import cache_interesses as modulo
+from backend.trafego_ai.tools.cache_interesses import CacheInteresses, normalizar_termo
+
+
+def _interesse(interesse_id, nome, audiencia=1000):
+    return {"id": interesse_id, "name": nome, "audience_size_upper_bound": audiencia}
+
+
+def test_normalizar_termo():
+    assert normalizar_termo("  Educação   FÍSICA ") == "educacao fisica"
+
+
+def test_busca_com_limite_maior_atende_limite_menor():
+    cache = CacheInteresses()
+    cache.guardar("Futebol", 5, [_interesse(str(i), f"Futebol {i}") for i in range(5)])
+
+    assert [i["id"] for i in cache.obter("futebol", 3)] == ["0", "1", "2"]
+    assert cache.obter("futebol", 10) is None
+
+
+def test_autocompletar_por_qualquer_palavra_ordenado_por_audiencia():
+    cache = CacheInteresses()
+    cache.guardar("esporte", 10, [_interesse("1", "Futebol de Areia", 10), _interesse("2", "Vôlei de Praia", 50)])
+
+    assert [i["id"] for i in cache.autocompletar("areia")] == ["1"]
+    assert [i["id"] for i in cache.autocompletar("de")] == ["2", "1"]
+    assert [i["id"] for i in cache.autocompletar("volei")] == ["2"]
+
+
+def test_lru_remove_interesses_e_nos_da_trie():
+    cache = CacheInteresses(max_termos=2)
+    cache.guardar("a", 10, [_interesse("1", "Alpha")])
+    cache.guardar("b", 10, [_interesse("2", "Bravo"), _interesse("3", "Compartilhado")])
+    cache.guardar("c", 10, [_interesse("3", "Compartilhado")])
+
+    # "a" saiu do LRU: seu interesse e os nós da trie exclusivos dele também
+    assert cache.autocompletar("alpha") == []
+    assert "a" not in cache._raiz.filhos
+    assert cache.metricas()["interesses"] == 2
+
+    # "b" sai, mas o interesse 3 continua na busca "c"
+    cache.guardar("d", 10, [])
+    assert cache.autocompletar("bravo") == []
+    assert [i["id"] for i in cache.autocompletar("compart")] == ["3"]
+
+    cache.guardar("e", 10, [])
+    assert cache.metricas()["interesses"] == 0
+    assert cache._raiz.filhos == {}
+
+
+def test_ttl_remove_interesses_das_buscas_vencidas(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(modulo.time, "monotonic", lambda: agora[0])
+    cache = CacheInteresses(ttl=60)
+    cache.guardar("a", 10, [_interesse("1", "Alpha")])
+
+    agora[0] += 61
+    assert cache.autocompletar("alp") == []
+    assert cache.obter("a", 10) is None
+    assert cache.metricas()["buscas"] == 0 and cache.metricas()["interesses"] == 0
+
+
+def test_nova_busca_do_mesmo_termo_substitui_interesses():
+    cache = CacheInteresses()
+    cache.guardar("a", 10, [_interesse("1", "Alpha"), _interesse("2", "Antigo")])
+    cache.guardar("a", 20, [_interesse("1", "Alpha")])
+
+    assert [i["id"] for i in cache.autocompletar("a")] == ["1"]
+    assert cache.metricas()["interesses"] == 1
+
+
+def test_separar_devolve_termos_originais_pendentes():
+    cache = CacheInteresses()
+    cache.guardar("Educação", 10, [_interesse("1", "Educação")])
+
+    encontrados, pendentes = cache.separar(["educacao", "Educação Física", "EDUCAÇÃO  física", "Moda"], 10)
+
+    assert list(encontrados) == ["educacao"]
+    assert pendentes == ["Educação Física", "Moda"]
@@ -0,0 +1,104 @@
+"""
+Testes da normalização das consultas e do cache persistente de pesquisas
+"""
+import threading
+import time
+
+import pytest
+
+from backend.trafego_ai.tools.cache_pesquisa import CachePesquisa, normalizar_consulta
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CachePesquisa(caminho_db=str(tmp_path / "pesquisas.db"), ttl_fontes={"web": 60}, max_obsoleto=600)
+
+
+def _envelhecer(cache, segundos):
+    with cache._lock, cache._conexao:
+        cache._conexao.execute("UPDATE pesquisas SET criado_em = criado_em - ?", (segundos,))
+
+
+def test_normalizar_consulta_ignora_acentos_pontuacao_e_palavras_vazias():
+    assert normalizar_consulta("Tendências  de Marketing!") == "tendencias marketing"
+    assert normalizar_consulta("marketing: tendências") == "marketing tendencias"
+    # Uma consulta só de palavras vazias não vira uma chave vazia
+    assert normalizar_consulta("de a") == "de a"
+
+
+def test_normalizar_consulta_mantem_palavras_que_mudam_o_sentido():
+    assert normalizar_consulta("anúncios com vídeo") != normalizar_consulta("anúncios sem vídeo")
+    assert normalizar_consulta("reels ou stories") != normalizar_consulta("reels e stories")
+    assert normalizar_consulta("dicas para iniciantes") != normalizar_consulta("dicas sobre iniciantes")
+    assert normalizar_consulta("o que é CPM") == "que cpm"
+
+
+def test_acerto_dentro_da_validade_nao_busca(cache):
+    buscas = []
+
+    def buscar():
+        buscas.append(1)
+        return ["resultado"]
+
+    assert cache.obter_ou_buscar("web", "Tendências de marketing", buscar) == ["resultado"]
+    assert cache.obter_ou_buscar("web", "tendencias marketing?", buscar) == ["resultado"]
+
+    assert len(buscas) == 1
+    assert cache.metricas()["acertos"] == 1
+    assert cache.metricas()["falhas"] == 1
+
+
+def test_variante_e_fonte_separam_as_entradas(cache):
+    cache.guardar("web", "marketing", ["cinco"], variante="5")
+
+    assert cache.obter("web", "marketing", variante="5") == (["cinco"], True)
+    assert cache.obter("web", "marketing", variante="10") is None
+    assert cache.obter("outra", "marketing", variante="5") is None
+
+
+def test_entrada_vencida_e_servida_com_uma_unica_renovacao(cache):
+    cache.guardar("web", "marketing", ["antigo"])
+    _envelhecer(cache, 120)
+
+    liberar = threading.Event()
+    buscas = []
+
+    def buscar():
+        buscas.append(1)
+        liberar.wait(5)
+        return ["novo"]
+
+    # Enquanto a renovação roda, as demais leituras recebem a versão antiga sem disparar outra
+    assert cache.obter_ou_buscar("web", "marketing", buscar) == ["antigo"]
+    assert cache.obter_ou_buscar("web", "marketing", buscar) == ["antigo"]
+    liberar.set()
+
+    limite = time.monotonic() + 5
+    while cache.renovacoes == 0 and time.monotonic() < limite:
+        time.sleep(0.01)
+
+    assert len(buscas) == 1
+    assert cache.obsoletos == 2
+    assert cache.obter("web", "marketing") == (["novo"], True)
+
+
+def test_entrada_vencida_ha_muito_tempo_e_buscada_de_novo(cache):
+    cache.guardar("web", "marketing", ["antigo"])
+    _envelhecer(cache, 60 + 600 + 1)
+
+    assert cache.obter_ou_buscar("web", "marketing", lambda: ["novo"]) == ["novo"]
+    assert cache.falhas == 1
+
+
+def test_resultado_vazio_nao_e_guardado(cache):
+    buscas = []
+
+    def buscar():
+        buscas.append(1)
+        return []
+
+    assert cache.obter_ou_buscar("web", "marketing", buscar) == []
+    assert cache.obter_ou_buscar("web", "marketing", buscar) == []
+
+    assert len(buscas) == 2
+    assert cache.obter("web", "marketing") is None
@@ -0,0 +1,117 @@
+"""
+Testes da extração de texto dos documentos e do índice BM25 por sessão
+"""
+import zipfile
+
+import pytest
+
+from backend.trafego_ai.tools import documentos
+from backend.trafego_ai.tools.documentos import (
+    FormatoNaoSuportado,
+    GerenciadorIndicesDocumentos,
+    IndiceDocumentosSessao,
+    dividir_em_trechos,
+    extrair_texto
+)
+
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_S = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _docx(caminho, paragrafos, preenchimento=0):
+    corpo = "".join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paragrafos)
+    # Espaços repetidos compactam para quase nada, como em um arquivo malicioso
+    xml = f'<w:document xmlns:w="{_W}"><w:body>{corpo}</w:body>{" " * preenchimento}</w:document>'
+    with zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as arquivo:
+        arquivo.writestr("word/document.xml", xml)
+    return str(caminho)
+
+
+def _xlsx(caminho):
+    compartilhadas = f'<sst xmlns="{_S}"><si><t>Campanha</t></si><si><t>Gasto</t></si></sst>'
+    planilha = (f'<worksheet xmlns="{_S}"><sheetData>'
+                '<row><c t="s"><v>0</v></c><c t="s"><v>1</v></c></row>'
+                '<row><c t="inlineStr"><is><t>Verão</t></is></c><c><v>150.5</v></c></row>'
+                '</sheetData></worksheet>')
+    with zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as arquivo:
+        arquivo.writestr("xl/sharedStrings.xml", compartilhadas)
+        arquivo.writestr("xl/worksheets/sheet1.xml", planilha)
+    return str(caminho)
+
+
+def test_extrai_texto_de_docx_e_xlsx(tmp_path):
+    assert extrair_texto(_docx(tmp_path / "briefing.docx", ["Público jovem", "Foco em vídeo"])) == \
+        "Público jovem\nFoco em vídeo"
+    assert extrair_texto(_xlsx(tmp_path / "metricas.xlsx")) == "Campanha | Gasto\nVerão | 150.5"
+
+
+def test_recusa_documento_que_descompacta_alem_do_limite(tmp_path, monkeypatch):
+    monkeypatch.setattr(documentos, "DOCUMENTOS_MAX_TAMANHO_EXTRAIDO", 1024 * 1024)
+    caminho = _docx(tmp_path / "bomba.docx", ["texto"], preenchimento=2 * 1024 * 1024)
+    assert (tmp_path / "bomba.docx").stat().st_size < 64 * 1024
+
+    with pytest.raises(FormatoNaoSuportado, match="grande demais"):
+        extrair_texto(caminho)
+
+    gerenciador = GerenciadorIndicesDocumentos(diretorio=None)
+    gerenciador.indexar_documento("s1", caminho)
+    assert gerenciador.obter("s1").documentos["bomba.docx"]["status"] == "erro"
+
+
+def test_formato_sem_extrator(tmp_path):
+    with pytest.raises(FormatoNaoSuportado):
+        extrair_texto(str(tmp_path / "antigo.doc"))
+
+
+def test_dividir_em_trechos_com_sobreposicao():
+    palavras = [f"p{i}" for i in range(10)]
+
+    trechos = dividir_em_trechos(" ".join(palavras), palavras_por_trecho=4, sobreposicao=1)
+
+    assert trechos == ["p0 p1 p2 p3", "p3 p4 p5 p6", "p6 p7 p8 p9"]
+    assert dividir_em_trechos("curto", palavras_por_trecho=4, sobreposicao=1) == ["curto"]
+    assert dividir_em_trechos("", palavras_por_trecho=4, sobreposicao=1) == []
+
+
+def test_busca_ordena_trechos_por_relevancia():
+    indice = IndiceDocumentosSessao("s1")
+    indice.adicionar_texto("briefing.txt", "O público da campanha são mães de crianças pequenas.")
+    indice.adicionar_texto("orcamento.txt", "O orçamento mensal é de dez mil reais para a campanha.")
+    indice.adicionar_texto("marca.txt", "A marca usa tons de verde. Orçamento aprovado pela diretoria, "
+                                        "orçamento revisado todo mês.")
+
+    resultado = indice.buscar("Qual é o orçamento?", k=2)
+
+    assert [t["documento"] for t in resultado] == ["marca.txt", "orcamento.txt"]
+    assert resultado[0]["pontuacao"] > resultado[1]["pontuacao"]
+    # Consultas sem termos indexados (ou só com palavras vazias) não retornam trechos
+    assert indice.buscar("inexistente") == []
+    assert indice.buscar("de a o") == []
+
+
+def test_documento_reenviado_substitui_os_trechos_anteriores():
+    indice = IndiceDocumentosSessao("s1")
+    indice.adicionar_texto("briefing.txt", "Promoção de inverno com casacos")
+    indice.adicionar_texto("outro.txt", "Tabela de preços")
+
+    indice.adicionar_texto("briefing.txt", "Promoção de verão com biquínis")
+
+    assert indice.buscar("inverno") == []
+    assert [t["documento"] for t in indice.buscar("verão")] == ["briefing.txt"]
+    assert indice.metricas()["trechos"] == 2
+    assert "inverno" not in indice._documentos_com_termo
+
+
+def test_exportar_e_importar_preservam_a_busca(tmp_path):
+    gerenciador = GerenciadorIndicesDocumentos(diretorio=str(tmp_path))
+    caminho = tmp_path / "briefing.txt"
+    caminho.write_text("Campanha de lançamento do tênis de corrida para maratonistas", encoding="utf-8")
+    gerenciador.indexar_documento("s1", str(caminho))
+    original = gerenciador.obter("s1")
+
+    recarregado = GerenciadorIndicesDocumentos(diretorio=str(tmp_path)).obter("s1")
+
+    assert recarregado is not original
+    assert recarregado.documentos == original.documentos
+    assert recarregado.buscar("tênis maratona corrida") == original.buscar("tênis maratona corrida")
+    assert recarregado.metricas() == original.metricas()
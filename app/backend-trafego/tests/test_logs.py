@@ -0,0 +1,118 @@
+"""
+Testes do registro de logs estruturado: contexto, amostragem e formatação
+"""
+import asyncio
+import json
+import logging
+import sys
+import threading
+
+from backend.trafego_ai.utils.logs import (
+    FiltroAmostragem,
+    FiltroContexto,
+    FormatadorJSON,
+    FormatadorTexto,
+    HandlerFila,
+    contexto_atual,
+    contexto_log,
+    etapa_log
+)
+
+
+def _registro(nome="teste", nivel=logging.INFO, mensagem="mensagem %s", args=("x",), **extras):
+    registro = logging.LogRecord(nome, nivel, __file__, 1, mensagem, args, None)
+    for chave, valor in extras.items():
+        setattr(registro, chave, valor)
+    return registro
+
+
+def test_contexto_log_aninhado_e_restaurado():
+    with contexto_log(session_id="s1", tarefa_id=None):
+        with contexto_log(etapa="estrategia"):
+            assert contexto_atual() == {"session_id": "s1", "etapa": "estrategia"}
+        assert contexto_atual() == {"session_id": "s1"}
+    assert contexto_atual() == {}
+
+
+def test_etapa_log_em_funcoes_sincronas_e_assincronas():
+    @etapa_log("sincrona")
+    def sincrona():
+        return contexto_atual()
+
+    @etapa_log("assincrona")
+    async def assincrona():
+        await asyncio.sleep(0)
+        return contexto_atual()
+
+    with contexto_log(session_id="s1"):
+        assert sincrona() == {"session_id": "s1", "etapa": "sincrona"}
+        assert asyncio.run(assincrona()) == {"session_id": "s1", "etapa": "assincrona"}
+
+
+def test_filtro_contexto_captura_o_contexto_da_thread_que_emitiu():
+    filtro = FiltroContexto()
+    registros = []
+
+    def emitir():
+        with contexto_log(session_id="thread"):
+            registro = _registro()
+            filtro.filter(registro)
+            registros.append(registro)
+
+    thread = threading.Thread(target=emitir)
+    thread.start()
+    thread.join()
+
+    assert registros[0].contexto == {"session_id": "thread"}
+
+
+def test_amostragem_mantem_uma_a_cada_n_abaixo_de_warning():
+    filtro = FiltroAmostragem({"ruidoso": 0.1})
+
+    mantidos = [filtro.filter(_registro("ruidoso.sub", logging.DEBUG)) for _ in range(100)]
+
+    assert sum(mantidos) == 10
+    assert mantidos[0] is True
+
+
+def test_amostragem_nao_descarta_avisos_nem_outros_loggers():
+    filtro = FiltroAmostragem({"ruidoso": 0.0})
+
+    assert filtro.filter(_registro("ruidoso", logging.WARNING))
+    assert filtro.filter(_registro("ruidosox", logging.INFO))
+    assert not filtro.filter(_registro("ruidoso.sub", logging.INFO))
+
+
+def test_amostragem_usa_o_prefixo_mais_especifico():
+    filtro = FiltroAmostragem({"app": 0.0, "app.importante": 1.0, "app.meio": 0.5})
+
+    assert filtro.filter(_registro("app.importante.sub"))
+    assert not filtro.filter(_registro("app.outro"))
+    assert [filtro.filter(_registro("app.meio")) for _ in range(4)] == [True, False, True, False]
+
+
+def test_formatador_json_inclui_contexto_extras_e_excecao():
+    handler = HandlerFila(None)
+    try:
+        raise ValueError("falhou")
+    except ValueError:
+        registro = _registro(exc_info=sys.exc_info(), contexto={"session_id": "s1"}, custo=3, amostragem=10)
+
+    dados = json.loads(FormatadorJSON().format(handler.prepare(registro)))
+
+    assert dados["mensagem"] == "mensagem x"
+    assert dados["nivel"] == "INFO" and dados["logger"] == "teste"
+    assert dados["session_id"] == "s1"
+    assert dados["custo"] == 3 and dados["amostragem"] == 10
+    assert "ValueError: falhou" in dados["excecao"]
+    assert dados["ts"].endswith("+00:00")
+    assert "asctime" not in dados and "contexto" not in dados
+
+
+def test_formatador_texto_acrescenta_contexto():
+    formatador = FormatadorTexto()
+
+    assert formatador.format(_registro(contexto={"session_id": "s1", "etapa": "x"})).endswith(
+        "mensagem x [session_id=s1 etapa=x]"
+    )
+    assert formatador.format(_registro(contexto={})).endswith("mensagem x")
@@ -0,0 +1,92 @@
+"""
+Testes da memória de sessão limitada e do gerenciador com remoção LRU
+"""
+import threading
+
+from backend.trafego_ai.utils.memoria import GerenciadorMemoria, MemoriaSessao
+
+
+def _conteudos(memoria):
+    return [t["content"] for t in memoria.turnos]
+
+
+def test_remocao_da_ram_nao_perde_turnos(tmp_path):
+    gerenciador = GerenciadorMemoria(max_sessoes=1, diretorio=str(tmp_path))
+
+    # Duas sessões alternando com espaço para uma só: cada turno força a remoção da outra
+    for i in range(5):
+        gerenciador.registrar_turnos("a", [("user", f"a{i}"), ("assistant", f"ra{i}")])
+        gerenciador.registrar_turnos("b", [("user", f"b{i}"), ("assistant", f"rb{i}")])
+
+    assert _conteudos(gerenciador.obter("a")) == [t for i in range(5) for t in (f"a{i}", f"ra{i}")]
+    assert _conteudos(gerenciador.obter("b")) == [t for i in range(5) for t in (f"b{i}", f"rb{i}")]
+
+
+def test_memoria_removida_recusa_turnos_e_registrar_recarrega(tmp_path):
+    gerenciador = GerenciadorMemoria(max_sessoes=1, diretorio=str(tmp_path))
+    antiga = gerenciador.obter("a")
+    antiga.adicionar_turno("user", "antes")
+
+    gerenciador.obter("b")
+
+    assert antiga.removida
+    assert antiga.adicionar_turno("user", "depois") is False
+    gerenciador.registrar_turnos("a", [("user", "depois")])
+    atual = gerenciador.obter("a")
+    assert atual is not antiga
+    assert _conteudos(atual) == ["antes", "depois"]
+
+
+def test_salvar_todas_persiste_sessoes_em_ram(tmp_path):
+    diretorio = tmp_path / "memoria"
+    gerenciador = GerenciadorMemoria(max_sessoes=10, diretorio=str(diretorio))
+    gerenciador.registrar_turnos("a", [("user", "oi")])
+
+    # O diretório só é criado na primeira persistência
+    assert not diretorio.exists()
+    gerenciador.salvar_todas()
+
+    recarregado = GerenciadorMemoria(max_sessoes=10, diretorio=str(diretorio))
+    assert _conteudos(recarregado.obter("a")) == ["oi"]
+
+
+def test_compactacao_mantem_turnos_recentes_e_resume_antigos():
+    memoria = MemoriaSessao("s", max_turnos=4, max_tokens=10_000, turnos_recentes=2)
+
+    for i in range(5):
+        memoria.adicionar_turno("user", f"mensagem {i}")
+
+    assert _conteudos(memoria) == ["mensagem 3", "mensagem 4"]
+    assert "mensagem 0" in memoria.resumo and "mensagem 2" in memoria.resumo
+    assert memoria.metricas()["compactacoes"] == 1
+
+
+def test_sumarizador_roda_fora_do_lock():
+    bloqueado = []
+
+    def sumarizador(resumo_anterior, turnos):
+        # Outra thread precisa conseguir usar a memória enquanto o resumo é gerado
+        outra = threading.Thread(target=lambda: memoria.adicionar_turno("user", "durante"))
+        outra.start()
+        outra.join(timeout=2)
+        bloqueado.append(outra.is_alive())
+        return "resumo"
+
+    memoria = MemoriaSessao("s", max_turnos=2, max_tokens=10_000, turnos_recentes=1, sumarizador=sumarizador)
+    for i in range(3):
+        memoria.adicionar_turno("user", f"mensagem {i}")
+
+    assert bloqueado == [False]
+    assert memoria.resumo == "resumo"
+    assert _conteudos(memoria) == ["mensagem 2", "durante"]
+
+
+def test_erro_no_sumarizador_usa_resumo_extrativo():
+    def sumarizador(resumo_anterior, turnos):
+        raise RuntimeError("LLM indisponível")
+
+    memoria = MemoriaSessao("s", max_turnos=2, max_tokens=10_000, turnos_recentes=1, sumarizador=sumarizador)
+    for i in range(3):
+        memoria.adicionar_turno("user", f"mensagem {i}")
+
+    assert memoria.resumo == "- user: mensagem 0\n- user: mensagem 1"
@@ -0,0 +1,192 @@
+"""
+Testes do cliente assíncrono do Meta ADS contra a Graph API simulada
+"""
+import asyncio
+import os
+from datetime import datetime
+
+import httpx
+import pytest
+
+from backend.benchmarks.graph_api_simulada import ConfiguracaoGraphSimulada, GraphAPISimulada, criar_app
+from backend.trafego_ai.tools.meta_ads_async import MetaAdsAsyncAPI
+
+CONTA = "1234567890"
+
+
+def arvore_campanha(imagem, **campanha):
+    return {
+        "campanha": {"nome": "Campanha Teste", "objetivo": "OUTCOME_TRAFFIC", "orcamento_diario": 50, **campanha},
+        "conjuntos": [{
+            "nome": "Conjunto Teste",
+            "objetivo_otimizacao": "LINK_CLICKS",
+            "segmentacao": {"geo_locations": {"countries": ["BR"]}, "age_min": 18, "age_max": 65},
+            "data_inicio": datetime(2026, 11, 1, 8, 0),
+            "anuncios": [{
+                "nome": f"Anúncio {i}",
+                "creative_id": None,
+                "criativo": {"titulo": f"Oferta {i}", "texto": "Conheça a nova coleção", "cta": "LEARN_MORE",
+                             "url_destino": "https://example.com", "imagem_url": imagem},
+            } for i in range(2)],
+        }],
+    }
+
+
+async def _executar(simulador, corrotina):
+    transporte = httpx.ASGITransport(app=criar_app(simulador))
+    async with httpx.AsyncClient(transport=transporte) as cliente_http:
+        api = MetaAdsAsyncAPI(access_token="token-teste", account_id=CONTA, app_secret="segredo",
+                              cliente_http=cliente_http, base_url="http://graph.teste")
+        return await corrotina(api)
+
+
+@pytest.fixture
+def imagem(tmp_path):
+    # Conteúdo aleatório: o registro de imagens já enviadas não reaproveita o hash de outro teste
+    caminho = tmp_path / "criativo.jpg"
+    caminho.write_bytes(os.urandom(4096))
+    return str(caminho)
+
+
+def _simulador():
+    return GraphAPISimulada(ConfiguracaoGraphSimulada(latencia=0, latencia_por_operacao=0, semente=1))
+
+
+def _objetos(simulador, tipo):
+    return [o for o in simulador.objetos.values() if o["_tipo"] == tipo]
+
+
+def test_implantar_campanha_com_datas_datetime(imagem):
+    simulador = _simulador()
+    arvore = arvore_campanha(imagem, data_inicio=datetime(2026, 11, 1, 8, 0), data_fim=datetime(2026, 11, 30, 23, 0))
+
+    resultado = asyncio.run(_executar(simulador, lambda api: api.implantar_campanha(arvore)))
+
+    assert resultado["sucesso"], resultado
+    campanha = simulador.objetos[resultado["campanha_id"]]
+    assert campanha["start_time"] == "2026-11-01T08:00:00"
+    assert campanha["stop_time"] == "2026-11-30T23:00:00"
+    assert _objetos(simulador, "adset")[0]["start_time"] == "2026-11-01T08:00:00"
+    assert len(_objetos(simulador, "ad")) == 2
+    # A árvore recebida não é alterada
+    assert isinstance(arvore["campanha"]["data_inicio"], datetime)
+
+
+def test_implantacao_dividida_em_varios_lotes(imagem):
+    simulador = _simulador()
+    arvore = arvore_campanha(imagem)
+    conjunto = arvore["conjuntos"][0]
+    arvore["conjuntos"] = [
+        {**conjunto, "nome": f"Conjunto {i}",
+         "anuncios": [{**anuncio, "nome": f"Anúncio {i}.{j}", "criativo": {**anuncio["criativo"], "titulo": f"T{i}.{j}"}}
+                      for j in range(10) for anuncio in conjunto["anuncios"][:1]]}
+        for i in range(3)
+    ]
+
+    resultado = asyncio.run(_executar(simulador, lambda api: api.implantar_campanha(arvore)))
+
+    # 1 campanha + 3 conjuntos + 30 criativos + 30 anúncios = 64 operações, em 2 lotes de até 50
+    assert resultado["sucesso"], resultado
+    assert resultado["requisicoes"] == 2
+    assert len(_objetos(simulador, "ad")) == 30
+    assert {o["campaign_id"] for o in _objetos(simulador, "adset")} == {resultado["campanha_id"]}
+
+
+def test_sincronizar_campanha_com_datas_datetime_nao_altera_campanha_igual(imagem):
+    simulador = _simulador()
+    arvore = arvore_campanha(imagem, data_inicio=datetime(2026, 11, 1, 8, 0))
+
+    implantacao = asyncio.run(_executar(simulador, lambda api: api.implantar_campanha(arvore)))
+    sincronizacao = asyncio.run(_executar(simulador, lambda api: api.sincronizar_campanha(arvore)))
+
+    assert sincronizacao["campanha_id"] == implantacao["campanha_id"]
+    contagem = sincronizacao["contagem"]
+    assert (contagem["criar"], contagem["atualizar"], contagem["pausar"]) == (0, 0, 0)
+    assert contagem["inalterados"] == 4
+
+
+def test_sincronizar_campanha_atualiza_data_alterada(imagem):
+    simulador = _simulador()
+    implantacao = asyncio.run(_executar(
+        simulador, lambda api: api.implantar_campanha(arvore_campanha(imagem, data_inicio=datetime(2026, 11, 1, 8, 0)))
+    ))
+
+    nova = arvore_campanha(imagem, data_inicio=datetime(2026, 11, 5, 8, 0))
+    resultado = asyncio.run(_executar(simulador, lambda api: api.sincronizar_campanha(nova)))
+
+    assert resultado["sucesso"], resultado
+    assert resultado["contagem"]["atualizar"] == 1
+    assert simulador.objetos[implantacao["campanha_id"]]["start_time"] == "2026-11-05T08:00:00"
+
+
+def test_busca_em_lote_envia_os_termos_originais(monkeypatch):
+    from backend.trafego_ai.tools import meta_ads_async
+    from backend.trafego_ai.tools.cache_interesses import CacheInteresses
+
+    simulador = _simulador()
+    monkeypatch.setattr(meta_ads_async, "cache_interesses", CacheInteresses())
+    em_lote = asyncio.run(_executar(
+        simulador, lambda api: api.buscar_interesses_em_lote(["Educação Física", "educacao fisica"], limite=3)
+    ))
+
+    monkeypatch.setattr(meta_ads_async, "cache_interesses", CacheInteresses())
+    individual = asyncio.run(_executar(simulador, lambda api: api.buscar_interesses("Educação Física", limite=3)))
+
+    assert em_lote["Educação Física"] == individual
+    assert em_lote["educacao fisica"] == individual
+    assert individual[0]["name"].startswith("Educação Física")
+
+
+def _campanhas_populadas(simulador, quantidade=2):
+    simulador.popular_conta(CONTA, campanhas=quantidade, conjuntos_por_campanha=0)
+    return [c["id"] for c in _objetos(simulador, "campaign")]
+
+
+def test_mutacoes_arredondam_centavos():
+    simulador = _simulador()
+    campanha, outra = _campanhas_populadas(simulador)
+
+    relatorio = asyncio.run(_executar(simulador, lambda api: api.aplicar_mutacoes([
+        {"id": campanha, "tipo": "campanha", "orcamento_diario": 19.99},
+        {"id": outra, "tipo": "campanha", "orcamento_diario": 1234.57},
+    ])))
+
+    assert relatorio["sucesso"], relatorio
+    assert relatorio["objetos"][0]["alteracao"] == {"daily_budget": 1999}
+    assert int(simulador.objetos[campanha]["daily_budget"]) == 1999
+    assert int(simulador.objetos[outra]["daily_budget"]) == 123457
+
+
+def test_falha_parcial_reverte_as_alteracoes_aplicadas():
+    simulador = _simulador()
+    valida, invalida = _campanhas_populadas(simulador)
+
+    # O orçamento de 0,50 é recusado pela Graph API; a pausa da outra campanha é desfeita
+    relatorio = asyncio.run(_executar(simulador, lambda api: api.aplicar_mutacoes([
+        {"id": valida, "tipo": "campanha", "status": "PAUSED", "orcamento_diario": 80},
+        {"id": invalida, "tipo": "campanha", "orcamento_diario": 0.5},
+    ])))
+
+    assert not relatorio["sucesso"]
+    assert relatorio["contagem"] == {"revertido": 1, "erro": 1}
+    revertido, erro = relatorio["objetos"]
+    assert revertido["status"] == "revertido"
+    assert revertido["anterior"] == {"status": "ACTIVE", "daily_budget": "5000"}
+    assert erro["status"] == "erro" and "budget" in erro["erro"]
+    assert simulador.objetos[valida]["status"] == "ACTIVE"
+    assert int(simulador.objetos[valida]["daily_budget"]) == 5000
+    assert int(simulador.objetos[invalida]["daily_budget"]) == 5000
+
+
+def test_falha_na_leitura_previa_nao_altera_nada():
+    simulador = _simulador()
+    (campanha,) = _campanhas_populadas(simulador, quantidade=1)
+
+    relatorio = asyncio.run(_executar(simulador, lambda api: api.aplicar_mutacoes([
+        {"id": campanha, "tipo": "campanha", "status": "PAUSED"},
+        {"id": "999999999", "tipo": "campanha", "status": "PAUSED"},
+    ])))
+
+    assert not relatorio["sucesso"]
+    assert [o["status"] for o in relatorio["objetos"]] == ["nao_enviado", "erro"]
+    assert simulador.objetos[campanha]["status"] == "ACTIVE"
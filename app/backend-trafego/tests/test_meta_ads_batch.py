@@ -0,0 +1,158 @@
+"""
+Testes da montagem de parâmetros e da execução de operações em lote da Graph API
+"""
+import json
+import re
+from datetime import datetime
+from urllib.parse import parse_qsl
+
+from backend.trafego_ai.tools.meta_ads_batch import (
+    executar_operacoes,
+    montar_operacoes_campanha,
+    nova_operacao,
+    referencia
+)
+from backend.trafego_ai.tools.meta_ads_params import (
+    codificar_params,
+    params_campanha,
+    params_criativo,
+    requer_relatorio_assincrono
+)
+
+
+def test_params_campanha_converte_orcamento_e_datas():
+    params = params_campanha("Campanha", "OUTCOME_TRAFFIC", orcamento_diario=50.5,
+                             data_inicio=datetime(2026, 11, 1, 8, 30), data_fim=datetime(2026, 11, 30))
+
+    assert params["daily_budget"] == 5050
+    assert params["start_time"] == "2026-11-01T08:30:00"
+    assert params["end_time"] == "2026-11-30T00:00:00"
+    assert params["status"] == "PAUSED" and params["special_ad_categories"] == []
+    # Valores como 19.99 * 100 == 1998.9999... não perdem um centavo
+    assert params_campanha("Campanha", "OUTCOME_TRAFFIC", orcamento_lifetime=19.99)["lifetime_budget"] == 1999
+
+
+def test_params_criativo_de_imagem_e_de_video():
+    imagem = params_criativo("Título", "Texto", "LEARN_MORE", "https://example.com", imagem_hash="h1", page_id="p")
+    video = params_criativo("Título", "Texto", "SHOP_NOW", "https://example.com", imagem_hash="h1", video_id="v1")
+
+    assert imagem["object_story_spec"]["link_data"]["image_hash"] == "h1"
+    assert imagem["object_story_spec"]["page_id"] == "p"
+    assert video["object_story_spec"]["video_data"]["video_id"] == "v1"
+    assert video["object_story_spec"]["video_data"]["image_hash"] == "h1"
+    assert "link_data" not in video["object_story_spec"]
+
+
+def test_codificar_params_serializa_objetos_e_ignora_none():
+    assert codificar_params({"name": "x", "targeting": {"age_min": 18}, "limit": 5, "vazio": None}) == {
+        "name": "x", "targeting": '{"age_min": 18}', "limit": "5"
+    }
+
+
+def test_requer_relatorio_assincrono_por_periodo_ou_breakdown():
+    assert not requer_relatorio_assincrono(datetime(2026, 1, 1), datetime(2026, 1, 7))
+    assert requer_relatorio_assincrono(datetime(2026, 1, 1), datetime(2026, 1, 7), breakdowns=["age"])
+    assert requer_relatorio_assincrono(datetime(2025, 1, 1), datetime(2026, 1, 1))
+
+
+def test_nova_operacao_mantem_referencias_sem_codificacao():
+    operacao = nova_operacao("anuncio", "POST", "act_1/ads",
+                             {"adset_id": referencia("conjunto"), "creative": {"creative_id": referencia("criativo")}})
+
+    corpo = dict(parse_qsl(operacao["corpo"]))
+    assert corpo["adset_id"] == "{result=conjunto:$.id}"
+    assert json.loads(corpo["creative"]) == {"creative_id": "{result=criativo:$.id}"}
+    assert operacao["depende_de"] == ["conjunto", "criativo"]
+
+
+def test_nova_operacao_get_leva_parametros_na_url():
+    operacao = nova_operacao("busca", "GET", "search", {"q": "moda", "limit": 3})
+
+    assert operacao["url_relativa"] == "search?q=moda&limit=3"
+    assert operacao["corpo"] == ""
+
+
+def test_montar_operacoes_campanha_em_ordem_de_dependencia():
+    arvore = {
+        "campanha": {"nome": "C", "objetivo": "OUTCOME_TRAFFIC"},
+        "conjuntos": [{
+            "nome": "S", "objetivo_otimizacao": "LINK_CLICKS", "segmentacao": {},
+            "anuncios": [
+                {"nome": "A0", "creative_id": "123"},
+                {"nome": "A1", "criativo": {"titulo": "T", "texto": "x", "cta": "LEARN_MORE",
+                                            "url_destino": "https://example.com"}},
+            ],
+        }],
+    }
+
+    operacoes = montar_operacoes_campanha("1", arvore)
+
+    assert [o["nome"] for o in operacoes] == ["campanha", "conjunto_0", "anuncio_0_0", "criativo_0_1", "anuncio_0_1"]
+    dependencias = {o["nome"]: o["depende_de"] for o in operacoes}
+    assert dependencias["conjunto_0"] == ["campanha"]
+    assert dependencias["anuncio_0_0"] == ["conjunto_0"]
+    assert dependencias["anuncio_0_1"] == ["conjunto_0", "criativo_0_1"]
+
+
+class _GraphEmMemoria:
+    """
+    Executa os itens de um lote resolvendo as referências internas, como a Graph API.
+    """
+
+    def __init__(self, falhar=()):
+        self.falhar = set(falhar)
+        self.lotes = []
+        self._proximo_id = 100
+
+    def __call__(self, itens):
+        self.lotes.append(itens)
+        ids, respostas = {}, []
+        for item in itens:
+            pendentes = re.findall(r"\{result=(\w+):\$\.id\}", item["relative_url"] + item.get("body", ""))
+            if item["name"] in self.falhar or any(nome not in ids for nome in pendentes):
+                respostas.append({"code": 400, "body": json.dumps({"error": {"message": f"falhou {item['name']}"}})})
+                continue
+            self._proximo_id += 1
+            ids[item["name"]] = str(self._proximo_id)
+            respostas.append({"code": 200, "body": json.dumps({"id": str(self._proximo_id)})})
+        return respostas
+
+
+def _operacoes_encadeadas():
+    return [
+        nova_operacao("campanha", "POST", "act_1/campaigns", {"name": "C"}, tipo="campanha"),
+        nova_operacao("conjunto", "POST", "act_1/adsets", {"campaign_id": referencia("campanha")}, tipo="conjunto"),
+        nova_operacao("anuncio", "POST", "act_1/ads", {"adset_id": referencia("conjunto")}, tipo="anuncio"),
+    ]
+
+
+def test_executar_operacoes_substitui_referencias_entre_lotes():
+    graph = _GraphEmMemoria()
+
+    resultado = executar_operacoes(_operacoes_encadeadas(), graph, tamanho_lote=2)
+
+    assert resultado["sucesso"]
+    assert resultado["requisicoes"] == 2
+    # A referência ao conjunto criado no primeiro lote chega ao segundo já como ID
+    assert graph.lotes[1][0]["body"] == f"adset_id={resultado['resultados']['conjunto']['id']}"
+
+
+def test_executar_operacoes_ignora_dependentes_de_falha():
+    graph = _GraphEmMemoria(falhar={"campanha"})
+
+    resultado = executar_operacoes(_operacoes_encadeadas(), graph, tamanho_lote=1)
+
+    estados = {nome: r["status"] for nome, r in resultado["resultados"].items()}
+    assert estados == {"campanha": "erro", "conjunto": "ignorado", "anuncio": "ignorado"}
+    assert resultado["resultados"]["campanha"]["erro"] == "falhou campanha"
+    assert resultado["requisicoes"] == 1 and not resultado["sucesso"]
+
+
+def test_executar_operacoes_registra_erro_de_envio_do_lote():
+    def enviar_lote(itens):
+        raise ConnectionError("sem conexão")
+
+    resultado = executar_operacoes(_operacoes_encadeadas()[:1], enviar_lote)
+
+    assert resultado["resultados"]["campanha"]["status"] == "erro"
+    assert resultado["resultados"]["campanha"]["erro"] == "sem conexão"
@@ -0,0 +1,168 @@
+"""
+Testes do armazenamento local de métricas e da detecção dos dias pendentes de sincronização
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.trafego_ai.utils import metricas_locais
+from backend.trafego_ai.utils.metricas_locais import (
+    ArmazemMetricas,
+    _intervalos,
+    data_para_dia,
+    dia_para_data,
+    linha_para_registro
+)
+
+HOJE = date(2026, 3, 31)
+CONTA = "act_1"
+
+
+@pytest.fixture
+def armazem(tmp_path):
+    return ArmazemMetricas(diretorio=str(tmp_path))
+
+
+def _sincronizar_em(monkeypatch, armazem, instante: date, dias):
+    # Meio-dia evita que o fuso local mude a data do instante gravado
+    monkeypatch.setattr(metricas_locais.time, "time",
+                        lambda: datetime(instante.year, instante.month, instante.day, 12).timestamp())
+    armazem.gravar_dias(CONTA, "ad", dias, [])
+
+
+def _registro(ad_id, dia, impressoes=100, cliques=5):
+    return (1, 2, ad_id, dia, impressoes, cliques, 80, 10.0, 1.0)
+
+
+def test_conversao_de_datas():
+    assert data_para_dia("1970-01-02T03:00:00-0300") == 1
+    assert data_para_dia(datetime(2026, 3, 31, 23, 59)) == data_para_dia(HOJE)
+    assert dia_para_data(data_para_dia(HOJE)) == HOJE
+
+
+def test_intervalos_agrupa_dias_contiguos():
+    assert _intervalos([5, 1, 2, 3, 7, 8, 2]) == [(1, 3), (5, 5), (7, 8)]
+    assert _intervalos([]) == []
+
+
+def test_linha_para_registro_soma_apenas_conversoes():
+    registro = linha_para_registro({
+        "campaign_id": "10", "ad_id": "30", "date_start": "2026-03-31",
+        "impressions": "1000", "clicks": "20", "spend": "12.5",
+        "actions": [
+            {"action_type": "purchase", "value": "2"},
+            {"action_type": "lead", "value": "3"},
+            {"action_type": "link_click", "value": "20"},
+        ],
+    })
+    assert registro == (10, 0, 30, data_para_dia(HOJE), 1000, 20, 0, 12.5, 5.0)
+
+
+def test_dias_pendentes_sem_sincronizacao(armazem):
+    pendentes = armazem.dias_pendentes(CONTA, "ad", dias_historico=30, janela_atribuicao=7, hoje=HOJE)
+    hoje = data_para_dia(HOJE)
+    assert pendentes == list(range(hoje - 29, hoje + 1))
+
+
+def test_dias_pendentes_ignora_dias_finais_e_rebusca_janela(monkeypatch, armazem):
+    hoje = data_para_dia(HOJE)
+    _sincronizar_em(monkeypatch, armazem, HOJE, range(hoje - 29, hoje + 1))
+
+    pendentes = armazem.dias_pendentes(CONTA, "ad", dias_historico=30, janela_atribuicao=7, hoje=HOJE)
+
+    # Os dias ainda dentro da janela de atribuição são sempre buscados de novo
+    assert pendentes == list(range(hoje - 6, hoje + 1))
+
+
+def test_dias_pendentes_rebusca_dia_sincronizado_antes_de_fechar_a_janela(monkeypatch, armazem):
+    hoje = data_para_dia(HOJE)
+    _sincronizar_em(monkeypatch, armazem, HOJE, range(hoje - 29, hoje + 1))
+    # Este dia foi sincronizado no dia seguinte, com métricas ainda provisórias
+    antigo = hoje - 20
+    _sincronizar_em(monkeypatch, armazem, dia_para_data(antigo + 1), [antigo])
+
+    pendentes = armazem.dias_pendentes(CONTA, "ad", dias_historico=30, janela_atribuicao=7, hoje=HOJE)
+
+    assert pendentes == [antigo] + list(range(hoje - 6, hoje + 1))
+
+
+def test_gravar_dias_substitui_apenas_os_dias_informados(armazem):
+    hoje = data_para_dia(HOJE)
+    armazem.gravar_dias(CONTA, "ad", [hoje - 1, hoje],
+                        [_registro(3, hoje), _registro(3, hoje - 1), _registro(4, hoje)])
+    armazem.gravar_dias(CONTA, "ad", [hoje], [_registro(3, hoje, impressoes=500)])
+
+    dados = armazem.consultar(CONTA, "ad")
+    assert dados.dtype == metricas_locais.DTYPE_METRICAS
+    # Ordenado por objeto e data; o anúncio 4 sumiu do dia regravado
+    assert [(int(l["ad_id"]), int(l["data"]), int(l["impressions"])) for l in dados] == [
+        (3, hoje - 1, 100),
+        (3, hoje, 500),
+    ]
+
+
+def test_cobre_periodo_exige_dias_finais(monkeypatch, armazem):
+    hoje = data_para_dia(HOJE)
+    _sincronizar_em(monkeypatch, armazem, HOJE, range(hoje - 29, hoje + 1))
+    # Sincronizado no dia seguinte, ainda dentro da janela de atribuição
+    _sincronizar_em(monkeypatch, armazem, dia_para_data(hoje - 19), [hoje - 20])
+
+    def cobre(inicio, fim):
+        return armazem.cobre_periodo(CONTA, "ad", dia_para_data(inicio), dia_para_data(fim),
+                                     janela_atribuicao=7, hoje=HOJE)
+
+    assert cobre(hoje - 19, hoje - 7)
+    # Hoje já foi sincronizado, mas com dados parciais
+    assert not cobre(hoje - 10, hoje)
+    assert not cobre(hoje - 21, hoje - 19)
+    assert not cobre(hoje - 35, hoje - 25)
+
+
+def test_metricas_campanha_omitem_alcance_do_periodo(armazem):
+    hoje = data_para_dia(HOJE)
+    armazem.gravar_dias(CONTA, "campaign", [hoje - 1, hoje],
+                        [(7, 0, 0, dia, 1000, 20, 400, 15.0, 2.0) for dia in (hoje - 1, hoje)])
+
+    metricas = armazem.metricas_campanha(CONTA, "7", dia_para_data(hoje - 1), HOJE)
+
+    assert metricas["impressions"] == 2000 and metricas["clicks"] == 40
+    assert metricas["ctr"] == 2.0 and metricas["cpc"] == 0.75 and metricas["cpm"] == 15.0
+    # O alcance único do período não sai da soma dos dias
+    assert "reach" not in metricas and "frequency" not in metricas
+    assert metricas["date_start"] == dia_para_data(hoje - 1).isoformat()
+
+
+def test_consultar_filtra_por_periodo_e_ids(armazem):
+    hoje = data_para_dia(HOJE)
+    armazem.gravar_dias(CONTA, "ad", range(hoje - 2, hoje + 1),
+                        [_registro(ad, dia) for ad in (3, 4) for dia in range(hoje - 2, hoje + 1)])
+
+    dados = armazem.consultar(CONTA, "ad", data_inicio=HOJE - timedelta(days=1), ad_ids=["4"])
+
+    assert np.array_equal(dados["ad_id"], [4, 4])
+    assert np.array_equal(dados["data"], [hoje - 1, hoje])
+    assert len(armazem.consultar("act_2", "ad")) == 0
+
+
+def test_sincronizar_busca_apenas_intervalos_pendentes(monkeypatch, armazem):
+    hoje = data_para_dia(HOJE)
+    _sincronizar_em(monkeypatch, armazem, HOJE, range(hoje - 29, hoje - 9))
+
+    class API:
+        account_id = CONTA
+
+        def __init__(self):
+            self.chamadas = []
+
+        def obter_insights_conta(self, nivel, data_inicio, data_fim, incremento_tempo, metricas):
+            self.chamadas.append((data_inicio, data_fim))
+            return [{"ad_id": "3", "date_start": data_fim.isoformat(), "impressions": "10"}]
+
+    api = API()
+    resultado = armazem.sincronizar(api, dias_historico=30, janela_atribuicao=7, hoje=HOJE)
+
+    assert api.chamadas == [(dia_para_data(hoje - 9), HOJE)]
+    assert resultado == {"dias": 10, "linhas": 1, "consultas": 1}
+    assert armazem.dias_pendentes(CONTA, "ad", dias_historico=30, janela_atribuicao=7, hoje=HOJE) == \
+        list(range(hoje - 6, hoje + 1))
@@ -0,0 +1,60 @@
+"""
+Testes do registro de sessões da API do Meta ADS por conta e credencial
+"""
+import pytest
+
+from backend.trafego_ai.tools.sessoes_meta import RegistroSessoesMeta
+
+
+@pytest.fixture
+def registro(monkeypatch):
+    registro = RegistroSessoesMeta(ttl=60, max_sessoes=3)
+    registro.validacoes = []
+    registro.contas_sem_acesso = set()
+
+    def validar(api, account_id):
+        registro.validacoes.append(account_id)
+        return account_id not in registro.contas_sem_acesso
+
+    monkeypatch.setattr(registro, "_validar", validar)
+    return registro
+
+
+def test_sessao_validada_e_reaproveitada(registro):
+    api = registro.obter("app", "segredo", "token", "1")
+
+    assert registro.obter("app", "segredo", "token", "1") is api
+    assert registro.obter("app", "segredo", "outro-token", "1") is not api
+    assert registro.validacoes == ["1", "1"]
+
+
+def test_registro_limitado_remove_a_sessao_menos_usada(registro):
+    apis = {conta: registro.obter("app", "segredo", f"token-{conta}", conta) for conta in "123"}
+    registro.obter("app", "segredo", "token-1", "1")
+
+    registro.obter("app", "segredo", "token-4", "4")
+
+    assert sorted(registro.metricas()) == ["1", "3", "4"]
+    assert registro.obter("app", "segredo", "token-1", "1") is apis["1"]
+    assert registro.obter("app", "segredo", "token-2", "2") is not apis["2"]
+
+
+def test_sessao_sem_acesso_nao_fica_no_registro(registro):
+    registro.contas_sem_acesso.add("9")
+
+    registro.obter("app", "segredo", "token", "9")
+    registro.obter("app", "segredo", "token", "9")
+
+    assert registro.metricas() == {}
+    assert registro.validacoes == ["9", "9"]
+
+
+def test_sessoes_expiradas_sao_removidas(registro):
+    registro.ttl = 0
+    registro.obter("app", "segredo", "token-1", "1")
+    registro.obter("app", "segredo", "token-2", "2")
+    registro.ttl = 60
+
+    registro.obter("app", "segredo", "token-3", "3")
+
+    assert sorted(registro.metricas()) == ["3"]
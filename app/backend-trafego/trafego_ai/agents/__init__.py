@@ -1,15 +1,23 @@
 """
 Pacote de agentes para o sistema de IA de Gestão de Tráfego
+
+Os agentes são importados sob demanda, já que carregam o CrewAI e o LangChain.
 """
+from importlib import import_module
+
+_EXPORTACOES = {
+    "BaseAgent": "backend.trafego_ai.agents.base_agent",
+    "EstrategistaAgent": "backend.trafego_ai.agents.estrategista_agent",
+    "CriadorCampanhasAgent": "backend.trafego_ai.agents.criador_campanhas_agent",
+    "EspecialistaAnunciosAgent": "backend.trafego_ai.agents.especialista_anuncios_agent"
+}
+
+__all__ = list(_EXPORTACOES)
+
 
-from backend.trafego_ai.agents.base_agent import BaseAgent
-from backend.trafego_ai.agents.estrategista_agent import EstrategistaAgent
-from backend.trafego_ai.agents.criador_campanhas_agent import CriadorCampanhasAgent
-from backend.trafego_ai.agents.especialista_anuncios_agent import EspecialistaAnunciosAgent
-
-__all__ = [
-    "BaseAgent",
-    "EstrategistaAgent",
-    "CriadorCampanhasAgent",
-    "EspecialistaAnunciosAgent"
-] 
\ No newline at end of file
+def __getattr__(nome: str):
+    if nome in _EXPORTACOES:
+        valor = getattr(import_module(_EXPORTACOES[nome]), nome)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -1,8 +1,6 @@
 """
 Implementação da classe base para os agentes de IA de Gestão de Tráfego
 """
-from crewai import Agent
-from langchain_openai import ChatOpenAI
 from backend.trafego_ai.config.settings import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE
 
 
@@ -12,7 +10,7 @@ class BaseAgent:
     Implementa funcionalidades comuns e fornece integração com o CrewAI.
     """
     
-    def __init__(self, role, goal, backstory=None, memory=True, verbose=False, 
+    def __init__(self, role, goal, backstory=None, memory=False, verbose=False, 
                 tools=None, model=None, temperature=None, allow_delegation=True):
         """
         Inicializa um agente base.
@@ -21,7 +19,9 @@ class BaseAgent:
             role (str): O papel/função do agente
             goal (str): O objetivo principal do agente
             backstory (str, optional): História de fundo do agente
-            memory (bool, optional): Se o agente deve manter memória das interações
+            memory (bool, optional): Se o agente deve usar a memória nativa (ilimitada) do CrewAI.
+                                     Default para False; a memória da sessão é limitada e
+                                     gerenciada pelo CrewManager.
             verbose (bool, optional): Se deve imprimir logs detalhados
             tools (list, optional): Lista de ferramentas disponíveis para o agente
             model (str, optional): Modelo LLM específico a ser usado
@@ -39,14 +39,28 @@ class BaseAgent:
         self.allow_delegation = allow_delegation
         
         # Inicializar o modelo LLM
-        self.llm = ChatOpenAI(
+        self.llm = self._create_llm()
+        
+        # Criar o agente CrewAI
+        self.agent = self._create_agent()
+    
+    def _create_llm(self):
+        """
+        Cria o modelo LLM do agente.
+        
+        O LangChain é importado aqui, e não no módulo, para que importar os agentes
+        não pese na inicialização da API.
+        
+        Returns:
+            ChatOpenAI: Modelo LLM configurado
+        """
+        from langchain_openai import ChatOpenAI
+        
+        return ChatOpenAI(
             api_key=OPENAI_API_KEY,
             model=self.model_name,
             temperature=self.temperature
         )
-        
-        # Criar o agente CrewAI
-        self.agent = self._create_agent()
     
     def _create_agent(self):
         """
@@ -55,6 +69,8 @@ class BaseAgent:
         Returns:
             Agent: Uma instância do agente CrewAI
         """
+        from crewai import Agent
+        
         return Agent(
             role=self.role,
             goal=self.goal,
@@ -101,10 +117,6 @@ class BaseAgent:
             BaseAgent: O próprio agente para encadeamento de métodos
         """
         self.temperature = temperature
-        self.llm = ChatOpenAI(
-            api_key=OPENAI_API_KEY,
-            model=self.model_name,
-            temperature=self.temperature
-        )
+        self.llm = self._create_llm()
         self.agent = self._create_agent()
         return self 
\ No newline at end of file
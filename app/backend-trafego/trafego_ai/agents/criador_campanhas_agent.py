@@ -26,7 +26,7 @@ class CriadorCampanhasAgent(BaseAgent):
             recursos, formatos, configurações e requisitos técnicos da plataforma. Você 
             sabe como estruturar campanhas, conjuntos de anúncios e anúncios para alcançar
             os melhores resultados possíveis, independente do objetivo.""",
-            memory=True,
+            memory=False,  # Memória da sessão gerenciada pelo CrewManager
             verbose=verbose,
             tools=tools,
             temperature=0.2,
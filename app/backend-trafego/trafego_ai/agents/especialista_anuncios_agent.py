@@ -26,7 +26,7 @@ class EspecialistaAnunciosAgent(BaseAgent):
             anúncios, requisitos técnicos, e práticas recomendadas para cada tipo de objetivo. 
             Você sabe avaliar imagens e vídeos para determinar seu potencial de desempenho e 
             sabe criar textos persuasivos que geram resultados.""",
-            memory=True,
+            memory=False,  # Memória da sessão gerenciada pelo CrewManager
             verbose=verbose,
             tools=tools,
             temperature=0.4,  # Um pouco mais de criatividade para textos publicitários
@@ -174,13 +174,14 @@ class EspecialistaAnunciosAgent(BaseAgent):
             "recursos_disponiveis": recursos_disponiveis
         }
     
-    def otimizar_anuncio_existente(self, detalhes_anuncio, metricas_desempenho):
+    def otimizar_anuncio_existente(self, detalhes_anuncio, metricas_desempenho, achados=None):
         """
         Fornece recomendações para otimizar um anúncio existente com base em seu desempenho.
         
         Args:
             detalhes_anuncio (dict): Detalhes do anúncio existente
             metricas_desempenho (dict): Métricas de desempenho do anúncio
+            achados (str, optional): Achados compactos da análise quantitativa já calculada
             
         Returns:
             dict: Recomendações de otimização
@@ -198,6 +199,14 @@ class EspecialistaAnunciosAgent(BaseAgent):
         conversoes = metricas_desempenho.get("conversoes", "Não fornecido")
         frequencia = metricas_desempenho.get("frequencia", "Não fornecido")
         
+        # KPIs, tendências e anomalias chegam prontos; o agente apenas os interpreta
+        analise_texto = ""
+        if achados:
+            analise_texto = f"""
+        ANÁLISE QUANTITATIVA (calculada sobre a série diária; não recalcule):
+        {achados}
+        """
+        
         prompt = f"""
         Analise o anúncio existente e suas métricas de desempenho, e forneça recomendações 
         detalhadas para otimização:
@@ -214,7 +223,7 @@ class EspecialistaAnunciosAgent(BaseAgent):
         CPC: {cpc}
         Conversões: {conversoes}
         Frequência: {frequencia}
-        
+        {analise_texto}
         Com base nessas informações, forneça:
         
         1. Diagnóstico dos problemas ou limitações do anúncio atual
@@ -233,5 +242,6 @@ class EspecialistaAnunciosAgent(BaseAgent):
         return {
             "recomendacoes_otimizacao": result,
             "anuncio_original": detalhes_anuncio,
-            "metricas_analisadas": metricas_desempenho
+            "metricas_analisadas": metricas_desempenho,
+            "achados": achados
         } 
\ No newline at end of file
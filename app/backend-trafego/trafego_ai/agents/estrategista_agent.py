@@ -27,7 +27,7 @@ class EstrategistaAgent(BaseAgent):
             de diversos tamanhos e segmentos, alcançando resultados excepcionais através de 
             estratégias bem fundamentadas. Você é orientado por dados, mas também compreende 
             o lado criativo e humano do marketing digital.""",
-            memory=True,
+            memory=False,  # Memória da sessão gerenciada pelo CrewManager
             verbose=verbose,
             tools=tools,
             temperature=0.2,
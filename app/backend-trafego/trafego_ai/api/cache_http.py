@@ -0,0 +1,68 @@
+"""
+Implementação das requisições condicionais (ETag e If-None-Match) das respostas JSON da API
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from backend.trafego_ai.api.serializacao import RespostaJSONPronta
+
+# Sufixos que a compressão acrescenta ao ETag de cada codificação (Ex: "abc-gzip")
+SUFIXOS_CODIFICACAO = ("-gzip", "-br")
+
+
+def etag_forte(corpo: bytes) -> str:
+    """
+    Calcula um ETag forte a partir do corpo da resposta.
+
+    Args:
+        corpo (bytes): Corpo da resposta sem compressão
+
+    Returns:
+        str: ETag entre aspas
+    """
+    return f'"{hashlib.blake2b(corpo, digest_size=16).hexdigest()}"'
+
+
+def _normalizar_etag(etag: str) -> str:
+    etag = etag.strip()
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for sufixo in SUFIXOS_CODIFICACAO:
+        if etag.endswith(f'{sufixo}"'):
+            return etag[:-len(sufixo) - 1] + '"'
+    return etag
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Verifica se o If-None-Match da requisição corresponde ao ETag atual.
+
+    A comparação é fraca (RFC 9110): ignora o prefixo W/ e o sufixo da codificação
+    usada na compressão, já que a representação descomprimida é a mesma.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_normalizar_etag(candidato) == etag for candidato in if_none_match.split(","))
+
+
+def resposta_condicional(request: Request, corpo: bytes, etag: Optional[str] = None) -> Response:
+    """
+    Monta a resposta JSON de um recurso com ETag, ou 304 se o cliente já tem a versão atual.
+
+    Args:
+        request (Request): Requisição recebida
+        corpo (bytes): Corpo JSON já serializado
+        etag (str, optional): ETag já calculado. Se None, é calculado a partir do corpo.
+
+    Returns:
+        Response: 304 sem corpo ou 200 com o corpo, ambos com ETag
+    """
+    etag = etag or etag_forte(corpo)
+    cabecalhos = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    return RespostaJSONPronta(corpo, headers=cabecalhos)
@@ -0,0 +1,141 @@
+"""
+Implementação do middleware de compressão das respostas (brotli ou gzip, negociado por requisição)
+"""
+import gzip
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.trafego_ai.config.settings import (
+    COMPRESSAO_TAMANHO_MINIMO,
+    COMPRESSAO_NIVEL_GZIP,
+    COMPRESSAO_NIVEL_BROTLI
+)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli é opcional
+    brotli = None
+
+# Tipos de conteúdo que valem a compressão
+_TIPOS_COMPRESSIVEIS = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def escolher_codificacao(accept_encoding: str) -> Optional[str]:
+    """
+    Escolhe a codificação da resposta a partir do Accept-Encoding da requisição.
+
+    Prefere brotli (se instalado) a gzip e respeita os pesos q=0.
+
+    Args:
+        accept_encoding (str): Header Accept-Encoding
+
+    Returns:
+        Optional[str]: "br", "gzip" ou None se nenhuma for aceita
+    """
+    aceitas = {}
+    for item in accept_encoding.lower().split(","):
+        partes = [p.strip() for p in item.split(";")]
+        if not partes[0]:
+            continue
+        peso = 1.0
+        for parametro in partes[1:]:
+            if parametro.startswith("q="):
+                try:
+                    peso = float(parametro[2:])
+                except ValueError:
+                    peso = 0.0
+        aceitas[partes[0]] = peso
+
+    candidatas: List[str] = (["br"] if brotli is not None else []) + ["gzip"]
+    for codificacao in candidatas:
+        if aceitas.get(codificacao, aceitas.get("*", 0.0)) > 0:
+            return codificacao
+    return None
+
+
+def comprimir(corpo: bytes, codificacao: str) -> bytes:
+    """
+    Comprime um corpo de resposta com a codificação escolhida.
+    """
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=COMPRESSAO_NIVEL_BROTLI)
+    return gzip.compress(corpo, compresslevel=COMPRESSAO_NIVEL_GZIP, mtime=0)
+
+
+class CompressaoMiddleware:
+    """
+    Comprime respostas acima de um tamanho mínimo com brotli ou gzip, conforme o Accept-Encoding.
+
+    Respostas em fluxo (Ex: NDJSON da análise de criativos em lote) passam sem compressão
+    para que cada evento chegue ao cliente assim que é produzido. O ETag recebe o sufixo
+    da codificação, mantendo-o forte e distinto por representação.
+    """
+
+    def __init__(self, app: ASGIApp, tamanho_minimo: int = COMPRESSAO_TAMANHO_MINIMO):
+        """
+        Inicializa o middleware.
+
+        Args:
+            app (ASGIApp): Aplicação ASGI
+            tamanho_minimo (int, optional): Bytes a partir dos quais a resposta é comprimida
+        """
+        self.app = app
+        self.tamanho_minimo = tamanho_minimo
+
+    @staticmethod
+    def _marcar_etag(cabecalhos: MutableHeaders, codificacao: str):
+        etag = cabecalhos.get("etag")
+        if etag and etag.endswith('"'):
+            cabecalhos["ETag"] = f'{etag[:-1]}-{codificacao}"'
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio: Optional[Message] = None
+        repassando = False
+
+        async def enviar(mensagem: Message):
+            nonlocal inicio, repassando
+            if mensagem["type"] == "http.response.start":
+                inicio = mensagem
+                return
+            if repassando or mensagem["type"] != "http.response.body" or inicio is None:
+                await send(mensagem)
+                return
+
+            cabecalhos = MutableHeaders(raw=inicio["headers"])
+            corpo = mensagem.get("body", b"")
+            compressivel = cabecalhos.get("content-type", "").startswith(_TIPOS_COMPRESSIVEIS)
+
+            if inicio["status"] == 304:
+                # O 304 confirma a representação que o cliente tem, comprimida com esta codificação
+                self._marcar_etag(cabecalhos, codificacao)
+                cabecalhos.add_vary_header("Accept-Encoding")
+            elif (mensagem.get("more_body", False) or not compressivel
+                    or inicio["status"] < 200 or inicio["status"] == 204
+                    or "content-encoding" in cabecalhos
+                    or len(corpo) < self.tamanho_minimo):
+                if compressivel:
+                    cabecalhos.add_vary_header("Accept-Encoding")
+            else:
+                corpo = comprimir(corpo, codificacao)
+                cabecalhos["Content-Encoding"] = codificacao
+                cabecalhos["Content-Length"] = str(len(corpo))
+                cabecalhos.add_vary_header("Accept-Encoding")
+                self._marcar_etag(cabecalhos, codificacao)
+                mensagem = {**mensagem, "body": corpo}
+
+            repassando = True
+            await send(inicio)
+            await send(mensagem)
+
+        await self.app(scope, receive, enviar)
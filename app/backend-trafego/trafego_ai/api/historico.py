@@ -0,0 +1,123 @@
+"""
+Implementação do histórico de mensagens das sessões, em registro colunar compacto e com serialização JSON incremental
+"""
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.trafego_ai.api.cache_http import etag_forte
+from backend.trafego_ai.api.serializacao import dumps_json
+
+# Autores das mensagens; cada mensagem guarda apenas o índice do autor nesta lista
+_PAPEIS: List[str] = ["user", "assistant", "system"]
+_INDICES_PAPEIS: Dict[str, int] = {papel: i for i, papel in enumerate(_PAPEIS)}
+_LOCK_PAPEIS = threading.Lock()
+
+
+def _indice_papel(role: str) -> int:
+    indice = _INDICES_PAPEIS.get(role)
+    if indice is None:
+        with _LOCK_PAPEIS:
+            indice = _INDICES_PAPEIS.get(role)
+            if indice is None:
+                if len(_PAPEIS) >= 256:
+                    raise ValueError(f"Autores de mensagem demais para registrar '{role}'")
+                indice = len(_PAPEIS)
+                _PAPEIS.append(role)
+                _INDICES_PAPEIS[role] = indice
+    return indice
+
+
+def _para_microssegundos(timestamp: str) -> int:
+    data = datetime.fromisoformat(timestamp)
+    return int(data.timestamp()) * 1_000_000 + data.microsecond
+
+
+def _para_iso(microssegundos: int) -> str:
+    segundos, micro = divmod(microssegundos, 1_000_000)
+    return datetime.fromtimestamp(segundos).replace(microsecond=micro).isoformat()
+
+
+class HistoricoSessao:
+    """
+    Histórico de mensagens de uma sessão.
+
+    As mensagens são guardadas em colunas (autor em um byte, data e hora em microssegundos
+    como inteiro e o texto), sem um dicionário por mensagem; o formato público
+    (role, content e timestamp em ISO 8601) é montado apenas na saída da API.
+
+    As mensagens não mudam depois de adicionadas, então o JSON do histórico é mantido
+    em cache e, a cada nova mensagem, apenas as novas são serializadas e anexadas.
+    """
+
+    __slots__ = ("_papeis", "_conteudos", "_instantes", "_json", "_etag", "_serializadas", "_lock")
+
+    def __init__(self):
+        self._papeis = bytearray()
+        self._conteudos: List[str] = []
+        self._instantes = array("q")
+        self._json = b"[]"
+        self._etag = etag_forte(self._json)
+        self._serializadas = 0
+        self._lock = threading.Lock()
+
+    def adicionar(self, role: str, content: str, timestamp: Optional[str] = None):
+        """
+        Adiciona uma mensagem ao histórico.
+
+        Args:
+            role (str): Autor da mensagem (user, assistant ou system)
+            content (str): Texto da mensagem
+            timestamp (str, optional): Data e hora em ISO 8601. Default para agora.
+        """
+        papel = _indice_papel(role)
+        instante = _para_microssegundos(timestamp) if timestamp else time.time_ns() // 1000
+        with self._lock:
+            self._papeis.append(papel)
+            self._conteudos.append(content)
+            self._instantes.append(instante)
+
+    def __len__(self) -> int:
+        return len(self._conteudos)
+
+    def _mensagem(self, indice: int) -> Dict[str, Any]:
+        return {
+            "role": _PAPEIS[self._papeis[indice]],
+            "content": self._conteudos[indice],
+            "timestamp": _para_iso(self._instantes[indice])
+        }
+
+    def mensagens(self) -> List[Dict[str, Any]]:
+        """
+        Retorna as mensagens do histórico no formato público.
+        """
+        with self._lock:
+            return [self._mensagem(i) for i in range(len(self._conteudos))]
+
+    def json(self) -> bytes:
+        """
+        Retorna o histórico serializado em JSON, serializando apenas as mensagens novas.
+
+        Returns:
+            bytes: Lista de mensagens em JSON
+        """
+        return self.json_com_etag()[0]
+
+    def json_com_etag(self) -> Tuple[bytes, str]:
+        """
+        Retorna o histórico serializado em JSON e seu ETag, recalculado apenas quando há mensagens novas.
+
+        Returns:
+            Tuple[bytes, str]: Lista de mensagens em JSON e ETag forte
+        """
+        with self._lock:
+            total = len(self._conteudos)
+            if self._serializadas < total:
+                novas = b",".join(dumps_json(self._mensagem(i)) for i in range(self._serializadas, total))
+                separador = b"," if self._serializadas else b""
+                self._json = self._json[:-1] + separador + novas + b"]"
+                self._etag = etag_forte(self._json)
+                self._serializadas = total
+            return self._json, self._etag
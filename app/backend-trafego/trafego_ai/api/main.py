@@ -2,19 +2,37 @@
 Ponto de entrada principal da API FastAPI para o sistema de IA de Gestão de Tráfego.
 """
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
 from backend.trafego_ai.api.routers import router
+from backend.trafego_ai.api.compressao import CompressaoMiddleware
+from backend.trafego_ai.api.serializacao import RespostaJSON
 from backend.trafego_ai.config.settings import settings
+from backend.trafego_ai.utils.logs import configurar_logs
+from backend.trafego_ai.utils.memoria import gerenciador_memoria
+
+# Logs assíncronos também nos workers iniciados pelo uvicorn (reload ou vários workers)
+configurar_logs()
+
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    """
+    Persiste as memórias das sessões mantidas em RAM ao encerrar o servidor.
+    """
+    yield
+    gerenciador_memoria.salvar_todas()
 
 # Criar a aplicação FastAPI
 app = FastAPI(
     title="SiaFlow - API de Gestão de Tráfego",
     description="API para interação com o sistema de IA de Gestão de Tráfego",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=RespostaJSON,
+    lifespan=ciclo_de_vida
 )
 
 # Configurar CORS
@@ -24,8 +42,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Comprimir respostas grandes (brotli ou gzip, conforme o Accept-Encoding)
+app.add_middleware(CompressaoMiddleware)
+
 # Incluir os roteadores
 app.include_router(router)
 
@@ -48,7 +70,9 @@ async def root():
             "/api/trafego/message",
             "/api/trafego/upload",
             "/api/trafego/campanha",
-            "/api/trafego/history/{session_id}"
+            "/api/trafego/criativos/lote",
+            "/api/trafego/history/{session_id}",
+            "/api/trafego/tarefas/{tarefa_id}"
         ]
     }
 
@@ -58,5 +82,6 @@ if __name__ == "__main__":
         "backend.trafego_ai.api.main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        log_config=None
     ) 
\ No newline at end of file
@@ -1,8 +1,9 @@
 """
 Implementação dos roteadores da API FastAPI para o sistema de IA de Gestão de Tráfego.
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status, BackgroundTasks
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 import json
 from pydantic import ValidationError
 import uuid
@@ -15,12 +16,25 @@ from backend.trafego_ai.models import (
     MessageSchema,
     CampanhaSchema,
     CriativoSchema,
+    AnaliseCriativosLoteSchema,
+    MutacoesMetaSchema,
     CampanhaResponse,
     MensagemResponse
 )
-from backend.trafego_ai.utils import CrewManager
+from backend.trafego_ai.tools.analise_imagem import eh_imagem, analisar_imagem_async
+from backend.trafego_ai.tools.agendador_meta import agendador_meta
+from backend.trafego_ai.tools.cache_pesquisa import cache_pesquisa
+from backend.trafego_ai.tools.documentos import eh_documento, indices_documentos
+from backend.trafego_ai.api.cache_http import resposta_condicional
+from backend.trafego_ai.api.historico import HistoricoSessao
+from backend.trafego_ai.api.serializacao import dumps_json
+from backend.trafego_ai.api.tarefas import registro_tarefas
+from backend.trafego_ai.utils.logs import contexto_log
 from backend.trafego_ai.config.settings import settings
 
+if TYPE_CHECKING:
+    from backend.trafego_ai.utils.crew_manager import CrewManager
+
 # Instanciar o router principal
 router = APIRouter(prefix="/api/trafego", tags=["trafego"])
 
@@ -30,32 +44,66 @@ crew_managers = {}
 # Dicionário para armazenar o histórico de mensagens por sessão
 message_history = {}
 
+# Dicionário com a validação local das imagens enviadas, por sessão e arquivo
+validacoes_criativos = {}
+
 # Pasta para armazenar uploads
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+def novo_crew_manager(session_id: str) -> "CrewManager":
+    """
+    Cria o gerenciador de equipe de uma sessão.
+    
+    O CrewManager (e com ele o CrewAI e os SDKs) é importado apenas na primeira sessão,
+    para não atrasar a inicialização dos workers.
+    """
+    from backend.trafego_ai.utils.crew_manager import CrewManager
+    
+    return CrewManager(verbose=settings.debug, session_id=session_id)
+
 @router.post("/session", response_model=Dict[str, str])
 async def criar_sessao():
     """
     Cria uma nova sessão para o usuário.
     """
     session_id = str(uuid.uuid4())
-    crew_managers[session_id] = CrewManager(verbose=settings.debug)
-    message_history[session_id] = []
+    crew_managers[session_id] = novo_crew_manager(session_id)
+    message_history[session_id] = HistoricoSessao()
     
     return {"session_id": session_id}
 
-def get_crew_manager(session_id: str) -> CrewManager:
+def get_crew_manager(session_id: str) -> "CrewManager":
     """
     Obtém o gerenciador de equipe para uma sessão específica.
     """
     if session_id not in crew_managers:
         # Criar um novo se não existir
-        crew_managers[session_id] = CrewManager(verbose=settings.debug)
-        message_history[session_id] = []
+        crew_managers[session_id] = novo_crew_manager(session_id)
+        message_history[session_id] = HistoricoSessao()
     
     return crew_managers[session_id]
 
+def get_arquivo_criativo(session_id: str, url_arquivo: Optional[str]) -> Dict[str, Any]:
+    """
+    Resolve o arquivo de um criativo enviado via upload e sua validação local.
+    
+    Retorna um dicionário vazio se o arquivo não pertencer à sessão.
+    """
+    if not url_arquivo:
+        return {}
+    
+    session_dir = os.path.join(UPLOAD_DIR, session_id)
+    caminho = os.path.realpath(os.path.join(UPLOAD_DIR, url_arquivo))
+    if not caminho.startswith(os.path.realpath(session_dir) + os.sep) or not os.path.exists(caminho):
+        return {}
+    
+    arquivo = {"caminho": caminho}
+    fatos = validacoes_criativos.get(session_id, {}).get(os.path.basename(caminho))
+    if fatos is not None:
+        arquivo["fatos_tecnicos"] = fatos
+    return arquivo
+
 @router.post("/message", response_model=MensagemResponse)
 async def enviar_mensagem(
     message: MessageSchema,
@@ -74,11 +122,7 @@ async def enviar_mensagem(
         )
     
     # Adicionar mensagem ao histórico
-    message_history[session_id].append({
-        "role": "user",
-        "content": message.content,
-        "timestamp": datetime.now().isoformat()
-    })
+    message_history[session_id].adicionar("user", message.content)
     
     # Obter o gerenciador de equipe
     crew_mgr = get_crew_manager(session_id)
@@ -90,85 +134,132 @@ async def enviar_mensagem(
         "is_complete": False,
         "error": None
     }
+    registro_tarefas.registrar(response["id"], response)
     
     # Processar a mensagem em segundo plano
     async def process_message():
-        try:
-            # Lógica para processar a mensagem com base no tipo
-            if message.type == "briefing":
-                try:
-                    briefing_data = json.loads(message.content)
-                    briefing = BriefingSchema(**briefing_data)
-                    result = crew_mgr.criar_estrategia_campanha(briefing.dict())
-                    response_content = f"Estratégia desenvolvida com sucesso.\n\n{result['estrategia']}"
-                except ValidationError as e:
-                    response_content = f"Erro ao processar o briefing: {str(e)}"
-                except Exception as e:
-                    response_content = f"Erro ao desenvolver estratégia: {str(e)}"
+        with contexto_log(session_id=session_id, tarefa_id=response["id"], etapa=f"mensagem_{message.type}"):
+            try:
+                # Lógica para processar a mensagem com base no tipo
+                if message.type == "briefing":
+                    try:
+                        briefing_data = json.loads(message.content)
+                        briefing = BriefingSchema(**briefing_data)
+                        result = crew_mgr.criar_estrategia_campanha(briefing.dict())
+                        response_content = f"Estratégia desenvolvida com sucesso.\n\n{result['estrategia']}"
+                    except ValidationError as e:
+                        response_content = f"Erro ao processar o briefing: {str(e)}"
+                    except Exception as e:
+                        response_content = f"Erro ao desenvolver estratégia: {str(e)}"
             
-            elif message.type == "criativo":
-                try:
-                    criativo_data = json.loads(message.content)
-                    result = crew_mgr.analisar_criativo(
-                        descricao_criativo=criativo_data.get("descricao", ""),
-                        formato=criativo_data.get("formato", "Não especificado"),
-                        objetivo_campanha=criativo_data.get("objetivo", "Não especificado")
-                    )
-                    response_content = f"Análise do criativo concluída.\n\n{result['avaliacao_criativo']}"
-                except Exception as e:
-                    response_content = f"Erro ao analisar criativo: {str(e)}"
+                elif message.type == "criativo":
+                    try:
+                        criativo_data = json.loads(message.content)
+                        arquivo = get_arquivo_criativo(session_id, criativo_data.get("url_arquivo"))
+                        result = crew_mgr.analisar_criativo(
+                            descricao_criativo=criativo_data.get("descricao", ""),
+                            formato=criativo_data.get("formato", "Não especificado"),
+                            objetivo_campanha=criativo_data.get("objetivo", "Não especificado"),
+                            caminho_arquivo=arquivo.get("caminho"),
+                            fatos_tecnicos=arquivo.get("fatos_tecnicos")
+                        )
+                        response_content = f"Análise do criativo concluída.\n\n{result['avaliacao_criativo']}"
+                    except Exception as e:
+                        response_content = f"Erro ao analisar criativo: {str(e)}"
             
-            else:  # mensagem comum
-                # Implementação simplificada - em produção, seria analisada pelo NLU
-                if "briefing" in message.content.lower():
-                    response_content = ("Vamos elaborar seu briefing. Por favor, forneça as seguintes informações:\n\n"
-                                      "1. Objetivo da campanha\n"
-                                      "2. Público-alvo\n"
-                                      "3. Orçamento\n"
-                                      "4. Duração da campanha\n"
-                                      "5. Métricas importantes\n"
-                                      "6. Experiência prévia com anúncios")
-                elif "analisar" in message.content.lower() and "criativo" in message.content.lower():
-                    response_content = ("Para analisar seu criativo, preciso das seguintes informações:\n\n"
-                                      "1. Descrição detalhada do criativo\n"
-                                      "2. Formato (imagem, vídeo, carrossel, etc.)\n"
-                                      "3. Objetivo da campanha")
-                else:
-                    response_content = ("Como posso ajudar com sua campanha de tráfego pago hoje? "
-                                      "Posso ajudar com:\n\n"
-                                      "- Elaboração de briefing\n"
-                                      "- Estratégia de campanha\n"
-                                      "- Análise de criativos\n"
-                                      "- Criação de estrutura de campanha")
+                else:  # mensagem comum
+                    # Implementação simplificada - em produção, seria analisada pelo NLU
+                    if "briefing" in message.content.lower():
+                        response_content = ("Vamos elaborar seu briefing. Por favor, forneça as seguintes informações:\n\n"
+                                          "1. Objetivo da campanha\n"
+                                          "2. Público-alvo\n"
+                                          "3. Orçamento\n"
+                                          "4. Duração da campanha\n"
+                                          "5. Métricas importantes\n"
+                                          "6. Experiência prévia com anúncios")
+                    elif "analisar" in message.content.lower() and "criativo" in message.content.lower():
+                        response_content = ("Para analisar seu criativo, preciso das seguintes informações:\n\n"
+                                          "1. Descrição detalhada do criativo\n"
+                                          "2. Formato (imagem, vídeo, carrossel, etc.)\n"
+                                          "3. Objetivo da campanha")
+                    else:
+                        response_content = ("Como posso ajudar com sua campanha de tráfego pago hoje? "
+                                          "Posso ajudar com:\n\n"
+                                          "- Elaboração de briefing\n"
+                                          "- Estratégia de campanha\n"
+                                          "- Análise de criativos\n"
+                                          "- Criação de estrutura de campanha")
                 
-            # Atualizar a resposta
-            response["content"] = response_content
-            response["is_complete"] = True
+                # Atualizar a resposta
+                response["content"] = response_content
+                response["is_complete"] = True
             
-            # Adicionar ao histórico
-            message_history[session_id].append({
-                "role": "assistant",
-                "content": response_content,
-                "timestamp": datetime.now().isoformat()
-            })
+                # Adicionar ao histórico
+                message_history[session_id].adicionar("assistant", response_content)
             
-        except Exception as e:
-            response["error"] = str(e)
-            response["is_complete"] = True
+            except Exception as e:
+                response["error"] = str(e)
+                response["is_complete"] = True
     
     # Iniciar o processamento em segundo plano
     background_tasks.add_task(process_message)
     
     return response
 
-@router.post("/upload", response_model=Dict[str, str])
+@router.post("/criativos/lote")
+async def analisar_criativos_lote(lote: AnaliseCriativosLoteSchema):
+    """
+    Avalia vários criativos simultaneamente.
+    
+    A resposta é um fluxo NDJSON: uma linha por criativo, na ordem em que as
+    avaliações terminam, seguida de uma linha final com o ranking combinado.
+    """
+    if lote.session_id not in crew_managers:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sessão não encontrada."
+        )
+    
+    crew_mgr = get_crew_manager(lote.session_id)
+    criativos = [
+        {**criativo.dict(), **get_arquivo_criativo(lote.session_id, criativo.url_arquivo)}
+        for criativo in lote.criativos
+    ]
+    
+    # O lote é validado antes de a resposta em fluxo começar, para que o erro chegue como 4xx
+    try:
+        eventos = crew_mgr.analisar_criativos_em_lote(
+            criativos=criativos,
+            objetivo_campanha=lote.objetivo,
+            max_concorrencia=lote.max_concorrencia
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    async def gerar_eventos():
+        with contexto_log(session_id=lote.session_id, etapa="criativos_lote"):
+            async for evento in eventos:
+                if evento["tipo"] == "ranking":
+                    message_history[lote.session_id].adicionar(
+                        "system", f"Análise em lote de {evento['total']} criativos concluída."
+                    )
+                yield dumps_json(evento) + b"\n"
+    
+    return StreamingResponse(gerar_eventos(), media_type="application/x-ndjson")
+
+@router.post("/upload", response_model=Dict[str, Any])
 async def upload_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     session_id: str = Form(...),
     file_type: str = Form(...)
 ):
     """
-    Faz upload de um arquivo (criativo) para a sessão.
+    Faz upload de um arquivo (criativo ou documento) para a sessão.
+    
+    Imagens passam por uma validação local dos requisitos do Meta ADS, cujo
+    resultado é devolvido e reaproveitado nas análises do criativo. Documentos
+    têm o texto extraído e indexado em segundo plano para consulta pelos agentes.
     """
     if session_id not in crew_managers:
         raise HTTPException(
@@ -193,10 +284,37 @@ async def upload_file(
     # Obter URL relativa para o arquivo
     relative_path = os.path.join(session_id, safe_filename)
     
-    return {
+    resposta = {
         "file_path": relative_path,
         "message": "Arquivo enviado com sucesso."
     }
+    
+    if eh_imagem(safe_filename):
+        validacao = await analisar_imagem_async(file_path)
+        validacoes_criativos.setdefault(session_id, {})[safe_filename] = validacao
+        resposta["validacao"] = validacao
+        if not validacao["aprovado"]:
+            resposta["message"] = "Arquivo enviado, mas não atende aos requisitos técnicos do Meta ADS."
+    elif eh_documento(safe_filename):
+        nome_documento = os.path.basename(file.filename) or safe_filename
+        indices_documentos.obter(session_id).registrar_documento(nome_documento)
+        background_tasks.add_task(indices_documentos.indexar_documento, session_id, file_path, nome_documento)
+        resposta["indexacao"] = "pendente"
+    
+    return resposta
+
+@router.get("/documentos/{session_id}", response_model=Dict[str, Any])
+async def obter_documentos(session_id: str):
+    """
+    Retorna o estado da indexação dos documentos enviados na sessão.
+    """
+    if session_id not in crew_managers:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sessão não encontrada."
+        )
+    
+    return indices_documentos.obter(session_id).metricas()
 
 @router.post("/campanha", response_model=CampanhaResponse)
 async def criar_campanha(
@@ -221,44 +339,46 @@ async def criar_campanha(
         is_complete=False,
         error=None
     )
+    registro_tarefas.registrar(response.id, response)
     
     # Processar em segundo plano
     async def process_campanha():
-        try:
-            # Obter criativos da sessão (para um sistema real, isto seria mais sofisticado)
-            session_dir = os.path.join(UPLOAD_DIR, session_id)
-            criativos = []
+        with contexto_log(session_id=session_id, tarefa_id=response.id):
+            try:
+                # Obter criativos da sessão (para um sistema real, isto seria mais sofisticado)
+                session_dir = os.path.join(UPLOAD_DIR, session_id)
+                criativos = []
             
-            if os.path.exists(session_dir):
-                for file in os.listdir(session_dir):
-                    criativos.append({
-                        "tipo": file.split("_")[0],
-                        "caminho": os.path.join(session_dir, file),
-                        "descricao": f"Arquivo {file}"
-                    })
+                if os.path.exists(session_dir):
+                    for file in os.listdir(session_dir):
+                        criativo = {
+                            "tipo": file.split("_")[0],
+                            "caminho": os.path.join(session_dir, file),
+                            "descricao": f"Arquivo {file}"
+                        }
+                        fatos = validacoes_criativos.get(session_id, {}).get(file)
+                        if fatos is not None:
+                            criativo["fatos_tecnicos"] = fatos
+                        criativos.append(criativo)
             
-            # Executar o processo completo
-            result = crew_mgr.processo_completo_campanha(
-                briefing=briefing.dict(),
-                criativos=criativos
-            )
+                # Executar o processo completo
+                result = crew_mgr.processo_completo_campanha(
+                    briefing=briefing.dict(),
+                    criativos=criativos
+                )
             
-            # Atualizar a resposta
-            response.estrategia = result["processo_completo"]["estrategia"]
-            response.estrutura_tecnica = result["processo_completo"]["estrutura_tecnica"]
-            response.especificacoes_anuncios = result["processo_completo"]["especificacoes_anuncios"]
-            response.is_complete = True
+                # Atualizar a resposta
+                response.estrategia = result["processo_completo"]["estrategia"]
+                response.estrutura_tecnica = result["processo_completo"]["estrutura_tecnica"]
+                response.especificacoes_anuncios = result["processo_completo"]["especificacoes_anuncios"]
+                response.is_complete = True
             
-            # Adicionar ao histórico
-            message_history[session_id].append({
-                "role": "system",
-                "content": f"Campanha criada: {briefing.nome_campanha}",
-                "timestamp": datetime.now().isoformat()
-            })
+                # Adicionar ao histórico
+                message_history[session_id].adicionar("system", f"Campanha criada: {briefing.nome_campanha}")
             
-        except Exception as e:
-            response.error = str(e)
-            response.is_complete = True
+            except Exception as e:
+                response.error = str(e)
+                response.is_complete = True
     
     # Iniciar o processamento em segundo plano
     background_tasks.add_task(process_campanha)
@@ -266,9 +386,11 @@ async def criar_campanha(
     return response
 
 @router.get("/history/{session_id}", response_model=List[Dict[str, Any]])
-async def obter_historico(session_id: str):
+async def obter_historico(session_id: str, request: Request):
     """
     Obtém o histórico de mensagens para uma sessão.
+    
+    A resposta traz um ETag; com If-None-Match igual, retorna 304 sem corpo.
     """
     if session_id not in message_history:
         raise HTTPException(
@@ -276,4 +398,67 @@ async def obter_historico(session_id: str):
             detail="Sessão não encontrada."
         )
     
-    return message_history[session_id] 
\ No newline at end of file
+    # O histórico é pré-serializado: cada mensagem é convertida em JSON uma única vez
+    corpo, etag = message_history[session_id].json_com_etag()
+    return resposta_condicional(request, corpo, etag)
+
+@router.get("/tarefas/{tarefa_id}", response_model=Dict[str, Any])
+async def obter_tarefa(tarefa_id: str, request: Request):
+    """
+    Obtém o estado de uma tarefa (resposta de mensagem ou criação de campanha) pelo ID
+    devolvido na criação.
+    
+    A resposta traz um ETag; com If-None-Match igual, retorna 304 sem corpo.
+    """
+    tarefa = registro_tarefas.json_com_etag(tarefa_id)
+    if tarefa is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tarefa não encontrada."
+        )
+    
+    corpo, etag = tarefa
+    return resposta_condicional(request, corpo, etag)
+
+@router.get("/memoria/{session_id}", response_model=Dict[str, Any])
+async def obter_metricas_memoria(session_id: str):
+    """
+    Obtém as métricas de uso da memória dos agentes para uma sessão.
+    """
+    if session_id not in crew_managers:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sessão não encontrada."
+        )
+    
+    return crew_managers[session_id].metricas_memoria()
+
+@router.get("/meta/uso", response_model=Dict[str, Any])
+async def obter_uso_meta():
+    """
+    Obtém o uso atual da Graph API por conta publicitária, conforme os headers de uso do Meta.
+    """
+    return agendador_meta.metricas()
+
+@router.get("/pesquisa/cache", response_model=Dict[str, Any])
+async def obter_metricas_cache_pesquisa():
+    """
+    Obtém as estatísticas do cache de pesquisas na web deste worker.
+    """
+    return cache_pesquisa.metricas()
+
+@router.post("/meta/mutacoes", response_model=Dict[str, Any])
+async def aplicar_mutacoes_meta(requisicao: MutacoesMetaSchema):
+    """
+    Altera status, orçamentos e lances de vários objetos do Meta ADS de uma vez,
+    com resultado por objeto.
+    """
+    from backend.trafego_ai.tools.meta_ads_async import MetaAdsAsyncAPI
+    
+    mutacoes = [m.dict(exclude_none=True) for m in requisicao.mutacoes]
+    try:
+        async with MetaAdsAsyncAPI() as api:
+            return await api.aplicar_mutacoes(mutacoes, reverter_em_falha=requisicao.reverter_em_falha)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
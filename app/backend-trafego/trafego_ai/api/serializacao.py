@@ -0,0 +1,55 @@
+"""
+Implementação da serialização JSON das respostas da API, com orjson quando disponível
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+# Opções do orjson equivalentes ao json.dumps usado no restante da API
+# (chaves não textuais aceitas, numpy serializado diretamente)
+_OPCOES_ORJSON = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def dumps_json(conteudo: Any) -> bytes:
+    """
+    Serializa um valor em JSON (UTF-8, sem espaços), usando orjson se instalado.
+
+    Valores não suportados (Ex: datetime no json padrão, objetos arbitrários) são convertidos com str.
+
+    Args:
+        conteudo (Any): Valor a serializar
+
+    Returns:
+        bytes: JSON codificado em UTF-8
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(conteudo, default=str, option=_OPCOES_ORJSON)
+        except TypeError:
+            # Inteiros acima de 64 bits e subclasses exóticas: recorre ao json padrão
+            pass
+    return json.dumps(conteudo, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class RespostaJSON(JSONResponse):
+    """
+    Resposta JSON padrão da API, serializada por dumps_json.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+class RespostaJSONPronta(JSONResponse):
+    """
+    Resposta cujo corpo já está serializado em JSON (Ex: histórico pré-serializado).
+    """
+
+    def render(self, content: bytes) -> bytes:
+        return content
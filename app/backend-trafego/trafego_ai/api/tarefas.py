@@ -0,0 +1,79 @@
+"""
+Implementação do registro das tarefas em segundo plano (respostas de mensagens e campanhas) consultáveis pela API
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from backend.trafego_ai.api.cache_http import etag_forte
+from backend.trafego_ai.api.serializacao import dumps_json
+from backend.trafego_ai.config.settings import TAREFAS_MAX
+
+
+class RegistroTarefas:
+    """
+    Guarda as respostas das tarefas em andamento e concluídas, para que o cliente
+    consulte o resultado pelo ID devolvido na criação.
+
+    Mantém no máximo max_tarefas; ao exceder, descarta primeiro as concluídas mais antigas.
+    """
+
+    def __init__(self, max_tarefas: int = TAREFAS_MAX):
+        """
+        Inicializa o registro.
+
+        Args:
+            max_tarefas (int, optional): Número máximo de tarefas mantidas. Default para TAREFAS_MAX.
+        """
+        self.max_tarefas = max_tarefas
+        self._tarefas: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _conteudo(resposta: Any) -> Dict[str, Any]:
+        return resposta.dict() if isinstance(resposta, BaseModel) else dict(resposta)
+
+    @staticmethod
+    def _concluida(resposta: Any) -> bool:
+        return bool(RegistroTarefas._conteudo(resposta).get("is_complete"))
+
+    def registrar(self, tarefa_id: str, resposta: Any):
+        """
+        Registra a resposta de uma tarefa, atualizada em seu processamento em segundo plano.
+
+        Args:
+            tarefa_id (str): ID devolvido ao cliente
+            resposta (Any): Dicionário ou modelo Pydantic com is_complete
+        """
+        with self._lock:
+            self._tarefas[tarefa_id] = resposta
+            excedentes = len(self._tarefas) - self.max_tarefas
+            if excedentes > 0:
+                descartar = [t for t, r in self._tarefas.items() if self._concluida(r)][:excedentes]
+                if len(descartar) < excedentes:
+                    descartar += [t for t in self._tarefas if t not in descartar][:excedentes - len(descartar)]
+                for antiga in descartar:
+                    del self._tarefas[antiga]
+
+    def json_com_etag(self, tarefa_id: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Retorna o estado atual de uma tarefa serializado em JSON e seu ETag.
+
+        Args:
+            tarefa_id (str): ID da tarefa
+
+        Returns:
+            Optional[Tuple[bytes, str]]: JSON e ETag forte, ou None se a tarefa não existir
+        """
+        with self._lock:
+            resposta = self._tarefas.get(tarefa_id)
+        if resposta is None:
+            return None
+        corpo = dumps_json(self._conteudo(resposta))
+        return corpo, etag_forte(corpo)
+
+
+# Tarefas das sessões deste worker
+registro_tarefas = RegistroTarefas()
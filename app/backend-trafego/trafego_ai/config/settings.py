@@ -2,6 +2,9 @@
 Configurações do sistema de IA para Gestão de Tráfego
 """
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -14,16 +17,118 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = "gpt-4o-mini"  # Modelo mais econômico conforme especificado
 OPENAI_TEMPERATURE = 0.2  # Valor menor para respostas mais determinísticas
 
+# Pesquisa na web
+WEB_SEARCH_MAX_CONCORRENCIA = int(os.getenv("WEB_SEARCH_MAX_CONCORRENCIA", 6))  # Pesquisas simultâneas em research_topic
+WEB_SEARCH_RESUMO_MAX_TOKENS = int(os.getenv("WEB_SEARCH_RESUMO_MAX_TOKENS", 6000))  # Teto de tokens de entrada por resumo em lote
+PESQUISA_CACHE_DB = os.getenv("PESQUISA_CACHE_DB", str(Path(__file__).parent.parent / "data" / "pesquisas.db"))
+PESQUISA_CACHE_TTL_FONTES = {  # Validade das pesquisas em cache por fonte, em segundos
+    "openai_web_search": 12 * 3600,
+    "openai_resumo": 12 * 3600,
+}
+PESQUISA_CACHE_TTL_PADRAO = 24 * 3600  # Validade das fontes sem valor próprio
+PESQUISA_CACHE_MAX_OBSOLETO = 7 * 24 * 3600  # Segundos após o vencimento em que a pesquisa ainda é servida (e renovada)
+
 # Meta ADS API
 META_APP_ID = os.getenv("META_APP_ID")
 META_APP_SECRET = os.getenv("META_APP_SECRET")
 META_ACCESS_TOKEN = os.getenv("META_ACCESS_TOKEN")
 META_ACCOUNT_ID = os.getenv("META_ACCOUNT_ID")
+META_GRAPH_URL = os.getenv("META_GRAPH_URL", "https://graph.facebook.com")  # Aponte para a Graph API simulada em testes
+META_GRAPH_API_VERSION = "v18.0"  # Mesma versão do facebook-business fixado em requirements.txt
+META_MAX_CONEXOES = int(os.getenv("META_MAX_CONEXOES", 100))  # Conexões simultâneas do cliente assíncrono
+META_TIMEOUT = 60  # Segundos por requisição à Graph API
+META_SESSAO_TTL = 3600  # Segundos até a sessão de uma conta ser recriada e revalidada
+META_SESSOES_MAX = int(os.getenv("META_SESSOES_MAX", 500))  # Sessões (conta e credencial) mantidas em RAM
+INSIGHTS_LIMITE_DIAS_SINCRONO = 14  # Períodos maiores (ou com breakdowns) usam relatórios assíncronos
+INSIGHTS_INTERVALO_POLLING = 2  # Segundos entre consultas ao status de um relatório assíncrono
+INSIGHTS_TIMEOUT_RELATORIO = 900  # Tempo máximo de espera por um relatório assíncrono
+META_TAXA_REQUISICOES = float(os.getenv("META_TAXA_REQUISICOES", 10))  # Requisições por segundo por conta com uso baixo
+META_RAJADA_REQUISICOES = 20  # Requisições que uma conta ociosa pode disparar de uma vez
+META_USO_LIMIAR_REDUCAO = 50  # Percentual de uso a partir do qual o ritmo é reduzido
+META_ESPERA_LIMITE_PADRAO = float(os.getenv("META_ESPERA_LIMITE_PADRAO", 60))  # Segundos de espera após limitação sem tempo de recuperação informado
+META_MAX_TENTATIVAS_LIMITE = 3  # Novas tentativas de uma chamada recusada por limitação de uso
+META_MUTACOES_MAX_CONCORRENCIA = 4  # Lotes de alterações em massa enviados simultaneamente
+IMAGENS_DB = os.getenv("IMAGENS_DB", str(Path(__file__).parent.parent / "data" / "imagens_meta.db"))
+IMAGENS_POR_REQUISICAO = 10  # Imagens enviadas por requisição multipart ao endpoint adimages
+VIDEOS_ESTADO_DIR = os.getenv("VIDEOS_ESTADO_DIR", str(Path(__file__).parent.parent / "data" / "uploads_video"))
+VIDEOS_MAX_CONCORRENCIA = 3  # Vídeos enviados simultaneamente (os trechos de um mesmo vídeo são sequenciais)
+VIDEO_MAX_TENTATIVAS_TRECHO = 5  # Reenvios de um trecho após erro transitório ou offset divergente
+VIDEO_INTERVALO_POLLING = 5  # Segundos entre consultas ao status de codificação de um vídeo
+VIDEO_TIMEOUT_CODIFICACAO = 1800  # Tempo máximo de espera pela codificação de um vídeo
+INTERESSES_CACHE_TTL = 86400  # Validade de uma busca de interesses em cache (24 horas)
+INTERESSES_CACHE_MAX_TERMOS = 5000  # Buscas de interesses mantidas em cache
+META_JANELA_ATRIBUICAO_DIAS = 7  # Dias em que as métricas de um dia ainda podem ser revisadas pelo Meta
+
+# Armazenamento local de métricas
+METRICAS_DIR = os.getenv("METRICAS_DIR", str(Path(__file__).parent.parent / "data" / "metricas"))
+METRICAS_DIAS_HISTORICO = int(os.getenv("METRICAS_DIAS_HISTORICO", 90))  # Dias mantidos localmente
+
+# Análise de desempenho dos anúncios
+ANALISE_JANELA_DIAS = 7  # Janela das médias móveis e das comparações de tendência
+ANALISE_LIMIAR_Z = 3.0  # Escore z a partir do qual um dia é considerado anômalo
+ANALISE_MIN_IMPRESSOES = 1000  # Impressões mínimas na janela para avaliar um anúncio
+ANALISE_MAX_ACHADOS = 20  # Achados enviados ao agente por análise
+FADIGA_FREQUENCIA = 3.0  # Frequência média a partir da qual o público está saturado
+FADIGA_QUEDA_CTR = 0.2  # Queda relativa do CTR em relação à janela anterior que indica fadiga
 
 # Configurações do servidor
 HOST = os.getenv("HOST", "localhost")
 PORT = int(os.getenv("PORT", 8000))
 DEBUG = os.getenv("DEBUG", "True").lower() in ("true", "1", "t")
+CORS_ORIGINS = "http://localhost:3000"  # Origens permitidas por padrão, separadas por vírgula
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Configurações do servidor, tipadas e lidas do ambiente no primeiro acesso a `settings`.
+    """
+    host: str
+    port: int
+    debug: bool
+    cors_origins: List[str]
+    log_level: str
+
+    @classmethod
+    def do_ambiente(cls) -> "Settings":
+        """
+        Monta as configurações a partir das variáveis de ambiente atuais.
+
+        Raises:
+            ValueError: Se PORT não for um número inteiro
+        """
+        porta = os.getenv("PORT", "8000")
+        if not porta.strip().isdigit():
+            raise ValueError(f"PORT inválida: {porta!r}")
+        origens = os.getenv("CORS_ORIGINS", CORS_ORIGINS)
+        return cls(
+            host=os.getenv("HOST", "localhost"),
+            port=int(porta),
+            debug=os.getenv("DEBUG", "True").lower() in ("true", "1", "t"),
+            cors_origins=[o.strip() for o in origens.split(",") if o.strip()],
+            log_level=os.getenv("LOG_LEVEL", LOG_LEVEL).upper()
+        )
+
+
+@lru_cache(maxsize=None)
+def obter_settings() -> Settings:
+    """
+    Retorna as configurações do servidor, carregadas uma única vez.
+    """
+    return Settings.do_ambiente()
+
+
+def __getattr__(nome: str):
+    # `settings` é carregado sob demanda (PEP 562), depois que o .env do run.py já foi lido
+    if nome == "settings":
+        return obter_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+# Compressão e cache HTTP das respostas
+COMPRESSAO_TAMANHO_MINIMO = int(os.getenv("COMPRESSAO_TAMANHO_MINIMO", 1024))  # Bytes a partir dos quais a resposta é comprimida
+COMPRESSAO_NIVEL_GZIP = 6  # De 1 (rápido) a 9 (menor)
+COMPRESSAO_NIVEL_BROTLI = 4  # De 0 a 11; níveis altos são lentos demais para respostas dinâmicas
+TAREFAS_MAX = int(os.getenv("TAREFAS_MAX", 1000))  # Tarefas (mensagens e campanhas) consultáveis em RAM
 
 # Configurações de upload
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
@@ -32,6 +137,20 @@ ALLOWED_EXTENSIONS = {
     "document": ["pdf", "doc", "docx", "xls", "xlsx", "txt"]
 }
 
+# Validação local de criativos de imagem (requisitos do Meta ADS)
+CRIATIVO_MAX_TAMANHO_ARQUIVO = 30 * 1024 * 1024  # 30MB
+CRIATIVO_MIN_LARGURA = 600
+CRIATIVO_MIN_ALTURA = 600
+CRIATIVO_PROPORCAO_MIN = 0.5625  # 9:16
+CRIATIVO_PROPORCAO_MAX = 1.91  # 1.91:1
+CRIATIVO_COBERTURA_TEXTO_AVISO = 0.2  # Acima disso a entrega tende a ser reduzida
+CRIATIVO_COBERTURA_TEXTO_MAX = 0.5  # Acima disso o aviso indica que o texto excede o recomendado (a estimativa não reprova)
+CRIATIVO_ANALISE_WORKERS = int(os.getenv("CRIATIVO_ANALISE_WORKERS", 2))
+
+# Análise de criativos em lote
+CRIATIVOS_LOTE_MAX_ITENS = 30  # Criativos aceitos por lote
+CRIATIVOS_LOTE_MAX_CONCORRENCIA = int(os.getenv("CRIATIVOS_LOTE_MAX_CONCORRENCIA", 5))
+
 # Briefing padrão
 DEFAULT_BRIEFING_QUESTIONS = [
     "Qual é o objetivo principal da sua campanha? (conscientização, tráfego, conversões, etc.)",
@@ -74,4 +193,28 @@ de veiculação e alocação eficiente de recursos."""
 
 # Log e cache
 LOG_LEVEL = "INFO"
-CACHE_TTL = 3600  # 1 hora em segundos 
\ No newline at end of file
+LOG_ARQUIVO = os.getenv("LOG_ARQUIVO", str(Path(__file__).parent.parent.parent / "trafego_ai.log"))  # Log em JSON; vazio desativa
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))  # Tamanho do arquivo de log antes da rotação
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", 5))  # Arquivos de log rotacionados mantidos
+LOG_FORMATO_CONSOLE = os.getenv("LOG_FORMATO_CONSOLE", "texto")  # "texto" ou "json"
+# Fração mantida das mensagens abaixo de WARNING por logger. Ex: "backend.trafego_ai.tools.web_search=0.1"
+LOG_AMOSTRAGEM = {
+    nome.strip(): float(fracao)
+    for nome, fracao in (item.split("=", 1) for item in os.getenv("LOG_AMOSTRAGEM", "").split(",") if "=" in item)
+}
+CACHE_TTL = 3600  # 1 hora em segundos
+
+# Memória dos agentes
+MEMORIA_MAX_TURNOS = int(os.getenv("MEMORIA_MAX_TURNOS", 20))  # Turnos mantidos na íntegra por sessão
+MEMORIA_TURNOS_RECENTES = 6  # Turnos preservados sem resumo após cada compactação
+MEMORIA_MAX_TOKENS = int(os.getenv("MEMORIA_MAX_TOKENS", 3000))  # Teto de tokens da memória no prompt
+MEMORIA_MAX_SESSOES = int(os.getenv("MEMORIA_MAX_SESSOES", 200))  # Sessões mantidas em RAM
+MEMORIA_DIR = os.getenv("MEMORIA_DIR", str(Path(__file__).parent.parent / "data" / "memoria")) 
+
+# Documentos enviados (índice de recuperação por sessão)
+DOCUMENTOS_PALAVRAS_TRECHO = int(os.getenv("DOCUMENTOS_PALAVRAS_TRECHO", 180))  # Palavras por trecho indexado
+DOCUMENTOS_SOBREPOSICAO_TRECHO = 30  # Palavras repetidas entre trechos vizinhos
+DOCUMENTOS_TRECHOS_RETORNADOS = int(os.getenv("DOCUMENTOS_TRECHOS_RETORNADOS", 4))  # Trechos entregues aos agentes por busca
+DOCUMENTOS_MAX_SESSOES = int(os.getenv("DOCUMENTOS_MAX_SESSOES", 200))  # Índices mantidos em RAM
+DOCUMENTOS_MAX_TAMANHO_EXTRAIDO = 50 * 1024 * 1024  # 50MB descompactados lidos de um .docx ou .xlsx
+DOCUMENTOS_DIR = os.getenv("DOCUMENTOS_DIR", str(Path(__file__).parent.parent / "data" / "documentos"))
@@ -14,7 +14,16 @@ from backend.trafego_ai.models.schemas import (
     WebSearchResponse,
     WebSearchResult,
     MetaAdsMetrics,
-    OptimizationSuggestion
+    OptimizationSuggestion,
+    BriefingSchema,
+    MessageSchema,
+    CriativoSchema,
+    AnaliseCriativosLoteSchema,
+    MutacaoMetaSchema,
+    MutacoesMetaSchema,
+    CampanhaSchema,
+    MensagemResponse,
+    CampanhaResponse
 )
 
 __all__ = [
@@ -29,5 +38,14 @@ __all__ = [
     "WebSearchResponse",
     "WebSearchResult",
     "MetaAdsMetrics",
-    "OptimizationSuggestion"
+    "OptimizationSuggestion",
+    "BriefingSchema",
+    "MessageSchema",
+    "CriativoSchema",
+    "AnaliseCriativosLoteSchema",
+    "MutacaoMetaSchema",
+    "MutacoesMetaSchema",
+    "CampanhaSchema",
+    "MensagemResponse",
+    "CampanhaResponse"
 ] 
\ No newline at end of file
@@ -1,11 +1,13 @@
 """
 Schemas Pydantic para o sistema de IA de Gestão de Tráfego
 """
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 from typing import List, Optional, Dict, Any, Literal, Union
 from datetime import datetime
 import uuid
 
+from backend.trafego_ai.config.settings import CRIATIVOS_LOTE_MAX_ITENS
+
 
 class Attachment(BaseModel):
     """Schema para representar anexos (imagens, documentos, etc.)"""
@@ -120,6 +122,19 @@ class MetaAdsMetrics(BaseModel):
     relevance_score: Optional[float] = None
     date: datetime = Field(default_factory=datetime.now)
 
+    @model_validator(mode="after")
+    def calcular_derivadas(self):
+        """Preenche as métricas derivadas ausentes a partir das métricas primárias"""
+        if self.ctr is None and self.impressions:
+            self.ctr = round(self.clicks / self.impressions * 100, 4)
+        if self.cpc is None and self.clicks:
+            self.cpc = round(self.spend / self.clicks, 4)
+        if self.cpm is None and self.impressions:
+            self.cpm = round(self.spend / self.impressions * 1000, 4)
+        if self.frequency is None and self.reach:
+            self.frequency = round(self.impressions / self.reach, 4)
+        return self
+
 
 class OptimizationSuggestion(BaseModel):
     """Schema para sugestões de otimização"""
@@ -178,6 +193,44 @@ class CriativoSchema(BaseModel):
     call_to_action: Optional[str] = Field(None, title="Call to Action", description="Chamada para ação do anúncio")
 
 
+class AnaliseCriativosLoteSchema(BaseModel):
+    """
+    Schema para a análise de vários criativos em lote.
+    """
+    session_id: str = Field(..., title="ID da Sessão", description="Identificador da sessão do usuário")
+    objetivo: str = Field(..., title="Objetivo", description="Objetivo da campanha dos criativos")
+    criativos: List[CriativoSchema] = Field(..., title="Criativos", min_length=1, max_length=CRIATIVOS_LOTE_MAX_ITENS,
+                                            description="Criativos a serem avaliados")
+    max_concorrencia: Optional[int] = Field(None, title="Concorrência Máxima", ge=1,
+                                            description="Número máximo de avaliações simultâneas")
+
+
+class MutacaoMetaSchema(BaseModel):
+    """
+    Schema para a alteração de um objeto do Meta ADS.
+    """
+    id: str = Field(..., title="ID", description="ID da campanha, conjunto de anúncios ou anúncio")
+    tipo: Optional[str] = Field(None, title="Tipo", description="Tipo do objeto (campanha, conjunto, anuncio)")
+    status: Optional[str] = Field(None, title="Status", description="Novo status (ACTIVE, PAUSED, ARCHIVED)")
+    orcamento_diario: Optional[float] = Field(None, title="Orçamento Diário", gt=0,
+                                              description="Novo orçamento diário na moeda da conta")
+    orcamento_lifetime: Optional[float] = Field(None, title="Orçamento Total", gt=0,
+                                                description="Novo orçamento total na moeda da conta")
+    lance: Optional[float] = Field(None, title="Lance", gt=0, description="Novo valor de lance na moeda da conta")
+    estrategia_lance: Optional[str] = Field(None, title="Estratégia de Lance",
+                                            description="Nova estratégia de lance (Ex: LOWEST_COST_WITH_BID_CAP)")
+
+
+class MutacoesMetaSchema(BaseModel):
+    """
+    Schema para alterações em massa no Meta ADS.
+    """
+    mutacoes: List[MutacaoMetaSchema] = Field(..., title="Alterações", min_length=1,
+                                              description="Alterações a aplicar")
+    reverter_em_falha: bool = Field(True, title="Reverter em Falha",
+                                    description="Desfaz as alterações aplicadas se alguma falhar")
+
+
 class CampanhaSchema(BaseModel):
     """
     Schema para uma campanha completa.
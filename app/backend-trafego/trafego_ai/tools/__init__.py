@@ -1,11 +1,24 @@
 """
 Pacote de ferramentas para o sistema de IA de Gestão de Tráfego
+
+As ferramentas são importadas sob demanda: importar um submódulo leve (Ex: cache_pesquisa)
+não carrega o SDK do Facebook nem o cliente da OpenAI.
 """
+from importlib import import_module
+
+_EXPORTACOES = {
+    "MetaAdsAPI": "backend.trafego_ai.tools.meta_ads_api",
+    "MetaAdsAsyncAPI": "backend.trafego_ai.tools.meta_ads_async",
+    "MetaGraphAPIError": "backend.trafego_ai.tools.meta_ads_async",
+    "OpenAIWebSearch": "backend.trafego_ai.tools.web_search"
+}
+
+__all__ = list(_EXPORTACOES)
 
-from backend.trafego_ai.tools.meta_ads_api import MetaAdsAPI
-from backend.trafego_ai.tools.web_search import OpenAIWebSearch
 
-__all__ = [
-    "MetaAdsAPI",
-    "OpenAIWebSearch"
-] 
\ No newline at end of file
+def __getattr__(nome: str):
+    if nome in _EXPORTACOES:
+        valor = getattr(import_module(_EXPORTACOES[nome]), nome)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -0,0 +1,397 @@
+"""
+Implementação do agendador de chamadas à Graph API por conta, guiado pelos headers de uso do Meta
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Mapping
+
+from backend.trafego_ai.config.settings import (
+    META_TAXA_REQUISICOES,
+    META_RAJADA_REQUISICOES,
+    META_USO_LIMIAR_REDUCAO,
+    META_ESPERA_LIMITE_PADRAO
+)
+
+logger = logging.getLogger(__name__)
+
+# Prioridades das chamadas (menor valor é atendido primeiro)
+PRIORIDADE_INTERATIVA = 0  # Ações do usuário, como implantar uma campanha
+PRIORIDADE_PADRAO = 1
+PRIORIDADE_SEGUNDO_PLANO = 2  # Sincronizações e relatórios
+
+# Códigos de erro da Graph API que indicam limitação de uso
+CODIGOS_LIMITE_USO = {4, 17, 32, 613} | set(range(80000, 80015))
+
+_prioridade_atual: contextvars.ContextVar = contextvars.ContextVar("prioridade_meta", default=PRIORIDADE_PADRAO)
+
+
+@contextmanager
+def prioridade(valor: int):
+    """
+    Define a prioridade das chamadas à Graph API feitas dentro do bloco.
+
+    A prioridade acompanha o contexto de execução (threads e tarefas asyncio criadas
+    a partir dele), sem precisar ser repassada a cada método.
+
+    Args:
+        valor (int): PRIORIDADE_INTERATIVA, PRIORIDADE_PADRAO ou PRIORIDADE_SEGUNDO_PLANO
+    """
+    token = _prioridade_atual.set(valor)
+    try:
+        yield
+    finally:
+        _prioridade_atual.reset(token)
+
+
+def prioridade_atual() -> int:
+    """
+    Retorna a prioridade definida para o contexto atual.
+    """
+    return _prioridade_atual.get()
+
+
+def _ler_json(valor: Optional[str]) -> Any:
+    if not valor:
+        return None
+    try:
+        return json.loads(valor)
+    except ValueError:
+        return None
+
+
+def interpretar_headers_uso(headers: Mapping[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Interpreta os headers de uso retornados pela Graph API.
+
+    Considera X-Business-Use-Case-Usage, X-Ad-Account-Usage e X-App-Usage.
+
+    Args:
+        headers (Mapping[str, str]): Headers da resposta
+
+    Returns:
+        Optional[Dict[str, Any]]: Maior percentual de uso, segundos até a recuperação do
+                                  acesso e os valores de cada header; None se não houver headers de uso
+    """
+    headers = {chave.lower(): valor for chave, valor in headers.items()}
+    uso_caso = _ler_json(headers.get("x-business-use-case-usage"))
+    uso_conta = _ler_json(headers.get("x-ad-account-usage"))
+    uso_app = _ler_json(headers.get("x-app-usage"))
+    if uso_caso is None and uso_conta is None and uso_app is None:
+        return None
+
+    percentuais = [0.0]
+    espera = 0.0
+
+    for entradas in (uso_caso or {}).values():
+        for entrada in entradas:
+            percentuais += [float(entrada.get(campo) or 0) for campo in ("call_count", "total_cputime", "total_time")]
+            espera = max(espera, float(entrada.get("estimated_time_to_regain_access") or 0) * 60)
+
+    if uso_conta:
+        percentuais.append(float(uso_conta.get("acc_id_util_pct") or 0))
+        if percentuais[-1] >= 100:
+            espera = max(espera, float(uso_conta.get("reset_time_duration") or 0))
+
+    if uso_app:
+        percentuais += [float(uso_app.get(campo) or 0) for campo in ("call_count", "total_cputime", "total_time")]
+
+    return {
+        "uso": max(percentuais),
+        "espera": espera,
+        "business_use_case": uso_caso,
+        "ad_account": uso_conta,
+        "app": uso_app
+    }
+
+
+class LimitadorConta:
+    """
+    Balde de tokens de uma conta, com fila de prioridade e ritmo ajustado pelo uso informado pelo Meta.
+    """
+
+    def __init__(self, taxa: float = META_TAXA_REQUISICOES, rajada: int = META_RAJADA_REQUISICOES):
+        """
+        Inicializa o limitador.
+
+        Args:
+            taxa (float, optional): Requisições por segundo com uso baixo
+            rajada (int, optional): Capacidade do balde
+        """
+        self.taxa_base = taxa
+        self.taxa = taxa
+        self.rajada = rajada
+        self.tokens = float(rajada)
+        self.atualizado = time.monotonic()
+        self.bloqueado_ate = 0.0
+        self.uso: Optional[Dict[str, Any]] = None
+        self.requisicoes = 0
+        self.limitacoes = 0
+        self._fila = []
+        self._sequencia = itertools.count()
+        self._condicao = threading.Condition()
+        # Esperas assíncronas: senha -> (event loop, evento que a acorda)
+        self._despertadores: Dict[tuple, tuple] = {}
+
+    def _repor(self, agora: float):
+        self.tokens = min(self.rajada, self.tokens + (agora - self.atualizado) * self.taxa)
+        self.atualizado = agora
+
+    def _espera(self, agora: float) -> float:
+        if agora < self.bloqueado_ate:
+            return self.bloqueado_ate - agora
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.taxa
+
+    def _consumir(self):
+        self.tokens -= 1
+        self.requisicoes += 1
+
+    def _notificar(self):
+        # Chamado com o lock adquirido: acorda as esperas síncronas e as assíncronas
+        self._condicao.notify_all()
+        for loop, evento in self._despertadores.values():
+            loop.call_soon_threadsafe(evento.set)
+
+    def _sair_da_fila(self, senha: tuple):
+        if senha in self._fila:
+            self._fila.remove(senha)
+            heapq.heapify(self._fila)
+        self._notificar()
+
+    def tentar_adquirir(self) -> bool:
+        """
+        Consome um token sem esperar, se não houver fila nem bloqueio.
+
+        Returns:
+            bool: True se o token foi obtido
+        """
+        with self._condicao:
+            agora = time.monotonic()
+            self._repor(agora)
+            if self._fila or self._espera(agora) > 0:
+                return False
+            self._consumir()
+            return True
+
+    def adquirir(self, prioridade_chamada: int = PRIORIDADE_PADRAO):
+        """
+        Aguarda a vez da chamada na fila de prioridade e consome um token.
+
+        Args:
+            prioridade_chamada (int, optional): Prioridade da chamada
+        """
+        with self._condicao:
+            senha = (prioridade_chamada, next(self._sequencia))
+            heapq.heappush(self._fila, senha)
+            try:
+                while True:
+                    agora = time.monotonic()
+                    self._repor(agora)
+                    if self._fila[0] == senha:
+                        espera = self._espera(agora)
+                        if espera <= 0:
+                            heapq.heappop(self._fila)
+                            self._consumir()
+                            return
+                        self._condicao.wait(espera)
+                    else:
+                        self._condicao.wait()
+            finally:
+                self._sair_da_fila(senha)
+
+    async def adquirir_async(self, prioridade_chamada: int = PRIORIDADE_PADRAO):
+        """
+        Aguarda a vez da chamada na fila de prioridade sem ocupar uma thread e consome um token.
+
+        A espera é feita no próprio event loop. Se a tarefa for cancelada, a senha sai da
+        fila e nenhum token é consumido em nome dela.
+
+        Args:
+            prioridade_chamada (int, optional): Prioridade da chamada
+        """
+        evento = asyncio.Event()
+        with self._condicao:
+            senha = (prioridade_chamada, next(self._sequencia))
+            heapq.heappush(self._fila, senha)
+            self._despertadores[senha] = (asyncio.get_running_loop(), evento)
+        try:
+            while True:
+                with self._condicao:
+                    agora = time.monotonic()
+                    self._repor(agora)
+                    espera = None
+                    if self._fila[0] == senha:
+                        espera = self._espera(agora)
+                        if espera <= 0:
+                            heapq.heappop(self._fila)
+                            self._consumir()
+                            return
+                    evento.clear()
+                try:
+                    await asyncio.wait_for(evento.wait(), espera)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._condicao:
+                del self._despertadores[senha]
+                self._sair_da_fila(senha)
+
+    def registrar_uso(self, headers: Mapping[str, str]):
+        """
+        Ajusta o ritmo da conta a partir dos headers de uso de uma resposta.
+
+        Abaixo de META_USO_LIMIAR_REDUCAO o ritmo é o nominal; acima dele é reduzido
+        proporcionalmente ao uso restante. Se o Meta informar um tempo de recuperação,
+        a conta fica bloqueada até lá.
+
+        Args:
+            headers (Mapping[str, str]): Headers da resposta
+        """
+        uso = interpretar_headers_uso(headers)
+        if uso is None:
+            return
+
+        with self._condicao:
+            self.uso = uso
+            if uso["uso"] <= META_USO_LIMIAR_REDUCAO:
+                self.taxa = self.taxa_base
+            else:
+                restante = max(0.0, 100 - uso["uso"]) / (100 - META_USO_LIMIAR_REDUCAO)
+                self.taxa = max(self.taxa_base * 0.05, self.taxa_base * restante)
+            if uso["espera"]:
+                self.bloqueado_ate = max(self.bloqueado_ate, time.monotonic() + uso["espera"])
+            self._notificar()
+
+    def registrar_limitacao(self, espera: Optional[float] = None) -> float:
+        """
+        Bloqueia a conta após um erro de limitação de uso.
+
+        Args:
+            espera (float, optional): Segundos de bloqueio. Default para o tempo informado
+                                      nos headers ou META_ESPERA_LIMITE_PADRAO
+
+        Returns:
+            float: Segundos até o fim do bloqueio
+        """
+        with self._condicao:
+            agora = time.monotonic()
+            self.limitacoes += 1
+            espera = espera or (self.uso or {}).get("espera") or META_ESPERA_LIMITE_PADRAO
+            self.bloqueado_ate = max(self.bloqueado_ate, agora + espera)
+            self.tokens = 0.0
+            self._notificar()
+            return self.bloqueado_ate - agora
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna o estado atual da conta.
+
+        Returns:
+            Dict[str, Any]: Uso informado pelo Meta, ritmo atual, fila, bloqueio e contadores
+        """
+        with self._condicao:
+            agora = time.monotonic()
+            self._repor(agora)
+            return {
+                "uso_percentual": (self.uso or {}).get("uso"),
+                "headers": {chave: (self.uso or {}).get(chave) for chave in ("business_use_case", "ad_account", "app")},
+                "taxa_atual": round(self.taxa, 3),
+                "tokens": round(self.tokens, 2),
+                "fila": len(self._fila),
+                "bloqueado_por": round(max(0.0, self.bloqueado_ate - agora), 1),
+                "requisicoes": self.requisicoes,
+                "limitacoes": self.limitacoes
+            }
+
+
+class AgendadorMeta:
+    """
+    Agendador das chamadas à Graph API, com um limitador independente por conta publicitária.
+    """
+
+    def __init__(self):
+        self._limitadores: Dict[str, LimitadorConta] = {}
+        self._lock = threading.Lock()
+
+    def limitador(self, account_id: Optional[str]) -> LimitadorConta:
+        """
+        Retorna o limitador da conta, criando-o se necessário.
+
+        Args:
+            account_id (str): ID da conta publicitária (com ou sem o prefixo act_)
+
+        Returns:
+            LimitadorConta: Limitador da conta
+        """
+        chave = str(account_id or "app").replace("act_", "")
+        with self._lock:
+            if chave not in self._limitadores:
+                self._limitadores[chave] = LimitadorConta()
+            return self._limitadores[chave]
+
+    def adquirir(self, account_id: Optional[str], prioridade_chamada: Optional[int] = None):
+        """
+        Aguarda a vez de uma chamada síncrona.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            prioridade_chamada (int, optional): Prioridade. Default para a prioridade do contexto
+        """
+        limitador = self.limitador(account_id)
+        if not limitador.tentar_adquirir():
+            limitador.adquirir(prioridade_atual() if prioridade_chamada is None else prioridade_chamada)
+
+    async def adquirir_async(self, account_id: Optional[str], prioridade_chamada: Optional[int] = None):
+        """
+        Aguarda a vez de uma chamada assíncrona sem bloquear o event loop.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            prioridade_chamada (int, optional): Prioridade. Default para a prioridade do contexto
+        """
+        limitador = self.limitador(account_id)
+        if not limitador.tentar_adquirir():
+            await limitador.adquirir_async(prioridade_atual() if prioridade_chamada is None else prioridade_chamada)
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna o estado de todas as contas.
+
+        Returns:
+            Dict[str, Any]: Métricas de uso por conta
+        """
+        with self._lock:
+            limitadores = dict(self._limitadores)
+        return {conta: limitador.metricas() for conta, limitador in limitadores.items()}
+
+
+def eh_limitacao_uso(codigo: Optional[int]) -> bool:
+    """
+    Indica se um código de erro da Graph API corresponde a limitação de uso.
+    """
+    return codigo in CODIGOS_LIMITE_USO
+
+
+def rebobinar_arquivos(files: Optional[Mapping[str, Any]]):
+    """
+    Volta ao início os arquivos de uma requisição multipart, para que ela possa ser repetida.
+
+    Args:
+        files (Mapping[str, Any], optional): Arquivos no formato do requests/httpx
+    """
+    for valor in (files or {}).values():
+        arquivo = valor[1] if isinstance(valor, tuple) else valor
+        if hasattr(arquivo, "seek"):
+            arquivo.seek(0)
+
+
+# Agendador compartilhado pelos clientes do Meta ADS do processo
+agendador_meta = AgendadorMeta()
@@ -0,0 +1,212 @@
+"""
+Implementação da análise local de criativos de imagem, executada antes da avaliação pelo LLM
+"""
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from PIL import Image, ImageFilter, UnidentifiedImageError
+
+from backend.trafego_ai.config.settings import (
+    ALLOWED_EXTENSIONS,
+    CRIATIVO_MAX_TAMANHO_ARQUIVO,
+    CRIATIVO_MIN_LARGURA,
+    CRIATIVO_MIN_ALTURA,
+    CRIATIVO_PROPORCAO_MIN,
+    CRIATIVO_PROPORCAO_MAX,
+    CRIATIVO_COBERTURA_TEXTO_AVISO,
+    CRIATIVO_COBERTURA_TEXTO_MAX,
+    CRIATIVO_ANALISE_WORKERS
+)
+
+logger = logging.getLogger(__name__)
+
+# Parâmetros da estimativa de área de texto
+_LADO_AMOSTRA = 256  # A análise de cor e texto é feita sobre uma miniatura
+_GRADE = 10  # A imagem é dividida em uma grade de 10x10 células
+_LIMIAR_BORDA = 64  # Intensidade mínima para considerar um pixel como borda
+_DENSIDADE_TEXTO = 0.12  # Fração de pixels de borda que caracteriza uma célula com texto
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _obter_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=CRIATIVO_ANALISE_WORKERS)
+    return _pool
+
+
+def eh_imagem(caminho: str) -> bool:
+    """
+    Indica se o arquivo tem uma extensão de imagem aceita.
+
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        bool: True se a extensão for de imagem
+    """
+    extensao = os.path.splitext(caminho)[1].lower().lstrip(".")
+    return extensao in ALLOWED_EXTENSIONS["image"]
+
+
+def _cores_dominantes(imagem: Image.Image, quantidade: int = 5) -> List[Dict[str, Any]]:
+    """
+    Calcula o histograma de cores dominantes por quantização da paleta.
+    """
+    quantizada = imagem.quantize(colors=quantidade)
+    paleta = quantizada.getpalette()
+    total = quantizada.width * quantizada.height
+    contagens = sorted(quantizada.getcolors(), reverse=True)
+
+    cores = []
+    for contagem, indice in contagens:
+        r, g, b = paleta[indice * 3:indice * 3 + 3]
+        cores.append({"cor": f"#{r:02x}{g:02x}{b:02x}", "percentual": round(contagem / total, 3)})
+    return cores
+
+
+def _cobertura_texto(imagem: Image.Image) -> float:
+    """
+    Estima a fração da imagem ocupada por texto.
+
+    Texto gera alta densidade de bordas finas e contrastantes. A imagem é dividida
+    em uma grade e conta-se a fração de células cuja densidade de bordas supera o limiar.
+    Texturas e fotos com muitos detalhes também têm bordas densas, então o valor é apenas
+    um indício: gera avisos para o LLM confirmar, nunca reprova o criativo.
+    """
+    bordas = imagem.convert("L").filter(ImageFilter.FIND_EDGES)
+    bordas = bordas.point(lambda p: 255 if p >= _LIMIAR_BORDA else 0)
+
+    largura, altura = bordas.size
+    celulas_texto = 0
+    for linha in range(_GRADE):
+        for coluna in range(_GRADE):
+            caixa = (
+                coluna * largura // _GRADE,
+                linha * altura // _GRADE,
+                (coluna + 1) * largura // _GRADE,
+                (linha + 1) * altura // _GRADE
+            )
+            celula = bordas.crop(caixa)
+            pixels = max(1, celula.width * celula.height)
+            densidade = celula.histogram()[255] / pixels
+            if densidade >= _DENSIDADE_TEXTO:
+                celulas_texto += 1
+
+    return round(celulas_texto / (_GRADE * _GRADE), 2)
+
+
+def analisar_imagem(caminho: str) -> Dict[str, Any]:
+    """
+    Analisa localmente um criativo de imagem e verifica os requisitos do Meta ADS.
+
+    Args:
+        caminho (str): Caminho do arquivo de imagem
+
+    Returns:
+        Dict[str, Any]: Fatos técnicos da imagem, falhas (bloqueantes) e avisos
+    """
+    falhas = []
+    avisos = []
+    fatos: Dict[str, Any] = {"arquivo": os.path.basename(caminho)}
+
+    try:
+        tamanho = os.path.getsize(caminho)
+        fatos["tamanho_bytes"] = tamanho
+        if tamanho > CRIATIVO_MAX_TAMANHO_ARQUIVO:
+            falhas.append(f"Arquivo com {tamanho / 1024 / 1024:.1f}MB excede o limite de "
+                          f"{CRIATIVO_MAX_TAMANHO_ARQUIVO / 1024 / 1024:.0f}MB")
+
+        with Image.open(caminho) as imagem:
+            largura, altura = imagem.size
+            fatos["formato"] = imagem.format
+            fatos["largura"] = largura
+            fatos["altura"] = altura
+            fatos["proporcao"] = round(largura / altura, 3)
+
+            if largura < CRIATIVO_MIN_LARGURA or altura < CRIATIVO_MIN_ALTURA:
+                falhas.append(f"Resolução {largura}x{altura} abaixo do mínimo de "
+                              f"{CRIATIVO_MIN_LARGURA}x{CRIATIVO_MIN_ALTURA}")
+            if not CRIATIVO_PROPORCAO_MIN <= fatos["proporcao"] <= CRIATIVO_PROPORCAO_MAX:
+                falhas.append(f"Proporção {fatos['proporcao']} fora do intervalo aceito "
+                              f"({CRIATIVO_PROPORCAO_MIN} a {CRIATIVO_PROPORCAO_MAX})")
+
+            # Cores e texto são estimados sobre uma miniatura para manter a análise rápida
+            imagem.draft("RGB", (_LADO_AMOSTRA, _LADO_AMOSTRA))
+            amostra = imagem.convert("RGB")
+            amostra.thumbnail((_LADO_AMOSTRA, _LADO_AMOSTRA))
+
+        fatos["cores_dominantes"] = _cores_dominantes(amostra)
+        fatos["cobertura_texto"] = _cobertura_texto(amostra)
+
+        # A estimativa não distingue texto de textura: vira aviso e a confirmação fica com o LLM
+        if fatos["cobertura_texto"] > CRIATIVO_COBERTURA_TEXTO_MAX:
+            avisos.append(f"Possível texto (ou textura) em cerca de {fatos['cobertura_texto']:.0%} da imagem; "
+                          f"se for texto, excede o recomendado de {CRIATIVO_COBERTURA_TEXTO_MAX:.0%}")
+        elif fatos["cobertura_texto"] > CRIATIVO_COBERTURA_TEXTO_AVISO:
+            avisos.append(f"Possível texto em cerca de {fatos['cobertura_texto']:.0%} da imagem; "
+                          f"acima de {CRIATIVO_COBERTURA_TEXTO_AVISO:.0%} a entrega tende a ser reduzida")
+
+    except Image.DecompressionBombError as e:
+        falhas.append(f"Resolução grande demais para ser processada: {e}")
+    except (UnidentifiedImageError, OSError) as e:
+        falhas.append(f"Não foi possível ler a imagem: {e}")
+
+    fatos["falhas"] = falhas
+    fatos["avisos"] = avisos
+    fatos["aprovado"] = not falhas
+    return fatos
+
+
+def analisar_imagens(caminhos: List[str]) -> List[Dict[str, Any]]:
+    """
+    Analisa várias imagens em paralelo no pool de processos.
+
+    Args:
+        caminhos (List[str]): Caminhos dos arquivos de imagem
+
+    Returns:
+        List[Dict[str, Any]]: Análises na mesma ordem dos caminhos
+    """
+    return list(_obter_pool().map(analisar_imagem, caminhos))
+
+
+async def analisar_imagem_async(caminho: str) -> Dict[str, Any]:
+    """
+    Analisa uma imagem no pool de processos sem bloquear o event loop.
+
+    Args:
+        caminho (str): Caminho do arquivo de imagem
+
+    Returns:
+        Dict[str, Any]: Fatos técnicos da imagem
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_obter_pool(), analisar_imagem, caminho)
+
+
+def fatos_compactos(analise: Dict[str, Any]) -> str:
+    """
+    Serializa os fatos técnicos de forma compacta para inclusão no prompt.
+
+    Args:
+        analise (Dict[str, Any]): Resultado de analisar_imagem
+
+    Returns:
+        str: JSON compacto com os fatos relevantes para a avaliação
+    """
+    compacto = {
+        "dim": f"{analise.get('largura')}x{analise.get('altura')}",
+        "prop": analise.get("proporcao"),
+        "kb": round(analise.get("tamanho_bytes", 0) / 1024),
+        "cores": [f"{c['cor']}:{c['percentual']}" for c in analise.get("cores_dominantes", [])],
+        "texto": analise.get("cobertura_texto")
+    }
+    if analise.get("avisos"):
+        compacto["avisos"] = analise["avisos"]
+    return json.dumps(compacto, ensure_ascii=False, separators=(",", ":"))
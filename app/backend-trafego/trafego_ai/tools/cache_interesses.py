@@ -0,0 +1,257 @@
+"""
+Implementação do cache de buscas de interesses do Meta ADS com índice de prefixos
+"""
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from backend.trafego_ai.config.settings import (
+    INTERESSES_CACHE_TTL,
+    INTERESSES_CACHE_MAX_TERMOS
+)
+
+logger = logging.getLogger(__name__)
+
+
+def normalizar_termo(termo: str) -> str:
+    """
+    Normaliza um termo de busca: minúsculas, sem acentos e com espaços simples.
+
+    Args:
+        termo (str): Termo original
+
+    Returns:
+        str: Termo normalizado
+    """
+    sem_acentos = unicodedata.normalize("NFKD", termo).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sem_acentos.lower().split())
+
+
+class _NoTrie:
+    __slots__ = ("filhos", "ids")
+
+    def __init__(self):
+        self.filhos: Dict[str, "_NoTrie"] = {}
+        self.ids: set = set()
+
+
+class CacheInteresses:
+    """
+    Cache TTL/LRU de buscas de interesses com um índice de prefixos (trie).
+
+    Cada busca feita na Graph API é guardada pelo termo normalizado. Os interesses
+    retornados também são indexados pelo nome, de modo que o autocompletar é respondido
+    localmente. Um interesse fica no índice enquanto alguma busca em cache o contiver:
+    ao expirar ou sair do LRU, a busca libera seus interesses e os nós da trie sem uso.
+    """
+
+    def __init__(self, ttl: int = INTERESSES_CACHE_TTL, max_termos: int = INTERESSES_CACHE_MAX_TERMOS):
+        """
+        Inicializa o cache.
+
+        Args:
+            ttl (int, optional): Validade de uma busca em segundos
+            max_termos (int, optional): Número máximo de buscas mantidas
+        """
+        self.ttl = ttl
+        self.max_termos = max_termos
+        self._buscas: "OrderedDict[str, Tuple[float, int, List[Dict[str, Any]]]]" = OrderedDict()
+        self._interesses: Dict[str, Dict[str, Any]] = {}
+        self._referencias: Dict[str, int] = {}  # Buscas em cache que contêm cada interesse
+        self._raiz = _NoTrie()
+        self._ultima_limpeza = time.monotonic()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def _chaves_indice(interesse: Dict[str, Any]) -> set:
+        # O nome completo e o trecho a partir de cada palavra, para autocompletar a partir de qualquer palavra
+        nome = normalizar_termo(interesse.get("name", ""))
+        palavras = nome.split()
+        return {nome} | {" ".join(palavras[i:]) for i in range(1, len(palavras))}
+
+    def _indexar(self, interesse: Dict[str, Any]):
+        interesse_id = str(interesse.get("id"))
+        anterior = self._interesses.get(interesse_id)
+        if anterior is not None and anterior.get("name") != interesse.get("name"):
+            self._remover_do_indice(interesse_id, anterior)
+        self._interesses[interesse_id] = interesse
+        self._referencias[interesse_id] = self._referencias.get(interesse_id, 0) + 1
+
+        for chave in self._chaves_indice(interesse):
+            no = self._raiz
+            for caractere in chave:
+                no = no.filhos.setdefault(caractere, _NoTrie())
+                no.ids.add(interesse_id)
+
+    def _remover_do_indice(self, interesse_id: str, interesse: Dict[str, Any]):
+        for chave in self._chaves_indice(interesse):
+            no = self._raiz
+            for caractere in chave:
+                filho = no.filhos.get(caractere)
+                if filho is None:
+                    break
+                filho.ids.discard(interesse_id)
+                # Um nó sem IDs não tem descendentes com IDs: a subárvore inteira sai
+                if not filho.ids:
+                    del no.filhos[caractere]
+                    break
+                no = filho
+
+    def _liberar(self, resultados: List[Dict[str, Any]]):
+        """
+        Libera os interesses de uma busca removida do cache, tirando do índice os que ficaram sem busca.
+        """
+        for interesse in resultados:
+            interesse_id = str(interesse.get("id"))
+            restantes = self._referencias.get(interesse_id, 0) - 1
+            if restantes > 0:
+                self._referencias[interesse_id] = restantes
+                continue
+            self._referencias.pop(interesse_id, None)
+            removido = self._interesses.pop(interesse_id, None)
+            if removido is not None:
+                self._remover_do_indice(interesse_id, removido)
+
+    def _expirar(self):
+        # Varre as buscas vencidas no máximo a cada décimo do TTL (o LRU não ordena por instante)
+        agora = time.monotonic()
+        if agora - self._ultima_limpeza < self.ttl / 10:
+            return
+        self._ultima_limpeza = agora
+        for chave in [c for c, (instante, _, _) in self._buscas.items() if agora - instante > self.ttl]:
+            self._liberar(self._buscas.pop(chave)[2])
+
+    def obter(self, termo: str, limite: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Retorna os resultados de uma busca já feita, se ainda válidos.
+
+        Uma busca anterior com limite maior ou igual atende a um limite menor; uma
+        busca que retornou menos resultados que o limite pedido é completa para qualquer limite.
+
+        Args:
+            termo (str): Termo de busca
+            limite (int): Número máximo de resultados
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Interesses encontrados ou None se não houver no cache
+        """
+        chave = normalizar_termo(termo)
+        with self._lock:
+            entrada = self._buscas.get(chave)
+            if entrada:
+                instante, limite_buscado, resultados = entrada
+                if time.monotonic() - instante > self.ttl:
+                    del self._buscas[chave]
+                    self._liberar(resultados)
+                elif limite <= limite_buscado or len(resultados) < limite_buscado:
+                    self._buscas.move_to_end(chave)
+                    self.acertos += 1
+                    return resultados[:limite]
+            self.falhas += 1
+            return None
+
+    def guardar(self, termo: str, limite: int, resultados: List[Dict[str, Any]]):
+        """
+        Guarda os resultados de uma busca e indexa os interesses retornados.
+
+        Args:
+            termo (str): Termo de busca
+            limite (int): Limite usado na busca
+            resultados (List[Dict[str, Any]]): Interesses retornados pela Graph API
+        """
+        chave = normalizar_termo(termo)
+        with self._lock:
+            self._expirar()
+            anterior = self._buscas.pop(chave, None)
+            self._buscas[chave] = (time.monotonic(), limite, resultados)
+            for interesse in resultados:
+                self._indexar(interesse)
+            # A busca substituída é liberada depois de indexar a nova, para não reindexar os interesses em comum
+            if anterior is not None:
+                self._liberar(anterior[2])
+            while len(self._buscas) > self.max_termos:
+                removida, (_, _, resultados_removidos) = self._buscas.popitem(last=False)
+                self._liberar(resultados_removidos)
+                logger.debug(f"Busca de interesses '{removida}' removida do cache")
+
+    def separar(self, termos: List[str], limite: int) -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+        """
+        Separa os termos de uma busca em lote entre os já respondidos pelo cache e os pendentes.
+
+        A normalização serve apenas de chave do cache: os pendentes são devolvidos como
+        digitados, para que a Graph API receba o mesmo termo que na busca individual.
+
+        Args:
+            termos (List[str]): Termos de busca (repetições, mesmo com grafias diferentes,
+                                são consultadas uma única vez)
+            limite (int): Número máximo de resultados por termo
+
+        Returns:
+            tuple: Resultados em cache por termo normalizado e termos originais pendentes
+                   (a primeira grafia de cada termo normalizado)
+        """
+        encontrados = {}
+        pendentes = []
+        vistos = set()
+        for termo in termos:
+            chave = normalizar_termo(termo)
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+            resultados = self.obter(termo, limite)
+            if resultados is None:
+                pendentes.append(termo)
+            else:
+                encontrados[chave] = resultados
+        return encontrados, pendentes
+
+    def autocompletar(self, prefixo: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """
+        Sugere interesses já vistos cujo nome (ou uma de suas palavras) começa com o prefixo.
+
+        Args:
+            prefixo (str): Prefixo digitado
+            limite (int, optional): Número máximo de sugestões. Default para 10
+
+        Returns:
+            List[Dict[str, Any]]: Interesses ordenados por tamanho de audiência
+        """
+        with self._lock:
+            self._expirar()
+            no = self._raiz
+            for caractere in normalizar_termo(prefixo):
+                no = no.filhos.get(caractere)
+                if no is None:
+                    return []
+            interesses = [self._interesses[i] for i in no.ids]
+
+        interesses.sort(key=lambda i: i.get("audience_size_upper_bound") or i.get("audience_size") or 0,
+                        reverse=True)
+        return interesses[:limite]
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas de uso do cache.
+
+        Returns:
+            Dict[str, Any]: Buscas e interesses armazenados, acertos, falhas e taxa de acerto
+        """
+        total = self.acertos + self.falhas
+        with self._lock:
+            buscas, interesses = len(self._buscas), len(self._interesses)
+        return {
+            "buscas": buscas,
+            "interesses": interesses,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / total, 3) if total else 0.0
+        }
+
+
+# Cache compartilhado pelos clientes do Meta ADS do processo
+cache_interesses = CacheInteresses()
@@ -0,0 +1,254 @@
+"""
+Implementação do cache persistente de pesquisas na web, compartilhado entre workers por um banco SQLite local
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from backend.trafego_ai.config.settings import (
+    PESQUISA_CACHE_DB,
+    PESQUISA_CACHE_TTL_FONTES,
+    PESQUISA_CACHE_TTL_PADRAO,
+    PESQUISA_CACHE_MAX_OBSOLETO
+)
+from backend.trafego_ai.tools.cache_interesses import normalizar_termo
+
+logger = logging.getLogger(__name__)
+
+# Palavras ignoradas na chave da consulta (já sem acentos, como após normalizar_termo).
+# Palavras interrogativas e as que mudam o sentido são mantidas: "o que é X" e "X",
+# ou "anúncios com vídeo" e "anúncios sem vídeo", são pesquisas diferentes
+PALAVRAS_VAZIAS = frozenset("""
+a o as os um uma uns umas de do da dos das no na nos nas em por
+e ao aos pelo pela pelos pelas se sao ser
+the an of in on to and by at from is are
+""".split())
+
+# Tempo máximo de uma renovação em segundo plano antes que outro worker possa assumi-la
+_PRAZO_RENOVACAO = 120
+
+# Gravações entre duas limpezas das entradas vencidas
+_GRAVACOES_POR_LIMPEZA = 200
+
+
+def normalizar_consulta(consulta: str) -> str:
+    """
+    Normaliza uma consulta para uso como chave do cache: minúsculas, sem acentos,
+    sem pontuação e sem palavras vazias.
+
+    Args:
+        consulta (str): Consulta original
+
+    Returns:
+        str: Consulta normalizada (a consulta sem palavras vazias se todas forem vazias)
+    """
+    termo = normalizar_termo("".join(c if c.isalnum() else " " for c in consulta))
+    palavras = [p for p in termo.split() if p not in PALAVRAS_VAZIAS]
+    return " ".join(palavras) or termo
+
+
+class CachePesquisa:
+    """
+    Cache de pesquisas com validade por fonte, persistido em SQLite.
+
+    Entradas vencidas continuam sendo servidas por até PESQUISA_CACHE_MAX_OBSOLETO
+    segundos enquanto uma renovação roda em segundo plano. Como o banco é compartilhado,
+    uma pesquisa feita por um worker atende aos demais, e apenas um deles renova cada entrada.
+    """
+
+    def __init__(self, caminho_db: str = PESQUISA_CACHE_DB, ttl_fontes: Optional[Dict[str, int]] = None,
+                 ttl_padrao: int = PESQUISA_CACHE_TTL_PADRAO, max_obsoleto: int = PESQUISA_CACHE_MAX_OBSOLETO):
+        """
+        Inicializa o cache, criando o banco se necessário.
+
+        Args:
+            caminho_db (str, optional): Caminho do arquivo SQLite. Default para PESQUISA_CACHE_DB.
+            ttl_fontes (Dict[str, int], optional): Validade em segundos por fonte. Default para PESQUISA_CACHE_TTL_FONTES.
+            ttl_padrao (int, optional): Validade das fontes sem valor próprio
+            max_obsoleto (int, optional): Segundos após o vencimento em que a entrada ainda é servida
+        """
+        os.makedirs(os.path.dirname(caminho_db) or ".", exist_ok=True)
+        self.ttl_fontes = dict(PESQUISA_CACHE_TTL_FONTES if ttl_fontes is None else ttl_fontes)
+        self.ttl_padrao = ttl_padrao
+        self.max_obsoleto = max_obsoleto
+        self._lock = threading.Lock()
+        self._renovando: set = set()
+        self._gravacoes = 0
+        self.acertos = 0
+        self.obsoletos = 0
+        self.falhas = 0
+        self.renovacoes = 0
+
+        self._conexao = sqlite3.connect(caminho_db, check_same_thread=False, timeout=10)
+        with self._lock, self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS pesquisas ("
+                "fonte TEXT NOT NULL, chave TEXT NOT NULL, consulta TEXT NOT NULL, valor TEXT NOT NULL, "
+                "criado_em REAL NOT NULL, renovando_ate REAL, PRIMARY KEY (fonte, chave))"
+            )
+
+    def ttl(self, fonte: str) -> int:
+        """
+        Retorna a validade em segundos das pesquisas de uma fonte.
+        """
+        return self.ttl_fontes.get(fonte, self.ttl_padrao)
+
+    @staticmethod
+    def chave(consulta: str, variante: str = "") -> str:
+        """
+        Monta a chave de uma consulta; a variante distingue parâmetros como o número de resultados.
+        """
+        return f"{normalizar_consulta(consulta)}|{variante}"
+
+    def obter(self, fonte: str, consulta: str, variante: str = "") -> Optional[Tuple[Any, bool]]:
+        """
+        Busca uma pesquisa no cache.
+
+        Args:
+            fonte (str): Fonte da pesquisa (Ex: openai_web_search)
+            consulta (str): Consulta original
+            variante (str, optional): Parâmetros que alteram o resultado
+
+        Returns:
+            Optional[Tuple[Any, bool]]: Valor e se ainda está na validade, ou None se ausente ou vencido há muito
+        """
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT valor, criado_em FROM pesquisas WHERE fonte = ? AND chave = ?",
+                (fonte, self.chave(consulta, variante))
+            ).fetchone()
+        if linha is None:
+            return None
+        idade = time.time() - linha[1]
+        if idade > self.ttl(fonte) + self.max_obsoleto:
+            return None
+        return json.loads(linha[0]), idade <= self.ttl(fonte)
+
+    def guardar(self, fonte: str, consulta: str, valor: Any, variante: str = ""):
+        """
+        Guarda o resultado de uma pesquisa.
+
+        Args:
+            fonte (str): Fonte da pesquisa
+            consulta (str): Consulta original
+            valor (Any): Resultado serializável em JSON
+            variante (str, optional): Parâmetros que alteram o resultado
+        """
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO pesquisas (fonte, chave, consulta, valor, criado_em, renovando_ate) "
+                "VALUES (?, ?, ?, ?, ?, NULL)",
+                (fonte, self.chave(consulta, variante), consulta, json.dumps(valor, ensure_ascii=False, default=str), time.time())
+            )
+            self._gravacoes += 1
+            if self._gravacoes % _GRAVACOES_POR_LIMPEZA == 0:
+                self._limpar()
+
+    def _limpar(self):
+        # Remove entradas vencidas há mais tempo do que podem ser servidas
+        agora = time.time()
+        removidas = 0
+        for fonte in {f for (f,) in self._conexao.execute("SELECT DISTINCT fonte FROM pesquisas")}:
+            removidas += self._conexao.execute(
+                "DELETE FROM pesquisas WHERE fonte = ? AND criado_em < ?",
+                (fonte, agora - self.ttl(fonte) - self.max_obsoleto)
+            ).rowcount
+        if removidas:
+            logger.debug(f"{removidas} pesquisas vencidas removidas do cache")
+
+    def _reservar_renovacao(self, fonte: str, chave: str) -> bool:
+        # Apenas um worker (e uma thread) renova cada entrada; a reserva expira se ele falhar
+        agora = time.time()
+        with self._lock, self._conexao:
+            if (fonte, chave) in self._renovando:
+                return False
+            reservada = self._conexao.execute(
+                "UPDATE pesquisas SET renovando_ate = ? WHERE fonte = ? AND chave = ? "
+                "AND (renovando_ate IS NULL OR renovando_ate < ?)",
+                (agora + _PRAZO_RENOVACAO, fonte, chave, agora)
+            ).rowcount == 1
+            if reservada:
+                self._renovando.add((fonte, chave))
+            return reservada
+
+    def _renovar(self, fonte: str, consulta: str, variante: str, buscar: Callable[[], Any],
+                 cachear: Callable[[Any], bool]):
+        chave = self.chave(consulta, variante)
+        try:
+            valor = buscar()
+            if cachear(valor):
+                self.guardar(fonte, consulta, valor, variante)
+                self.renovacoes += 1
+        except Exception as e:
+            logger.error(f"Erro ao renovar a pesquisa '{consulta}' em cache: {e}")
+        finally:
+            with self._lock:
+                self._renovando.discard((fonte, chave))
+
+    def obter_ou_buscar(self, fonte: str, consulta: str, buscar: Callable[[], Any], variante: str = "",
+                        cachear: Callable[[Any], bool] = bool) -> Any:
+        """
+        Retorna a pesquisa do cache ou a executa.
+
+        Uma entrada válida é retornada diretamente. Uma entrada vencida é retornada e
+        renovada em segundo plano. Sem entrada, a pesquisa é executada e guardada.
+
+        Args:
+            fonte (str): Fonte da pesquisa
+            consulta (str): Consulta original
+            buscar (Callable[[], Any]): Executa a pesquisa no provedor
+            variante (str, optional): Parâmetros que alteram o resultado
+            cachear (Callable[[Any], bool], optional): Indica se um resultado deve ser guardado.
+                                                      Default: apenas resultados não vazios
+
+        Returns:
+            Any: Resultado da pesquisa
+        """
+        encontrado = self.obter(fonte, consulta, variante)
+        if encontrado is not None:
+            valor, valido = encontrado
+            if valido:
+                self.acertos += 1
+                return valor
+
+            self.obsoletos += 1
+            if self._reservar_renovacao(fonte, self.chave(consulta, variante)):
+                logger.info(f"Renovando em segundo plano a pesquisa '{consulta}' ({fonte})")
+                threading.Thread(target=self._renovar, args=(fonte, consulta, variante, buscar, cachear),
+                                 daemon=True).start()
+            return valor
+
+        self.falhas += 1
+        valor = buscar()
+        if cachear(valor):
+            self.guardar(fonte, consulta, valor, variante)
+        return valor
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas de uso do cache.
+
+        Returns:
+            Dict[str, Any]: Entradas por fonte, acertos, entradas obsoletas servidas, falhas,
+                            renovações e taxa de acerto
+        """
+        with self._lock:
+            entradas = dict(self._conexao.execute("SELECT fonte, COUNT(*) FROM pesquisas GROUP BY fonte").fetchall())
+        total = self.acertos + self.obsoletos + self.falhas
+        return {
+            "entradas": entradas,
+            "acertos": self.acertos,
+            "obsoletos": self.obsoletos,
+            "falhas": self.falhas,
+            "renovacoes": self.renovacoes,
+            "taxa_acerto": round((self.acertos + self.obsoletos) / total, 3) if total else 0.0
+        }
+
+
+# Cache compartilhado pelas ferramentas de pesquisa do processo (e, pelo banco, entre workers)
+cache_pesquisa = CachePesquisa()
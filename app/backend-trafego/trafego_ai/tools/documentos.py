@@ -0,0 +1,444 @@
+"""
+Implementação da extração de texto dos documentos enviados e do índice BM25 por sessão para recuperação de trechos
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import zipfile
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+from xml.etree import ElementTree
+
+from backend.trafego_ai.config.settings import (
+    DOCUMENTOS_DIR,
+    DOCUMENTOS_MAX_SESSOES,
+    DOCUMENTOS_MAX_TAMANHO_EXTRAIDO,
+    DOCUMENTOS_PALAVRAS_TRECHO,
+    DOCUMENTOS_SOBREPOSICAO_TRECHO,
+    DOCUMENTOS_TRECHOS_RETORNADOS
+)
+from backend.trafego_ai.tools.cache_interesses import normalizar_termo
+from backend.trafego_ai.tools.cache_pesquisa import PALAVRAS_VAZIAS
+
+logger = logging.getLogger(__name__)
+
+# Parâmetros usuais do BM25
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+
+_PADRAO_PALAVRA = re.compile(r"\w+")
+
+# Na pontuação dos trechos, as preposições que distinguem consultas no cache de pesquisas não pesam
+_PALAVRAS_IGNORADAS = PALAVRAS_VAZIAS | {"para", "pra", "com", "sem", "sobre", "ou", "for", "with", "about", "or"}
+
+
+class FormatoNaoSuportado(Exception):
+    """
+    Documento cujo formato não permite extrair o texto.
+    """
+
+
+def _texto_xml(conteudo: bytes, tag_texto: str, tag_bloco: str) -> str:
+    # Junta o texto dos elementos tag_texto, quebrando a linha a cada tag_bloco (parágrafo, linha da planilha)
+    blocos = []
+    for bloco in ElementTree.fromstring(conteudo).iter(tag_bloco):
+        texto = "".join(elemento.text or "" for elemento in bloco.iter(tag_texto))
+        if texto.strip():
+            blocos.append(texto)
+    return "\n".join(blocos)
+
+
+def _verificar_tamanho(arquivo: zipfile.ZipFile, nomes: List[str]):
+    # O zipfile não lê além do tamanho declarado de cada membro; conferi-lo antes barra zip bombs
+    total = sum(arquivo.getinfo(nome).file_size for nome in nomes)
+    if total > DOCUMENTOS_MAX_TAMANHO_EXTRAIDO:
+        raise FormatoNaoSuportado(
+            f"Documento grande demais para ser indexado: {total / 1024 / 1024:.0f}MB descompactados "
+            f"(máximo de {DOCUMENTOS_MAX_TAMANHO_EXTRAIDO / 1024 / 1024:.0f}MB)"
+        )
+
+
+def _extrair_docx(caminho: str) -> str:
+    w = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    with zipfile.ZipFile(caminho) as arquivo:
+        _verificar_tamanho(arquivo, ["word/document.xml"])
+        return _texto_xml(arquivo.read("word/document.xml"), f"{w}t", f"{w}p")
+
+
+def _extrair_xlsx(caminho: str) -> str:
+    s = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    with zipfile.ZipFile(caminho) as arquivo:
+        nomes = arquivo.namelist()
+        planilhas = sorted(n for n in nomes if n.startswith("xl/worksheets/sheet") and n.endswith(".xml"))
+        _verificar_tamanho(arquivo, planilhas + [n for n in nomes if n == "xl/sharedStrings.xml"])
+
+        compartilhadas = []
+        if "xl/sharedStrings.xml" in nomes:
+            raiz = ElementTree.fromstring(arquivo.read("xl/sharedStrings.xml"))
+            compartilhadas = ["".join(t.text or "" for t in item.iter(f"{s}t")) for item in raiz.iter(f"{s}si")]
+
+        linhas = []
+        for nome in planilhas:
+            for linha in ElementTree.fromstring(arquivo.read(nome)).iter(f"{s}row"):
+                celulas = []
+                for celula in linha.iter(f"{s}c"):
+                    valor = celula.find(f"{s}v")
+                    if celula.get("t") == "s" and valor is not None:
+                        celulas.append(compartilhadas[int(valor.text)])
+                    elif celula.get("t") == "inlineStr":
+                        celulas.append("".join(t.text or "" for t in celula.iter(f"{s}t")))
+                    elif valor is not None and valor.text:
+                        celulas.append(valor.text)
+                if celulas:
+                    linhas.append(" | ".join(celulas))
+        return "\n".join(linhas)
+
+
+def _extrair_pdf(caminho: str) -> str:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise FormatoNaoSuportado("Instale o pacote pypdf para extrair o texto de arquivos PDF")
+    return "\n".join(pagina.extract_text() or "" for pagina in PdfReader(caminho).pages)
+
+
+def _extrair_xls(caminho: str) -> str:
+    try:
+        import pandas as pd
+        planilhas = pd.read_excel(caminho, sheet_name=None, header=None)
+    except ImportError:
+        raise FormatoNaoSuportado("Instale os pacotes pandas e xlrd para extrair o texto de arquivos .xls")
+    return "\n".join(
+        " | ".join(str(v) for v in linha if str(v) != "nan")
+        for planilha in planilhas.values() for linha in planilha.itertuples(index=False)
+    )
+
+
+def _extrair_txt(caminho: str) -> str:
+    with open(caminho, "rb") as arquivo:
+        conteudo = arquivo.read()
+    try:
+        return conteudo.decode("utf-8")
+    except UnicodeDecodeError:
+        return conteudo.decode("latin-1")
+
+
+_EXTRATORES = {
+    ".txt": _extrair_txt,
+    ".docx": _extrair_docx,
+    ".xlsx": _extrair_xlsx,
+    ".pdf": _extrair_pdf,
+    ".xls": _extrair_xls,
+}
+
+
+def eh_documento(nome_arquivo: str) -> bool:
+    """
+    Indica se o arquivo é um documento cujo texto pode ser indexado.
+    """
+    return os.path.splitext(nome_arquivo)[1].lower() in _EXTRATORES or nome_arquivo.lower().endswith(".doc")
+
+
+def extrair_texto(caminho: str) -> str:
+    """
+    Extrai o texto de um documento (txt, docx, xlsx, pdf ou xls).
+
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        str: Texto do documento
+
+    Raises:
+        FormatoNaoSuportado: Se o formato não permitir a extração (Ex: .doc)
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    extrator = _EXTRATORES.get(extensao)
+    if extrator is None:
+        raise FormatoNaoSuportado(f"Não é possível extrair o texto de arquivos {extensao}; envie .docx ou .pdf")
+    return extrator(caminho)
+
+
+def tokenizar(texto: str) -> List[str]:
+    """
+    Separa um texto em termos normalizados (sem acentos, minúsculos e sem palavras vazias).
+    """
+    return [p for p in _PADRAO_PALAVRA.findall(normalizar_termo(texto)) if p not in _PALAVRAS_IGNORADAS]
+
+
+def dividir_em_trechos(texto: str, palavras_por_trecho: int = DOCUMENTOS_PALAVRAS_TRECHO,
+                       sobreposicao: int = DOCUMENTOS_SOBREPOSICAO_TRECHO) -> List[str]:
+    """
+    Divide um texto em trechos de tamanho fixo (em palavras), com sobreposição entre trechos vizinhos.
+
+    Args:
+        texto (str): Texto completo
+        palavras_por_trecho (int, optional): Palavras por trecho
+        sobreposicao (int, optional): Palavras repetidas no início do trecho seguinte
+
+    Returns:
+        List[str]: Trechos do texto
+    """
+    palavras = texto.split()
+    passo = max(1, palavras_por_trecho - sobreposicao)
+    return [
+        " ".join(palavras[inicio:inicio + palavras_por_trecho])
+        for inicio in range(0, max(1, len(palavras) - sobreposicao), passo)
+        if palavras[inicio:inicio + palavras_por_trecho]
+    ]
+
+
+class IndiceDocumentosSessao:
+    """
+    Índice BM25 dos trechos dos documentos enviados em uma sessão.
+
+    Os agentes recebem apenas os trechos mais relevantes para a consulta, em vez dos
+    documentos inteiros.
+    """
+
+    def __init__(self, session_id: str):
+        """
+        Inicializa um índice vazio.
+
+        Args:
+            session_id (str): Identificador da sessão
+        """
+        self.session_id = session_id
+        self.documentos: Dict[str, Dict[str, Any]] = {}
+        self.trechos: List[Dict[str, Any]] = []
+        self._frequencias: List[Counter] = []
+        self._documentos_com_termo: Counter = Counter()
+        self._total_termos = 0
+        self._lock = threading.Lock()
+
+    def registrar_documento(self, nome: str):
+        """
+        Registra um documento aguardando a indexação.
+        """
+        with self._lock:
+            self.documentos[nome] = {"status": "pendente", "trechos": 0, "erro": None}
+
+    def adicionar_texto(self, nome: str, texto: str):
+        """
+        Divide o texto de um documento em trechos e os adiciona ao índice.
+
+        Args:
+            nome (str): Nome do documento
+            texto (str): Texto extraído
+        """
+        trechos = dividir_em_trechos(texto)
+        frequencias = [Counter(tokenizar(trecho)) for trecho in trechos]
+        with self._lock:
+            if self.documentos.get(nome, {}).get("trechos"):
+                self._remover_trechos(nome)
+            for posicao, (trecho, frequencia) in enumerate(zip(trechos, frequencias)):
+                self.trechos.append({"documento": nome, "posicao": posicao, "texto": trecho})
+                self._frequencias.append(frequencia)
+                self._documentos_com_termo.update(frequencia.keys())
+                self._total_termos += sum(frequencia.values())
+            self.documentos[nome] = {"status": "indexado", "trechos": len(trechos), "erro": None}
+
+    def _remover_trechos(self, nome: str):
+        # Um documento reenviado com o mesmo nome substitui os trechos da versão anterior
+        mantidos = [(t, f) for t, f in zip(self.trechos, self._frequencias) if t["documento"] != nome]
+        self.trechos = [t for t, _ in mantidos]
+        self._frequencias = [f for _, f in mantidos]
+        self._documentos_com_termo = Counter()
+        for frequencia in self._frequencias:
+            self._documentos_com_termo.update(frequencia.keys())
+        self._total_termos = sum(sum(f.values()) for f in self._frequencias)
+
+    def registrar_erro(self, nome: str, erro: str):
+        """
+        Registra a falha na extração de um documento.
+        """
+        with self._lock:
+            self.documentos[nome] = {"status": "erro", "trechos": 0, "erro": erro}
+
+    def buscar(self, consulta: str, k: int = DOCUMENTOS_TRECHOS_RETORNADOS) -> List[Dict[str, Any]]:
+        """
+        Retorna os k trechos mais relevantes para a consulta pela pontuação BM25.
+
+        Args:
+            consulta (str): Consulta em linguagem natural
+            k (int, optional): Número de trechos. Default para DOCUMENTOS_TRECHOS_RETORNADOS.
+
+        Returns:
+            List[Dict[str, Any]]: Trechos com documento, posição, texto e pontuação
+        """
+        termos = set(tokenizar(consulta))
+        with self._lock:
+            total = len(self.trechos)
+            if not total or not termos:
+                return []
+            media = self._total_termos / total
+            idf = {
+                termo: math.log(1 + (total - self._documentos_com_termo[termo] + 0.5)
+                                / (self._documentos_com_termo[termo] + 0.5))
+                for termo in termos if self._documentos_com_termo[termo]
+            }
+            pontuados = []
+            for indice, frequencia in enumerate(self._frequencias):
+                tamanho = sum(frequencia.values())
+                pontuacao = 0.0
+                for termo, peso in idf.items():
+                    f = frequencia.get(termo)
+                    if f:
+                        pontuacao += peso * f * (_BM25_K1 + 1) / (f + _BM25_K1 * (1 - _BM25_B + _BM25_B * tamanho / media))
+                if pontuacao > 0:
+                    pontuados.append((pontuacao, indice))
+
+            pontuados.sort(reverse=True)
+            return [{**self.trechos[indice], "pontuacao": round(pontuacao, 3)} for pontuacao, indice in pontuados[:k]]
+
+    def buscar_trechos(self, consulta: str, k: int = DOCUMENTOS_TRECHOS_RETORNADOS) -> str:
+        """
+        Formata os trechos mais relevantes para inclusão no contexto de um agente.
+
+        Args:
+            consulta (str): Consulta em linguagem natural
+            k (int, optional): Número de trechos
+
+        Returns:
+            str: Trechos com o documento de origem, ou aviso se nada for encontrado
+        """
+        trechos = self.buscar(consulta, k)
+        if not trechos:
+            return "Nenhum trecho relevante encontrado nos documentos da sessão."
+        return "\n\n".join(f"[{t['documento']}, trecho {t['posicao'] + 1}]\n{t['texto']}" for t in trechos)
+
+    def exportar(self) -> Dict[str, Any]:
+        """
+        Exporta os documentos e trechos para persistência.
+        """
+        with self._lock:
+            return {"session_id": self.session_id, "documentos": self.documentos, "trechos": self.trechos}
+
+    @classmethod
+    def importar(cls, dados: Dict[str, Any]) -> "IndiceDocumentosSessao":
+        """
+        Reconstrói o índice a partir dos trechos exportados.
+        """
+        indice = cls(dados["session_id"])
+        indice.documentos = dados.get("documentos", {})
+        for trecho in dados.get("trechos", []):
+            frequencia = Counter(tokenizar(trecho["texto"]))
+            indice.trechos.append(trecho)
+            indice._frequencias.append(frequencia)
+            indice._documentos_com_termo.update(frequencia.keys())
+            indice._total_termos += sum(frequencia.values())
+        return indice
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna o estado dos documentos e o tamanho do índice.
+        """
+        with self._lock:
+            return {"documentos": dict(self.documentos), "trechos": len(self.trechos),
+                    "termos_distintos": len(self._documentos_com_termo)}
+
+
+class GerenciadorIndicesDocumentos:
+    """
+    Mantém os índices de documentos por sessão em RAM com limite de sessões (LRU).
+
+    Cada índice é persistido em disco após a indexação de um documento e recarregado sob demanda.
+    """
+
+    def __init__(self, max_sessoes: int = DOCUMENTOS_MAX_SESSOES, diretorio: Optional[str] = DOCUMENTOS_DIR):
+        """
+        Inicializa o gerenciador de índices.
+
+        Args:
+            max_sessoes (int, optional): Número máximo de índices mantidos em RAM
+            diretorio (str, optional): Diretório de persistência. Se None, não persiste.
+        """
+        self.max_sessoes = max_sessoes
+        self.diretorio = diretorio
+        self._indices: "OrderedDict[str, IndiceDocumentosSessao]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.diretorio:
+            os.makedirs(self.diretorio, exist_ok=True)
+
+    def _caminho(self, session_id: str) -> str:
+        nome = "".join(c for c in session_id if c.isalnum() or c in "-_")
+        return os.path.join(self.diretorio, f"{nome}.json")
+
+    def obter(self, session_id: str) -> IndiceDocumentosSessao:
+        """
+        Obtém o índice de uma sessão, carregando-o do disco ou criando um novo.
+
+        Args:
+            session_id (str): Identificador da sessão
+
+        Returns:
+            IndiceDocumentosSessao: Índice da sessão
+        """
+        with self._lock:
+            indice = self._indices.get(session_id)
+            if indice is not None:
+                self._indices.move_to_end(session_id)
+                return indice
+
+            indice = self._carregar(session_id) or IndiceDocumentosSessao(session_id)
+            self._indices[session_id] = indice
+            while len(self._indices) > self.max_sessoes:
+                self._indices.popitem(last=False)
+            return indice
+
+    def _carregar(self, session_id: str) -> Optional[IndiceDocumentosSessao]:
+        if not self.diretorio or not os.path.exists(self._caminho(session_id)):
+            return None
+        try:
+            with open(self._caminho(session_id), "r", encoding="utf-8") as f:
+                return IndiceDocumentosSessao.importar(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Erro ao carregar o índice de documentos da sessão {session_id}: {e}")
+            return None
+
+    def _persistir(self, indice: IndiceDocumentosSessao):
+        if not self.diretorio:
+            return
+        caminho = self._caminho(indice.session_id)
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(indice.exportar(), f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+
+    def indexar_documento(self, session_id: str, caminho: str, nome: Optional[str] = None):
+        """
+        Extrai o texto de um documento e o adiciona ao índice da sessão.
+
+        Feito para rodar em segundo plano após o upload; falhas ficam registradas no
+        estado do documento em vez de propagar.
+
+        Args:
+            session_id (str): Identificador da sessão
+            caminho (str): Caminho do arquivo
+            nome (str, optional): Nome do documento. Default para o nome do arquivo
+        """
+        nome = nome or os.path.basename(caminho)
+        indice = self.obter(session_id)
+        inicio = time.perf_counter()
+        try:
+            texto = extrair_texto(caminho)
+        except FormatoNaoSuportado as e:
+            indice.registrar_erro(nome, str(e))
+            logger.warning(f"Documento {nome} não indexado: {e}")
+        except Exception as e:
+            indice.registrar_erro(nome, "Não foi possível extrair o texto do documento")
+            logger.error(f"Erro ao extrair o texto de {nome}: {e}")
+        else:
+            indice.adicionar_texto(nome, texto)
+            logger.info(f"Documento {nome} indexado em {indice.documentos[nome]['trechos']} trechos "
+                        f"({time.perf_counter() - inicio:.2f}s)")
+        self._persistir(indice)
+
+
+# Índices compartilhados pelas rotas e agentes do processo
+indices_documentos = GerenciadorIndicesDocumentos()
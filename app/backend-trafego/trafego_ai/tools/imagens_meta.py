@@ -0,0 +1,179 @@
+"""
+Implementação do registro persistente de imagens já carregadas no Meta ADS, por conta e conteúdo
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from backend.trafego_ai.config.settings import IMAGENS_DB, IMAGENS_POR_REQUISICAO
+
+logger = logging.getLogger(__name__)
+
+_TAMANHO_BLOCO_LEITURA = 1024 * 1024
+
+
+def sha256_arquivo(caminho: str) -> str:
+    """
+    Calcula o SHA-256 do conteúdo de um arquivo, lendo-o em blocos.
+
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        str: Hash hexadecimal
+    """
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(_TAMANHO_BLOCO_LEITURA), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def nome_envio(caminho: str, sha256: str) -> str:
+    """
+    Gera o nome usado no envio multipart, único por conteúdo, para identificar a imagem na resposta.
+
+    Args:
+        caminho (str): Caminho do arquivo
+        sha256 (str): SHA-256 do conteúdo
+
+    Returns:
+        str: Nome do arquivo no envio
+    """
+    return f"{sha256[:32]}{os.path.splitext(caminho)[1].lower()}"
+
+
+class RegistroImagens:
+    """
+    Mapeamento persistente (SQLite) do SHA-256 do conteúdo para o hash da imagem no Meta, por conta.
+    """
+
+    def __init__(self, caminho_db: str = IMAGENS_DB):
+        """
+        Inicializa o registro, criando o banco se necessário.
+
+        Args:
+            caminho_db (str, optional): Caminho do arquivo SQLite. Default para IMAGENS_DB.
+        """
+        os.makedirs(os.path.dirname(caminho_db) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(caminho_db, check_same_thread=False)
+        with self._lock, self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS imagens ("
+                "account_id TEXT NOT NULL, sha256 TEXT NOT NULL, hash_meta TEXT NOT NULL, "
+                "criado_em REAL NOT NULL, PRIMARY KEY (account_id, sha256))"
+            )
+
+    def obter(self, account_id: str, shas: Iterable[str]) -> Dict[str, str]:
+        """
+        Busca os hashes do Meta já registrados para os conteúdos informados.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            shas (Iterable[str]): SHA-256 dos conteúdos
+
+        Returns:
+            Dict[str, str]: SHA-256 -> hash da imagem no Meta, apenas para os encontrados
+        """
+        shas = list(dict.fromkeys(shas))
+        if not shas:
+            return {}
+        marcadores = ",".join("?" * len(shas))
+        with self._lock:
+            linhas = self._conexao.execute(
+                f"SELECT sha256, hash_meta FROM imagens WHERE account_id = ? AND sha256 IN ({marcadores})",
+                [str(account_id), *shas]
+            ).fetchall()
+        return dict(linhas)
+
+    def registrar(self, account_id: str, hashes: Dict[str, str]):
+        """
+        Registra os hashes do Meta de imagens recém-carregadas.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            hashes (Dict[str, str]): SHA-256 -> hash da imagem no Meta
+        """
+        agora = time.time()
+        with self._lock, self._conexao:
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO imagens (account_id, sha256, hash_meta, criado_em) VALUES (?, ?, ?, ?)",
+                [(str(account_id), sha, hash_meta, agora) for sha, hash_meta in hashes.items()]
+            )
+
+    def remover(self, account_id: str, hash_meta: str):
+        """
+        Remove uma imagem do registro (por exemplo, se ela foi excluída da conta).
+
+        Args:
+            account_id (str): ID da conta publicitária
+            hash_meta (str): Hash da imagem no Meta
+        """
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "DELETE FROM imagens WHERE account_id = ? AND hash_meta = ?", (str(account_id), hash_meta)
+            )
+
+
+def planejar_envio(account_id: str, caminhos: List[str], registro: Optional[RegistroImagens] = None
+                   ) -> Tuple[Dict[str, str], Dict[str, str], List[List[Tuple[str, str, str]]]]:
+    """
+    Separa as imagens já carregadas na conta das que precisam ser enviadas.
+
+    Conteúdos repetidos entre os caminhos são enviados uma única vez.
+
+    Args:
+        account_id (str): ID da conta publicitária
+        caminhos (List[str]): Caminhos locais das imagens
+        registro (RegistroImagens, optional): Registro usado. Default para o registro do processo
+
+    Returns:
+        tuple: SHA-256 de cada caminho, hashes já conhecidos (SHA-256 -> hash do Meta) e
+               os envios pendentes em blocos de (caminho, SHA-256, nome de envio)
+    """
+    registro = registro or registro_imagens
+    shas = {caminho: sha256_arquivo(caminho) for caminho in dict.fromkeys(caminhos)}
+    conhecidos = registro.obter(account_id, shas.values())
+
+    pendentes = {}
+    for caminho, sha in shas.items():
+        if sha not in conhecidos and sha not in pendentes:
+            pendentes[sha] = (caminho, sha, nome_envio(caminho, sha))
+
+    envios = list(pendentes.values())
+    blocos = [envios[i:i + IMAGENS_POR_REQUISICAO] for i in range(0, len(envios), IMAGENS_POR_REQUISICAO)]
+    if conhecidos:
+        logger.info(f"{len(conhecidos)} imagens já carregadas na conta {account_id}; "
+                    f"{len(envios)} a enviar em {len(blocos)} requisições")
+    return shas, conhecidos, blocos
+
+
+def hashes_enviados(bloco: List[Tuple[str, str, str]], resposta: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Extrai da resposta do endpoint adimages o hash de cada imagem enviada no bloco.
+
+    Args:
+        bloco (List[Tuple[str, str, str]]): Envios do bloco (caminho, SHA-256, nome de envio)
+        resposta (Dict[str, Any]): Corpo da resposta da Graph API
+
+    Returns:
+        Dict[str, str]: SHA-256 -> hash da imagem no Meta
+    """
+    imagens = resposta.get("images", {})
+    hashes = {}
+    for caminho, sha, nome in bloco:
+        if nome in imagens:
+            hashes[sha] = imagens[nome]["hash"]
+        else:
+            logger.error(f"Imagem {caminho} ausente da resposta do upload")
+    return hashes
+
+
+# Registro compartilhado pelos clientes do Meta ADS do processo
+registro_imagens = RegistroImagens()
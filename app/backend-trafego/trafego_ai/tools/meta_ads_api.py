@@ -3,27 +3,70 @@ Implementação da integração com a API do Meta ADS (Facebook)
 """
 import time
 import json
+import copy
 import logging
+from contextlib import ExitStack
 from datetime import datetime, timedelta
-from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.adaccount import AdAccount
 from facebook_business.adobjects.campaign import Campaign
 from facebook_business.adobjects.adset import AdSet
 from facebook_business.adobjects.ad import Ad
-from facebook_business.adobjects.targetingsearch import TargetingSearch
-from facebook_business.adobjects.adimage import AdImage
 from facebook_business.adobjects.advideo import AdVideo
+from facebook_business.adobjects.adreportrun import AdReportRun
 from facebook_business.exceptions import FacebookRequestError
 
 from backend.trafego_ai.config.settings import (
     META_APP_ID,
     META_APP_SECRET,
     META_ACCESS_TOKEN,
-    META_ACCOUNT_ID
+    META_ACCOUNT_ID,
+    INSIGHTS_INTERVALO_POLLING,
+    INSIGHTS_TIMEOUT_RELATORIO,
+    VIDEO_INTERVALO_POLLING,
+    VIDEO_TIMEOUT_CODIFICACAO,
+    META_MUTACOES_MAX_CONCORRENCIA
 )
+from backend.trafego_ai.tools.meta_ads_params import (
+    params_campanha,
+    params_conjunto_anuncios,
+    params_anuncio,
+    params_criativo,
+    params_insights,
+    requer_relatorio_assincrono
+)
+from backend.trafego_ai.tools.meta_ads_batch import (
+    montar_operacoes_campanha,
+    montar_operacoes_busca_interesses,
+    interesses_do_lote,
+    criativos_sem_hash,
+    criativos_sem_video,
+    executar_operacoes,
+    executar_operacoes_concorrentes
+)
+from backend.trafego_ai.tools.mutacoes_meta import (
+    normalizar_mutacoes,
+    montar_operacoes_leitura,
+    montar_operacoes_mutacao,
+    valores_anteriores,
+    valores_a_reverter,
+    relatorio_mutacoes
+)
+from backend.trafego_ai.tools.meta_ads_sync import (
+    CAMPOS_ARVORE_CAMPANHA,
+    planejar_sincronizacao,
+    resultado_sincronizacao
+)
+from backend.trafego_ai.tools.imagens_meta import planejar_envio, hashes_enviados, registro_imagens
+from backend.trafego_ai.tools.video_meta import (
+    SessaoUploadVideo,
+    status_codificacao,
+    STATUS_VIDEO_PRONTO,
+    STATUS_VIDEO_ERRO
+)
+from backend.trafego_ai.tools.cache_interesses import cache_interesses, normalizar_termo
+from backend.trafego_ai.tools.agendador_meta import PRIORIDADE_INTERATIVA, prioridade
+from backend.trafego_ai.tools.sessoes_meta import registro_sessoes
 
-# Configurar logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -48,14 +91,10 @@ class MetaAdsAPI:
         self.access_token = access_token or META_ACCESS_TOKEN
         self.account_id = account_id or META_ACCOUNT_ID
         
-        # Inicializar a API do Facebook
+        # Obter a sessão da conta no registro (criada e validada uma única vez, sem API padrão global)
         try:
-            FacebookAdsApi.init(self.app_id, self.app_secret, self.access_token)
-            logger.info("Facebook Ads API inicializada com sucesso")
-            
-            # Validar a conta
-            self.ad_account = AdAccount(f'act_{self.account_id}')
-            self.check_account_access()
+            self.api = registro_sessoes.obter(self.app_id, self.app_secret, self.access_token, self.account_id)
+            self.ad_account = AdAccount(f'act_{self.account_id}', api=self.api)
         except FacebookRequestError as e:
             logger.error(f"Erro ao inicializar a API do Facebook: {e}")
             raise
@@ -96,24 +135,8 @@ class MetaAdsAPI:
             str: ID da campanha criada
         """
         try:
-            params = {
-                'name': nome,
-                'objective': objetivo,
-                'status': status,
-                'special_ad_categories': [],
-            }
-            
-            # Configurar orçamento
-            if orcamento_diario:
-                params['daily_budget'] = int(orcamento_diario * 100)  # Converter para centavos
-            elif orcamento_lifetime:
-                params['lifetime_budget'] = int(orcamento_lifetime * 100)  # Converter para centavos
-            
-            # Configurar datas
-            if data_inicio:
-                params['start_time'] = data_inicio.strftime("%Y-%m-%dT%H:%M:%S%z")
-            if data_fim:
-                params['end_time'] = data_fim.strftime("%Y-%m-%dT%H:%M:%S%z")
+            params = params_campanha(nome, objetivo, orcamento_diario, orcamento_lifetime,
+                                     data_inicio, data_fim, status)
             
             # Criar a campanha
             campaign = self.ad_account.create_campaign(params=params)
@@ -147,26 +170,9 @@ class MetaAdsAPI:
             str: ID do conjunto de anúncios criado
         """
         try:
-            params = {
-                'name': nome,
-                'campaign_id': campanha_id,
-                'optimization_goal': objetivo_otimizacao,
-                'billing_event': 'IMPRESSIONS',  # ou LINK_CLICKS, APP_INSTALLS, etc.
-                'status': status,
-                'targeting': segmentacao,
-            }
-            
-            # Configurar orçamento
-            if orcamento_diario:
-                params['daily_budget'] = int(orcamento_diario * 100)  # Converter para centavos
-            elif orcamento_lifetime:
-                params['lifetime_budget'] = int(orcamento_lifetime * 100)  # Converter para centavos
-            
-            # Configurar datas
-            if data_inicio:
-                params['start_time'] = data_inicio.strftime("%Y-%m-%dT%H:%M:%S%z")
-            if data_fim:
-                params['end_time'] = data_fim.strftime("%Y-%m-%dT%H:%M:%S%z")
+            params = params_conjunto_anuncios(campanha_id, nome, objetivo_otimizacao, segmentacao,
+                                              orcamento_diario, orcamento_lifetime,
+                                              data_inicio, data_fim, status)
             
             # Criar o conjunto de anúncios
             ad_set = self.ad_account.create_ad_set(params=params)
@@ -193,12 +199,7 @@ class MetaAdsAPI:
             str: ID do anúncio criado
         """
         try:
-            params = {
-                'name': nome,
-                'adset_id': conjunto_anuncios_id,
-                'creative': {'creative_id': creative_id},
-                'status': status,
-            }
+            params = params_anuncio(conjunto_anuncios_id, nome, creative_id, status)
             
             # Criar o anúncio
             ad = self.ad_account.create_ad(params=params)
@@ -212,7 +213,7 @@ class MetaAdsAPI:
             raise
     
     def criar_criativo(self, titulo, texto, cta, url_destino, imagem_url=None, imagem_hash=None, 
-                      formato="LINK"):
+                      formato="LINK", video_url=None, video_id=None):
         """
         Cria um novo criativo para anúncios no Meta ADS.
         
@@ -224,6 +225,8 @@ class MetaAdsAPI:
             imagem_url (str, optional): URL da imagem a ser usada
             imagem_hash (str, optional): Hash de uma imagem já carregada
             formato (str, optional): Formato do criativo. Default para "LINK"
+            video_url (str, optional): Caminho do vídeo a ser carregado
+            video_id (str, optional): ID de um vídeo já carregado
             
         Returns:
             str: ID do criativo criado
@@ -231,28 +234,14 @@ class MetaAdsAPI:
         try:
             # Verificar se temos uma imagem para usar
             if imagem_url and not imagem_hash:
-                # Fazer upload da imagem
-                image = AdImage(parent_id=f'act_{self.account_id}')
-                image[AdImage.Field.filename] = imagem_url
-                image.remote_create()
-                imagem_hash = image[AdImage.Field.hash]
-            
-            params = {
-                'name': f'Criativo - {titulo[:20]}',
-                'object_story_spec': {
-                    'page_id': '123456789',  # ID da Página do Facebook - deve ser substituído pelo ID real
-                    'link_data': {
-                        'message': texto,
-                        'link': url_destino,
-                        'name': titulo,
-                        'call_to_action': {'type': cta},
-                    }
-                }
-            }
+                # Fazer upload da imagem (ou reaproveitar uma já carregada na conta)
+                imagem_hash = self.carregar_imagens([imagem_url])[imagem_url]
             
-            # Adicionar a imagem ao criativo
-            if imagem_hash:
-                params['object_story_spec']['link_data']['image_hash'] = imagem_hash
+            # O criativo só pode ser criado com o vídeo já codificado
+            if video_url and not video_id:
+                video_id = self.carregar_video(video_url, titulo, aguardar_codificacao=True)
+            
+            params = params_criativo(titulo, texto, cta, url_destino, imagem_hash, video_id=video_id)
             
             # Criar o criativo
             creative = self.ad_account.create_ad_creative(params=params)
@@ -265,6 +254,287 @@ class MetaAdsAPI:
             logger.error(f"Erro ao criar criativo: {e}")
             raise
     
+    def carregar_imagens(self, caminhos):
+        """
+        Faz upload de várias imagens para a conta, várias por requisição.
+        
+        Imagens cujo conteúdo já foi carregado nesta conta não são enviadas novamente.
+        
+        Args:
+            caminhos (list): Caminhos locais das imagens
+            
+        Returns:
+            dict: Hash da imagem no Meta ADS por caminho
+        """
+        shas, hashes, blocos = planejar_envio(self.account_id, caminhos)
+        
+        for bloco in blocos:
+            with ExitStack() as pilha:
+                arquivos = {nome: (nome, pilha.enter_context(open(caminho, 'rb'))) for caminho, _, nome in bloco}
+                resposta = self.api.call(
+                    'POST',
+                    (f'act_{self.account_id}', 'adimages'),
+                    files=arquivos
+                )
+            novos = hashes_enviados(bloco, resposta.json())
+            registro_imagens.registrar(self.account_id, novos)
+            hashes.update(novos)
+        
+        return {caminho: hashes.get(sha) for caminho, sha in shas.items()}
+    
+    def carregar_video(self, caminho_video, titulo=None, aguardar_codificacao=False):
+        """
+        Faz upload de um vídeo pelo protocolo em partes (start/transfer/finish).
+        
+        O arquivo é lido do disco um trecho por vez, e um upload interrompido do
+        mesmo arquivo é retomado do último trecho aceito.
+        
+        Args:
+            caminho_video (str): Caminho local do vídeo
+            titulo (str, optional): Título do vídeo. Default para o nome do arquivo
+            aguardar_codificacao (bool, optional): Se deve aguardar o vídeo ficar pronto
+            
+        Returns:
+            str: ID do vídeo no Meta ADS
+        """
+        sessao = SessaoUploadVideo(self.account_id, caminho_video, titulo)
+        retomada = sessao.iniciada
+        
+        try:
+            video_id = self._enviar_video(sessao)
+        except FacebookRequestError as e:
+            if not retomada:
+                raise
+            # A sessão salva pode ter expirado no servidor: recomeçar do zero
+            logger.warning(f"Não foi possível retomar o upload de {caminho_video} ({e}); reiniciando")
+            sessao.descartar_estado()
+            video_id = self._enviar_video(sessao)
+        
+        if aguardar_codificacao:
+            self.aguardar_codificacao_video(video_id)
+        return video_id
+    
+    def _enviar_video(self, sessao):
+        api = self.api
+        caminho = tuple(sessao.caminho_api.split('/'))
+        
+        if not sessao.iniciada:
+            sessao.registrar_inicio(api.call('POST', caminho, params=sessao.params_inicio()).json())
+        
+        while not sessao.transferida:
+            params, arquivos = sessao.ler_trecho()
+            try:
+                resposta = api.call('POST', caminho, params=params, files=arquivos)
+            except FacebookRequestError as e:
+                if not sessao.recuperar_de_erro(e.body()):
+                    raise
+                time.sleep(sessao.tentativas)
+                continue
+            sessao.registrar_trecho(resposta.json())
+        
+        api.call('POST', caminho, params=sessao.params_finalizacao())
+        return sessao.concluir()
+    
+    def aguardar_codificacao_video(self, video_id):
+        """
+        Aguarda a codificação de um vídeo carregado.
+        
+        Args:
+            video_id (str): ID do vídeo
+            
+        Returns:
+            dict: Status final do vídeo
+        """
+        limite = time.monotonic() + VIDEO_TIMEOUT_CODIFICACAO
+        while True:
+            video = AdVideo(video_id, api=self.api).api_get(fields=['status'])
+            situacao = status_codificacao(video.export_all_data())
+            if situacao == STATUS_VIDEO_PRONTO:
+                return video['status']
+            if situacao == STATUS_VIDEO_ERRO:
+                raise RuntimeError(f"Codificação do vídeo {video_id} falhou: {video.get('status')}")
+            if time.monotonic() > limite:
+                raise TimeoutError(f"Vídeo {video_id} não codificado a tempo")
+            
+            time.sleep(VIDEO_INTERVALO_POLLING)
+    
+    def _enviar_lote(self, itens):
+        """
+        Envia uma requisição em lote (até 50 operações) para a Graph API.
+        
+        Args:
+            itens (list): Operações no formato de lote da Graph API
+            
+        Returns:
+            list: Respostas de cada operação, na mesma ordem
+        """
+        resposta = self.api.call(
+            'POST',
+            ('',),
+            params={'batch': itens, 'include_headers': False}
+        )
+        return resposta.json()
+    
+    def implantar_campanha(self, arvore):
+        """
+        Implanta a árvore completa de uma campanha usando requisições em lote.
+        
+        Campanha, conjuntos, criativos e anúncios são enviados juntos, com referências
+        de dependência entre os itens, em requisições de até 50 operações. Imagens
+        informadas por imagem_url sem imagem_hash são carregadas antes do lote.
+        
+        Args:
+            arvore (dict): Estrutura da campanha (ver montar_operacoes_campanha)
+            
+        Returns:
+            dict: ID da campanha, resultado por nó, número de requisições e indicador de sucesso
+        """
+        # Implantações são ações do usuário: passam à frente das sincronizações na fila da conta
+        with prioridade(PRIORIDADE_INTERATIVA):
+            arvore = copy.deepcopy(arvore)
+            
+            # Carregar de uma vez as imagens que ainda não têm hash
+            criativos = criativos_sem_hash(arvore)
+            if criativos:
+                hashes = self.carregar_imagens([criativo["imagem_url"] for criativo in criativos])
+                for criativo in criativos:
+                    criativo["imagem_hash"] = hashes[criativo["imagem_url"]]
+            
+            for criativo in criativos_sem_video(arvore):
+                criativo["video_id"] = self.carregar_video(criativo["video_url"], aguardar_codificacao=True)
+            
+            operacoes = montar_operacoes_campanha(self.account_id, arvore)
+            resultado = executar_operacoes(operacoes, self._enviar_lote)
+            
+            campanha = resultado["resultados"].get("campanha", {})
+            resultado["campanha_id"] = campanha.get("id")
+            
+            falhas = [r for r in resultado["resultados"].values() if r["status"] != "sucesso"]
+            if falhas:
+                logger.warning(f"Implantação da campanha com {len(falhas)} de {len(operacoes)} nós não criados")
+            else:
+                logger.info(f"Campanha implantada com sucesso em {resultado['requisicoes']} requisições: "
+                            f"{resultado['campanha_id']}")
+            
+            return resultado
+    
+    def obter_arvore_campanha(self, campanha_id=None, nome=None):
+        """
+        Lê em uma única requisição a campanha com seus conjuntos, anúncios e criativos.
+        
+        Args:
+            campanha_id (str, optional): ID da campanha
+            nome (str, optional): Nome da campanha, usado quando o ID não é informado
+            
+        Returns:
+            dict: Campanha com as arestas adsets e ads expandidas, ou None se não existir
+        """
+        if campanha_id:
+            return self.api.call(
+                'GET',
+                (str(campanha_id),),
+                params={'fields': CAMPOS_ARVORE_CAMPANHA}
+            ).json()
+        
+        resposta = self.api.call(
+            'GET',
+            (f'act_{self.account_id}', 'campaigns'),
+            params={
+                'fields': CAMPOS_ARVORE_CAMPANHA,
+                'filtering': [{'field': 'name', 'operator': 'EQUAL', 'value': nome}],
+                'limit': 5
+            }
+        ).json()
+        campanhas = [c for c in resposta.get('data', []) if c.get('status') != 'DELETED']
+        return campanhas[0] if campanhas else None
+    
+    def sincronizar_campanha(self, arvore, campanha_id=None, simular=False):
+        """
+        Leva a campanha existente à árvore desejada com o mínimo de operações em lote.
+        
+        A árvore atual é lida uma única vez e comparada com a desejada: objetos ausentes
+        são criados, objetos diferentes são atualizados e objetos fora da árvore são
+        pausados. Sincronizar de novo a mesma árvore não envia nenhuma escrita.
+        
+        Args:
+            arvore (dict): Estrutura da campanha (ver montar_operacoes_campanha)
+            campanha_id (str, optional): ID da campanha. Default para a busca pelo nome da árvore
+            simular (bool, optional): Se True, apenas retorna as ações planejadas
+            
+        Returns:
+            dict: ID da campanha, ações, contagem por ação, conflitos, resultado por
+                  operação, número de requisições e indicador de sucesso
+        """
+        with prioridade(PRIORIDADE_INTERATIVA):
+            arvore = copy.deepcopy(arvore)
+            atual = self.obter_arvore_campanha(campanha_id, arvore["campanha"]["nome"])
+            plano = planejar_sincronizacao(self.account_id, arvore, atual)
+            
+            if simular:
+                return resultado_sincronizacao(plano, None, atual and atual["id"])
+            
+            # Só é carregada a mídia dos criativos que serão realmente criados
+            pendentes = plano["midias_pendentes"]
+            if pendentes:
+                imagens = [c for c in pendentes if c.get("imagem_url") and not c.get("imagem_hash")]
+                if imagens:
+                    hashes = self.carregar_imagens([c["imagem_url"] for c in imagens])
+                    for criativo in imagens:
+                        criativo["imagem_hash"] = hashes[criativo["imagem_url"]]
+                for criativo in pendentes:
+                    if criativo.get("video_url") and not criativo.get("video_id"):
+                        criativo["video_id"] = self.carregar_video(criativo["video_url"], aguardar_codificacao=True)
+                plano = planejar_sincronizacao(self.account_id, arvore, atual)
+            
+            execucao = executar_operacoes(plano["operacoes"], self._enviar_lote)
+            resultado = resultado_sincronizacao(plano, execucao, atual and atual["id"])
+            
+            contagem = resultado["contagem"]
+            logger.info(f"Campanha {resultado['campanha_id']} sincronizada: {contagem['criar']} criados, "
+                        f"{contagem['atualizar']} atualizados, {contagem['pausar']} pausados "
+                        f"em {resultado['requisicoes']} requisições")
+            return resultado
+    
+    def aplicar_mutacoes(self, mutacoes, reverter_em_falha=True):
+        """
+        Altera status, orçamentos e lances de várias campanhas, conjuntos e anúncios de uma vez.
+        
+        As alterações são enviadas em requisições em lote simultâneas. Com reverter_em_falha,
+        os valores atuais são lidos antes e, se alguma alteração falhar, as já aplicadas
+        são desfeitas; se algum objeto não puder ser lido, nenhuma alteração é enviada.
+        
+        Args:
+            mutacoes (list): Alterações (ver normalizar_mutacoes).
+                             Ex: [{"id": "123", "tipo": "campanha", "status": "PAUSED"}]
+            reverter_em_falha (bool, optional): Se deve desfazer as alterações após uma falha parcial
+            
+        Returns:
+            dict: Resultado por objeto, contagem por status, requisições e indicador de sucesso
+        """
+        # Alterações em massa costumam ser emergenciais: passam à frente das sincronizações
+        with prioridade(PRIORIDADE_INTERATIVA):
+            mutacoes = normalizar_mutacoes(mutacoes)
+            leitura, execucao, reversao, anteriores = None, None, None, {}
+            
+            if reverter_em_falha:
+                leitura = self._executar_concorrente(montar_operacoes_leitura(mutacoes))
+                anteriores = valores_anteriores(mutacoes, leitura)
+            
+            if leitura is None or leitura["sucesso"]:
+                execucao = self._executar_concorrente(montar_operacoes_mutacao(mutacoes))
+                if reverter_em_falha and not execucao["sucesso"]:
+                    logger.warning("Falha parcial na alteração em massa; revertendo as alterações aplicadas")
+                    a_reverter = valores_a_reverter(mutacoes, execucao, anteriores)
+                    reversao = self._executar_concorrente(montar_operacoes_mutacao(mutacoes, a_reverter, "reverter"))
+            
+            relatorio = relatorio_mutacoes(mutacoes, leitura, execucao, reversao, anteriores)
+            logger.info(f"Alteração em massa de {len(mutacoes)} objetos em {relatorio['requisicoes']} "
+                        f"requisições: {relatorio['contagem']}")
+            return relatorio
+    
+    def _executar_concorrente(self, operacoes):
+        return executar_operacoes_concorrentes(operacoes, self._enviar_lote, META_MUTACOES_MAX_CONCORRENCIA)
+    
     def obter_metricas_campanha(self, campanha_id, data_inicio=None, data_fim=None, 
                                metricas=None):
         """
@@ -277,7 +547,7 @@ class MetaAdsAPI:
             metricas (list, optional): Lista de métricas a serem obtidas
             
         Returns:
-            dict: Métricas da campanha
+            dict: Métricas da campanha (sem reach e frequency quando vindas do armazenamento local)
         """
         try:
             # Configurar datas padrão se não fornecidas
@@ -286,6 +556,13 @@ class MetaAdsAPI:
             if not data_fim:
                 data_fim = datetime.now()
             
+            # Métricas padrão: usar o armazenamento local quando ele cobre todo o período com dados
+            # finais. Sem reach e frequency, que só a Graph API calcula para o período
+            if not metricas:
+                from backend.trafego_ai.utils.metricas_locais import armazem_metricas
+                if armazem_metricas.cobre_periodo(self.account_id, "campaign", data_inicio, data_fim):
+                    return armazem_metricas.metricas_campanha(self.account_id, campanha_id, data_inicio, data_fim)
+
             # Configurar métricas padrão se não fornecidas
             if not metricas:
                 metricas = [
@@ -299,7 +576,7 @@ class MetaAdsAPI:
                 ]
             
             # Obter as métricas
-            campaign = Campaign(campanha_id)
+            campaign = Campaign(campanha_id, api=self.api)
             insights = campaign.get_insights(
                 params={
                     'time_range': {
@@ -320,6 +597,85 @@ class MetaAdsAPI:
             logger.error(f"Erro ao obter métricas da campanha: {e}")
             raise
     
+    def obter_insights_conta(self, nivel="campaign", data_inicio=None, data_fim=None,
+                             incremento_tempo=None, breakdowns=None, metricas=None,
+                             filtros=None, assincrono=None, limite_pagina=500):
+        """
+        Obtém insights de todos os objetos da conta em um único relatório.
+        
+        As linhas são produzidas à medida que cada página é lida, sem acumular o
+        relatório inteiro em memória. Períodos longos ou com breakdowns usam um
+        relatório assíncrono (AdReportRun).
+        
+        Args:
+            nivel (str, optional): Nível de agregação (account, campaign, adset, ad). Default para "campaign"
+            data_inicio (datetime, optional): Data inicial. Default para 30 dias atrás
+            data_fim (datetime, optional): Data final. Default para hoje
+            incremento_tempo (int|str, optional): Dias por linha (1 = diário), "monthly" ou "all_days"
+            breakdowns (list, optional): Quebras adicionais (Ex: age, gender, publisher_platform)
+            metricas (list, optional): Métricas a serem obtidas
+            filtros (list, optional): Filtros no formato da Graph API
+            assincrono (bool, optional): Força (ou impede) o uso de relatório assíncrono.
+                                       Se None, decide pelo tamanho do período.
+            limite_pagina (int, optional): Linhas por página. Default para 500
+            
+        Yields:
+            dict: Uma linha de insights
+        """
+        data_inicio = data_inicio or datetime.now() - timedelta(days=30)
+        data_fim = data_fim or datetime.now()
+        if assincrono is None:
+            assincrono = requer_relatorio_assincrono(data_inicio, data_fim, breakdowns)
+        
+        params = params_insights(nivel, data_inicio, data_fim, incremento_tempo, breakdowns,
+                                 metricas, filtros, limite_pagina)
+        campos = params.pop('fields').split(',')
+        if 'breakdowns' in params:
+            params['breakdowns'] = params['breakdowns'].split(',')
+        
+        try:
+            if assincrono:
+                relatorio = self.ad_account.get_insights(fields=campos, params=params, is_async=True)
+                relatorio = self._aguardar_relatorio(relatorio)
+                cursor = relatorio.get_insights(params={'limit': limite_pagina})
+            else:
+                cursor = self.ad_account.get_insights(fields=campos, params=params)
+            
+            # O cursor carrega uma página por vez conforme é percorrido
+            for linha in cursor:
+                yield linha.export_all_data()
+        
+        except FacebookRequestError as e:
+            logger.error(f"Erro ao obter insights da conta: {e}")
+            raise
+    
+    def _aguardar_relatorio(self, relatorio):
+        """
+        Aguarda a conclusão de um relatório assíncrono de insights.
+        
+        Args:
+            relatorio (AdReportRun): Relatório criado
+            
+        Returns:
+            AdReportRun: Relatório concluído
+        """
+        limite = time.monotonic() + INSIGHTS_TIMEOUT_RELATORIO
+        while True:
+            relatorio = relatorio.api_get(fields=[
+                AdReportRun.Field.async_status,
+                AdReportRun.Field.async_percent_completion
+            ])
+            situacao = relatorio[AdReportRun.Field.async_status]
+            if situacao == 'Job Completed':
+                return relatorio
+            if situacao in ('Job Failed', 'Job Skipped'):
+                raise RuntimeError(f"Relatório de insights {relatorio['id']} terminou com status: {situacao}")
+            if time.monotonic() > limite:
+                raise TimeoutError(f"Relatório de insights {relatorio['id']} não concluído a tempo")
+            
+            logger.info(f"Relatório {relatorio['id']}: {relatorio[AdReportRun.Field.async_percent_completion]}%")
+            time.sleep(INSIGHTS_INTERVALO_POLLING)
+    
     def buscar_interesses(self, termo_busca, limite=10):
         """
         Busca interesses para segmentação com base em um termo.
@@ -331,9 +687,16 @@ class MetaAdsAPI:
         Returns:
             list: Lista de interesses encontrados
         """
+        # Buscas repetidas são respondidas pelo cache
+        interesses = cache_interesses.obter(termo_busca, limite)
+        if interesses is not None:
+            return interesses
+        
         try:
-            # Buscar interesses
-            interests = TargetingSearch.search(
+            # Buscar interesses (pela sessão da conta: TargetingSearch.search ignora a URL e a versão dela)
+            resposta = self.api.call(
+                'GET',
+                ('search',),
                 params={
                     'q': termo_busca,
                     'type': 'adinterest',
@@ -342,12 +705,52 @@ class MetaAdsAPI:
             )
             
             # Processar e retornar os resultados
-            return interests
+            interesses = resposta.json().get('data', [])
+            cache_interesses.guardar(termo_busca, limite, interesses)
+            return interesses
         
         except FacebookRequestError as e:
             logger.error(f"Erro ao buscar interesses: {e}")
             raise
     
+    def buscar_interesses_em_lote(self, termos, limite=10):
+        """
+        Busca interesses para vários termos de uma vez.
+        
+        Termos já em cache não são consultados; os demais são buscados em
+        requisições em lote de até 50 termos.
+        
+        Args:
+            termos (list): Termos para busca de interesses
+            limite (int, optional): Número máximo de resultados por termo. Default para 10
+            
+        Returns:
+            dict: Lista de interesses encontrados por termo (vazia se a busca falhou)
+        """
+        encontrados, pendentes = cache_interesses.separar(termos, limite)
+        
+        if pendentes:
+            execucao = executar_operacoes(montar_operacoes_busca_interesses(pendentes, limite), self._enviar_lote)
+            for termo, interesses in interesses_do_lote(pendentes, execucao).items():
+                if interesses is not None:
+                    cache_interesses.guardar(termo, limite, interesses)
+                encontrados[normalizar_termo(termo)] = interesses or []
+        
+        return {termo: encontrados[normalizar_termo(termo)] for termo in termos}
+    
+    def autocompletar_interesses(self, prefixo, limite=10):
+        """
+        Sugere interesses já encontrados cujo nome começa com o prefixo, sem acessar a Graph API.
+        
+        Args:
+            prefixo (str): Prefixo digitado
+            limite (int, optional): Número máximo de sugestões. Default para 10
+            
+        Returns:
+            list: Interesses ordenados por tamanho de audiência
+        """
+        return cache_interesses.autocompletar(prefixo, limite)
+    
     def atualizar_status_campanha(self, campanha_id, status):
         """
         Atualiza o status de uma campanha.
@@ -361,8 +764,8 @@ class MetaAdsAPI:
         """
         try:
             # Atualizar o status da campanha
-            campaign = Campaign(campanha_id)
-            campaign.update(params={'status': status})
+            campaign = Campaign(campanha_id, api=self.api)
+            campaign.api_update(params={'status': status})
             
             logger.info(f"Status da campanha {campanha_id} atualizado para {status}")
             return True
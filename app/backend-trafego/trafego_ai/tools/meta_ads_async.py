@@ -0,0 +1,788 @@
+"""
+Implementação do cliente assíncrono da API do Meta ADS (Graph API) baseado em httpx
+"""
+import asyncio
+import copy
+import hashlib
+import hmac
+import logging
+import time
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, AsyncIterator
+
+import httpx
+
+from backend.trafego_ai.config.settings import (
+    META_APP_SECRET,
+    META_ACCESS_TOKEN,
+    META_ACCOUNT_ID,
+    META_GRAPH_URL,
+    META_GRAPH_API_VERSION,
+    META_MAX_CONEXOES,
+    META_TIMEOUT,
+    META_MAX_TENTATIVAS_LIMITE,
+    VIDEOS_MAX_CONCORRENCIA,
+    VIDEO_INTERVALO_POLLING,
+    VIDEO_TIMEOUT_CODIFICACAO,
+    INSIGHTS_INTERVALO_POLLING,
+    INSIGHTS_TIMEOUT_RELATORIO,
+    META_MUTACOES_MAX_CONCORRENCIA
+)
+from backend.trafego_ai.tools.meta_ads_params import (
+    params_campanha,
+    params_conjunto_anuncios,
+    params_anuncio,
+    params_criativo,
+    params_insights,
+    requer_relatorio_assincrono,
+    codificar_params
+)
+from backend.trafego_ai.tools.meta_ads_batch import (
+    montar_operacoes_campanha,
+    montar_operacoes_busca_interesses,
+    interesses_do_lote,
+    criativos_sem_hash,
+    criativos_sem_video,
+    executar_operacoes_async,
+    executar_operacoes_concorrentes_async
+)
+from backend.trafego_ai.tools.mutacoes_meta import (
+    normalizar_mutacoes,
+    montar_operacoes_leitura,
+    montar_operacoes_mutacao,
+    valores_anteriores,
+    valores_a_reverter,
+    relatorio_mutacoes
+)
+from backend.trafego_ai.tools.meta_ads_sync import (
+    CAMPOS_ARVORE_CAMPANHA,
+    planejar_sincronizacao,
+    resultado_sincronizacao
+)
+from backend.trafego_ai.tools.cache_interesses import cache_interesses, normalizar_termo
+from backend.trafego_ai.tools.imagens_meta import planejar_envio, hashes_enviados, registro_imagens
+from backend.trafego_ai.tools.video_meta import (
+    SessaoUploadVideo,
+    status_codificacao,
+    STATUS_VIDEO_PRONTO,
+    STATUS_VIDEO_ERRO
+)
+from backend.trafego_ai.tools.agendador_meta import (
+    agendador_meta,
+    eh_limitacao_uso,
+    rebobinar_arquivos,
+    prioridade,
+    PRIORIDADE_INTERATIVA
+)
+
+logger = logging.getLogger(__name__)
+
+
+class MetaGraphAPIError(Exception):
+    """
+    Erro retornado pela Graph API.
+    """
+
+    def __init__(self, mensagem: str, status_http: int, codigo: Optional[int] = None,
+                 subcodigo: Optional[int] = None, corpo: Any = None, headers: Optional[Dict[str, str]] = None):
+        super().__init__(mensagem)
+        self.mensagem = mensagem
+        self.status_http = status_http
+        self.codigo = codigo
+        self.subcodigo = subcodigo
+        self.corpo = corpo
+        self.headers = headers or {}
+
+    def __str__(self):
+        return f"[{self.status_http}] ({self.codigo}/{self.subcodigo}) {self.mensagem}"
+
+
+def criar_cliente_http(max_conexoes: int = META_MAX_CONEXOES, timeout: float = META_TIMEOUT) -> httpx.AsyncClient:
+    """
+    Cria um cliente HTTP com pool de conexões para a Graph API.
+
+    Um único cliente pode ser compartilhado por várias instâncias de MetaAdsAsyncAPI
+    (uma por conta), reaproveitando as mesmas conexões.
+
+    Args:
+        max_conexoes (int, optional): Número máximo de conexões simultâneas
+        timeout (float, optional): Timeout por requisição em segundos
+
+    Returns:
+        httpx.AsyncClient: Cliente HTTP assíncrono
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_conexoes, max_keepalive_connections=max_conexoes),
+        timeout=timeout
+    )
+
+
+class MetaAdsAsyncAPI:
+    """
+    Cliente assíncrono para a API do Meta ADS.
+
+    Oferece as mesmas operações de MetaAdsAPI sem o SDK síncrono e sem estado global:
+    cada instância carrega suas próprias credenciais, permitindo chamadas concorrentes
+    para contas diferentes no mesmo processo.
+    """
+
+    def __init__(self, access_token=None, account_id=None, app_secret=None,
+                 cliente_http: Optional[httpx.AsyncClient] = None,
+                 base_url: str = None, api_version: str = META_GRAPH_API_VERSION):
+        """
+        Inicializa o cliente assíncrono.
+
+        Args:
+            access_token (str, optional): Token de acesso. Default para o valor nas configurações.
+            account_id (str, optional): ID da conta publicitária. Default para o valor nas configurações.
+            app_secret (str, optional): Segredo da aplicação, usado no appsecret_proof.
+                                        Default para o valor nas configurações.
+            cliente_http (httpx.AsyncClient, optional): Cliente HTTP compartilhado. Se None, cria um próprio.
+            base_url (str, optional): URL base da Graph API. Default para META_GRAPH_URL.
+            api_version (str, optional): Versão da Graph API
+        """
+        self.access_token = access_token or META_ACCESS_TOKEN
+        self.account_id = account_id or META_ACCOUNT_ID
+        self.app_secret = app_secret or META_APP_SECRET
+        self.base_url = f"{(base_url or META_GRAPH_URL).rstrip('/')}/{api_version}"
+
+        self._cliente_proprio = cliente_http is None
+        self.cliente_http = cliente_http or criar_cliente_http()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.fechar()
+
+    async def fechar(self):
+        """
+        Fecha o cliente HTTP, se ele tiver sido criado por esta instância.
+        """
+        if self._cliente_proprio:
+            await self.cliente_http.aclose()
+
+    def _params_autenticacao(self) -> Dict[str, str]:
+        params = {"access_token": self.access_token}
+        if self.app_secret:
+            params["appsecret_proof"] = hmac.new(
+                self.app_secret.encode(), self.access_token.encode(), hashlib.sha256
+            ).hexdigest()
+        return params
+
+    async def _requisicao(self, metodo: str, caminho: str, params: Optional[Dict[str, Any]] = None,
+                          files: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Executa uma requisição à Graph API.
+
+        Args:
+            metodo (str): Método HTTP
+            caminho (str): Caminho relativo à versão da API (Ex: act_123/campaigns)
+            params (Dict[str, Any], optional): Parâmetros da requisição
+            files (Dict[str, Any], optional): Arquivos enviados em multipart
+
+        Returns:
+            Any: Corpo da resposta decodificado
+
+        Raises:
+            MetaGraphAPIError: Se a Graph API retornar erro
+        """
+        dados = {**codificar_params(params or {}), **self._params_autenticacao()}
+        url = f"{self.base_url}/{caminho.lstrip('/')}"
+        limitador = agendador_meta.limitador(self.account_id)
+
+        for tentativa in range(META_MAX_TENTATIVAS_LIMITE + 1):
+            await agendador_meta.adquirir_async(self.account_id)
+
+            if metodo in ("GET", "DELETE"):
+                resposta = await self.cliente_http.request(metodo, url, params=dados)
+            else:
+                resposta = await self.cliente_http.request(metodo, url, data=dados, files=files)
+            limitador.registrar_uso(resposta.headers)
+
+            try:
+                corpo = resposta.json()
+            except ValueError:
+                corpo = resposta.text
+
+            if not resposta.is_error and not (isinstance(corpo, dict) and "error" in corpo):
+                return corpo
+
+            erro = corpo.get("error", {}) if isinstance(corpo, dict) else {}
+            if eh_limitacao_uso(erro.get("code")) and tentativa < META_MAX_TENTATIVAS_LIMITE:
+                espera = limitador.registrar_limitacao()
+                logger.warning(f"Conta {self.account_id} limitada pelo Meta (código {erro.get('code')}); "
+                               f"nova tentativa em {espera:.0f}s")
+                rebobinar_arquivos(files)
+                continue
+
+            raise MetaGraphAPIError(
+                erro.get("error_user_msg") or erro.get("message") or str(corpo),
+                resposta.status_code,
+                codigo=erro.get("code"),
+                subcodigo=erro.get("error_subcode"),
+                corpo=corpo,
+                headers=dict(resposta.headers)
+            )
+
+    async def check_account_access(self) -> bool:
+        """
+        Verifica se temos acesso à conta de anúncios.
+
+        Returns:
+            bool: True se o acesso for válido, False caso contrário
+        """
+        try:
+            await self._requisicao("GET", f"act_{self.account_id}", {"fields": "name,account_status"})
+            return True
+        except MetaGraphAPIError as e:
+            logger.error(f"Erro ao acessar a conta: {e}")
+            return False
+
+    async def criar_campanha(self, nome, objetivo, orcamento_diario=None, orcamento_lifetime=None,
+                             data_inicio=None, data_fim=None, status="PAUSED") -> str:
+        """
+        Cria uma nova campanha publicitária no Meta ADS.
+
+        Args:
+            nome (str): Nome da campanha
+            objetivo (str): Objetivo da campanha (Ex: REACH, TRAFFIC, CONVERSIONS)
+            orcamento_diario (float, optional): Orçamento diário
+            orcamento_lifetime (float, optional): Orçamento total da campanha
+            data_inicio (datetime, optional): Data de início da campanha
+            data_fim (datetime, optional): Data de término da campanha
+            status (str, optional): Status inicial da campanha. Default para "PAUSED"
+
+        Returns:
+            str: ID da campanha criada
+        """
+        params = params_campanha(nome, objetivo, orcamento_diario, orcamento_lifetime,
+                                 data_inicio, data_fim, status)
+        resposta = await self._requisicao("POST", f"act_{self.account_id}/campaigns", params)
+        logger.info(f"Campanha criada com sucesso: {resposta['id']}")
+        return resposta["id"]
+
+    async def criar_conjunto_anuncios(self, campanha_id, nome, objetivo_otimizacao, segmentacao,
+                                      orcamento_diario=None, orcamento_lifetime=None,
+                                      data_inicio=None, data_fim=None, status="PAUSED") -> str:
+        """
+        Cria um novo conjunto de anúncios (Ad Set) no Meta ADS.
+
+        Args:
+            campanha_id (str): ID da campanha
+            nome (str): Nome do conjunto de anúncios
+            objetivo_otimizacao (str): Objetivo de otimização (Ex: REACH, LINK_CLICKS)
+            segmentacao (dict): Configurações de segmentação
+            orcamento_diario (float, optional): Orçamento diário
+            orcamento_lifetime (float, optional): Orçamento total do conjunto
+            data_inicio (datetime, optional): Data de início
+            data_fim (datetime, optional): Data de término
+            status (str, optional): Status inicial. Default para "PAUSED"
+
+        Returns:
+            str: ID do conjunto de anúncios criado
+        """
+        params = params_conjunto_anuncios(campanha_id, nome, objetivo_otimizacao, segmentacao,
+                                          orcamento_diario, orcamento_lifetime,
+                                          data_inicio, data_fim, status)
+        resposta = await self._requisicao("POST", f"act_{self.account_id}/adsets", params)
+        logger.info(f"Conjunto de anúncios criado com sucesso: {resposta['id']}")
+        return resposta["id"]
+
+    async def criar_anuncio(self, conjunto_anuncios_id, nome, creative_id, status="PAUSED") -> str:
+        """
+        Cria um novo anúncio no Meta ADS.
+
+        Args:
+            conjunto_anuncios_id (str): ID do conjunto de anúncios
+            nome (str): Nome do anúncio
+            creative_id (str): ID do criativo a ser usado
+            status (str, optional): Status inicial. Default para "PAUSED"
+
+        Returns:
+            str: ID do anúncio criado
+        """
+        params = params_anuncio(conjunto_anuncios_id, nome, creative_id, status)
+        resposta = await self._requisicao("POST", f"act_{self.account_id}/ads", params)
+        logger.info(f"Anúncio criado com sucesso: {resposta['id']}")
+        return resposta["id"]
+
+    async def carregar_imagem(self, caminho_imagem: str) -> str:
+        """
+        Faz upload de uma imagem para a conta e retorna seu hash.
+
+        Args:
+            caminho_imagem (str): Caminho local da imagem
+
+        Returns:
+            str: Hash da imagem no Meta ADS
+        """
+        hashes = await self.carregar_imagens([caminho_imagem])
+        return hashes[caminho_imagem]
+
+    async def carregar_imagens(self, caminhos: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Faz upload de várias imagens para a conta, várias por requisição.
+
+        Imagens cujo conteúdo já foi carregado nesta conta não são enviadas novamente.
+
+        Args:
+            caminhos (List[str]): Caminhos locais das imagens
+
+        Returns:
+            Dict[str, Optional[str]]: Hash da imagem no Meta ADS por caminho
+        """
+        shas, hashes, blocos = await asyncio.to_thread(planejar_envio, self.account_id, caminhos)
+
+        for bloco in blocos:
+            with ExitStack() as pilha:
+                arquivos = {nome: (nome, pilha.enter_context(open(caminho, "rb"))) for caminho, _, nome in bloco}
+                resposta = await self._requisicao("POST", f"act_{self.account_id}/adimages", files=arquivos)
+            novos = hashes_enviados(bloco, resposta)
+            registro_imagens.registrar(self.account_id, novos)
+            hashes.update(novos)
+
+        return {caminho: hashes.get(sha) for caminho, sha in shas.items()}
+
+    async def carregar_video(self, caminho_video: str, titulo: Optional[str] = None,
+                             aguardar_codificacao: bool = False) -> str:
+        """
+        Faz upload de um vídeo pelo protocolo em partes (start/transfer/finish).
+
+        O arquivo é lido do disco um trecho por vez, no intervalo pedido pelo servidor.
+        O progresso é salvo após cada trecho, e um upload interrompido do mesmo arquivo
+        é retomado do último trecho aceito.
+
+        Args:
+            caminho_video (str): Caminho local do vídeo
+            titulo (str, optional): Título do vídeo. Default para o nome do arquivo
+            aguardar_codificacao (bool, optional): Se deve aguardar o vídeo ficar pronto
+
+        Returns:
+            str: ID do vídeo no Meta ADS
+        """
+        sessao = await asyncio.to_thread(SessaoUploadVideo, self.account_id, caminho_video, titulo)
+        retomada = sessao.iniciada
+
+        try:
+            video_id = await self._enviar_video(sessao)
+        except MetaGraphAPIError as e:
+            if not retomada:
+                raise
+            # A sessão salva pode ter expirado no servidor: recomeçar do zero
+            logger.warning(f"Não foi possível retomar o upload de {caminho_video} ({e}); reiniciando")
+            sessao.descartar_estado()
+            video_id = await self._enviar_video(sessao)
+
+        if aguardar_codificacao:
+            await self.aguardar_codificacao_video(video_id)
+        return video_id
+
+    async def _enviar_video(self, sessao: SessaoUploadVideo) -> str:
+        if not sessao.iniciada:
+            sessao.registrar_inicio(await self._requisicao("POST", sessao.caminho_api, sessao.params_inicio()))
+
+        while not sessao.transferida:
+            params, arquivos = await asyncio.to_thread(sessao.ler_trecho)
+            try:
+                resposta = await self._requisicao("POST", sessao.caminho_api, params, files=arquivos)
+            except MetaGraphAPIError as e:
+                if not sessao.recuperar_de_erro(e.corpo):
+                    raise
+                await asyncio.sleep(sessao.tentativas)
+                continue
+            sessao.registrar_trecho(resposta)
+
+        await self._requisicao("POST", sessao.caminho_api, sessao.params_finalizacao())
+        return sessao.concluir()
+
+    async def carregar_videos(self, caminhos: List[str], aguardar_codificacao: bool = False,
+                              max_concorrencia: int = VIDEOS_MAX_CONCORRENCIA) -> Dict[str, Any]:
+        """
+        Faz upload de vários vídeos simultaneamente.
+
+        Args:
+            caminhos (List[str]): Caminhos locais dos vídeos
+            aguardar_codificacao (bool, optional): Se deve aguardar os vídeos ficarem prontos
+            max_concorrencia (int, optional): Vídeos enviados ao mesmo tempo
+
+        Returns:
+            Dict[str, Any]: ID do vídeo (ou a exceção do upload que falhou) por caminho
+        """
+        semaforo = asyncio.Semaphore(max_concorrencia)
+
+        async def carregar(caminho):
+            async with semaforo:
+                return await self.carregar_video(caminho, aguardar_codificacao=aguardar_codificacao)
+
+        caminhos = list(dict.fromkeys(caminhos))
+        resultados = await asyncio.gather(*(carregar(c) for c in caminhos), return_exceptions=True)
+        return dict(zip(caminhos, resultados))
+
+    async def aguardar_codificacao_video(self, video_id: str) -> Dict[str, Any]:
+        """
+        Aguarda, sem bloquear o event loop, a codificação de um vídeo carregado.
+
+        Args:
+            video_id (str): ID do vídeo
+
+        Returns:
+            Dict[str, Any]: Status final do vídeo
+        """
+        limite = time.monotonic() + VIDEO_TIMEOUT_CODIFICACAO
+        while True:
+            resposta = await self._requisicao("GET", video_id, {"fields": "status"})
+            situacao = status_codificacao(resposta)
+            if situacao == STATUS_VIDEO_PRONTO:
+                return resposta["status"]
+            if situacao == STATUS_VIDEO_ERRO:
+                raise RuntimeError(f"Codificação do vídeo {video_id} falhou: {resposta.get('status')}")
+            if time.monotonic() > limite:
+                raise TimeoutError(f"Vídeo {video_id} não codificado a tempo")
+
+            await asyncio.sleep(VIDEO_INTERVALO_POLLING)
+
+    async def criar_criativo(self, titulo, texto, cta, url_destino, imagem_url=None, imagem_hash=None,
+                             formato="LINK", video_url=None, video_id=None) -> str:
+        """
+        Cria um novo criativo para anúncios no Meta ADS.
+
+        Args:
+            titulo (str): Título do anúncio
+            texto (str): Texto principal do anúncio
+            cta (str): Call-to-action (Ex: LEARN_MORE, SHOP_NOW)
+            url_destino (str): URL de destino do anúncio
+            imagem_url (str, optional): Caminho da imagem a ser carregada
+            imagem_hash (str, optional): Hash de uma imagem já carregada
+            formato (str, optional): Formato do criativo. Default para "LINK"
+            video_url (str, optional): Caminho do vídeo a ser carregado
+            video_id (str, optional): ID de um vídeo já carregado
+
+        Returns:
+            str: ID do criativo criado
+        """
+        if imagem_url and not imagem_hash:
+            imagem_hash = await self.carregar_imagem(imagem_url)
+        if video_url and not video_id:
+            video_id = await self.carregar_video(video_url, titulo, aguardar_codificacao=True)
+
+        params = params_criativo(titulo, texto, cta, url_destino, imagem_hash, video_id=video_id)
+        resposta = await self._requisicao("POST", f"act_{self.account_id}/adcreatives", params)
+        logger.info(f"Criativo criado com sucesso: {resposta['id']}")
+        return resposta["id"]
+
+    async def _enviar_lote(self, itens: List[Dict[str, Any]]) -> List[Any]:
+        return await self._requisicao("POST", "", {"batch": itens, "include_headers": False})
+
+    async def implantar_campanha(self, arvore: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Implanta a árvore completa de uma campanha usando requisições em lote.
+
+        Args:
+            arvore (Dict[str, Any]): Estrutura da campanha (ver montar_operacoes_campanha)
+
+        Returns:
+            Dict[str, Any]: ID da campanha, resultado por nó, número de requisições e indicador de sucesso
+        """
+        with prioridade(PRIORIDADE_INTERATIVA):
+            arvore = copy.deepcopy(arvore)
+            criativos = criativos_sem_hash(arvore)
+            if criativos:
+                hashes = await self.carregar_imagens([criativo["imagem_url"] for criativo in criativos])
+                for criativo in criativos:
+                    criativo["imagem_hash"] = hashes[criativo["imagem_url"]]
+
+            criativos = criativos_sem_video(arvore)
+            if criativos:
+                videos = await self.carregar_videos([criativo["video_url"] for criativo in criativos],
+                                                    aguardar_codificacao=True)
+                for criativo in criativos:
+                    video_id = videos[criativo["video_url"]]
+                    if isinstance(video_id, Exception):
+                        raise video_id
+                    criativo["video_id"] = video_id
+
+            operacoes = montar_operacoes_campanha(self.account_id, arvore)
+            resultado = await executar_operacoes_async(operacoes, self._enviar_lote)
+            resultado["campanha_id"] = resultado["resultados"].get("campanha", {}).get("id")
+            return resultado
+
+    async def obter_arvore_campanha(self, campanha_id=None, nome=None) -> Optional[Dict[str, Any]]:
+        """
+        Lê em uma única requisição a campanha com seus conjuntos, anúncios e criativos.
+
+        Args:
+            campanha_id (str, optional): ID da campanha
+            nome (str, optional): Nome da campanha, usado quando o ID não é informado
+
+        Returns:
+            Optional[Dict[str, Any]]: Campanha com as arestas adsets e ads expandidas, ou None se não existir
+        """
+        if campanha_id:
+            return await self._requisicao("GET", str(campanha_id), {"fields": CAMPOS_ARVORE_CAMPANHA})
+
+        resposta = await self._requisicao("GET", f"act_{self.account_id}/campaigns", {
+            "fields": CAMPOS_ARVORE_CAMPANHA,
+            "filtering": [{"field": "name", "operator": "EQUAL", "value": nome}],
+            "limit": 5,
+        })
+        campanhas = [c for c in resposta.get("data", []) if c.get("status") != "DELETED"]
+        return campanhas[0] if campanhas else None
+
+    async def sincronizar_campanha(self, arvore: Dict[str, Any], campanha_id: Optional[str] = None,
+                                   simular: bool = False) -> Dict[str, Any]:
+        """
+        Leva a campanha existente à árvore desejada com o mínimo de operações em lote.
+
+        Args:
+            arvore (Dict[str, Any]): Estrutura da campanha (ver montar_operacoes_campanha)
+            campanha_id (str, optional): ID da campanha. Default para a busca pelo nome da árvore
+            simular (bool, optional): Se True, apenas retorna as ações planejadas
+
+        Returns:
+            Dict[str, Any]: ID da campanha, ações, contagem por ação, conflitos, resultado por
+                            operação, número de requisições e indicador de sucesso
+        """
+        with prioridade(PRIORIDADE_INTERATIVA):
+            arvore = copy.deepcopy(arvore)
+            atual = await self.obter_arvore_campanha(campanha_id, arvore["campanha"]["nome"])
+            plano = planejar_sincronizacao(self.account_id, arvore, atual)
+
+            if simular:
+                return resultado_sincronizacao(plano, None, atual and atual["id"])
+
+            pendentes = plano["midias_pendentes"]
+            if pendentes:
+                imagens = [c for c in pendentes if c.get("imagem_url") and not c.get("imagem_hash")]
+                if imagens:
+                    hashes = await self.carregar_imagens([c["imagem_url"] for c in imagens])
+                    for criativo in imagens:
+                        criativo["imagem_hash"] = hashes[criativo["imagem_url"]]
+
+                videos = [c for c in pendentes if c.get("video_url") and not c.get("video_id")]
+                if videos:
+                    ids = await self.carregar_videos([c["video_url"] for c in videos], aguardar_codificacao=True)
+                    for criativo in videos:
+                        if isinstance(ids[criativo["video_url"]], Exception):
+                            raise ids[criativo["video_url"]]
+                        criativo["video_id"] = ids[criativo["video_url"]]
+                plano = planejar_sincronizacao(self.account_id, arvore, atual)
+
+            execucao = await executar_operacoes_async(plano["operacoes"], self._enviar_lote)
+            return resultado_sincronizacao(plano, execucao, atual and atual["id"])
+
+    async def obter_metricas_campanha(self, campanha_id, data_inicio=None, data_fim=None,
+                                      metricas=None) -> Dict[str, Any]:
+        """
+        Obtém métricas de desempenho de uma campanha.
+
+        Args:
+            campanha_id (str): ID da campanha
+            data_inicio (datetime, optional): Data inicial para as métricas
+            data_fim (datetime, optional): Data final para as métricas
+            metricas (list, optional): Lista de métricas a serem obtidas
+
+        Returns:
+            dict: Métricas da campanha
+        """
+        data_inicio = data_inicio or datetime.now() - timedelta(days=30)
+        data_fim = data_fim or datetime.now()
+        metricas = metricas or ['impressions', 'clicks', 'ctr', 'spend', 'cpc', 'reach', 'frequency']
+
+        resposta = await self._requisicao("GET", f"{campanha_id}/insights", {
+            "time_range": {
+                "since": data_inicio.strftime("%Y-%m-%d"),
+                "until": data_fim.strftime("%Y-%m-%d"),
+            },
+            "fields": ",".join(metricas),
+        })
+        dados = resposta.get("data", [])
+        return dados[0] if dados else {}
+
+    async def obter_insights_conta(self, nivel="campaign", data_inicio=None, data_fim=None,
+                                   incremento_tempo=None, breakdowns=None, metricas=None,
+                                   filtros=None, assincrono=None, limite_pagina=500) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Obtém insights de todos os objetos da conta em um único relatório.
+
+        As linhas são produzidas página a página, sem acumular o relatório em memória.
+        Períodos longos ou com breakdowns usam um relatório assíncrono.
+
+        Args:
+            nivel (str, optional): Nível de agregação (account, campaign, adset, ad). Default para "campaign"
+            data_inicio (datetime, optional): Data inicial. Default para 30 dias atrás
+            data_fim (datetime, optional): Data final. Default para hoje
+            incremento_tempo (int|str, optional): Dias por linha (1 = diário), "monthly" ou "all_days"
+            breakdowns (list, optional): Quebras adicionais (Ex: age, gender, publisher_platform)
+            metricas (list, optional): Métricas a serem obtidas
+            filtros (list, optional): Filtros no formato da Graph API
+            assincrono (bool, optional): Força (ou impede) o uso de relatório assíncrono.
+                                       Se None, decide pelo tamanho do período.
+            limite_pagina (int, optional): Linhas por página. Default para 500
+
+        Yields:
+            Dict[str, Any]: Uma linha de insights
+        """
+        data_inicio = data_inicio or datetime.now() - timedelta(days=30)
+        data_fim = data_fim or datetime.now()
+        if assincrono is None:
+            assincrono = requer_relatorio_assincrono(data_inicio, data_fim, breakdowns)
+
+        params = params_insights(nivel, data_inicio, data_fim, incremento_tempo, breakdowns,
+                                 metricas, filtros, limite_pagina)
+
+        if assincrono:
+            relatorio = await self._requisicao("POST", f"act_{self.account_id}/insights", params)
+            relatorio_id = await self._aguardar_relatorio(relatorio["report_run_id"])
+            caminho, params = f"{relatorio_id}/insights", {"limit": limite_pagina}
+        else:
+            caminho = f"act_{self.account_id}/insights"
+
+        while True:
+            pagina = await self._requisicao("GET", caminho, params)
+            for linha in pagina.get("data", []):
+                yield linha
+
+            cursor = pagina.get("paging", {})
+            if "next" not in cursor:
+                break
+            params = {**params, "after": cursor["cursors"]["after"]}
+
+    async def _aguardar_relatorio(self, relatorio_id: str) -> str:
+        """
+        Aguarda, sem bloquear o event loop, a conclusão de um relatório assíncrono.
+
+        Args:
+            relatorio_id (str): ID do relatório (report_run_id)
+
+        Returns:
+            str: ID do relatório concluído
+        """
+        limite = time.monotonic() + INSIGHTS_TIMEOUT_RELATORIO
+        while True:
+            relatorio = await self._requisicao(
+                "GET", relatorio_id, {"fields": "async_status,async_percent_completion"}
+            )
+            situacao = relatorio.get("async_status")
+            if situacao == "Job Completed":
+                return relatorio_id
+            if situacao in ("Job Failed", "Job Skipped"):
+                raise RuntimeError(f"Relatório de insights {relatorio_id} terminou com status: {situacao}")
+            if time.monotonic() > limite:
+                raise TimeoutError(f"Relatório de insights {relatorio_id} não concluído a tempo")
+
+            await asyncio.sleep(INSIGHTS_INTERVALO_POLLING)
+
+    async def buscar_interesses(self, termo_busca, limite=10) -> List[Dict[str, Any]]:
+        """
+        Busca interesses para segmentação com base em um termo.
+
+        Args:
+            termo_busca (str): Termo para busca de interesses
+            limite (int, optional): Número máximo de resultados. Default para 10
+
+        Returns:
+            list: Lista de interesses encontrados
+        """
+        interesses = cache_interesses.obter(termo_busca, limite)
+        if interesses is not None:
+            return interesses
+
+        resposta = await self._requisicao("GET", "search", {
+            "q": termo_busca,
+            "type": "adinterest",
+            "limit": limite,
+        })
+        interesses = resposta.get("data", [])
+        cache_interesses.guardar(termo_busca, limite, interesses)
+        return interesses
+
+    async def buscar_interesses_em_lote(self, termos, limite=10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Busca interesses para vários termos de uma vez, consultando apenas os ausentes do cache.
+
+        Args:
+            termos (list): Termos para busca de interesses
+            limite (int, optional): Número máximo de resultados por termo. Default para 10
+
+        Returns:
+            dict: Lista de interesses encontrados por termo (vazia se a busca falhou)
+        """
+        encontrados, pendentes = cache_interesses.separar(termos, limite)
+
+        if pendentes:
+            execucao = await executar_operacoes_async(
+                montar_operacoes_busca_interesses(pendentes, limite), self._enviar_lote
+            )
+            for termo, interesses in interesses_do_lote(pendentes, execucao).items():
+                if interesses is not None:
+                    cache_interesses.guardar(termo, limite, interesses)
+                encontrados[normalizar_termo(termo)] = interesses or []
+
+        return {termo: encontrados[normalizar_termo(termo)] for termo in termos}
+
+    async def atualizar_status(self, objeto_id, status) -> bool:
+        """
+        Atualiza o status de uma campanha, conjunto de anúncios ou anúncio.
+
+        Args:
+            objeto_id (str): ID do objeto
+            status (str): Novo status (ACTIVE, PAUSED, ARCHIVED)
+
+        Returns:
+            bool: True se a atualização for bem-sucedida, False caso contrário
+        """
+        try:
+            await self._requisicao("POST", str(objeto_id), {"status": status})
+            logger.info(f"Status do objeto {objeto_id} atualizado para {status}")
+            return True
+        except MetaGraphAPIError as e:
+            logger.error(f"Erro ao atualizar status do objeto {objeto_id}: {e}")
+            return False
+
+    async def atualizar_status_campanha(self, campanha_id, status) -> bool:
+        """
+        Atualiza o status de uma campanha.
+
+        Args:
+            campanha_id (str): ID da campanha
+            status (str): Novo status (ACTIVE, PAUSED, ARCHIVED)
+
+        Returns:
+            bool: True se a atualização for bem-sucedida, False caso contrário
+        """
+        return await self.atualizar_status(campanha_id, status)
+
+    async def aplicar_mutacoes(self, mutacoes: List[Dict[str, Any]], reverter_em_falha: bool = True) -> Dict[str, Any]:
+        """
+        Altera status, orçamentos e lances de várias campanhas, conjuntos e anúncios de uma vez.
+
+        Args:
+            mutacoes (List[Dict[str, Any]]): Alterações (ver normalizar_mutacoes)
+            reverter_em_falha (bool, optional): Se deve desfazer as alterações após uma falha parcial
+
+        Returns:
+            Dict[str, Any]: Resultado por objeto, contagem por status, requisições e indicador de sucesso
+        """
+        with prioridade(PRIORIDADE_INTERATIVA):
+            mutacoes = normalizar_mutacoes(mutacoes)
+            leitura, execucao, reversao, anteriores = None, None, None, {}
+
+            if reverter_em_falha:
+                leitura = await self._executar_concorrente(montar_operacoes_leitura(mutacoes))
+                anteriores = valores_anteriores(mutacoes, leitura)
+
+            if leitura is None or leitura["sucesso"]:
+                execucao = await self._executar_concorrente(montar_operacoes_mutacao(mutacoes))
+                if reverter_em_falha and not execucao["sucesso"]:
+                    logger.warning("Falha parcial na alteração em massa; revertendo as alterações aplicadas")
+                    a_reverter = valores_a_reverter(mutacoes, execucao, anteriores)
+                    reversao = await self._executar_concorrente(
+                        montar_operacoes_mutacao(mutacoes, a_reverter, "reverter"))
+
+            return relatorio_mutacoes(mutacoes, leitura, execucao, reversao, anteriores)
+
+    async def _executar_concorrente(self, operacoes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return await executar_operacoes_concorrentes_async(operacoes, self._enviar_lote,
+                                                           META_MUTACOES_MAX_CONCORRENCIA)
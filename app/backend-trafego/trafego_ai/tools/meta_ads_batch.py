@@ -0,0 +1,436 @@
+"""
+Implementação da implantação de campanhas completas via requisições em lote da Graph API
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Awaitable, Callable, Optional
+
+from backend.trafego_ai.tools.meta_ads_params import (
+    params_campanha,
+    params_conjunto_anuncios,
+    params_anuncio,
+    params_criativo,
+    codificar_corpo
+)
+
+logger = logging.getLogger(__name__)
+
+# Limite de operações por requisição em lote imposto pela Graph API
+TAMANHO_MAXIMO_LOTE = 50
+
+# Referência ao ID produzido por outra operação do mesmo lote
+_PADRAO_REFERENCIA_CODIFICADA = re.compile(r"%7Bresult%3D([A-Za-z0-9_]+)%3A%24\.id%7D")
+_PADRAO_REFERENCIA = re.compile(r"\{result=([A-Za-z0-9_]+):\$\.id\}")
+
+
+def referencia(nome_operacao: str) -> str:
+    """
+    Gera a referência ao ID criado por outra operação do lote.
+
+    Args:
+        nome_operacao (str): Nome da operação referenciada
+
+    Returns:
+        str: Expressão JSONPath de referência da Graph API
+    """
+    return f"{{result={nome_operacao}:$.id}}"
+
+
+def nova_operacao(nome: str, metodo: str, url_relativa: str, params: Optional[Dict[str, Any]] = None,
+                  tipo: Optional[str] = None, rotulo: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Cria uma operação de lote.
+
+    As dependências são deduzidas das referências presentes nos parâmetros.
+
+    Args:
+        nome (str): Nome único da operação no lote
+        metodo (str): Método HTTP (GET, POST, DELETE)
+        url_relativa (str): URL relativa ao endpoint da Graph API
+        params (Dict[str, Any], optional): Parâmetros da operação
+        tipo (str, optional): Tipo do objeto afetado (campanha, conjunto, criativo, anuncio)
+        rotulo (str, optional): Nome legível do objeto para o relatório
+
+    Returns:
+        Dict[str, Any]: Operação de lote
+    """
+    corpo = codificar_corpo(params) if params and metodo != "GET" else ""
+    if params and metodo == "GET":
+        url_relativa = f"{url_relativa}?{codificar_corpo(params)}"
+    # As referências precisam chegar à Graph API sem codificação
+    corpo = _PADRAO_REFERENCIA_CODIFICADA.sub(r"{result=\1:$.id}", corpo)
+    url_relativa = _PADRAO_REFERENCIA_CODIFICADA.sub(r"{result=\1:$.id}", url_relativa)
+
+    return {
+        "nome": nome,
+        "metodo": metodo,
+        "url_relativa": url_relativa,
+        "corpo": corpo,
+        "depende_de": sorted(set(_PADRAO_REFERENCIA.findall(corpo + url_relativa))),
+        "tipo": tipo,
+        "rotulo": rotulo or nome
+    }
+
+
+def montar_operacoes_campanha(account_id: str, arvore: Dict[str, Any],
+                              page_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Converte a árvore de uma campanha em operações de lote em ordem de dependência.
+
+    A árvore tem o formato:
+        {
+            "campanha": {parâmetros de criar_campanha},
+            "conjuntos": [
+                {parâmetros de criar_conjunto_anuncios (sem campanha_id),
+                 "anuncios": [
+                     {"nome": ..., "status": ..., "creative_id": ...}
+                     ou {"nome": ..., "criativo": {parâmetros de criar_criativo}}
+                     (o criativo pode ter imagem_hash ou imagem_url, e video_id ou video_url)
+                 ]}
+            ]
+        }
+
+    Args:
+        account_id (str): ID da conta publicitária (sem o prefixo act_)
+        arvore (Dict[str, Any]): Estrutura completa da campanha
+        page_id (str, optional): ID da Página do Facebook usada nos criativos
+
+    Returns:
+        List[Dict[str, Any]]: Operações de lote
+    """
+    conta = f"act_{account_id}"
+    campanha = arvore["campanha"]
+    operacoes = [nova_operacao(
+        "campanha", "POST", f"{conta}/campaigns", params_campanha(**campanha),
+        tipo="campanha", rotulo=campanha["nome"]
+    )]
+
+    for i, conjunto in enumerate(arvore.get("conjuntos", [])):
+        dados_conjunto = {k: v for k, v in conjunto.items() if k != "anuncios"}
+        nome_conjunto = f"conjunto_{i}"
+        operacoes.append(nova_operacao(
+            nome_conjunto, "POST", f"{conta}/adsets",
+            params_conjunto_anuncios(referencia("campanha"), **dados_conjunto),
+            tipo="conjunto", rotulo=conjunto["nome"]
+        ))
+
+        for j, anuncio in enumerate(conjunto.get("anuncios", [])):
+            creative_id = anuncio.get("creative_id")
+            if not creative_id:
+                nome_criativo = f"criativo_{i}_{j}"
+                criativo = anuncio["criativo"]
+                operacoes.append(nova_operacao(
+                    nome_criativo, "POST", f"{conta}/adcreatives",
+                    params_criativo(
+                        criativo["titulo"], criativo["texto"], criativo["cta"], criativo["url_destino"],
+                        imagem_hash=criativo.get("imagem_hash"), page_id=page_id,
+                        video_id=criativo.get("video_id")
+                    ),
+                    tipo="criativo", rotulo=f"Criativo - {criativo['titulo'][:20]}"
+                ))
+                creative_id = referencia(nome_criativo)
+
+            operacoes.append(nova_operacao(
+                f"anuncio_{i}_{j}", "POST", f"{conta}/ads",
+                params_anuncio(referencia(nome_conjunto), anuncio["nome"], creative_id,
+                               status=anuncio.get("status", "PAUSED")),
+                tipo="anuncio", rotulo=anuncio["nome"]
+            ))
+
+    return operacoes
+
+
+def criativos_sem_hash(arvore: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Lista os criativos da árvore de uma campanha com imagem local ainda não carregada.
+
+    Args:
+        arvore (Dict[str, Any]): Estrutura completa da campanha
+
+    Returns:
+        List[Dict[str, Any]]: Criativos com imagem_url e sem imagem_hash
+    """
+    return [
+        anuncio["criativo"]
+        for conjunto in arvore.get("conjuntos", [])
+        for anuncio in conjunto.get("anuncios", [])
+        if anuncio.get("criativo", {}).get("imagem_url") and not anuncio["criativo"].get("imagem_hash")
+    ]
+
+
+def criativos_sem_video(arvore: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Lista os criativos da árvore de uma campanha com vídeo local ainda não carregado.
+
+    Args:
+        arvore (Dict[str, Any]): Estrutura completa da campanha
+
+    Returns:
+        List[Dict[str, Any]]: Criativos com video_url e sem video_id
+    """
+    return [
+        anuncio["criativo"]
+        for conjunto in arvore.get("conjuntos", [])
+        for anuncio in conjunto.get("anuncios", [])
+        if anuncio.get("criativo", {}).get("video_url") and not anuncio["criativo"].get("video_id")
+    ]
+
+
+def montar_operacoes_busca_interesses(termos: List[str], limite: int = 10) -> List[Dict[str, Any]]:
+    """
+    Converte vários termos em operações de busca de interesses para um único lote.
+
+    Args:
+        termos (List[str]): Termos de busca
+        limite (int, optional): Número máximo de resultados por termo. Default para 10
+
+    Returns:
+        List[Dict[str, Any]]: Operações de lote, nomeadas busca_0, busca_1, ...
+    """
+    return [
+        nova_operacao(f"busca_{i}", "GET", "search",
+                      {'q': termo, 'type': 'adinterest', 'limit': limite},
+                      tipo="busca", rotulo=termo)
+        for i, termo in enumerate(termos)
+    ]
+
+
+def interesses_do_lote(termos: List[str], execucao: Dict[str, Any]) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+    """
+    Extrai os interesses encontrados para cada termo do resultado de um lote de buscas.
+
+    Args:
+        termos (List[str]): Termos na ordem usada em montar_operacoes_busca_interesses
+        execucao (Dict[str, Any]): Resultado de executar_operacoes
+
+    Returns:
+        Dict[str, Optional[List[Dict[str, Any]]]]: Interesses por termo (None se a busca falhou)
+    """
+    interesses = {}
+    for i, termo in enumerate(termos):
+        resultado = execucao["resultados"].get(f"busca_{i}", {})
+        if resultado.get("status") == "sucesso":
+            interesses[termo] = resultado["resposta"].get("data", [])
+        else:
+            logger.warning(f"Busca de interesses por '{termo}' falhou: {resultado.get('erro')}")
+            interesses[termo] = None
+    return interesses
+
+
+def _extrair_erro(corpo: Any) -> str:
+    if isinstance(corpo, dict) and "error" in corpo:
+        erro = corpo["error"]
+        return erro.get("error_user_msg") or erro.get("message") or json.dumps(erro)
+    return str(corpo)
+
+
+class _ExecucaoLote:
+    """
+    Estado de uma execução em lote: IDs já criados e resultado por operação.
+    """
+
+    def __init__(self, operacoes: List[Dict[str, Any]], tamanho_lote: int):
+        self.operacoes = operacoes
+        self.tamanho_lote = tamanho_lote
+        self.resultados: Dict[str, Dict[str, Any]] = {}
+        self.ids: Dict[str, str] = {}
+        self.requisicoes = 0
+
+    def _substituir(self, texto: str) -> str:
+        return _PADRAO_REFERENCIA.sub(lambda m: self.ids.get(m.group(1), m.group(0)), texto)
+
+    def _registrar(self, operacao: Dict[str, Any], status: str, id_objeto=None, erro=None, resposta=None):
+        resultado = {"tipo": operacao["tipo"], "nome": operacao["rotulo"], "status": status,
+                     "id": id_objeto, "erro": erro}
+        if resposta is not None:
+            resultado["resposta"] = resposta
+        self.resultados[operacao["nome"]] = resultado
+
+    def blocos(self):
+        """
+        Gera, para cada bloco de até tamanho_lote operações, as operações enviadas e os
+        itens no formato da Graph API. Operações cuja dependência falhou são ignoradas.
+        """
+        for inicio in range(0, len(self.operacoes), self.tamanho_lote):
+            nomes_no_bloco = set()
+            enviados = []
+            itens = []
+
+            for operacao in self.operacoes[inicio:inicio + self.tamanho_lote]:
+                falhas = [d for d in operacao["depende_de"] if d not in self.ids and d not in nomes_no_bloco]
+                if falhas:
+                    self._registrar(operacao, "ignorado", erro=f"Dependência não criada: {', '.join(falhas)}")
+                    continue
+
+                item = {
+                    "method": operacao["metodo"],
+                    "relative_url": self._substituir(operacao["url_relativa"]),
+                    "name": operacao["nome"],
+                    "omit_response_on_success": False
+                }
+                if operacao["corpo"]:
+                    item["body"] = self._substituir(operacao["corpo"])
+                itens.append(item)
+                enviados.append(operacao)
+                nomes_no_bloco.add(operacao["nome"])
+
+            if itens:
+                self.requisicoes += 1
+                yield enviados, itens
+
+    def processar_respostas(self, enviados: List[Dict[str, Any]], respostas: Optional[List[Any]],
+                            erro_lote: Optional[str] = None):
+        """
+        Registra o resultado de cada operação de um bloco a partir das respostas da Graph API.
+        """
+        respostas = list(respostas or [])
+        respostas += [None] * (len(enviados) - len(respostas))
+
+        for operacao, resposta in zip(enviados, respostas):
+            if resposta is None:
+                self._registrar(operacao, "erro", erro=erro_lote or "Operação não executada pela Graph API")
+                continue
+
+            corpo = resposta.get("body")
+            try:
+                corpo = json.loads(corpo) if isinstance(corpo, str) else corpo
+            except ValueError:
+                pass
+
+            if resposta.get("code") == 200 and isinstance(corpo, dict) and "error" not in corpo:
+                self.ids[operacao["nome"]] = corpo.get("id")
+                self._registrar(operacao, "sucesso", id_objeto=corpo.get("id"), resposta=corpo)
+            else:
+                self._registrar(operacao, "erro", erro=_extrair_erro(corpo))
+
+    def resumo(self) -> Dict[str, Any]:
+        return {
+            "resultados": self.resultados,
+            "requisicoes": self.requisicoes,
+            "sucesso": all(r["status"] == "sucesso" for r in self.resultados.values())
+        }
+
+
+def executar_operacoes(operacoes: List[Dict[str, Any]], enviar_lote: Callable[[List[Dict[str, Any]]], List[Any]],
+                       tamanho_lote: int = TAMANHO_MAXIMO_LOTE) -> Dict[str, Any]:
+    """
+    Executa operações em requisições em lote de até 50 itens.
+
+    Dependências dentro do mesmo lote são resolvidas pela própria Graph API; para
+    dependências em lotes anteriores, a referência é substituída pelo ID já obtido.
+    Operações cuja dependência falhou não são enviadas.
+
+    Args:
+        operacoes (List[Dict[str, Any]]): Operações em ordem de dependência
+        enviar_lote (Callable): Função que envia a lista de itens no formato da Graph API
+                                e retorna a lista de respostas
+        tamanho_lote (int, optional): Número máximo de operações por requisição
+
+    Returns:
+        Dict[str, Any]: Resultado por operação, total de requisições e indicador de sucesso
+    """
+    execucao = _ExecucaoLote(operacoes, tamanho_lote)
+    for enviados, itens in execucao.blocos():
+        try:
+            respostas = enviar_lote(itens)
+        except Exception as e:
+            logger.error(f"Erro ao enviar lote de {len(itens)} operações: {e}")
+            execucao.processar_respostas(enviados, None, str(e))
+        else:
+            execucao.processar_respostas(enviados, respostas)
+    return execucao.resumo()
+
+
+async def executar_operacoes_async(operacoes: List[Dict[str, Any]],
+                                   enviar_lote: Callable[[List[Dict[str, Any]]], Awaitable[List[Any]]],
+                                   tamanho_lote: int = TAMANHO_MAXIMO_LOTE) -> Dict[str, Any]:
+    """
+    Versão assíncrona de executar_operacoes, para clientes baseados em asyncio.
+
+    Args:
+        operacoes (List[Dict[str, Any]]): Operações em ordem de dependência
+        enviar_lote (Callable): Corrotina que envia a lista de itens e retorna as respostas
+        tamanho_lote (int, optional): Número máximo de operações por requisição
+
+    Returns:
+        Dict[str, Any]: Resultado por operação, total de requisições e indicador de sucesso
+    """
+    execucao = _ExecucaoLote(operacoes, tamanho_lote)
+    for enviados, itens in execucao.blocos():
+        try:
+            respostas = await enviar_lote(itens)
+        except Exception as e:
+            logger.error(f"Erro ao enviar lote de {len(itens)} operações: {e}")
+            execucao.processar_respostas(enviados, None, str(e))
+        else:
+            execucao.processar_respostas(enviados, respostas)
+    return execucao.resumo()
+
+
+def _combinar_execucoes(execucoes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    resultados = {}
+    for execucao in execucoes:
+        resultados.update(execucao["resultados"])
+    return {
+        "resultados": resultados,
+        "requisicoes": sum(e["requisicoes"] for e in execucoes),
+        "sucesso": all(e["sucesso"] for e in execucoes)
+    }
+
+
+def executar_operacoes_concorrentes(operacoes: List[Dict[str, Any]],
+                                    enviar_lote: Callable[[List[Dict[str, Any]]], List[Any]],
+                                    max_concorrencia: int,
+                                    tamanho_lote: int = TAMANHO_MAXIMO_LOTE) -> Dict[str, Any]:
+    """
+    Executa operações independentes entre si (sem referências) em vários lotes simultâneos.
+
+    Args:
+        operacoes (List[Dict[str, Any]]): Operações sem dependências
+        enviar_lote (Callable): Função que envia a lista de itens e retorna as respostas
+        max_concorrencia (int): Número máximo de requisições em lote simultâneas
+        tamanho_lote (int, optional): Número máximo de operações por requisição
+
+    Returns:
+        Dict[str, Any]: Resultado por operação, total de requisições e indicador de sucesso
+    """
+    blocos = [operacoes[i:i + tamanho_lote] for i in range(0, len(operacoes), tamanho_lote)]
+    if len(blocos) <= 1:
+        return executar_operacoes(operacoes, enviar_lote, tamanho_lote)
+
+    # Cada thread recebe uma cópia do contexto, preservando a prioridade da chamada no agendador
+    with ThreadPoolExecutor(max_workers=max_concorrencia) as executor:
+        futuros = [executor.submit(contextvars.copy_context().run, executar_operacoes, bloco, enviar_lote, tamanho_lote)
+                   for bloco in blocos]
+        return _combinar_execucoes([futuro.result() for futuro in futuros])
+
+
+async def executar_operacoes_concorrentes_async(operacoes: List[Dict[str, Any]],
+                                                enviar_lote: Callable[[List[Dict[str, Any]]], Awaitable[List[Any]]],
+                                                max_concorrencia: int,
+                                                tamanho_lote: int = TAMANHO_MAXIMO_LOTE) -> Dict[str, Any]:
+    """
+    Versão assíncrona de executar_operacoes_concorrentes.
+
+    Args:
+        operacoes (List[Dict[str, Any]]): Operações sem dependências
+        enviar_lote (Callable): Corrotina que envia a lista de itens e retorna as respostas
+        max_concorrencia (int): Número máximo de requisições em lote simultâneas
+        tamanho_lote (int, optional): Número máximo de operações por requisição
+
+    Returns:
+        Dict[str, Any]: Resultado por operação, total de requisições e indicador de sucesso
+    """
+    semaforo = asyncio.Semaphore(max_concorrencia)
+
+    async def executar(bloco):
+        async with semaforo:
+            return await executar_operacoes_async(bloco, enviar_lote, tamanho_lote)
+
+    blocos = [operacoes[i:i + tamanho_lote] for i in range(0, len(operacoes), tamanho_lote)]
+    return _combinar_execucoes(await asyncio.gather(*(executar(bloco) for bloco in blocos)))
+
@@ -0,0 +1,277 @@
+"""
+Montagem dos parâmetros dos objetos do Meta ADS, compartilhada pelos clientes da Graph API
+"""
+import json
+from typing import Dict, Any, Optional
+from urllib.parse import urlencode
+
+from backend.trafego_ai.config.settings import INSIGHTS_LIMITE_DIAS_SINCRONO
+
+# ID da Página do Facebook - deve ser substituído pelo ID real
+PAGE_ID_PADRAO = '123456789'
+
+
+def _formatar_data(data) -> str:
+    return data.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+
+def _aplicar_orcamento_e_datas(params: Dict[str, Any], orcamento_diario=None, orcamento_lifetime=None,
+                               data_inicio=None, data_fim=None):
+    # Configurar orçamento
+    if orcamento_diario:
+        params['daily_budget'] = int(round(orcamento_diario * 100))  # Converter para centavos
+    elif orcamento_lifetime:
+        params['lifetime_budget'] = int(round(orcamento_lifetime * 100))  # Converter para centavos
+
+    # Configurar datas
+    if data_inicio:
+        params['start_time'] = _formatar_data(data_inicio)
+    if data_fim:
+        params['end_time'] = _formatar_data(data_fim)
+
+
+def params_campanha(nome, objetivo, orcamento_diario=None, orcamento_lifetime=None,
+                    data_inicio=None, data_fim=None, status="PAUSED") -> Dict[str, Any]:
+    """
+    Monta os parâmetros de criação de uma campanha.
+
+    Args:
+        nome (str): Nome da campanha
+        objetivo (str): Objetivo da campanha (Ex: REACH, TRAFFIC, CONVERSIONS)
+        orcamento_diario (float, optional): Orçamento diário
+        orcamento_lifetime (float, optional): Orçamento total da campanha
+        data_inicio (datetime, optional): Data de início da campanha
+        data_fim (datetime, optional): Data de término da campanha
+        status (str, optional): Status inicial da campanha. Default para "PAUSED"
+
+    Returns:
+        Dict[str, Any]: Parâmetros para a Graph API
+    """
+    params = {
+        'name': nome,
+        'objective': objetivo,
+        'status': status,
+        'special_ad_categories': [],
+    }
+    _aplicar_orcamento_e_datas(params, orcamento_diario, orcamento_lifetime, data_inicio, data_fim)
+    return params
+
+
+def params_conjunto_anuncios(campanha_id, nome, objetivo_otimizacao, segmentacao,
+                             orcamento_diario=None, orcamento_lifetime=None,
+                             data_inicio=None, data_fim=None, status="PAUSED") -> Dict[str, Any]:
+    """
+    Monta os parâmetros de criação de um conjunto de anúncios.
+
+    Args:
+        campanha_id (str): ID da campanha (ou referência de lote)
+        nome (str): Nome do conjunto de anúncios
+        objetivo_otimizacao (str): Objetivo de otimização (Ex: REACH, LINK_CLICKS)
+        segmentacao (dict): Configurações de segmentação
+        orcamento_diario (float, optional): Orçamento diário
+        orcamento_lifetime (float, optional): Orçamento total do conjunto
+        data_inicio (datetime, optional): Data de início
+        data_fim (datetime, optional): Data de término
+        status (str, optional): Status inicial. Default para "PAUSED"
+
+    Returns:
+        Dict[str, Any]: Parâmetros para a Graph API
+    """
+    params = {
+        'name': nome,
+        'campaign_id': campanha_id,
+        'optimization_goal': objetivo_otimizacao,
+        'billing_event': 'IMPRESSIONS',  # ou LINK_CLICKS, APP_INSTALLS, etc.
+        'status': status,
+        'targeting': segmentacao,
+    }
+    _aplicar_orcamento_e_datas(params, orcamento_diario, orcamento_lifetime, data_inicio, data_fim)
+    return params
+
+
+def params_anuncio(conjunto_anuncios_id, nome, creative_id, status="PAUSED") -> Dict[str, Any]:
+    """
+    Monta os parâmetros de criação de um anúncio.
+
+    Args:
+        conjunto_anuncios_id (str): ID do conjunto de anúncios (ou referência de lote)
+        nome (str): Nome do anúncio
+        creative_id (str): ID do criativo (ou referência de lote)
+        status (str, optional): Status inicial. Default para "PAUSED"
+
+    Returns:
+        Dict[str, Any]: Parâmetros para a Graph API
+    """
+    return {
+        'name': nome,
+        'adset_id': conjunto_anuncios_id,
+        'creative': {'creative_id': creative_id},
+        'status': status,
+    }
+
+
+def params_criativo(titulo, texto, cta, url_destino, imagem_hash=None,
+                    page_id: Optional[str] = None, video_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Monta os parâmetros de criação de um criativo de link ou de vídeo.
+
+    Args:
+        titulo (str): Título do anúncio
+        texto (str): Texto principal do anúncio
+        cta (str): Call-to-action (Ex: LEARN_MORE, SHOP_NOW)
+        url_destino (str): URL de destino do anúncio
+        imagem_hash (str, optional): Hash de uma imagem já carregada (miniatura, no caso de vídeo)
+        page_id (str, optional): ID da Página do Facebook
+        video_id (str, optional): ID de um vídeo já carregado
+
+    Returns:
+        Dict[str, Any]: Parâmetros para a Graph API
+    """
+    if video_id:
+        video_data = {
+            'video_id': video_id,
+            'message': texto,
+            'title': titulo,
+            'call_to_action': {'type': cta, 'value': {'link': url_destino}},
+        }
+        if imagem_hash:
+            video_data['image_hash'] = imagem_hash
+        return {
+            'name': f'Criativo - {titulo[:20]}',
+            'object_story_spec': {
+                'page_id': page_id or PAGE_ID_PADRAO,
+                'video_data': video_data,
+            }
+        }
+
+    params = {
+        'name': f'Criativo - {titulo[:20]}',
+        'object_story_spec': {
+            'page_id': page_id or PAGE_ID_PADRAO,
+            'link_data': {
+                'message': texto,
+                'link': url_destino,
+                'name': titulo,
+                'call_to_action': {'type': cta},
+            }
+        }
+    }
+
+    # Adicionar a imagem ao criativo
+    if imagem_hash:
+        params['object_story_spec']['link_data']['image_hash'] = imagem_hash
+
+    return params
+
+
+# Níveis de agregação aceitos pelo endpoint de insights
+NIVEIS_INSIGHTS = ("account", "campaign", "adset", "ad")
+
+# Métricas padrão dos insights em massa
+METRICAS_INSIGHTS_PADRAO = [
+    'impressions',
+    'clicks',
+    'ctr',
+    'spend',
+    'cpc',
+    'cpm',
+    'reach',
+    'frequency',
+    'actions',
+]
+
+# Campos de identificação incluídos automaticamente em cada nível
+_CAMPOS_NIVEL = {
+    "account": ["account_id"],
+    "campaign": ["campaign_id", "campaign_name"],
+    "adset": ["campaign_id", "adset_id", "adset_name"],
+    "ad": ["campaign_id", "adset_id", "ad_id", "ad_name"],
+}
+
+
+def params_insights(nivel, data_inicio, data_fim, incremento_tempo=None, breakdowns=None,
+                    metricas=None, filtros=None, limite_pagina=500) -> Dict[str, Any]:
+    """
+    Monta os parâmetros de uma consulta de insights no nível da conta.
+
+    Args:
+        nivel (str): Nível de agregação (account, campaign, adset, ad)
+        data_inicio (datetime): Data inicial
+        data_fim (datetime): Data final
+        incremento_tempo (int|str, optional): Dias por linha (1 = diário) ou "monthly"/"all_days"
+        breakdowns (list, optional): Quebras adicionais (Ex: age, gender, publisher_platform)
+        metricas (list, optional): Métricas a serem obtidas
+        filtros (list, optional): Filtros no formato da Graph API
+        limite_pagina (int, optional): Linhas por página. Default para 500
+
+    Returns:
+        Dict[str, Any]: Parâmetros para a Graph API
+
+    Raises:
+        ValueError: Se o nível não for válido
+    """
+    if nivel not in NIVEIS_INSIGHTS:
+        raise ValueError(f"Nível inválido: {nivel}. Use um de {', '.join(NIVEIS_INSIGHTS)}")
+
+    campos = _CAMPOS_NIVEL[nivel] + list(metricas or METRICAS_INSIGHTS_PADRAO)
+    params = {
+        'level': nivel,
+        'fields': ",".join(dict.fromkeys(campos)),
+        'time_range': {
+            'since': data_inicio.strftime("%Y-%m-%d"),
+            'until': data_fim.strftime("%Y-%m-%d"),
+        },
+        'limit': limite_pagina,
+    }
+    if incremento_tempo:
+        params['time_increment'] = str(incremento_tempo)
+    if breakdowns:
+        params['breakdowns'] = ",".join(breakdowns)
+    if filtros:
+        params['filtering'] = filtros
+    return params
+
+
+def requer_relatorio_assincrono(data_inicio, data_fim, breakdowns=None) -> bool:
+    """
+    Indica se a consulta de insights deve usar um relatório assíncrono (AdReportRun).
+
+    Args:
+        data_inicio (datetime): Data inicial
+        data_fim (datetime): Data final
+        breakdowns (list, optional): Quebras adicionais
+
+    Returns:
+        bool: True para períodos longos ou consultas com breakdowns
+    """
+    return bool(breakdowns) or (data_fim - data_inicio).days + 1 > INSIGHTS_LIMITE_DIAS_SINCRONO
+
+
+def codificar_params(params: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Codifica os parâmetros no formato esperado pela Graph API (objetos em JSON).
+
+    Args:
+        params (Dict[str, Any]): Parâmetros a serem codificados
+
+    Returns:
+        Dict[str, str]: Parâmetros com valores textuais
+    """
+    return {
+        chave: valor if isinstance(valor, str) else json.dumps(valor)
+        for chave, valor in params.items()
+        if valor is not None
+    }
+
+
+def codificar_corpo(params: Dict[str, Any]) -> str:
+    """
+    Codifica os parâmetros como corpo x-www-form-urlencoded de uma operação em lote.
+
+    Args:
+        params (Dict[str, Any]): Parâmetros da operação
+
+    Returns:
+        str: Corpo codificado
+    """
+    return urlencode(codificar_params(params))
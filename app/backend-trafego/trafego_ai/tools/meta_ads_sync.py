@@ -0,0 +1,312 @@
+"""
+Implementação da sincronização idempotente de campanhas: diferença mínima entre a árvore desejada e a existente
+"""
+import json
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from backend.trafego_ai.tools.meta_ads_params import (
+    params_campanha,
+    params_conjunto_anuncios,
+    params_anuncio,
+    params_criativo
+)
+from backend.trafego_ai.tools.meta_ads_batch import nova_operacao, referencia
+
+logger = logging.getLogger(__name__)
+
+# Árvore completa de uma campanha em uma única leitura, por expansão de campos
+CAMPOS_ARVORE_CAMPANHA = (
+    "name,status,objective,daily_budget,lifetime_budget,start_time,stop_time,"
+    "adsets.limit(500){name,status,optimization_goal,targeting,daily_budget,lifetime_budget,start_time,end_time,"
+    "ads.limit(500){name,status,creative{id,name,object_story_spec}}}"
+)
+
+# Status que não são alterados quando o objeto sai da árvore desejada
+STATUS_INATIVOS = {"PAUSED", "ARCHIVED", "DELETED"}
+
+# Campos comparados por tipo; os demais parâmetros de criação não podem ser alterados depois
+_CAMPOS_COMPARADOS = {
+    "campanha": ("daily_budget", "lifetime_budget", "start_time", "end_time"),
+    "conjunto": ("optimization_goal", "targeting", "daily_budget", "lifetime_budget", "start_time", "end_time"),
+}
+
+# Campos que a Graph API não permite alterar após a criação
+_CAMPOS_IMUTAVEIS = {"campanha": ("objective",)}
+
+# Campos com nome diferente no objeto do Meta (a data de término da campanha é stop_time)
+_CAMPOS_META = {"campanha": {"end_time": "stop_time"}, "conjunto": {}}
+
+
+def _normalizar(valor: Any) -> Any:
+    if isinstance(valor, bool) or valor is None:
+        return valor
+    if isinstance(valor, (int, float)):
+        return str(int(valor)) if float(valor).is_integer() else str(valor)
+    if isinstance(valor, str):
+        try:
+            data = datetime.fromisoformat(valor)
+        except ValueError:
+            return valor
+        return data.replace(tzinfo=None).isoformat() if "T" in valor else valor
+    if isinstance(valor, dict):
+        return {chave: _normalizar(v) for chave, v in valor.items()}
+    if isinstance(valor, list):
+        return [_normalizar(v) for v in valor]
+    return valor
+
+
+def contido(desejado: Any, atual: Any) -> bool:
+    """
+    Indica se o valor desejado já está refletido no atual.
+
+    Dicionários são comparados como subconjunto, pois a Graph API acrescenta campos
+    próprios (Ex: na segmentação e no object_story_spec); números e datas são normalizados.
+
+    Args:
+        desejado (Any): Valor da árvore desejada
+        atual (Any): Valor retornado pela Graph API
+
+    Returns:
+        bool: True se não há diferença
+    """
+    if isinstance(atual, str) and isinstance(desejado, (dict, list)):
+        try:
+            atual = json.loads(atual)
+        except ValueError:
+            return False
+    if isinstance(desejado, dict):
+        return isinstance(atual, dict) and all(contido(v, atual.get(k)) for k, v in desejado.items())
+    if isinstance(desejado, list):
+        return (isinstance(atual, list) and len(desejado) == len(atual)
+                and all(contido(d, a) for d, a in zip(desejado, atual)))
+    return _normalizar(desejado) == _normalizar(atual)
+
+
+def _diferencas(tipo: str, desejado: Dict[str, Any], atual: Dict[str, Any], explicitos) -> Dict[str, Any]:
+    campos = [c for c in _CAMPOS_COMPARADOS[tipo] if c in desejado]
+    # O status só é comparado quando informado na árvore, para não desfazer ativações manuais
+    if "status" in explicitos:
+        campos.append("status")
+    nomes = _CAMPOS_META[tipo]
+    return {nomes.get(c, c): desejado[c] for c in campos if not contido(desejado[c], atual.get(nomes.get(c, c)))}
+
+
+def _por_nome(objetos: List[Dict[str, Any]]):
+    indice, sobras = {}, []
+    for objeto in objetos:
+        if objeto.get("status") == "DELETED":
+            continue
+        # Duplicatas de implantações anteriores ficam fora do índice e são pausadas como sobras
+        if objeto.get("name") in indice:
+            sobras.append(objeto)
+        else:
+            indice[objeto.get("name")] = objeto
+    return indice, sobras
+
+
+def _dados(aresta: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return (aresta or {}).get("data", [])
+
+
+def _especificacao_criativo(criativo: Dict[str, Any], page_id: Optional[str]) -> Dict[str, Any]:
+    return params_criativo(
+        criativo["titulo"], criativo["texto"], criativo["cta"], criativo["url_destino"],
+        imagem_hash=criativo.get("imagem_hash"), page_id=page_id, video_id=criativo.get("video_id")
+    )
+
+
+def _midia_pendente(criativo: Dict[str, Any]) -> bool:
+    return bool((criativo.get("imagem_url") and not criativo.get("imagem_hash"))
+                or (criativo.get("video_url") and not criativo.get("video_id")))
+
+
+def _sem_midia_pendente(especificacao: Dict[str, Any], criativo: Dict[str, Any]) -> Dict[str, Any]:
+    # Mídia local ainda não carregada é comparada sem o hash/ID, que só existirão após o upload
+    especificacao = json.loads(json.dumps(especificacao))
+    for dados in especificacao["object_story_spec"].values():
+        if isinstance(dados, dict):
+            if criativo.get("imagem_url") and not criativo.get("imagem_hash"):
+                dados.pop("image_hash", None)
+            if criativo.get("video_url") and not criativo.get("video_id"):
+                dados.pop("video_id", None)
+    return especificacao
+
+
+class _Plano:
+    """
+    Acumula as operações e o resumo de um plano de sincronização.
+    """
+
+    def __init__(self, account_id: str, page_id: Optional[str]):
+        self.conta = f"act_{account_id}"
+        self.page_id = page_id
+        self.operacoes: List[Dict[str, Any]] = []
+        self.acoes: List[Dict[str, Any]] = []
+        self.conflitos: List[Dict[str, Any]] = []
+        self.midias_pendentes: List[Dict[str, Any]] = []
+        self.inalterados = 0
+
+    def criar(self, nome: str, aresta: str, params: Dict[str, Any], tipo: str, rotulo: str):
+        self.operacoes.append(nova_operacao(nome, "POST", f"{self.conta}/{aresta}", params, tipo=tipo, rotulo=rotulo))
+        self.acoes.append({"acao": "criar", "tipo": tipo, "nome": rotulo})
+
+    def atualizar(self, objeto: Dict[str, Any], campos: Dict[str, Any], tipo: str):
+        if not campos:
+            self.inalterados += 1
+            return
+        self.operacoes.append(nova_operacao(f"atualizar_{objeto['id']}", "POST", str(objeto["id"]), campos,
+                                            tipo=tipo, rotulo=objeto.get("name")))
+        self.acoes.append({"acao": "atualizar", "tipo": tipo, "nome": objeto.get("name"), "id": objeto["id"],
+                           "campos": sorted(campos)})
+
+    def pausar(self, objeto: Dict[str, Any], tipo: str):
+        if objeto.get("status") in STATUS_INATIVOS:
+            return
+        self.operacoes.append(nova_operacao(f"pausar_{objeto['id']}", "POST", str(objeto["id"]), {"status": "PAUSED"},
+                                            tipo=tipo, rotulo=objeto.get("name")))
+        self.acoes.append({"acao": "pausar", "tipo": tipo, "nome": objeto.get("name"), "id": objeto["id"]})
+
+    def resumo(self) -> Dict[str, Any]:
+        contagem = {"criar": 0, "atualizar": 0, "pausar": 0}
+        for acao in self.acoes:
+            contagem[acao["acao"]] += 1
+        return {
+            "operacoes": self.operacoes,
+            "acoes": self.acoes,
+            "contagem": {**contagem, "inalterados": self.inalterados},
+            "conflitos": self.conflitos,
+            "midias_pendentes": self.midias_pendentes,
+        }
+
+
+def planejar_sincronizacao(account_id: str, arvore: Dict[str, Any], atual: Optional[Dict[str, Any]] = None,
+                           page_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Calcula as operações mínimas para levar a campanha existente à árvore desejada.
+
+    Campanha, conjuntos e anúncios são identificados pelo nome (conjuntos dentro da
+    campanha, anúncios dentro do conjunto). Objetos ausentes são criados, objetos com
+    campos diferentes são atualizados e objetos existentes fora da árvore são pausados.
+    Criativos são imutáveis no Meta: um criativo diferente gera um novo criativo e a
+    troca no anúncio. Campos omitidos na árvore (incluindo o status) não são alterados.
+
+    Args:
+        account_id (str): ID da conta publicitária (sem o prefixo act_)
+        arvore (Dict[str, Any]): Estrutura desejada (ver montar_operacoes_campanha)
+        atual (Dict[str, Any], optional): Campanha existente lida com CAMPOS_ARVORE_CAMPANHA, ou None
+        page_id (str, optional): ID da Página do Facebook usada nos criativos
+
+    Returns:
+        Dict[str, Any]: Operações de lote, ações planejadas, contagem por ação, conflitos e os
+                        criativos com mídia local que precisa ser carregada antes da execução
+    """
+    plano = _Plano(account_id, page_id)
+    campanha = arvore["campanha"]
+    desejado = params_campanha(**campanha)
+
+    if atual is None:
+        plano.criar("campanha", "campaigns", desejado, "campanha", campanha["nome"])
+        id_campanha = referencia("campanha")
+        conjuntos_atuais, sobras = {}, []
+    else:
+        id_campanha = atual["id"]
+        for campo in _CAMPOS_IMUTAVEIS["campanha"]:
+            if campo in desejado and not contido(desejado[campo], atual.get(campo)):
+                plano.conflitos.append({"tipo": "campanha", "nome": campanha["nome"], "campo": campo,
+                                        "atual": atual.get(campo), "desejado": desejado[campo]})
+        plano.atualizar(atual, _diferencas("campanha", desejado, atual, campanha), "campanha")
+        conjuntos_atuais, sobras = _por_nome(_dados(atual.get("adsets")))
+
+    nomes_conjuntos = set()
+    for i, conjunto in enumerate(arvore.get("conjuntos", [])):
+        dados_conjunto = {k: v for k, v in conjunto.items() if k != "anuncios"}
+        desejado = params_conjunto_anuncios(id_campanha, **dados_conjunto)
+        nomes_conjuntos.add(conjunto["nome"])
+        conjunto_atual = conjuntos_atuais.get(conjunto["nome"])
+
+        if conjunto_atual is None:
+            nome_operacao = f"conjunto_{i}"
+            plano.criar(nome_operacao, "adsets", desejado, "conjunto", conjunto["nome"])
+            id_conjunto = referencia(nome_operacao)
+            anuncios_atuais, anuncios_sobrando = {}, []
+        else:
+            id_conjunto = conjunto_atual["id"]
+            plano.atualizar(conjunto_atual, _diferencas("conjunto", desejado, conjunto_atual, conjunto), "conjunto")
+            anuncios_atuais, anuncios_sobrando = _por_nome(_dados(conjunto_atual.get("ads")))
+
+        nomes_anuncios = set()
+        for j, anuncio in enumerate(conjunto.get("anuncios", [])):
+            nomes_anuncios.add(anuncio["nome"])
+            _planejar_anuncio(plano, anuncio, anuncios_atuais.get(anuncio["nome"]), id_conjunto, f"{i}_{j}")
+
+        for anuncio_atual in anuncios_sobrando + [a for n, a in anuncios_atuais.items() if n not in nomes_anuncios]:
+            plano.pausar(anuncio_atual, "anuncio")
+
+    for conjunto_atual in sobras + [c for n, c in conjuntos_atuais.items() if n not in nomes_conjuntos]:
+        plano.pausar(conjunto_atual, "conjunto")
+
+    return plano.resumo()
+
+
+def _planejar_anuncio(plano: _Plano, anuncio: Dict[str, Any], atual: Optional[Dict[str, Any]],
+                      id_conjunto: str, sufixo: str):
+    creative_id = anuncio.get("creative_id")
+    criativo = anuncio.get("criativo")
+    criativo_atual = (atual or {}).get("creative") or {}
+
+    # Decidir se o criativo atual serve ou se um novo deve ser criado
+    novo_criativo = False
+    if not creative_id:
+        especificacao = _especificacao_criativo(criativo, plano.page_id)
+        comparavel = _sem_midia_pendente(especificacao, criativo)
+        if atual is not None and contido(comparavel["object_story_spec"], criativo_atual.get("object_story_spec")):
+            creative_id = criativo_atual.get("id")
+        else:
+            novo_criativo = True
+            if _midia_pendente(criativo):
+                plano.midias_pendentes.append(criativo)
+            nome_criativo = f"criativo_{sufixo}"
+            plano.criar(nome_criativo, "adcreatives", especificacao, "criativo", especificacao["name"])
+            creative_id = referencia(nome_criativo)
+
+    if atual is None:
+        plano.criar(f"anuncio_{sufixo}", "ads",
+                    params_anuncio(id_conjunto, anuncio["nome"], creative_id, status=anuncio.get("status", "PAUSED")),
+                    "anuncio", anuncio["nome"])
+        return
+
+    campos = {}
+    if novo_criativo or str(creative_id) != str(criativo_atual.get("id")):
+        campos["creative"] = {"creative_id": creative_id}
+    if "status" in anuncio and not contido(anuncio["status"], atual.get("status")):
+        campos["status"] = anuncio["status"]
+    plano.atualizar(atual, campos, "anuncio")
+
+
+def resultado_sincronizacao(plano: Dict[str, Any], execucao: Optional[Dict[str, Any]],
+                            campanha_id: Optional[str]) -> Dict[str, Any]:
+    """
+    Monta o retorno da sincronização a partir do plano e da execução das operações.
+
+    Args:
+        plano (Dict[str, Any]): Retorno de planejar_sincronizacao
+        execucao (Dict[str, Any], optional): Retorno de executar_operacoes, ou None em uma simulação
+        campanha_id (str, optional): ID da campanha existente, ou None se foi criada agora
+
+    Returns:
+        Dict[str, Any]: ID da campanha, ações, contagem, conflitos, resultado por operação,
+                        número de requisições e indicador de sucesso
+    """
+    execucao = execucao or {"resultados": {}, "requisicoes": 0, "sucesso": True}
+    if campanha_id is None:
+        campanha_id = execucao["resultados"].get("campanha", {}).get("id")
+    return {
+        "campanha_id": campanha_id,
+        "acoes": plano["acoes"],
+        "contagem": plano["contagem"],
+        "conflitos": plano["conflitos"],
+        **execucao,
+    }
+
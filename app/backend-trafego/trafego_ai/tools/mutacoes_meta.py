@@ -0,0 +1,206 @@
+"""
+Implementação das alterações em massa de status, orçamento e lance, com reversão em caso de falha parcial
+"""
+import logging
+from typing import List, Dict, Any, Optional
+
+from backend.trafego_ai.tools.meta_ads_batch import nova_operacao
+
+logger = logging.getLogger(__name__)
+
+# Campos aceitos em uma alteração e o campo correspondente na Graph API
+CAMPOS_MUTAVEIS = {
+    "status": "status",
+    "orcamento_diario": "daily_budget",
+    "orcamento_lifetime": "lifetime_budget",
+    "lance": "bid_amount",
+    "estrategia_lance": "bid_strategy",
+}
+
+# Valores monetários são informados na moeda da conta e enviados em centavos
+_CAMPOS_MONETARIOS = {"orcamento_diario", "orcamento_lifetime", "lance"}
+
+_TIPOS = {"campanha", "conjunto", "anuncio"}
+
+
+def normalizar_mutacoes(mutacoes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Valida as alterações e as converte para os parâmetros da Graph API.
+
+    Cada alteração informa o ID do objeto (campanha, conjunto ou anúncio) e ao menos
+    um dos campos de CAMPOS_MUTAVEIS. Ex: {"id": "123", "tipo": "campanha", "status": "PAUSED"}
+
+    Args:
+        mutacoes (List[Dict[str, Any]]): Alterações desejadas
+
+    Returns:
+        List[Dict[str, Any]]: ID, tipo e parâmetros da Graph API de cada alteração
+
+    Raises:
+        ValueError: Se uma alteração não tiver ID, repetir um objeto ou tiver campos desconhecidos
+    """
+    normalizadas, vistos = [], set()
+    for mutacao in mutacoes:
+        objeto_id = str(mutacao.get("id") or "")
+        if not objeto_id:
+            raise ValueError(f"Alteração sem ID do objeto: {mutacao}")
+        if objeto_id in vistos:
+            raise ValueError(f"Objeto {objeto_id} alterado mais de uma vez")
+        vistos.add(objeto_id)
+
+        tipo = mutacao.get("tipo")
+        if tipo is not None and tipo not in _TIPOS:
+            raise ValueError(f"Tipo de objeto inválido: {tipo}")
+        desconhecidos = set(mutacao) - set(CAMPOS_MUTAVEIS) - {"id", "tipo"}
+        if desconhecidos:
+            raise ValueError(f"Campos não suportados na alteração de {objeto_id}: {', '.join(sorted(desconhecidos))}")
+
+        params = {}
+        for campo, valor in mutacao.items():
+            if campo in CAMPOS_MUTAVEIS and valor is not None:
+                params[CAMPOS_MUTAVEIS[campo]] = int(round(valor * 100)) if campo in _CAMPOS_MONETARIOS else valor
+        if not params:
+            raise ValueError(f"Nenhum campo a alterar em {objeto_id}")
+
+        normalizadas.append({"id": objeto_id, "tipo": tipo, "params": params})
+    return normalizadas
+
+
+def montar_operacoes_leitura(mutacoes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Monta as leituras dos valores atuais dos campos alterados, usados na reversão.
+
+    Args:
+        mutacoes (List[Dict[str, Any]]): Retorno de normalizar_mutacoes
+
+    Returns:
+        List[Dict[str, Any]]: Operações de lote (uma por objeto)
+    """
+    return [
+        nova_operacao(f"ler_{i}", "GET", m["id"], {"fields": ",".join(sorted(m["params"]))},
+                      tipo=m["tipo"], rotulo=m["id"])
+        for i, m in enumerate(mutacoes)
+    ]
+
+
+def montar_operacoes_mutacao(mutacoes: List[Dict[str, Any]],
+                             anteriores: Optional[Dict[int, Dict[str, Any]]] = None,
+                             nome: str = "alterar") -> List[Dict[str, Any]]:
+    """
+    Monta as operações de escrita das alterações, ou da reversão quando os valores
+    anteriores são informados.
+
+    Args:
+        mutacoes (List[Dict[str, Any]]): Retorno de normalizar_mutacoes
+        anteriores (Dict[int, Dict[str, Any]], optional): Valores a restaurar por índice da alteração
+        nome (str, optional): Prefixo do nome das operações
+
+    Returns:
+        List[Dict[str, Any]]: Operações de lote, independentes entre si
+    """
+    operacoes = []
+    for i, mutacao in enumerate(mutacoes):
+        params = mutacao["params"] if anteriores is None else anteriores.get(i)
+        if params:
+            operacoes.append(nova_operacao(f"{nome}_{i}", "POST", mutacao["id"], params,
+                                           tipo=mutacao["tipo"], rotulo=mutacao["id"]))
+    return operacoes
+
+
+def valores_anteriores(mutacoes: List[Dict[str, Any]], leitura: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+    """
+    Extrai da leitura prévia os valores que desfazem cada alteração.
+
+    Campos ausentes no objeto (Ex: orçamento diário em um conjunto com orçamento total)
+    não podem ser restaurados e ficam fora da reversão.
+
+    Args:
+        mutacoes (List[Dict[str, Any]]): Retorno de normalizar_mutacoes
+        leitura (Dict[str, Any]): Retorno de executar_operacoes para montar_operacoes_leitura
+
+    Returns:
+        Dict[int, Dict[str, Any]]: Valores atuais por índice das alterações lidas com sucesso
+    """
+    anteriores = {}
+    for i, mutacao in enumerate(mutacoes):
+        resultado = leitura["resultados"].get(f"ler_{i}", {})
+        if resultado.get("status") == "sucesso":
+            objeto = resultado.get("resposta") or {}
+            anteriores[i] = {campo: objeto[campo] for campo in mutacao["params"] if objeto.get(campo) is not None}
+    return anteriores
+
+
+def valores_a_reverter(mutacoes: List[Dict[str, Any]], execucao: Dict[str, Any],
+                       anteriores: Dict[int, Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """
+    Seleciona os valores anteriores das alterações que foram aplicadas.
+
+    Args:
+        mutacoes (List[Dict[str, Any]]): Retorno de normalizar_mutacoes
+        execucao (Dict[str, Any]): Execução das alterações
+        anteriores (Dict[int, Dict[str, Any]]): Retorno de valores_anteriores
+
+    Returns:
+        Dict[int, Dict[str, Any]]: Valores a restaurar por índice da alteração
+    """
+    return {
+        i: anteriores.get(i, {})
+        for i in range(len(mutacoes))
+        if execucao["resultados"].get(f"alterar_{i}", {}).get("status") == "sucesso"
+    }
+
+
+def relatorio_mutacoes(mutacoes: List[Dict[str, Any]], leitura: Optional[Dict[str, Any]],
+                       execucao: Optional[Dict[str, Any]], reversao: Optional[Dict[str, Any]],
+                       anteriores: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Monta o relatório por objeto de uma alteração em massa.
+
+    O status de cada objeto é aplicado, revertido, erro (a alteração falhou),
+    nao_enviado (a alteração não foi enviada por falha em outro objeto) ou
+    reversao_falhou (a alteração ficou aplicada).
+
+    Args:
+        mutacoes (List[Dict[str, Any]]): Retorno de normalizar_mutacoes
+        leitura (Dict[str, Any], optional): Execução da leitura prévia
+        execucao (Dict[str, Any], optional): Execução das alterações, ou None se não foram enviadas
+        reversao (Dict[str, Any], optional): Execução da reversão, ou None se não houve
+        anteriores (Dict[int, Dict[str, Any]]): Retorno de valores_anteriores
+
+    Returns:
+        Dict[str, Any]: Resultado por objeto, contagem por status, requisições e indicador de sucesso
+    """
+    objetos = []
+    for i, mutacao in enumerate(mutacoes):
+        item = {"id": mutacao["id"], "tipo": mutacao["tipo"], "alteracao": mutacao["params"],
+                "anterior": anteriores.get(i), "erro": None}
+
+        lido = (leitura or {}).get("resultados", {}).get(f"ler_{i}")
+        alterado = (execucao or {}).get("resultados", {}).get(f"alterar_{i}")
+        revertido = (reversao or {}).get("resultados", {}).get(f"reverter_{i}")
+
+        if lido is not None and lido["status"] != "sucesso":
+            item["status"], item["erro"] = "erro", lido["erro"]
+        elif alterado is None:
+            item["status"] = "nao_enviado"
+        elif alterado["status"] != "sucesso":
+            item["status"], item["erro"] = "erro", alterado["erro"]
+        elif reversao is None:
+            item["status"] = "aplicado"
+        elif revertido is not None and revertido["status"] == "sucesso":
+            item["status"] = "revertido"
+        else:
+            item["status"] = "reversao_falhou"
+            item["erro"] = revertido["erro"] if revertido else "Valores anteriores desconhecidos"
+        objetos.append(item)
+
+    contagem: Dict[str, int] = {}
+    for item in objetos:
+        contagem[item["status"]] = contagem.get(item["status"], 0) + 1
+
+    return {
+        "objetos": objetos,
+        "contagem": contagem,
+        "requisicoes": sum((e or {}).get("requisicoes", 0) for e in (leitura, execucao, reversao)),
+        "sucesso": all(item["status"] == "aplicado" for item in objetos),
+    }
@@ -0,0 +1,212 @@
+"""
+Implementação do registro de sessões da API do Meta ADS por conta, sem estado global no SDK
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from facebook_business.adobjects.adaccount import AdAccount
+from facebook_business.api import FacebookAdsApi
+from facebook_business.exceptions import FacebookRequestError
+from facebook_business.session import FacebookSession
+
+from backend.trafego_ai.config.settings import (
+    META_APP_ID,
+    META_APP_SECRET,
+    META_ACCESS_TOKEN,
+    META_ACCOUNT_ID,
+    META_GRAPH_URL,
+    META_GRAPH_API_VERSION,
+    META_TIMEOUT,
+    META_SESSAO_TTL,
+    META_SESSOES_MAX,
+    META_MAX_TENTATIVAS_LIMITE
+)
+from backend.trafego_ai.tools.agendador_meta import agendador_meta, eh_limitacao_uso, rebobinar_arquivos
+
+logger = logging.getLogger(__name__)
+
+
+def _conta_do_caminho(caminho) -> Optional[str]:
+    partes = caminho.split("/") if isinstance(caminho, str) else [str(p) for p in caminho]
+    for parte in partes:
+        if parte.startswith("act_"):
+            return parte
+    return None
+
+
+class FacebookAdsApiAgendada(FacebookAdsApi):
+    """
+    FacebookAdsApi que passa cada chamada pelo agendador da conta e repete as
+    chamadas recusadas por limitação de uso.
+    """
+
+    # Conta das chamadas cujo caminho não a identifica (definida pelo registro de sessões)
+    conta: Optional[str] = None
+
+    def call(self, method, path, params=None, headers=None, files=None, url_override=None, api_version=None):
+        conta = _conta_do_caminho(path) or self.conta or self.get_default_account_id()
+        limitador = agendador_meta.limitador(conta)
+
+        for tentativa in range(META_MAX_TENTATIVAS_LIMITE + 1):
+            agendador_meta.adquirir(conta)
+            try:
+                resposta = super().call(method, path, params, headers, files, url_override, api_version)
+            except FacebookRequestError as e:
+                limitador.registrar_uso(e.http_headers() or {})
+                if not eh_limitacao_uso(e.api_error_code()) or tentativa == META_MAX_TENTATIVAS_LIMITE:
+                    raise
+                espera = limitador.registrar_limitacao()
+                logger.warning(f"Conta {conta} limitada pelo Meta (código {e.api_error_code()}); "
+                               f"nova tentativa em {espera:.0f}s")
+                rebobinar_arquivos(files)
+                continue
+            limitador.registrar_uso(resposta.headers())
+            return resposta
+
+
+class _SessaoConta:
+    __slots__ = ("api", "validada", "expira_em", "lock")
+
+    def __init__(self):
+        self.api: Optional[FacebookAdsApiAgendada] = None
+        self.validada = False
+        self.expira_em = 0.0
+        self.lock = threading.Lock()
+
+
+class RegistroSessoesMeta:
+    """
+    Registro das instâncias de FacebookAdsApi, uma por conta e credencial.
+
+    Cada instância é criada e validada uma única vez e reaproveitada até expirar.
+    Como nenhuma delas é registrada como API padrão do SDK, sessões de contas
+    diferentes podem ser usadas ao mesmo tempo no mesmo processo. O registro guarda
+    no máximo max_sessoes sessões (LRU) e descarta as que falham na validação.
+    """
+
+    def __init__(self, ttl: int = META_SESSAO_TTL, max_sessoes: int = META_SESSOES_MAX):
+        """
+        Inicializa o registro.
+
+        Args:
+            ttl (int, optional): Segundos até uma sessão ser recriada e revalidada
+            max_sessoes (int, optional): Número máximo de sessões mantidas
+        """
+        self.ttl = ttl
+        self.max_sessoes = max_sessoes
+        self._sessoes: "OrderedDict[Tuple[str, str, str], _SessaoConta]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _chave(app_id: str, access_token: str, account_id: str) -> Tuple[str, str, str]:
+        # O token não é guardado em claro na chave
+        return str(app_id), hashlib.sha256(str(access_token).encode()).hexdigest(), str(account_id)
+
+    def _criar_api(self, app_id, app_secret, access_token, account_id) -> FacebookAdsApiAgendada:
+        sessao = FacebookSession(app_id, app_secret, access_token, timeout=META_TIMEOUT)
+        sessao.GRAPH = META_GRAPH_URL.rstrip("/")
+        api = FacebookAdsApiAgendada(sessao, META_GRAPH_API_VERSION)
+        api.conta = f"act_{account_id}"
+        return api
+
+    def obter(self, app_id=None, app_secret=None, access_token=None, account_id=None) -> FacebookAdsApiAgendada:
+        """
+        Retorna a API da conta, criando e validando a sessão se necessário.
+
+        Chamadas concorrentes para a mesma conta aguardam uma única criação; contas
+        diferentes não bloqueiam umas às outras.
+
+        Args:
+            app_id (str, optional): ID da aplicação Meta. Default para o valor nas configurações.
+            app_secret (str, optional): Segredo da aplicação Meta. Default para o valor nas configurações.
+            access_token (str, optional): Token de acesso. Default para o valor nas configurações.
+            account_id (str, optional): ID da conta publicitária. Default para o valor nas configurações.
+
+        Returns:
+            FacebookAdsApiAgendada: API exclusiva da conta
+        """
+        app_id = app_id or META_APP_ID
+        app_secret = app_secret or META_APP_SECRET
+        access_token = access_token or META_ACCESS_TOKEN
+        account_id = account_id or META_ACCOUNT_ID
+
+        chave = self._chave(app_id, access_token, account_id)
+        with self._lock:
+            sessao = self._sessoes.get(chave)
+            if sessao is None:
+                self._remover_expiradas()
+                sessao = self._sessoes[chave] = _SessaoConta()
+            self._sessoes.move_to_end(chave)
+            # Quem já obteve uma sessão removida continua usando-a; ela só deixa de ser reaproveitada
+            while len(self._sessoes) > self.max_sessoes:
+                self._sessoes.popitem(last=False)
+
+        with sessao.lock:
+            if sessao.api is not None and time.monotonic() < sessao.expira_em:
+                return sessao.api
+
+            api = self._criar_api(app_id, app_secret, access_token, account_id)
+            validada = sessao.validada = self._validar(api, account_id)
+            sessao.api = api
+            sessao.expira_em = time.monotonic() + self.ttl if validada else 0.0
+
+        if not validada:
+            # Uma sessão sem acesso é revalidada na próxima solicitação em vez de ficar no registro
+            self._descartar(chave, sessao)
+        return api
+
+    def _remover_expiradas(self):
+        # Chamado com o lock adquirido; sessões ainda em criação (sem API) são mantidas
+        agora = time.monotonic()
+        for chave, sessao in list(self._sessoes.items()):
+            if sessao.api is not None and sessao.expira_em <= agora:
+                del self._sessoes[chave]
+
+    def _descartar(self, chave: Tuple[str, str, str], sessao: _SessaoConta):
+        with self._lock:
+            if self._sessoes.get(chave) is sessao:
+                del self._sessoes[chave]
+
+    def _validar(self, api: FacebookAdsApiAgendada, account_id: str) -> bool:
+        try:
+            AdAccount(f"act_{account_id}", api=api).api_get(fields=["name", "account_status"])
+            logger.info(f"Sessão da conta {account_id} criada e validada")
+            return True
+        except FacebookRequestError as e:
+            logger.error(f"Erro ao acessar a conta {account_id}: {e}")
+            return False
+
+    def invalidar(self, account_id: Optional[str] = None):
+        """
+        Descarta as sessões de uma conta (por exemplo, após a troca do token), ou todas.
+
+        Args:
+            account_id (str, optional): ID da conta publicitária. Se None, descarta todas
+        """
+        with self._lock:
+            for chave in list(self._sessoes):
+                if account_id is None or chave[2] == str(account_id):
+                    del self._sessoes[chave]
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna o estado das sessões registradas.
+
+        Returns:
+            Dict[str, Any]: Validação e segundos até a expiração por conta
+        """
+        agora = time.monotonic()
+        with self._lock:
+            sessoes = list(self._sessoes.items())
+        return {
+            chave[2]: {"validada": sessao.validada, "expira_em": round(max(0.0, sessao.expira_em - agora))}
+            for chave, sessao in sessoes
+        }
+
+
+# Registro compartilhado pelo processo
+registro_sessoes = RegistroSessoesMeta()
@@ -0,0 +1,214 @@
+"""
+Implementação do protocolo de upload de vídeos em partes (start/transfer/finish) do Meta ADS, com retomada
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from backend.trafego_ai.config.settings import VIDEOS_ESTADO_DIR, VIDEO_MAX_TENTATIVAS_TRECHO
+
+logger = logging.getLogger(__name__)
+
+# Subcódigo da Graph API para trecho com offsets diferentes dos esperados pelo servidor
+SUBCODIGO_OFFSET_INVALIDO = 1363037
+
+# Status de codificação retornados pelo campo status.video_status
+STATUS_VIDEO_PRONTO = "ready"
+STATUS_VIDEO_ERRO = "error"
+
+
+class SessaoUploadVideo:
+    """
+    Estado de um upload de vídeo em partes, persistido em disco para permitir a retomada.
+
+    Os clientes (síncrono e assíncrono) enviam as requisições; esta classe monta os
+    parâmetros de cada fase, lê do disco apenas o trecho pedido pelo servidor e
+    registra o progresso após cada resposta.
+    """
+
+    def __init__(self, account_id: str, caminho: str, titulo: Optional[str] = None,
+                 diretorio_estado: str = VIDEOS_ESTADO_DIR):
+        """
+        Inicializa a sessão, retomando o estado salvo de um upload interrompido do mesmo arquivo.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            caminho (str): Caminho local do vídeo
+            titulo (str, optional): Título do vídeo. Default para o nome do arquivo
+            diretorio_estado (str, optional): Diretório dos arquivos de estado
+        """
+        self.account_id = str(account_id)
+        self.caminho = caminho
+        self.titulo = titulo or os.path.splitext(os.path.basename(caminho))[0]
+        self.tamanho = os.path.getsize(caminho)
+
+        # O arquivo é identificado por caminho, tamanho e data de modificação, sem ler seu conteúdo
+        assinatura = f"{self.account_id}|{os.path.abspath(caminho)}|{self.tamanho}|{os.path.getmtime(caminho)}"
+        os.makedirs(diretorio_estado, exist_ok=True)
+        self.caminho_estado = os.path.join(diretorio_estado, hashlib.sha256(assinatura.encode()).hexdigest() + ".json")
+
+        self.session_id: Optional[str] = None
+        self.video_id: Optional[str] = None
+        self.inicio = 0
+        self.fim = 0
+        self.tentativas = 0
+        self._carregar_estado()
+
+    def _carregar_estado(self):
+        if not os.path.exists(self.caminho_estado):
+            return
+        with open(self.caminho_estado, "r", encoding="utf-8") as f:
+            estado = json.load(f)
+        self.session_id = estado["session_id"]
+        self.video_id = estado["video_id"]
+        self.inicio = estado["inicio"]
+        self.fim = estado["fim"]
+        logger.info(f"Retomando upload de {self.caminho} a partir do byte {self.inicio} de {self.tamanho}")
+
+    def _salvar_estado(self):
+        temporario = f"{self.caminho_estado}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({
+                "caminho": self.caminho,
+                "session_id": self.session_id,
+                "video_id": self.video_id,
+                "inicio": self.inicio,
+                "fim": self.fim,
+                "atualizado_em": time.time()
+            }, f)
+        os.replace(temporario, self.caminho_estado)
+
+    def descartar_estado(self):
+        """
+        Remove o estado salvo, para que o próximo upload comece do zero.
+        """
+        self.session_id = None
+        self.video_id = None
+        self.inicio = self.fim = 0
+        if os.path.exists(self.caminho_estado):
+            os.remove(self.caminho_estado)
+
+    @property
+    def iniciada(self) -> bool:
+        return self.session_id is not None
+
+    @property
+    def transferida(self) -> bool:
+        return self.iniciada and self.inicio >= self.fim
+
+    @property
+    def caminho_api(self) -> str:
+        return f"act_{self.account_id}/advideos"
+
+    def params_inicio(self) -> Dict[str, Any]:
+        """
+        Parâmetros da fase start.
+        """
+        return {"upload_phase": "start", "file_size": self.tamanho}
+
+    def registrar_inicio(self, resposta: Dict[str, Any]):
+        """
+        Registra a sessão criada pela fase start.
+        """
+        self.session_id = resposta["upload_session_id"]
+        self.video_id = resposta["video_id"]
+        self.inicio = int(resposta["start_offset"])
+        self.fim = int(resposta["end_offset"])
+        self._salvar_estado()
+
+    def ler_trecho(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Lê do disco apenas o trecho pedido pelo servidor e monta a requisição da fase transfer.
+
+        Returns:
+            tuple: Parâmetros e arquivos (multipart) da requisição
+        """
+        with open(self.caminho, "rb") as arquivo:
+            arquivo.seek(self.inicio)
+            trecho = arquivo.read(self.fim - self.inicio)
+        params = {
+            "upload_phase": "transfer",
+            "upload_session_id": self.session_id,
+            "start_offset": self.inicio,
+        }
+        return params, {"video_file_chunk": (os.path.basename(self.caminho), trecho, "application/octet-stream")}
+
+    def registrar_trecho(self, resposta: Dict[str, Any]):
+        """
+        Registra o trecho aceito; o servidor informa o próximo intervalo a enviar.
+        """
+        self.inicio = int(resposta["start_offset"])
+        self.fim = int(resposta["end_offset"])
+        self.tentativas = 0
+        self._salvar_estado()
+
+    def recuperar_de_erro(self, corpo: Any) -> bool:
+        """
+        Decide se um erro na fase transfer pode ser contornado repetindo o envio.
+
+        Para offsets divergentes (por exemplo, ao retomar um upload cujo último trecho
+        chegou ao servidor sem a resposta chegar ao cliente), adota os offsets informados pelo servidor.
+
+        Args:
+            corpo (Any): Corpo da resposta de erro
+
+        Returns:
+            bool: True se o trecho deve ser reenviado
+        """
+        self.tentativas += 1
+        if self.tentativas > VIDEO_MAX_TENTATIVAS_TRECHO:
+            return False
+
+        erro = corpo.get("error", {}) if isinstance(corpo, dict) else {}
+        dados = erro.get("error_data") or {}
+        if isinstance(dados, str):
+            try:
+                dados = json.loads(dados)
+            except ValueError:
+                dados = {}
+
+        if erro.get("error_subcode") == SUBCODIGO_OFFSET_INVALIDO and "start_offset" in dados:
+            self.inicio = int(dados["start_offset"])
+            self.fim = int(dados["end_offset"])
+            self._salvar_estado()
+            return True
+        return bool(erro.get("is_transient"))
+
+    def params_finalizacao(self) -> Dict[str, Any]:
+        """
+        Parâmetros da fase finish.
+        """
+        return {
+            "upload_phase": "finish",
+            "upload_session_id": self.session_id,
+            "title": self.titulo,
+        }
+
+    def concluir(self) -> str:
+        """
+        Encerra a sessão após a fase finish e remove o estado salvo.
+
+        Returns:
+            str: ID do vídeo
+        """
+        video_id = self.video_id
+        if os.path.exists(self.caminho_estado):
+            os.remove(self.caminho_estado)
+        logger.info(f"Upload do vídeo {self.caminho} concluído: {video_id}")
+        return video_id
+
+
+def status_codificacao(resposta: Dict[str, Any]) -> str:
+    """
+    Extrai o status de codificação da resposta de GET /{video_id}?fields=status.
+
+    Args:
+        resposta (Dict[str, Any]): Corpo da resposta
+
+    Returns:
+        str: ready, processing ou error
+    """
+    return (resposta.get("status") or {}).get("video_status", "processing")
@@ -1,41 +1,83 @@
 """
 Implementação da ferramenta de pesquisa na web usando a API da OpenAI
 """
+import contextvars
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
 from pydantic import BaseModel
 
-from backend.trafego_ai.config.settings import OPENAI_API_KEY, OPENAI_MODEL
+from backend.trafego_ai.config.settings import (
+    OPENAI_API_KEY,
+    OPENAI_MODEL,
+    WEB_SEARCH_MAX_CONCORRENCIA,
+    WEB_SEARCH_RESUMO_MAX_TOKENS
+)
 from backend.trafego_ai.models.schemas import WebSearchResult
+from backend.trafego_ai.tools.cache_pesquisa import CachePesquisa, cache_pesquisa
 
-# Configurar logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fontes registradas no cache de pesquisas (cada uma com sua validade em PESQUISA_CACHE_TTL_FONTES)
+SEARCH_SOURCE = "openai_web_search"
+SUMMARY_SOURCE = "openai_resumo"
+
+SUMMARY_ERROR = "Não foi possível gerar um resumo devido a um erro."
+
+SUMMARY_SYSTEM_PROMPT = "Você é um assistente que resume informações de forma concisa e precisa."
+
+BATCH_SUMMARY_PROMPT = (
+    "Abaixo estão resultados de pesquisa agrupados em seções, uma por pergunta. Para cada seção, "
+    "forneça um resumo objetivo e informativo destacando os pontos mais importantes e relevantes, "
+    "usando apenas os resultados daquela seção. Responda em JSON, com o identificador de cada "
+    "seção como chave e o resumo como valor."
+)
+
+
+def _format_results(results: List[WebSearchResult]) -> str:
+    return "\n\n".join([
+        f"TÍTULO: {r.title}\nURL: {r.url}\nDESCRIÇÃO: {r.snippet}"
+        for r in results
+    ])
+
+
+def _summary_prompt(query: str, results_text: str) -> str:
+    return (f"Com base nos seguintes resultados de pesquisa sobre '{query}', forneça um resumo objetivo "
+            f"e informativo destacando os pontos mais importantes e relevantes:\n\n{results_text}")
+
 
 class OpenAIWebSearch:
     """
     Classe para realizar pesquisas na web utilizando a API de ferramentas do OpenAI.
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 cache: Optional[CachePesquisa] = None, use_cache: bool = True):
         """
         Inicializa a ferramenta de pesquisa na web.
         
         Args:
             api_key (str, optional): Chave de API do OpenAI. Se não fornecida, usa a das configurações.
             model (str, optional): Modelo de linguagem a ser usado. Se não fornecido, usa o das configurações.
+            cache (CachePesquisa, optional): Cache de pesquisas. Default para o cache compartilhado.
+            use_cache (bool, optional): Se False, toda pesquisa vai ao provedor. Default para True.
         """
         self.api_key = api_key or OPENAI_API_KEY
         self.model = model or OPENAI_MODEL
+        self.cache = (cache or cache_pesquisa) if use_cache else None
+        
+        from openai import OpenAI  # Importado aqui para não pesar na inicialização da API
         self.client = OpenAI(api_key=self.api_key)
     
     def search(self, query: str, max_results: int = 5) -> List[WebSearchResult]:
         """
         Realiza uma pesquisa na web usando a API de ferramentas do OpenAI.
         
+        Pesquisas equivalentes (mesma consulta normalizada e número de resultados) são
+        respondidas pelo cache; resultados vencidos são servidos enquanto são renovados.
+        
         Args:
             query (str): O termo de pesquisa
             max_results (int, optional): Número máximo de resultados a retornar. Default para 5.
@@ -43,6 +85,17 @@ class OpenAIWebSearch:
         Returns:
             List[WebSearchResult]: Lista de resultados da pesquisa
         """
+        if self.cache is None:
+            return self._search(query, max_results)
+        
+        results = self.cache.obter_ou_buscar(
+            SEARCH_SOURCE, query,
+            lambda: [r.dict() for r in self._search(query, max_results)],
+            variante=str(max_results)
+        )
+        return [WebSearchResult(**r) for r in results]
+    
+    def _search(self, query: str, max_results: int) -> List[WebSearchResult]:
         try:
             logger.info(f"Realizando pesquisa na web para: {query}")
             
@@ -98,6 +151,18 @@ class OpenAIWebSearch:
         Returns:
             Dict[str, Any]: Dicionário contendo resultados da pesquisa e o resumo
         """
+        if self.cache is None:
+            return self._search_with_summary(query, max_results)
+        
+        # Resumos que falharam ou sem resultados não são guardados
+        return self.cache.obter_ou_buscar(
+            SUMMARY_SOURCE, query,
+            lambda: self._search_with_summary(query, max_results),
+            variante=str(max_results),
+            cachear=lambda r: bool(r["results"]) and r["summary"] != SUMMARY_ERROR
+        )
+    
+    def _search_with_summary(self, query: str, max_results: int) -> Dict[str, Any]:
         # Primeiro, realizar a pesquisa
         results = self.search(query, max_results)
         
@@ -109,17 +174,14 @@ class OpenAIWebSearch:
             }
         
         # Gerar resumo dos resultados
-        results_text = "\n\n".join([
-            f"TÍTULO: {r.title}\nURL: {r.url}\nDESCRIÇÃO: {r.snippet}"
-            for r in results
-        ])
+        results_text = _format_results(results)
         
         try:
             summary_response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": "Você é um assistente que resume informações de forma concisa e precisa."},
-                    {"role": "user", "content": f"Com base nos seguintes resultados de pesquisa sobre '{query}', forneça um resumo objetivo e informativo destacando os pontos mais importantes e relevantes:\n\n{results_text}"}
+                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                    {"role": "user", "content": _summary_prompt(query, results_text)}
                 ]
             )
             
@@ -136,19 +198,126 @@ class OpenAIWebSearch:
             return {
                 "query": query,
                 "results": [r.dict() for r in results],
-                "summary": "Não foi possível gerar um resumo devido a um erro."
+                "summary": SUMMARY_ERROR
+            }
+    
+    def summarize_batch(self, searches: Dict[str, Dict[str, Any]],
+                        max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Resume os resultados de várias pesquisas em uma única chamada ao LLM, com uma seção por pergunta.
+        
+        As seções são agrupadas até o teto de tokens de entrada; acima dele, o lote é dividido
+        em mais chamadas. Seções ausentes na resposta recebem a mensagem de erro.
+        
+        Args:
+            searches (Dict[str, Dict[str, Any]]): Consulta ("query") e resultados ("results") por chave
+            max_tokens (int, optional): Tokens de entrada por chamada. Default para WEB_SEARCH_RESUMO_MAX_TOKENS.
+            
+        Returns:
+            Dict[str, Any]: Resumo por chave ("summaries") e estatísticas das chamadas ("stats"),
+                            incluindo as chamadas e os tokens economizados em relação a um resumo por pesquisa
+        """
+        # Importação tardia: o pacote utils importa as ferramentas
+        from backend.trafego_ai.utils.memoria import contar_tokens
+        
+        max_tokens = max_tokens or WEB_SEARCH_RESUMO_MAX_TOKENS
+        summaries = {}
+        sections = []
+        individual_tokens = 0
+        
+        for key, search in searches.items():
+            if not search["results"]:
+                summaries[key] = "Nenhum resultado encontrado."
+                continue
+            section_id = f"secao_{len(sections) + 1}"
+            results_text = _format_results(search["results"])
+            text = f"[{section_id}] PERGUNTA: {search['query']}\n\n{results_text}"
+            sections.append((key, section_id, text, contar_tokens(text)))
+            individual_tokens += contar_tokens(SUMMARY_SYSTEM_PROMPT) + contar_tokens(
+                _summary_prompt(search["query"], results_text))
+        
+        # Agrupar as seções sem ultrapassar o teto de tokens (uma seção maior que o teto vai sozinha)
+        base_tokens = contar_tokens(SUMMARY_SYSTEM_PROMPT) + contar_tokens(BATCH_SUMMARY_PROMPT)
+        groups, current, current_tokens = [], [], base_tokens
+        for section in sections:
+            if current and current_tokens + section[3] > max_tokens:
+                groups.append(current)
+                current, current_tokens = [], base_tokens
+            current.append(section)
+            current_tokens += section[3]
+        if current:
+            groups.append(current)
+        
+        prompt_tokens = 0
+        for group in groups:
+            content = BATCH_SUMMARY_PROMPT + "\n\n" + "\n\n".join(section[2] for section in group)
+            parsed = {}
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                        {"role": "user", "content": content}
+                    ],
+                    response_format={"type": "json_object"}
+                )
+                usage = getattr(response, "usage", None)
+                prompt_tokens += usage.prompt_tokens if usage else base_tokens + contar_tokens(content)
+                parsed = json.loads(response.choices[0].message.content)
+            except Exception as e:
+                logger.error(f"Erro ao gerar resumo em lote de {len(group)} pesquisas: {e}")
+                prompt_tokens += contar_tokens(SUMMARY_SYSTEM_PROMPT) + contar_tokens(content)
+            
+            for key, section_id, _, _ in group:
+                summary = parsed.get(section_id) if isinstance(parsed, dict) else None
+                if isinstance(summary, str) and summary.strip():
+                    summaries[key] = summary.strip()
+                else:
+                    summaries[key] = SUMMARY_ERROR
+        
+        stats = {
+            "calls": len(groups),
+            "calls_saved": len(sections) - len(groups),
+            "prompt_tokens": prompt_tokens,
+            "tokens_saved": max(0, individual_tokens - prompt_tokens)
+        }
+        logger.info(f"{len(sections)} pesquisas resumidas em {stats['calls']} chamadas "
+                    f"({stats['tokens_saved']} tokens economizados)")
+        return {"summaries": {key: summaries[key] for key in searches}, "stats": stats}
+    
+    def _run_concurrently(self, function, queries: Dict[str, str], max_workers: int) -> Dict[str, Any]:
+        # Executa a função para cada consulta, registrando cada resultado assim que fica pronto
+        done = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Cada pesquisa herda o contexto (Ex: sessão e tarefa nos logs) da chamada
+            futures = {
+                executor.submit(contextvars.copy_context().run, function, query): key
+                for key, query in queries.items()
             }
+            for future in as_completed(futures):
+                key = futures[future]
+                done[key] = future.result()
+                logger.info(f"Pesquisa '{queries[key]}' concluída ({len(done)}/{len(queries)})")
+        return {key: done[key] for key in queries}
     
-    def research_topic(self, topic: str, specific_questions: List[str] = None) -> Dict[str, Any]:
+    def research_topic(self, topic: str, specific_questions: List[str] = None,
+                       max_concurrency: Optional[int] = None, batch_summary: bool = True) -> Dict[str, Any]:
         """
         Realiza uma pesquisa aprofundada sobre um tópico, respondendo a perguntas específicas.
         
+        O tópico e as perguntas são pesquisados simultaneamente, e o resultado mantém a ordem
+        das perguntas. Com batch_summary, os resultados de todas as pesquisas são resumidos
+        juntos (ver summarize_batch); caso contrário, cada pesquisa gera seu próprio resumo.
+        
         Args:
             topic (str): O tópico a ser pesquisado
             specific_questions (List[str], optional): Lista de perguntas específicas a serem respondidas
+            max_concurrency (int, optional): Pesquisas simultâneas. Default para WEB_SEARCH_MAX_CONCORRENCIA.
+            batch_summary (bool, optional): Se deve resumir todas as pesquisas em lote. Default para True.
             
         Returns:
-            Dict[str, Any]: Resultados da pesquisa organizada por perguntas/tópicos
+            Dict[str, Any]: Resultados da pesquisa organizada por perguntas/tópicos e, no modo
+                            em lote, as estatísticas do resumo
         """
         if not specific_questions:
             specific_questions = [
@@ -159,20 +328,32 @@ class OpenAIWebSearch:
                 f"Quais são os desafios comuns relacionados a {topic}?"
             ]
         
-        results = {}
+        # Pesquisar o tópico geral e cada pergunta específica (usando a pergunta como chave)
+        queries = {"visão_geral": topic}
+        for question in specific_questions:
+            queries[question.lower().replace("?", "").replace(" ", "_")] = question
+        
+        max_workers = max(1, min(max_concurrency or WEB_SEARCH_MAX_CONCORRENCIA, len(queries)))
+        inicio = time.perf_counter()
         
-        # Pesquisar o tópico geral
-        general_results = self.search_with_summary(topic)
-        results["visão_geral"] = general_results
+        if not batch_summary:
+            results = self._run_concurrently(self.search_with_summary, queries, max_workers)
+            logger.info(f"Pesquisa sobre '{topic}' concluída em {time.perf_counter() - inicio:.1f}s")
+            return {"topic": topic, "research_results": results}
         
-        # Pesquisar cada pergunta específica
-        for question in specific_questions:
-            question_results = self.search_with_summary(question)
-            # Usar a pergunta como chave
-            key = question.lower().replace("?", "").replace(" ", "_")
-            results[key] = question_results
+        found = self._run_concurrently(self.search, queries, max_workers)
+        batch = self.summarize_batch({key: {"query": queries[key], "results": found[key]} for key in queries})
+        logger.info(f"Pesquisa sobre '{topic}' concluída em {time.perf_counter() - inicio:.1f}s")
         
         return {
             "topic": topic,
-            "research_results": results
-        } 
\ No newline at end of file
+            "research_results": {
+                key: {
+                    "query": queries[key],
+                    "results": [r.dict() for r in found[key]],
+                    "summary": batch["summaries"][key]
+                }
+                for key in queries
+            },
+            "summary_stats": batch["stats"]
+        }
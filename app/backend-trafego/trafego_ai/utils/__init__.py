@@ -1,7 +1,22 @@
 """
 Utilitários para o sistema de IA de Gestão de Tráfego.
+
+CrewManager é importado sob demanda, já que carrega o CrewAI e os SDKs das ferramentas.
 """
+from importlib import import_module
+
+_EXPORTACOES = {
+    "CrewManager": "backend.trafego_ai.utils.crew_manager",
+    "MemoriaSessao": "backend.trafego_ai.utils.memoria",
+    "GerenciadorMemoria": "backend.trafego_ai.utils.memoria"
+}
+
+__all__ = list(_EXPORTACOES)
 
-from backend.trafego_ai.utils.crew_manager import CrewManager
 
-__all__ = ["CrewManager"] 
\ No newline at end of file
+def __getattr__(nome: str):
+    if nome in _EXPORTACOES:
+        valor = getattr(import_module(_EXPORTACOES[nome]), nome)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -0,0 +1,274 @@
+"""
+Implementação do motor vetorizado de KPIs, tendências, fadiga e anomalias das métricas diárias
+"""
+import json
+import logging
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from backend.trafego_ai.config.settings import (
+    ANALISE_JANELA_DIAS,
+    ANALISE_LIMIAR_Z,
+    ANALISE_MIN_IMPRESSOES,
+    ANALISE_MAX_ACHADOS,
+    FADIGA_FREQUENCIA,
+    FADIGA_QUEDA_CTR
+)
+from backend.trafego_ai.utils.metricas_locais import CHAVES, dia_para_data
+
+logger = logging.getLogger(__name__)
+
+# Métricas monitoradas pela detecção de anomalias
+METRICAS_ANOMALIA = ("ctr", "cpc", "cpm", "spend")
+
+
+def _dividir(numerador: np.ndarray, denominador: np.ndarray, escala: float = 1.0) -> np.ndarray:
+    """
+    Divisão elemento a elemento que retorna NaN onde o denominador é zero.
+    """
+    numerador = np.asarray(numerador, dtype="f8")
+    denominador = np.asarray(denominador, dtype="f8")
+    resultado = np.full(numerador.shape, np.nan)
+    np.divide(numerador * escala, denominador, out=resultado, where=denominador > 0)
+    return resultado
+
+
+def calcular_kpis(impressoes, cliques, gasto, alcance, conversoes) -> Dict[str, np.ndarray]:
+    """
+    Calcula os KPIs derivados a partir das métricas primárias.
+
+    Args:
+        impressoes (np.ndarray): Impressões
+        cliques (np.ndarray): Cliques
+        gasto (np.ndarray): Valor gasto
+        alcance (np.ndarray): Alcance
+        conversoes (np.ndarray): Conversões
+
+    Returns:
+        Dict[str, np.ndarray]: ctr (%), cpc, cpm, frequency, taxa_conversao (%) e cpa (NaN quando indefinidos)
+    """
+    return {
+        "ctr": _dividir(cliques, impressoes, 100),
+        "cpc": _dividir(gasto, cliques),
+        "cpm": _dividir(gasto, impressoes, 1000),
+        "frequency": _dividir(impressoes, alcance),
+        "taxa_conversao": _dividir(conversoes, cliques, 100),
+        "cpa": _dividir(gasto, conversoes),
+    }
+
+
+def _grupos(dados: np.ndarray):
+    """
+    Identifica os grupos (anúncios) em dados ordenados por objeto e data.
+
+    Returns:
+        tuple: ID do grupo de cada linha, índice da primeira linha de cada grupo e
+               índice da primeira linha do grupo de cada linha
+    """
+    novo = np.ones(len(dados), dtype=bool)
+    if len(dados) > 1:
+        mudou = np.zeros(len(dados) - 1, dtype=bool)
+        for chave in CHAVES:
+            mudou |= dados[chave][1:] != dados[chave][:-1]
+        novo[1:] = mudou
+    grupo = np.cumsum(novo) - 1
+    inicios = np.flatnonzero(novo)
+    return grupo, inicios, inicios[grupo]
+
+
+def _soma_janela(valores: np.ndarray, inicio_grupo: np.ndarray, janela: int, deslocamento: int = 0):
+    """
+    Soma móvel por grupo, em uma única passada com somas acumuladas.
+
+    Para cada linha i soma as linhas [i - janela + 1 - deslocamento, i - deslocamento]
+    que pertencem ao mesmo grupo.
+
+    Returns:
+        np.ndarray: Somas da janela de cada linha
+    """
+    acumulado = np.concatenate([[0.0], np.cumsum(valores, dtype="f8")])
+    indices = np.arange(len(valores))
+    fim = indices - deslocamento + 1
+    inicio = np.maximum(fim - janela, inicio_grupo)
+    fim = np.maximum(fim, inicio)
+    return acumulado[fim] - acumulado[inicio]
+
+
+def analisar_series(dados: np.ndarray, janela: int = ANALISE_JANELA_DIAS) -> Dict[str, np.ndarray]:
+    """
+    Calcula KPIs diários, médias móveis, variações dia a dia e escores de anomalia.
+
+    Os dados devem estar ordenados por objeto e data, como retornados pelo armazenamento
+    local de métricas. Todas as séries são calculadas de uma vez para todos os anúncios.
+
+    Args:
+        dados (np.ndarray): Array estruturado no formato DTYPE_METRICAS
+        janela (int, optional): Tamanho da janela móvel em dias
+
+    Returns:
+        Dict[str, np.ndarray]: Colunas calculadas, alinhadas às linhas de dados
+    """
+    grupo, _, inicio_grupo = _grupos(dados)
+    primarias = {
+        "impressions": dados["impressions"].astype("f8"),
+        "clicks": dados["clicks"].astype("f8"),
+        "spend": dados["spend"].astype("f8"),
+        "reach": dados["reach"].astype("f8"),
+        "conversions": dados["conversions"].astype("f8"),
+    }
+    series = {"grupo": grupo}
+    series.update(calcular_kpis(primarias["impressions"], primarias["clicks"], primarias["spend"],
+                                primarias["reach"], primarias["conversions"]))
+
+    # Médias móveis ponderadas: somar numerador e denominador na janela antes de dividir
+    somas = {nome: _soma_janela(valores, inicio_grupo, janela) for nome, valores in primarias.items()}
+    movel = calcular_kpis(somas["impressions"], somas["clicks"], somas["spend"], somas["reach"], somas["conversions"])
+    for nome in ("ctr", "cpc", "cpm", "frequency"):
+        series[f"{nome}_movel"] = movel[nome]
+
+    # Janela anterior (imediatamente antes da atual) para comparar tendências
+    anteriores = {nome: _soma_janela(valores, inicio_grupo, janela, janela) for nome, valores in primarias.items()}
+    series["ctr_anterior"] = _dividir(anteriores["clicks"], anteriores["impressions"], 100)
+    series["impressoes_janela"] = somas["impressions"]
+
+    # Variação dia a dia apenas entre dias consecutivos do mesmo anúncio
+    consecutivo = np.zeros(len(dados), dtype=bool)
+    if len(dados) > 1:
+        consecutivo[1:] = (grupo[1:] == grupo[:-1]) & (np.diff(dados["data"]) == 1)
+    for nome in METRICAS_ANOMALIA:
+        valores = series[nome] if nome in series else primarias[nome]
+        anterior = np.roll(valores, 1)
+        series[f"{nome}_delta"] = np.where(consecutivo, valores - anterior, np.nan)
+
+    # Escore z de cada dia em relação às duas janelas anteriores (sem incluir o próprio dia);
+    # uma base mais longa que a janela evita que a variância de poucos dias gere falsos positivos
+    base = 2 * janela
+    for nome in METRICAS_ANOMALIA:
+        valores = series[nome] if nome in series else primarias[nome]
+        validos = ~np.isnan(valores)
+        limpos = np.where(validos, valores, 0.0)
+        soma = _soma_janela(limpos, inicio_grupo, base, 1)
+        soma_quadrados = _soma_janela(limpos ** 2, inicio_grupo, base, 1)
+        contagem = _soma_janela(validos.astype("f8"), inicio_grupo, base, 1)
+        media = _dividir(soma, contagem)
+        variancia = np.maximum(_dividir(soma_quadrados, contagem) - media ** 2, 0.0)
+        desvio = np.sqrt(variancia)
+        z = _dividir(limpos - media, desvio)
+        # Poucos dias de histórico não sustentam um escore confiável
+        series[f"{nome}_z"] = np.where(validos & (contagem >= janela), z, np.nan)
+
+    return series
+
+
+def _arredondar(valor: float, casas: int = 2):
+    return None if valor is None or np.isnan(valor) else round(float(valor), casas)
+
+
+def analisar_desempenho(dados: np.ndarray, janela: int = ANALISE_JANELA_DIAS,
+                        limiar_z: float = ANALISE_LIMIAR_Z,
+                        min_impressoes: int = ANALISE_MIN_IMPRESSOES,
+                        max_achados: int = ANALISE_MAX_ACHADOS) -> Dict[str, Any]:
+    """
+    Analisa o desempenho de todos os anúncios e retorna apenas os achados relevantes.
+
+    Args:
+        dados (np.ndarray): Métricas diárias no formato DTYPE_METRICAS, ordenadas por objeto e data
+        janela (int, optional): Tamanho da janela móvel em dias
+        limiar_z (float, optional): Escore z mínimo para considerar um dia anômalo
+        min_impressoes (int, optional): Impressões mínimas na janela para avaliar um anúncio
+        max_achados (int, optional): Número máximo de achados retornados
+
+    Returns:
+        Dict[str, Any]: Período, totais da conta, KPIs e achados ordenados por severidade
+    """
+    if not len(dados):
+        return {"periodo": None, "anuncios": 0, "totais": {}, "achados": []}
+
+    series = analisar_series(dados, janela)
+    totais = calcular_kpis(*(np.array([dados[c].sum()], dtype="f8")
+                             for c in ("impressions", "clicks", "spend", "reach", "conversions")))
+
+    # Última linha de cada anúncio: o estado atual de cada série
+    grupo = series["grupo"]
+    ultimas = np.flatnonzero(np.append(grupo[1:] != grupo[:-1], True))
+    relevantes = ultimas[series["impressoes_janela"][ultimas] >= min_impressoes]
+    ultimo_dia = dados["data"].max()
+
+    achados: List[Dict[str, Any]] = []
+
+    def identificar(linha: int) -> Dict[str, Any]:
+        return {chave: int(dados[chave][linha]) for chave in CHAVES if dados[chave][linha]}
+
+    # Fadiga: frequência alta e CTR caindo em relação à janela anterior
+    queda_ctr = 1 - _dividir(series["ctr_movel"][relevantes], series["ctr_anterior"][relevantes])
+    fadiga = (series["frequency_movel"][relevantes] >= FADIGA_FREQUENCIA) & (queda_ctr >= FADIGA_QUEDA_CTR)
+    for linha, queda in zip(relevantes[fadiga], queda_ctr[fadiga]):
+        achados.append({
+            **identificar(linha),
+            "tipo": "fadiga",
+            "frequencia": _arredondar(series["frequency_movel"][linha]),
+            "ctr": _arredondar(series["ctr_movel"][linha]),
+            "queda_ctr": _arredondar(queda),
+            "severidade": _arredondar(queda * series["frequency_movel"][linha] / FADIGA_FREQUENCIA),
+        })
+
+    # Anomalias no último dia disponível de cada anúncio
+    recentes = relevantes[dados["data"][relevantes] == ultimo_dia]
+    for nome in METRICAS_ANOMALIA:
+        escores = series[f"{nome}_z"][recentes]
+        anomalos = np.abs(np.nan_to_num(escores)) >= limiar_z
+        for linha, z in zip(recentes[anomalos], escores[anomalos]):
+            valores = series[nome] if nome in series else dados[nome].astype("f8")
+            achados.append({
+                **identificar(linha),
+                "tipo": "anomalia",
+                "metrica": nome,
+                "valor": _arredondar(valores[linha]),
+                "variacao_dia": _arredondar(series[f"{nome}_delta"][linha]),
+                "z": _arredondar(z),
+                "severidade": _arredondar(abs(z) / limiar_z),
+            })
+
+    achados.sort(key=lambda achado: achado["severidade"], reverse=True)
+    logger.info(f"Análise de {len(ultimas)} anúncios: {len(achados)} achados")
+
+    return {
+        "periodo": [dia_para_data(dados["data"].min()).isoformat(), dia_para_data(ultimo_dia).isoformat()],
+        "anuncios": int(len(ultimas)),
+        "anuncios_avaliados": int(len(relevantes)),
+        "totais": {
+            "impressions": int(dados["impressions"].sum()),
+            "clicks": int(dados["clicks"].sum()),
+            "spend": round(float(dados["spend"].sum()), 2),
+            "conversions": float(dados["conversions"].sum()),
+            **{nome: _arredondar(valores[0]) for nome, valores in totais.items() if nome != "frequency"},
+        },
+        "achados": achados[:max_achados],
+        "achados_omitidos": max(0, len(achados) - max_achados),
+    }
+
+
+def achados_compactos(analise: Dict[str, Any], ad_id: Optional[int] = None) -> str:
+    """
+    Serializa a análise de forma compacta para inclusão no prompt.
+
+    Args:
+        analise (Dict[str, Any]): Resultado de analisar_desempenho
+        ad_id (int, optional): Restringir os achados a um anúncio
+
+    Returns:
+        str: JSON compacto com totais e achados
+    """
+    achados = analise.get("achados", [])
+    if ad_id is not None:
+        achados = [achado for achado in achados if achado.get("ad_id") == int(ad_id)]
+    compacto = {
+        "periodo": analise.get("periodo"),
+        "totais": analise.get("totais"),
+        "achados": [{k: v for k, v in achado.items() if v is not None and k != "severidade"}
+                    for achado in achados],
+    }
+    if analise.get("achados_omitidos"):
+        compacto["omitidos"] = analise["achados_omitidos"]
+    return json.dumps(compacto, ensure_ascii=False, separators=(",", ":"))
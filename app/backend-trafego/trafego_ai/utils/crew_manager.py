@@ -1,20 +1,59 @@
 """
 Implementação do gerenciador de equipe (Crew) de agentes utilizando CrewAI
 """
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Union
-from crewai import Crew, Process, Task
+import re
+import uuid
+from datetime import date, timedelta
+from typing import List, Dict, Any, Optional, Union, AsyncIterator, TYPE_CHECKING
 
-from backend.trafego_ai.agents import (
-    EstrategistaAgent,
-    CriadorCampanhasAgent,
-    EspecialistaAnunciosAgent
+# CrewAI, LangChain, OpenAI e o SDK do Facebook são importados no primeiro uso:
+# importar este módulo não deve pesar na inicialização dos workers
+if TYPE_CHECKING:
+    from backend.trafego_ai.agents import EspecialistaAnunciosAgent
+from backend.trafego_ai.tools.analise_imagem import (
+    eh_imagem,
+    analisar_imagem,
+    analisar_imagens,
+    analisar_imagem_async,
+    fatos_compactos
 )
-from backend.trafego_ai.tools import (
-    MetaAdsAPI,
-    OpenAIWebSearch
+from backend.trafego_ai.tools.documentos import indices_documentos
+from backend.trafego_ai.utils.logs import etapa_log
+from backend.trafego_ai.utils.memoria import MemoriaSessao, gerenciador_memoria
+from backend.trafego_ai.utils.metricas_locais import armazem_metricas
+from backend.trafego_ai.utils.analise_metricas import analisar_desempenho, achados_compactos
+from backend.trafego_ai.config.settings import (
+    CRIATIVOS_LOTE_MAX_CONCORRENCIA,
+    CRIATIVOS_LOTE_MAX_ITENS,
+    DOCUMENTOS_TRECHOS_RETORNADOS,
+    META_ACCOUNT_ID
 )
 
+# Padrões para extrair a nota (de 1 a 10) de uma avaliação de criativo
+_PADRAO_NOTA = re.compile(r"NOTA:\s*(\d+(?:[.,]\d+)?)", re.IGNORECASE)
+_PADRAO_NOTA_ALTERNATIVO = re.compile(r"(\d+(?:[.,]\d+)?)\s*/\s*10")
+
+
+def extrair_nota_criativo(avaliacao: Any) -> Optional[float]:
+    """
+    Extrai a nota de adequação (de 1 a 10) do texto de avaliação de um criativo.
+    
+    Args:
+        avaliacao (Any): Texto da avaliação produzida pelo especialista
+        
+    Returns:
+        Optional[float]: Nota encontrada ou None se não houver nota reconhecível
+    """
+    texto = str(avaliacao or "")
+    encontrado = _PADRAO_NOTA.search(texto) or _PADRAO_NOTA_ALTERNATIVO.search(texto)
+    if not encontrado:
+        return None
+    nota = float(encontrado.group(1).replace(",", "."))
+    return nota if 0 <= nota <= 10 else None
+
+
 
 class CrewManager:
     """
@@ -24,28 +63,130 @@ class CrewManager:
     o framework CrewAI, orquestrando suas interações e atribuindo tarefas.
     """
     
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, session_id=None):
         """
         Inicializa o gerenciador de equipe.
         
         Args:
             verbose (bool, optional): Se deve imprimir logs detalhados. Default para False.
+            session_id (str, optional): Identificador da sessão dona da memória dos agentes.
+                                      Se None, gera um novo identificador.
         """
         self.verbose = verbose
         self.logger = logging.getLogger(__name__)
+        self.session_id = session_id or str(uuid.uuid4())
+        
+        from backend.trafego_ai.agents import (
+            EstrategistaAgent,
+            CriadorCampanhasAgent,
+            EspecialistaAnunciosAgent
+        )
+        from backend.trafego_ai.tools.web_search import OpenAIWebSearch
         
         # Inicializar as ferramentas
         self.web_search = OpenAIWebSearch()
         self.meta_ads_api = None  # Inicializado sob demanda
 
         # Inicializar os agentes
-        self.estrategista = EstrategistaAgent(tools=[self.web_search.search], verbose=verbose)
-        self.criador_campanhas = CriadorCampanhasAgent(verbose=verbose)
-        self.especialista_anuncios = EspecialistaAnunciosAgent(verbose=verbose)
+        self.estrategista = EstrategistaAgent(
+            tools=[self.web_search.search, self.buscar_documentos], verbose=verbose
+        )
+        self.criador_campanhas = CriadorCampanhasAgent(tools=[self.buscar_documentos], verbose=verbose)
+        self.especialista_anuncios = EspecialistaAnunciosAgent(tools=[self.buscar_documentos], verbose=verbose)
         
         # Inicializar a equipe (crew)
         self._crew = None
     
+    @property
+    def memoria(self) -> MemoriaSessao:
+        """
+        Memória limitada da sessão, compartilhada pelos agentes.
+        
+        É obtida do gerenciador a cada uso, sem referência guardada aqui, para que a sessão
+        possa sair da RAM (e ser recarregada do disco) entre um turno e outro.
+        """
+        return gerenciador_memoria.obter(self.session_id, sumarizador=self._resumir_memoria)
+    
+    def _resumir_memoria(self, resumo_anterior: str, turnos: List[Dict[str, Any]]) -> str:
+        """
+        Incorpora turnos antigos ao resumo da memória usando o LLM do estrategista.
+        
+        Args:
+            resumo_anterior (str): Resumo acumulado até o momento
+            turnos (List[Dict[str, Any]]): Turnos a serem resumidos
+            
+        Returns:
+            str: Novo resumo acumulado
+        """
+        turnos_texto = "\n".join(f"{t['role']}: {t['content']}" for t in turnos)
+        prompt = f"""
+        Atualize o resumo de uma conversa sobre campanhas no Meta ADS. Mantenha apenas
+        decisões, dados do cliente (objetivo, público, orçamento, prazos) e conclusões.
+        Responda com no máximo 10 tópicos curtos.
+        
+        RESUMO ATUAL:
+        {resumo_anterior or "Nenhum"}
+        
+        NOVAS INTERAÇÕES:
+        {turnos_texto}
+        """
+        return self.estrategista.llm.invoke(prompt).content.strip()
+    
+    def buscar_documentos(self, consulta: str, k: int = DOCUMENTOS_TRECHOS_RETORNADOS) -> str:
+        """
+        Busca nos documentos enviados pelo cliente nesta sessão (briefings, planilhas,
+        apresentações) os trechos mais relevantes para a consulta.
+        
+        Args:
+            consulta (str): O que se procura nos documentos (Ex: "público-alvo e faixa etária")
+            k (int, optional): Número de trechos retornados
+            
+        Returns:
+            str: Trechos relevantes com o documento de origem, ou aviso se nada for encontrado
+        """
+        # O índice é obtido a cada busca: ele pode ter sido recarregado do disco após o upload
+        return indices_documentos.obter(self.session_id).buscar_trechos(consulta, k)
+    
+    def _com_memoria(self, descricao: str, contexto: Optional[str] = None) -> str:
+        """
+        Acrescenta o contexto da memória da sessão à descrição de uma tarefa.
+        
+        Args:
+            descricao (str): Descrição original da tarefa
+            contexto (str, optional): Contexto já obtido da memória. Se None, é obtido agora.
+            
+        Returns:
+            str: Descrição da tarefa com o contexto da memória, se houver
+        """
+        if contexto is None:
+            contexto = self.memoria.contexto()
+        if not contexto:
+            return descricao
+        return f"{descricao}\n\nCONTEXTO DA SESSÃO:\n{contexto}"
+    
+    def _registrar_memoria(self, solicitacao: str, resultado: Any):
+        """
+        Registra uma solicitação e seu resultado na memória da sessão.
+        
+        Args:
+            solicitacao (str): Resumo da solicitação feita aos agentes
+            resultado (Any): Resultado retornado pela equipe
+        """
+        gerenciador_memoria.registrar_turnos(
+            self.session_id,
+            [("user", solicitacao), ("assistant", str(resultado))],
+            sumarizador=self._resumir_memoria
+        )
+    
+    def metricas_memoria(self) -> Dict[str, Any]:
+        """
+        Retorna as métricas de uso da memória da sessão.
+        
+        Returns:
+            Dict[str, Any]: Tokens derivados da memória por chamada e tamanho atual
+        """
+        return self.memoria.metricas()
+    
     def inicializar_meta_ads_api(self, app_id=None, app_secret=None, access_token=None, account_id=None):
         """
         Inicializa a API do Meta ADS.
@@ -57,6 +198,8 @@ class CrewManager:
             account_id (str, optional): ID da conta publicitária
         """
         try:
+            from backend.trafego_ai.tools.meta_ads_api import MetaAdsAPI
+            
             self.meta_ads_api = MetaAdsAPI(
                 app_id=app_id,
                 app_secret=app_secret,
@@ -68,7 +211,9 @@ class CrewManager:
             for agent in [self.criador_campanhas, self.especialista_anuncios]:
                 # Adicionar métodos relevantes da API como ferramentas
                 for method_name in ['criar_campanha', 'criar_conjunto_anuncios', 'criar_anuncio', 
-                                  'criar_criativo', 'buscar_interesses']:
+                                  'criar_criativo', 'implantar_campanha', 'sincronizar_campanha',
+                                  'aplicar_mutacoes', 'buscar_interesses', 'buscar_interesses_em_lote',
+                                  'autocompletar_interesses']:
                     agent.add_tool(getattr(self.meta_ads_api, method_name))
             
             self.logger.info("Meta ADS API inicializada e adicionada aos agentes")
@@ -77,7 +222,7 @@ class CrewManager:
             self.logger.error(f"Erro ao inicializar Meta ADS API: {e}")
             return False
     
-    def _criar_crew(self, agentes=None, processo=Process.sequential):
+    def _criar_crew(self, agentes=None, processo=None):
         """
         Cria a equipe (Crew) de agentes.
         
@@ -90,6 +235,8 @@ class CrewManager:
         Returns:
             Crew: Instância da equipe de agentes
         """
+        from crewai import Crew, Process
+        
         if agentes is None:
             agentes = [
                 self.estrategista.get_agent(),
@@ -99,11 +246,12 @@ class CrewManager:
         
         return Crew(
             agents=agentes,
-            process=processo,
+            process=processo or Process.sequential,
             verbose=self.verbose,
-            memory=True
+            memory=False  # A memória nativa do CrewAI não tem limite; usamos a memória da sessão
         )
     
+    @etapa_log("estrategia")
     def criar_estrategia_campanha(self, briefing: Dict[str, Any]) -> Dict[str, Any]:
         """
         Cria uma estratégia completa de campanha com base no briefing.
@@ -114,9 +262,11 @@ class CrewManager:
         Returns:
             Dict[str, Any]: Estratégia completa de campanha
         """
+        from crewai import Task
+        
         # Criar tarefa para o estrategista
         estrategia_task = Task(
-            description=f"""
+            description=self._com_memoria(f"""
             Analise o briefing a seguir e desenvolva uma estratégia completa de marketing para uma 
             campanha no Meta ADS (Facebook e Instagram).
             
@@ -140,7 +290,7 @@ class CrewManager:
             
             Se necessário, faça uma pesquisa na web para obter informações sobre tendências atuais,
             melhores práticas ou informações sobre o setor relacionado à campanha.
-            """,
+            """),
             agent=self.estrategista.get_agent(),
             expected_output="Uma estratégia de marketing digital detalhada e fundamentada para a campanha no Meta ADS."
         )
@@ -148,6 +298,10 @@ class CrewManager:
         # Criar e executar a equipe
         crew = self._criar_crew(agentes=[self.estrategista.get_agent()])
         result = crew.kickoff(tasks=[estrategia_task])
+        self._registrar_memoria(
+            f"Estratégia para a campanha com objetivo: {briefing.get('objetivo', 'Não especificado')}",
+            result
+        )
         
         return {
             "estrategia": result,
@@ -158,6 +312,7 @@ class CrewManager:
             }
         }
     
+    @etapa_log("estrutura_tecnica")
     def criar_estrutura_tecnica_campanha(self, estrategia: str, briefing: Dict[str, Any]) -> Dict[str, Any]:
         """
         Cria a estrutura técnica completa da campanha para implementação no Meta ADS.
@@ -169,9 +324,11 @@ class CrewManager:
         Returns:
             Dict[str, Any]: Estrutura técnica da campanha para Meta ADS
         """
+        from crewai import Task
+        
         # Criar tarefa para o criador de campanhas
         estrutura_task = Task(
-            description=f"""
+            description=self._com_memoria(f"""
             Com base na estratégia e no briefing abaixo, elabore uma estrutura técnica completa 
             para implementação no Meta ADS.
             
@@ -196,7 +353,7 @@ class CrewManager:
             
             Forneça esta estrutura em um formato detalhado e técnico, como seria implementado 
             na plataforma Meta ADS, incluindo todas as configurações específicas.
-            """,
+            """),
             agent=self.criador_campanhas.get_agent(),
             expected_output="Uma estrutura técnica detalhada para implementação no Meta ADS."
         )
@@ -204,6 +361,7 @@ class CrewManager:
         # Criar e executar a equipe
         crew = self._criar_crew(agentes=[self.criador_campanhas.get_agent()])
         result = crew.kickoff(tasks=[estrutura_task])
+        self._registrar_memoria("Estrutura técnica da campanha", result)
         
         return {
             "estrutura_tecnica": result,
@@ -213,21 +371,29 @@ class CrewManager:
             }
         }
     
-    def analisar_criativo(self, descricao_criativo: str, formato: str, objetivo_campanha: str) -> Dict[str, Any]:
+    def _descricao_analise_criativo(self, descricao_criativo: str, formato: str, objetivo_campanha: str,
+                                    fatos_tecnicos: Optional[Dict[str, Any]] = None) -> str:
         """
-        Analisa um criativo enviado pelo usuário e fornece feedback.
+        Monta a descrição da tarefa de avaliação de um criativo.
         
         Args:
             descricao_criativo (str): Descrição detalhada do criativo
             formato (str): Formato do criativo (imagem, vídeo, carrossel, etc.)
             objetivo_campanha (str): Objetivo da campanha
+            fatos_tecnicos (Dict[str, Any], optional): Resultado da análise local da imagem
             
         Returns:
-            Dict[str, Any]: Avaliação detalhada do criativo
+            str: Descrição da tarefa para o especialista em anúncios
         """
-        # Criar tarefa para o especialista em anúncios
-        analise_task = Task(
-            description=f"""
+        dados_tecnicos = ""
+        if fatos_tecnicos:
+            dados_tecnicos = (
+                "DADOS TÉCNICOS (medidos localmente; dim=px, prop=largura/altura, texto=fração "
+                "estimada da área com texto, que pode incluir texturas; confirme pela descrição): "
+                f"{fatos_compactos(fatos_tecnicos)}"
+            )
+        
+        return f"""
             Avalie o criativo descrito abaixo para uma campanha de Meta ADS:
             
             DESCRIÇÃO DO CRIATIVO:
@@ -237,6 +403,10 @@ class CrewManager:
             
             OBJETIVO DA CAMPANHA: {objetivo_campanha}
             
+            {dados_tecnicos}
+            
+            Comece a resposta com a linha "NOTA: X/10", onde X é a adequação ao objetivo.
+            
             Forneça uma avaliação detalhada deste criativo, incluindo:
             
             1. Adequação ao objetivo da campanha (de 1 a 10)
@@ -249,17 +419,97 @@ class CrewManager:
             
             Seja específico e técnico em sua avaliação, considerando os aspectos visuais, 
             textuais e estratégicos do criativo.
-            """,
-            agent=self.especialista_anuncios.get_agent(),
+            """
+    
+    def _executar_analise_criativo(self, especialista: "EspecialistaAnunciosAgent", descricao_tarefa: str) -> str:
+        """
+        Executa a tarefa de avaliação de criativo com um especialista em anúncios.
+        
+        Args:
+            especialista (EspecialistaAnunciosAgent): Agente que executará a avaliação
+            descricao_tarefa (str): Descrição completa da tarefa
+            
+        Returns:
+            str: Avaliação produzida pelo agente
+        """
+        from crewai import Task
+        
+        analise_task = Task(
+            description=descricao_tarefa,
+            agent=especialista.get_agent(),
             expected_output="Uma avaliação técnica detalhada do criativo para Meta ADS."
         )
         
-        # Criar e executar a equipe
-        crew = self._criar_crew(agentes=[self.especialista_anuncios.get_agent()])
-        result = crew.kickoff(tasks=[analise_task])
+        crew = self._criar_crew(agentes=[especialista.get_agent()])
+        return crew.kickoff(tasks=[analise_task])
+    
+    def _reprovacao_tecnica(self, fatos_tecnicos: Dict[str, Any]) -> str:
+        """
+        Monta a avaliação de um criativo reprovado na validação local, sem chamar o LLM.
+        
+        Args:
+            fatos_tecnicos (Dict[str, Any]): Resultado da análise local da imagem
+            
+        Returns:
+            str: Avaliação com os requisitos não atendidos
+        """
+        falhas = "\n".join(f"- {falha}" for falha in fatos_tecnicos["falhas"])
+        return (f"NOTA: 0/10\n\nO criativo não atende aos requisitos técnicos do Meta ADS "
+                f"e não foi enviado para avaliação:\n{falhas}")
+    
+    def _resumo_validacao(self, criativo: Dict[str, Any]) -> str:
+        """
+        Resume a validação local de um criativo para listagem em prompts.
+        
+        Args:
+            criativo (Dict[str, Any]): Criativo, possivelmente com a chave "fatos_tecnicos"
+            
+        Returns:
+            str: Trecho com os dados técnicos ou as falhas, vazio se não houver validação
+        """
+        fatos = criativo.get("fatos_tecnicos")
+        if not fatos:
+            return ""
+        if not fatos["aprovado"]:
+            return f" | REPROVADO na validação técnica: {'; '.join(fatos['falhas'])}"
+        return f" | dados técnicos: {fatos_compactos(fatos)}"
+    
+    @etapa_log("analise_criativo")
+    def analisar_criativo(self, descricao_criativo: str, formato: str, objetivo_campanha: str,
+                          caminho_arquivo: Optional[str] = None,
+                          fatos_tecnicos: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Analisa um criativo enviado pelo usuário e fornece feedback.
+        
+        Imagens passam antes por uma validação local; criativos reprovados nela
+        não são enviados ao LLM.
+        
+        Args:
+            descricao_criativo (str): Descrição detalhada do criativo
+            formato (str): Formato do criativo (imagem, vídeo, carrossel, etc.)
+            objetivo_campanha (str): Objetivo da campanha
+            caminho_arquivo (str, optional): Caminho local do arquivo do criativo
+            fatos_tecnicos (Dict[str, Any], optional): Análise local já calculada para o arquivo
+            
+        Returns:
+            Dict[str, Any]: Avaliação detalhada do criativo
+        """
+        if fatos_tecnicos is None and caminho_arquivo and eh_imagem(caminho_arquivo):
+            fatos_tecnicos = analisar_imagem(caminho_arquivo)
+        
+        if fatos_tecnicos and not fatos_tecnicos["aprovado"]:
+            result = self._reprovacao_tecnica(fatos_tecnicos)
+        else:
+            descricao_tarefa = self._com_memoria(
+                self._descricao_analise_criativo(descricao_criativo, formato, objetivo_campanha, fatos_tecnicos)
+            )
+            result = self._executar_analise_criativo(self.especialista_anuncios, descricao_tarefa)
+            self._registrar_memoria(f"Análise do criativo ({formato}): {descricao_criativo[:200]}", result)
         
         return {
             "avaliacao_criativo": result,
+            "nota": extrair_nota_criativo(result),
+            "validacao_tecnica": fatos_tecnicos,
             "criativo": {
                 "descricao": descricao_criativo[:200] + "..." if len(descricao_criativo) > 200 else descricao_criativo,
                 "formato": formato,
@@ -267,6 +517,181 @@ class CrewManager:
             }
         }
     
+    def analisar_criativos_em_lote(self, criativos: List[Dict[str, Any]], objetivo_campanha: str,
+                                   max_concorrencia: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analisa vários criativos simultaneamente, respeitando um limite de concorrência.
+        
+        Cada avaliação roda em uma thread com sua própria instância do especialista em
+        anúncios, pois os agentes do CrewAI não podem executar tarefas em paralelo.
+        Os resultados são produzidos à medida que ficam prontos e, ao final, é
+        produzido um ranking combinado pela nota de cada criativo.
+        
+        Criativos de imagem com a chave "caminho" passam antes pela validação local;
+        os reprovados são resolvidos sem chamada ao LLM.
+        
+        Args:
+            criativos (List[Dict[str, Any]]): Criativos com as chaves "descricao", "formato"
+                                            e, opcionalmente, "caminho"
+            objetivo_campanha (str): Objetivo da campanha
+            max_concorrencia (int, optional): Número máximo de avaliações simultâneas.
+                                            Default para CRIATIVOS_LOTE_MAX_CONCORRENCIA.
+            
+        Returns:
+            AsyncIterator[Dict[str, Any]]: Eventos do tipo "resultado" (um por criativo) e, por fim, "ranking"
+            
+        Raises:
+            ValueError: Se o lote exceder CRIATIVOS_LOTE_MAX_ITENS (antes de qualquer avaliação)
+        """
+        # Validado aqui, e não no gerador, para falhar antes de a resposta em fluxo começar
+        if len(criativos) > CRIATIVOS_LOTE_MAX_ITENS:
+            raise ValueError(f"O lote aceita no máximo {CRIATIVOS_LOTE_MAX_ITENS} criativos.")
+        
+        return self._gerar_analises_em_lote(criativos, objetivo_campanha, max_concorrencia)
+    
+    async def _gerar_analises_em_lote(self, criativos: List[Dict[str, Any]], objetivo_campanha: str,
+                                      max_concorrencia: Optional[int]) -> AsyncIterator[Dict[str, Any]]:
+        max_concorrencia = max(1, min(max_concorrencia or CRIATIVOS_LOTE_MAX_CONCORRENCIA, len(criativos) or 1))
+        
+        # Um especialista por vaga de concorrência, criado sob demanda
+        especialistas = asyncio.Queue()
+        especialistas.put_nowait(self.especialista_anuncios)
+        for _ in range(max_concorrencia - 1):
+            especialistas.put_nowait(None)
+        
+        # O contexto da memória é o mesmo para todo o lote
+        contexto = self.memoria.contexto()
+        
+        async def avaliar(indice: int, criativo: Dict[str, Any]) -> Dict[str, Any]:
+            descricao = criativo.get("descricao", "")
+            formato = criativo.get("formato", "Não especificado")
+            resumo_criativo = {"descricao": descricao[:200], "formato": formato}
+            
+            # A validação local roda no pool de processos, fora das vagas do LLM
+            fatos_tecnicos = criativo.get("fatos_tecnicos")
+            caminho = criativo.get("caminho")
+            try:
+                if fatos_tecnicos is None and caminho and eh_imagem(caminho):
+                    fatos_tecnicos = await analisar_imagem_async(caminho)
+            except Exception as e:
+                self.logger.error(f"Erro na validação local do criativo {indice}: {e}")
+            
+            if fatos_tecnicos and not fatos_tecnicos["aprovado"]:
+                avaliacao = self._reprovacao_tecnica(fatos_tecnicos)
+                return {"indice": indice, "avaliacao_criativo": avaliacao, "nota": extrair_nota_criativo(avaliacao),
+                        "validacao_tecnica": fatos_tecnicos, "criativo": resumo_criativo, "erro": None}
+            
+            especialista = await especialistas.get()
+            try:
+                if especialista is None:
+                    from backend.trafego_ai.agents import EspecialistaAnunciosAgent
+                    
+                    especialista = EspecialistaAnunciosAgent(
+                        tools=list(self.especialista_anuncios.tools),
+                        verbose=self.verbose
+                    )
+                descricao_tarefa = self._com_memoria(
+                    self._descricao_analise_criativo(descricao, formato, objetivo_campanha, fatos_tecnicos),
+                    contexto=contexto
+                )
+                avaliacao = await asyncio.to_thread(self._executar_analise_criativo, especialista, descricao_tarefa)
+                return {
+                    "indice": indice,
+                    "avaliacao_criativo": avaliacao,
+                    "nota": extrair_nota_criativo(avaliacao),
+                    "validacao_tecnica": fatos_tecnicos,
+                    "criativo": resumo_criativo,
+                    "erro": None
+                }
+            except Exception as e:
+                self.logger.error(f"Erro ao analisar o criativo {indice}: {e}")
+                return {"indice": indice, "avaliacao_criativo": None, "nota": None,
+                        "validacao_tecnica": fatos_tecnicos, "criativo": resumo_criativo, "erro": str(e)}
+            finally:
+                especialistas.put_nowait(especialista)
+        
+        tarefas = [asyncio.ensure_future(avaliar(i, c)) for i, c in enumerate(criativos)]
+        resultados = []
+        try:
+            for proxima in asyncio.as_completed(tarefas):
+                resultado = await proxima
+                resultados.append(resultado)
+                yield {"tipo": "resultado", **resultado}
+        finally:
+            # Cancela as avaliações pendentes se o consumidor abandonar o fluxo
+            for tarefa in tarefas:
+                tarefa.cancel()
+        
+        ranking = sorted(
+            ({"indice": r["indice"], "nota": r["nota"], "criativo": r["criativo"]}
+             for r in resultados if r["nota"] is not None),
+            key=lambda r: r["nota"],
+            reverse=True
+        )
+        falhas = sorted(r["indice"] for r in resultados if r["erro"])
+        
+        self._registrar_memoria(
+            f"Análise em lote de {len(criativos)} criativos para o objetivo: {objetivo_campanha}",
+            "Ranking: " + ", ".join(f"criativo {r['indice'] + 1} ({r['nota']}/10)" for r in ranking)
+        )
+        
+        yield {"tipo": "ranking", "ranking": ranking, "falhas": falhas, "total": len(criativos)}
+    
+    @etapa_log("analise_desempenho")
+    def analisar_desempenho_conta(self, account_id: Optional[str] = None, dias: int = 30,
+                                  ad_ids: Optional[List] = None) -> Dict[str, Any]:
+        """
+        Analisa o desempenho de todos os anúncios da conta a partir das métricas locais.
+        
+        KPIs, médias móveis, fadiga e anomalias são calculados de uma vez para todos
+        os anúncios; apenas os achados relevantes são retornados.
+        
+        Args:
+            account_id (str, optional): ID da conta publicitária. Default para META_ACCOUNT_ID
+            dias (int, optional): Número de dias analisados. Default para 30
+            ad_ids (List, optional): Restringir a análise a estes anúncios
+            
+        Returns:
+            Dict[str, Any]: Totais da conta e achados ordenados por severidade
+        """
+        dados = armazem_metricas.consultar(
+            account_id or META_ACCOUNT_ID, "ad", date.today() - timedelta(days=dias - 1), date.today(),
+            ad_ids=ad_ids
+        )
+        return analisar_desempenho(dados)
+    
+    @etapa_log("otimizacao_anuncio")
+    def otimizar_anuncio(self, detalhes_anuncio: Dict[str, Any], metricas_desempenho: Dict[str, Any],
+                         ad_id: Optional[str] = None, account_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Gera recomendações de otimização para um anúncio existente.
+        
+        Quando o ID do anúncio é informado, o especialista recebe os achados da análise
+        quantitativa da série diária em vez de precisar inferir tendências das métricas.
+        
+        Args:
+            detalhes_anuncio (Dict[str, Any]): Detalhes do anúncio existente
+            metricas_desempenho (Dict[str, Any]): Métricas de desempenho do anúncio
+            ad_id (str, optional): ID do anúncio no Meta ADS
+            account_id (str, optional): ID da conta publicitária. Default para META_ACCOUNT_ID
+            
+        Returns:
+            Dict[str, Any]: Recomendações de otimização
+        """
+        achados = None
+        if ad_id:
+            achados = achados_compactos(self.analisar_desempenho_conta(account_id, ad_ids=[ad_id]))
+        
+        resultado = self.especialista_anuncios.otimizar_anuncio_existente(
+            detalhes_anuncio, metricas_desempenho, achados=achados
+        )
+        self._registrar_memoria(
+            f"Otimização do anúncio {ad_id or detalhes_anuncio.get('titulo', '')}",
+            resultado["recomendacoes_otimizacao"]
+        )
+        return resultado
+    
+    @etapa_log("processo_completo")
     def processo_completo_campanha(self, briefing: Dict[str, Any], criativos: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Executa o processo completo de criação de campanha, desde a estratégia até as especificações de anúncios.
@@ -282,9 +707,18 @@ class CrewManager:
         if criativos is None:
             criativos = []
         
+        # Validar localmente as imagens, em paralelo, antes de montar o prompt
+        pendentes = [c for c in criativos
+                     if c.get("caminho") and eh_imagem(c["caminho"]) and "fatos_tecnicos" not in c]
+        if pendentes:
+            for criativo, fatos in zip(pendentes, analisar_imagens([c["caminho"] for c in pendentes])):
+                criativo["fatos_tecnicos"] = fatos
+        
+        from crewai import Task
+        
         # Tarefa 1: Desenvolver estratégia
         estrategia_task = Task(
-            description=f"""
+            description=self._com_memoria(f"""
             Analise o briefing do cliente e desenvolva uma estratégia abrangente de marketing
             para campanha no Meta ADS.
             
@@ -292,7 +726,7 @@ class CrewManager:
             {briefing}
             
             Se necessário, faça pesquisas na web para encontrar tendências atuais e melhores práticas.
-            """,
+            """),
             agent=self.estrategista.get_agent(),
             expected_output="Estratégia de marketing digital detalhada."
         )
@@ -312,7 +746,8 @@ class CrewManager:
         )
         
         # Tarefa 3: Avaliar criativos e criar especificações de anúncios
-        criativos_texto = "\n".join([f"Criativo {i+1}: {c.get('tipo', 'N/A')} - {c.get('descricao', 'N/A')}" 
+        criativos_texto = "\n".join([f"Criativo {i+1}: {c.get('tipo', 'N/A')} - {c.get('descricao', 'N/A')}"
+                                    f"{self._resumo_validacao(c)}"
                                     for i, c in enumerate(criativos)])
         
         anuncios_task = Task(
@@ -340,12 +775,15 @@ class CrewManager:
                 self.estrategista.get_agent(),
                 self.criador_campanhas.get_agent(),
                 self.especialista_anuncios.get_agent()
-            ],
-            processo=Process.sequential
+            ]
         )
         
         # Executar as tarefas
         resultado = crew.kickoff(tasks=[estrategia_task, estrutura_task, anuncios_task])
+        self._registrar_memoria(
+            f"Processo completo da campanha {briefing.get('nome_campanha', '')}",
+            f"Estratégia: {resultado[0]}\n\nEstrutura técnica: {resultado[1]}"
+        )
         
         return {
             "processo_completo": {
@@ -0,0 +1,250 @@
+"""
+Implementação do registro de logs assíncrono e estruturado (JSON), com contexto de sessão, tarefa e etapa
+"""
+import asyncio
+import atexit
+import contextvars
+import copy
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from backend.trafego_ai.config.settings import (
+    obter_settings,
+    LOG_ARQUIVO,
+    LOG_MAX_BYTES,
+    LOG_BACKUPS,
+    LOG_AMOSTRAGEM,
+    LOG_FORMATO_CONSOLE
+)
+
+# Identificadores anexados a cada registro: session_id, tarefa_id e etapa
+_contexto_log: contextvars.ContextVar = contextvars.ContextVar("contexto_log", default={})
+
+# Atributos padrão de um LogRecord; os demais vieram de `extra` e vão para o JSON
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "contexto", "contexto_texto", "amostragem"
+}
+
+_FORMATO_TEXTO = "%(asctime)s - %(name)s - %(levelname)s - %(message)s%(contexto_texto)s"
+
+_ouvinte: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+@contextmanager
+def contexto_log(**campos: Any):
+    """
+    Anexa identificadores aos logs emitidos dentro do bloco (e nas tarefas e threads
+    que copiam o contexto). Campos None são ignorados.
+
+    Ex: with contexto_log(session_id=sessao, tarefa_id=tarefa): ...
+
+    Args:
+        **campos: Identificadores (Ex: session_id, tarefa_id, etapa)
+    """
+    token = _contexto_log.set({**_contexto_log.get(), **{k: v for k, v in campos.items() if v is not None}})
+    try:
+        yield
+    finally:
+        try:
+            _contexto_log.reset(token)
+        except ValueError:
+            # Gerador assíncrono finalizado em outro contexto (Ex: cliente desconectou do fluxo)
+            pass
+
+
+def etapa_log(etapa: str) -> Callable:
+    """
+    Decorador que identifica nos logs a etapa executada pela função (síncrona ou assíncrona).
+
+    Args:
+        etapa (str): Nome da etapa (Ex: estrategia)
+    """
+    def decorador(funcao: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(funcao):
+            @functools.wraps(funcao)
+            async def executar_async(*args, **kwargs):
+                with contexto_log(etapa=etapa):
+                    return await funcao(*args, **kwargs)
+            return executar_async
+
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            with contexto_log(etapa=etapa):
+                return funcao(*args, **kwargs)
+        return executar
+    return decorador
+
+
+def contexto_atual() -> Dict[str, Any]:
+    """
+    Retorna os identificadores de log do contexto atual.
+    """
+    return dict(_contexto_log.get())
+
+
+class FiltroContexto(logging.Filter):
+    """
+    Copia o contexto de log para o registro na thread que o emitiu, antes de ir para a fila.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.contexto = _contexto_log.get()
+        return True
+
+
+class FiltroAmostragem(logging.Filter):
+    """
+    Mantém apenas uma fração das mensagens abaixo de WARNING dos loggers ruidosos.
+
+    A fração é configurada por prefixo do nome do logger (o mais específico vale).
+    A amostragem é determinística: com fração 0.1, uma a cada 10 mensagens é mantida,
+    e o registro leva o fator em `amostragem` para que as contagens possam ser reponderadas.
+    """
+
+    def __init__(self, fracoes: Dict[str, float]):
+        super().__init__()
+        self.fracoes = {nome: max(0.0, min(1.0, fracao)) for nome, fracao in fracoes.items()}
+        self._contadores: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _fracao(self, nome: str) -> float:
+        melhor, fracao = -1, 1.0
+        for prefixo, valor in self.fracoes.items():
+            if (nome == prefixo or nome.startswith(prefixo + ".")) and len(prefixo) > melhor:
+                melhor, fracao = len(prefixo), valor
+        return fracao
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.fracoes:
+            return True
+        fracao = self._fracao(record.name)
+        if fracao >= 1.0:
+            return True
+        if fracao <= 0.0:
+            return False
+        intervalo = round(1 / fracao)
+        with self._lock:
+            contagem = self._contadores.get(record.name, 0)
+            self._contadores[record.name] = contagem + 1
+        record.amostragem = intervalo
+        return contagem % intervalo == 0
+
+
+class HandlerFila(logging.handlers.QueueHandler):
+    """
+    QueueHandler que formata a mensagem na thread de origem (os argumentos podem mudar
+    depois) mas preserva o traceback em separado para o formatador JSON.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class FormatadorJSON(logging.Formatter):
+    """
+    Formata cada registro como uma linha JSON com data (UTC), nível, logger, mensagem,
+    contexto (sessão, tarefa, etapa) e os campos passados em `extra`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        registro = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+            **getattr(record, "contexto", {}),
+        }
+        if getattr(record, "amostragem", None):
+            registro["amostragem"] = record.amostragem
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO and chave not in registro:
+                registro[chave] = valor
+        if record.exc_text:
+            registro["excecao"] = record.exc_text
+        if record.stack_info:
+            registro["pilha"] = record.stack_info
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+class FormatadorTexto(logging.Formatter):
+    """
+    Formato legível para o console, com o contexto ao final da linha.
+    """
+
+    def __init__(self):
+        super().__init__(_FORMATO_TEXTO)
+
+    def format(self, record: logging.LogRecord) -> str:
+        contexto = getattr(record, "contexto", {})
+        record.contexto_texto = (" [" + " ".join(f"{k}={v}" for k, v in contexto.items()) + "]") if contexto else ""
+        return super().format(record)
+
+
+def configurar_logs(nivel: Optional[str] = None, arquivo: Optional[str] = LOG_ARQUIVO,
+                    amostragem: Optional[Dict[str, float]] = None,
+                    formato_console: str = LOG_FORMATO_CONSOLE) -> logging.handlers.QueueListener:
+    """
+    Configura o logger raiz para enviar os registros a uma fila, gravada em segundo plano.
+
+    Quem emite o log apenas enfileira o registro; o console e o arquivo (JSON, com rotação
+    por tamanho) são escritos por uma thread própria, fora do event loop. Chamadas
+    repetidas no mesmo processo reaproveitam a configuração existente.
+
+    Args:
+        nivel (str, optional): Nível mínimo do logger raiz. Default para settings.log_level
+                               (em uma nova chamada, None mantém o nível atual).
+        arquivo (str, optional): Arquivo de log em JSON. Se None, apenas o console.
+        amostragem (Dict[str, float], optional): Fração mantida por logger. Default para LOG_AMOSTRAGEM.
+        formato_console (str, optional): "texto" ou "json". Default para LOG_FORMATO_CONSOLE.
+
+    Returns:
+        QueueListener: Ouvinte da fila (encerrado automaticamente ao sair do processo)
+    """
+    global _ouvinte
+    with _lock:
+        raiz = logging.getLogger()
+        if _ouvinte is not None:
+            if nivel:
+                raiz.setLevel(nivel)
+            return _ouvinte
+        raiz.setLevel(nivel or obter_settings().log_level)
+
+        console = logging.StreamHandler()
+        console.setFormatter(FormatadorJSON() if formato_console == "json" else FormatadorTexto())
+        destinos = [console]
+        if arquivo:
+            os.makedirs(os.path.dirname(arquivo) or ".", exist_ok=True)
+            arquivo_log = logging.handlers.RotatingFileHandler(
+                arquivo, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+            )
+            arquivo_log.setFormatter(FormatadorJSON())
+            destinos.append(arquivo_log)
+
+        fila = HandlerFila(queue.SimpleQueue())
+        fila.addFilter(FiltroAmostragem(LOG_AMOSTRAGEM if amostragem is None else amostragem))
+        fila.addFilter(FiltroContexto())
+
+        for handler in list(raiz.handlers):
+            raiz.removeHandler(handler)
+        raiz.addHandler(fila)
+
+        _ouvinte = logging.handlers.QueueListener(fila.queue, *destinos, respect_handler_level=True)
+        _ouvinte.start()
+        atexit.register(_ouvinte.stop)
+        return _ouvinte
@@ -0,0 +1,401 @@
+"""
+Implementação da memória de sessão limitada e compactada para os agentes
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.trafego_ai.config.settings import (
+    MEMORIA_MAX_TURNOS,
+    MEMORIA_TURNOS_RECENTES,
+    MEMORIA_MAX_TOKENS,
+    MEMORIA_MAX_SESSOES,
+    MEMORIA_DIR
+)
+
+logger = logging.getLogger(__name__)
+
+# Codificador de tokens carregado sob demanda (tiktoken é opcional)
+_encoder = None
+_encoder_carregado = False
+
+
+def contar_tokens(texto: str) -> int:
+    """
+    Conta os tokens de um texto.
+
+    Usa o tiktoken quando disponível; caso contrário, aplica a aproximação
+    de 4 caracteres por token.
+
+    Args:
+        texto (str): Texto a ser medido
+
+    Returns:
+        int: Número de tokens estimado
+    """
+    global _encoder, _encoder_carregado
+    if not texto:
+        return 0
+
+    if not _encoder_carregado:
+        _encoder_carregado = True
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoder = None
+
+    if _encoder is not None:
+        return len(_encoder.encode(texto))
+    return max(1, len(texto) // 4)
+
+
+def resumo_extrativo(resumo_anterior: str, turnos: List[Dict[str, Any]], max_caracteres: int = 300) -> str:
+    """
+    Sumarizador padrão, sem chamada ao LLM: mantém o início de cada turno.
+
+    Args:
+        resumo_anterior (str): Resumo acumulado até o momento
+        turnos (List[Dict[str, Any]]): Turnos a serem incorporados ao resumo
+        max_caracteres (int, optional): Caracteres mantidos por turno. Default para 300.
+
+    Returns:
+        str: Novo resumo
+    """
+    linhas = [resumo_anterior] if resumo_anterior else []
+    for turno in turnos:
+        conteudo = " ".join(turno["content"].split())
+        if len(conteudo) > max_caracteres:
+            conteudo = conteudo[:max_caracteres] + "..."
+        linhas.append(f"- {turno['role']}: {conteudo}")
+    return "\n".join(linhas)
+
+
+class MemoriaSessao:
+    """
+    Memória de uma sessão com limite de turnos e de tokens.
+
+    Os turnos mais antigos são compactados em um resumo acumulado sempre que
+    algum dos limites é ultrapassado, mantendo apenas os turnos recentes na íntegra.
+    O sumarizador (que pode chamar o LLM) roda fora do lock da memória.
+    """
+
+    def __init__(self, session_id: str, max_turnos: int = MEMORIA_MAX_TURNOS,
+                 max_tokens: int = MEMORIA_MAX_TOKENS, turnos_recentes: int = MEMORIA_TURNOS_RECENTES,
+                 sumarizador: Optional[Callable[[str, List[Dict[str, Any]]], str]] = None):
+        """
+        Inicializa a memória da sessão.
+
+        Args:
+            session_id (str): Identificador da sessão
+            max_turnos (int, optional): Número máximo de turnos mantidos na íntegra
+            max_tokens (int, optional): Teto de tokens do contexto gerado pela memória
+            turnos_recentes (int, optional): Turnos preservados após cada compactação
+            sumarizador (Callable, optional): Função (resumo_anterior, turnos) -> novo resumo.
+                                             Default para o resumo extrativo local.
+        """
+        self.session_id = session_id
+        self.max_turnos = max_turnos
+        self.max_tokens = max_tokens
+        self.turnos_recentes = min(turnos_recentes, max_turnos)
+        self.sumarizador = sumarizador or resumo_extrativo
+
+        self.turnos: List[Dict[str, Any]] = []
+        self.resumo = ""
+        self.atualizado_em = time.time()
+
+        # Tokens derivados da memória em cada chamada ao LLM (janela limitada)
+        self.tokens_por_chamada = deque(maxlen=100)
+        self.total_chamadas = 0
+        self.total_tokens = 0
+        self.total_compactacoes = 0
+
+        # Marcada pelo GerenciadorMemoria ao tirar a sessão da RAM; a partir daí não aceita turnos
+        self.removida = False
+        self._compactando = False
+        self._lock = threading.RLock()
+
+    def adicionar_turno(self, role: str, content: str) -> bool:
+        """
+        Adiciona um turno à memória, compactando-a se necessário.
+
+        Args:
+            role (str): Papel do autor do turno (user, assistant, system)
+            content (str): Conteúdo do turno
+
+        Returns:
+            bool: False se a memória já foi removida da RAM (o turno não foi registrado)
+        """
+        return self.adicionar_turnos([(role, content)])
+
+    def adicionar_turnos(self, turnos: List[Tuple[str, str]]) -> bool:
+        """
+        Adiciona turnos à memória de uma só vez, compactando-a se necessário.
+
+        Args:
+            turnos (List[Tuple[str, str]]): Pares (role, content) na ordem da conversa
+
+        Returns:
+            bool: False se a memória já foi removida da RAM (nenhum turno foi registrado)
+        """
+        with self._lock:
+            if self.removida:
+                return False
+            agora = time.time()
+            self.turnos.extend({"role": role, "content": str(content), "timestamp": agora} for role, content in turnos)
+            self.atualizado_em = agora
+
+        self._compactar()
+        return True
+
+    def _tokens_armazenados(self) -> int:
+        return contar_tokens(self.resumo) + sum(contar_tokens(t["content"]) for t in self.turnos)
+
+    def _excede_limites(self) -> bool:
+        return len(self.turnos) > self.max_turnos or self._tokens_armazenados() > self.max_tokens
+
+    def _compactar(self):
+        """
+        Move os turnos mais antigos para o resumo acumulado, se algum limite foi ultrapassado.
+
+        O sumarizador roda sem o lock: enquanto isso, novos turnos podem ser adicionados
+        ao final e o contexto continua disponível com os turnos ainda não resumidos.
+        """
+        with self._lock:
+            if self._compactando or not self._excede_limites():
+                return
+            antigos = self.turnos[:-self.turnos_recentes] if self.turnos_recentes else list(self.turnos)
+            if not antigos:
+                self._limitar_tokens()
+                return
+            self._compactando = True
+            resumo_anterior = self.resumo
+
+        try:
+            try:
+                resumo = self.sumarizador(resumo_anterior, antigos)
+            except Exception as e:
+                logger.error(f"Erro ao resumir a memória da sessão {self.session_id}: {e}")
+                resumo = resumo_extrativo(resumo_anterior, antigos)
+
+            with self._lock:
+                # Só a compactação remove turnos do início; os resumidos continuam lá
+                self.turnos = self.turnos[len(antigos):]
+                self.resumo = resumo
+                self.total_compactacoes += 1
+                self._limitar_tokens()
+        finally:
+            with self._lock:
+                self._compactando = False
+
+    def _limitar_tokens(self):
+        # O resumo nunca pode ocupar mais da metade do orçamento de tokens
+        limite_resumo = self.max_tokens // 2
+        while self.resumo and contar_tokens(self.resumo) > limite_resumo:
+            linhas = self.resumo.split("\n")
+            if len(linhas) > 1:
+                self.resumo = "\n".join(linhas[1:])
+            else:
+                self.resumo = self.resumo[len(self.resumo) // 4:]
+
+        # Se os turnos recentes sozinhos estourarem o orçamento, descartar os mais antigos
+        while len(self.turnos) > 1 and self._tokens_armazenados() > self.max_tokens:
+            self.turnos.pop(0)
+
+    def contexto(self) -> str:
+        """
+        Gera o trecho de prompt com o conteúdo da memória e registra seu tamanho.
+
+        Returns:
+            str: Contexto da memória pronto para ser incluído no prompt
+        """
+        with self._lock:
+            partes = []
+            if self.resumo:
+                partes.append(f"RESUMO DAS INTERAÇÕES ANTERIORES:\n{self.resumo}")
+            if self.turnos:
+                recentes = "\n".join(f"{t['role']}: {t['content']}" for t in self.turnos)
+                partes.append(f"INTERAÇÕES RECENTES:\n{recentes}")
+            texto = "\n\n".join(partes)
+
+            tokens = contar_tokens(texto)
+            self.tokens_por_chamada.append(tokens)
+            self.total_chamadas += 1
+            self.total_tokens += tokens
+            return texto
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna as métricas de uso da memória.
+
+        Returns:
+            Dict[str, Any]: Tokens por chamada, totais e tamanho atual da memória
+        """
+        with self._lock:
+            return {
+                "session_id": self.session_id,
+                "turnos": len(self.turnos),
+                "tokens_armazenados": self._tokens_armazenados(),
+                "compactacoes": self.total_compactacoes,
+                "chamadas": self.total_chamadas,
+                "tokens_totais": self.total_tokens,
+                "tokens_ultima_chamada": self.tokens_por_chamada[-1] if self.tokens_por_chamada else 0,
+                "tokens_medio_por_chamada": (self.total_tokens / self.total_chamadas) if self.total_chamadas else 0.0
+            }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "session_id": self.session_id,
+                "turnos": list(self.turnos),
+                "resumo": self.resumo,
+                "atualizado_em": self.atualizado_em
+            }
+
+    @classmethod
+    def from_dict(cls, dados: Dict[str, Any], **kwargs) -> "MemoriaSessao":
+        memoria = cls(dados["session_id"], **kwargs)
+        memoria.turnos = dados.get("turnos", [])
+        memoria.resumo = dados.get("resumo", "")
+        memoria.atualizado_em = dados.get("atualizado_em", time.time())
+        return memoria
+
+
+class GerenciadorMemoria:
+    """
+    Mantém as memórias de sessão em RAM com limite de sessões (LRU).
+
+    Sessões removidas da RAM são persistidas em disco e recarregadas sob demanda.
+    Quem usa a memória deve obtê-la aqui a cada turno, sem guardar referência:
+    uma memória removida não aceita mais turnos (ver registrar_turnos).
+    """
+
+    def __init__(self, max_sessoes: int = MEMORIA_MAX_SESSOES, diretorio: Optional[str] = MEMORIA_DIR):
+        """
+        Inicializa o gerenciador de memórias.
+
+        Args:
+            max_sessoes (int, optional): Número máximo de sessões mantidas em RAM
+            diretorio (str, optional): Diretório de persistência. Se None, não persiste.
+        """
+        self.max_sessoes = max_sessoes
+        self.diretorio = diretorio
+        self._sessoes: "OrderedDict[str, MemoriaSessao]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _caminho(self, session_id: str) -> str:
+        nome = "".join(c for c in session_id if c.isalnum() or c in "-_")
+        return os.path.join(self.diretorio, f"{nome}.json")
+
+    def obter(self, session_id: str, **kwargs) -> MemoriaSessao:
+        """
+        Obtém a memória de uma sessão, carregando-a do disco ou criando uma nova.
+
+        Args:
+            session_id (str): Identificador da sessão
+            **kwargs: Parâmetros repassados a MemoriaSessao na criação
+
+        Returns:
+            MemoriaSessao: Memória da sessão
+        """
+        with self._lock:
+            memoria = self._sessoes.get(session_id)
+            if memoria is not None:
+                self._sessoes.move_to_end(session_id)
+                return memoria
+
+            memoria = self._carregar(session_id, **kwargs) or MemoriaSessao(session_id, **kwargs)
+            self._sessoes[session_id] = memoria
+
+            while len(self._sessoes) > self.max_sessoes:
+                _, removida = self._sessoes.popitem(last=False)
+                self._persistir(removida, remover=True)
+
+            return memoria
+
+    def registrar_turnos(self, session_id: str, turnos: List[Tuple[str, str]], **kwargs):
+        """
+        Registra turnos na memória de uma sessão, mesmo que ela tenha saído da RAM no meio do caminho.
+
+        Args:
+            session_id (str): Identificador da sessão
+            turnos (List[Tuple[str, str]]): Pares (role, content) na ordem da conversa
+            **kwargs: Parâmetros repassados a MemoriaSessao na criação
+        """
+        # Se a sessão foi removida entre obter e adicionar, ela é recarregada do disco já com o estado persistido
+        while not self.obter(session_id, **kwargs).adicionar_turnos(turnos):
+            pass
+
+    def _carregar(self, session_id: str, **kwargs) -> Optional[MemoriaSessao]:
+        if not self.diretorio:
+            return None
+        caminho = self._caminho(session_id)
+        if not os.path.exists(caminho):
+            return None
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                return MemoriaSessao.from_dict(json.load(f), **kwargs)
+        except (OSError, ValueError) as e:
+            logger.error(f"Erro ao carregar a memória da sessão {session_id}: {e}")
+            return None
+
+    def _persistir(self, memoria: MemoriaSessao, remover: bool = False):
+        # Com remover, a memória é marcada no mesmo lock em que é copiada: nenhum turno fica de fora do disco
+        with memoria._lock:
+            if remover:
+                memoria.removida = True
+            dados = memoria.to_dict()
+        if not self.diretorio:
+            return
+        caminho = self._caminho(memoria.session_id)
+        temporario = f"{caminho}.tmp"
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            logger.error(f"Erro ao persistir a memória da sessão {memoria.session_id}: {e}")
+
+    def salvar(self, session_id: str):
+        """
+        Persiste em disco a memória de uma sessão mantida em RAM.
+
+        Args:
+            session_id (str): Identificador da sessão
+        """
+        with self._lock:
+            memoria = self._sessoes.get(session_id)
+        if memoria is not None:
+            self._persistir(memoria)
+
+    def salvar_todas(self):
+        """
+        Persiste em disco todas as memórias mantidas em RAM.
+        """
+        with self._lock:
+            memorias = list(self._sessoes.values())
+        for memoria in memorias:
+            self._persistir(memoria)
+
+    def remover(self, session_id: str):
+        """
+        Remove a memória de uma sessão da RAM e do disco.
+
+        Args:
+            session_id (str): Identificador da sessão
+        """
+        with self._lock:
+            self._sessoes.pop(session_id, None)
+        if self.diretorio:
+            caminho = self._caminho(session_id)
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+
+# Gerenciador compartilhado pelo processo
+gerenciador_memoria = GerenciadorMemoria()
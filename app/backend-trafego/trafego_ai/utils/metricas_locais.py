@@ -0,0 +1,401 @@
+"""
+Implementação do armazenamento colunar local de métricas do Meta ADS com sincronização incremental
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from backend.trafego_ai.config.settings import (
+    METRICAS_DIR,
+    METRICAS_DIAS_HISTORICO,
+    META_JANELA_ATRIBUICAO_DIAS
+)
+from backend.trafego_ai.tools.agendador_meta import prioridade, PRIORIDADE_SEGUNDO_PLANO
+
+logger = logging.getLogger(__name__)
+
+_EPOCA = date(1970, 1, 1)
+
+# Tipos de ação contabilizados como conversão
+TIPOS_CONVERSAO = {
+    "purchase",
+    "lead",
+    "complete_registration",
+    "offsite_conversion.fb_pixel_purchase",
+    "offsite_conversion.fb_pixel_lead",
+    "onsite_conversion.lead_grouped",
+}
+
+# Uma linha por objeto e dia. IDs do Meta cabem em int64 (0 = não se aplica ao nível)
+DTYPE_METRICAS = np.dtype([
+    ("campaign_id", "i8"),
+    ("adset_id", "i8"),
+    ("ad_id", "i8"),
+    ("data", "i4"),  # Dias desde 1970-01-01
+    ("impressions", "i8"),
+    ("clicks", "i8"),
+    ("reach", "i8"),
+    ("spend", "f8"),
+    ("conversions", "f8"),
+])
+
+CHAVES = ("campaign_id", "adset_id", "ad_id")
+METRICAS_SINCRONIZADAS = ["impressions", "clicks", "reach", "spend", "actions"]
+
+
+def data_para_dia(valor) -> int:
+    """
+    Converte uma data (date, datetime ou texto ISO) em dias desde 1970-01-01.
+    """
+    if isinstance(valor, str):
+        valor = date.fromisoformat(valor[:10])
+    elif isinstance(valor, datetime):
+        valor = valor.date()
+    return (valor - _EPOCA).days
+
+
+def dia_para_data(dia: int) -> date:
+    """
+    Converte dias desde 1970-01-01 em date.
+    """
+    return _EPOCA + timedelta(days=int(dia))
+
+
+def _intervalos(dias: Iterable[int]) -> List[Tuple[int, int]]:
+    """
+    Agrupa dias em intervalos contíguos (inclusivos).
+    """
+    intervalos = []
+    for dia in sorted(set(dias)):
+        if intervalos and dia == intervalos[-1][1] + 1:
+            intervalos[-1] = (intervalos[-1][0], dia)
+        else:
+            intervalos.append((dia, dia))
+    return intervalos
+
+
+def _dia_final(dia: int, instante: Optional[float], hoje_dia: int, janela_atribuicao: int) -> bool:
+    """
+    Indica se um dia está sincronizado na versão final, que o Meta não revisa mais.
+
+    Um dia é mutável enquanto estiver dentro da janela de atribuição, ou se sua
+    última sincronização aconteceu antes de o dia sair dessa janela.
+    """
+    if instante is None or dia > hoje_dia - janela_atribuicao:
+        return False
+    return datetime.fromtimestamp(instante).date() >= dia_para_data(dia + janela_atribuicao)
+
+
+def linha_para_registro(linha: Dict[str, Any]) -> tuple:
+    """
+    Converte uma linha de insights diários da Graph API em um registro do armazenamento.
+
+    Args:
+        linha (Dict[str, Any]): Linha retornada por obter_insights_conta com time_increment=1
+
+    Returns:
+        tuple: Registro no formato de DTYPE_METRICAS
+    """
+    conversoes = sum(
+        float(acao.get("value", 0))
+        for acao in linha.get("actions", []) or []
+        if acao.get("action_type") in TIPOS_CONVERSAO
+    )
+    return (
+        int(linha.get("campaign_id") or 0),
+        int(linha.get("adset_id") or 0),
+        int(linha.get("ad_id") or 0),
+        data_para_dia(linha["date_start"]),
+        int(linha.get("impressions") or 0),
+        int(linha.get("clicks") or 0),
+        int(linha.get("reach") or 0),
+        float(linha.get("spend") or 0),
+        conversoes,
+    )
+
+
+class ArmazemMetricas:
+    """
+    Armazenamento colunar local de métricas diárias, particionado por conta e nível.
+
+    Cada partição é um arquivo .npy com um array estruturado ordenado por objeto e
+    data, lido por mapeamento em memória. Um arquivo JSON ao lado registra os dias
+    já sincronizados.
+    """
+
+    def __init__(self, diretorio: str = METRICAS_DIR):
+        """
+        Inicializa o armazenamento.
+
+        Args:
+            diretorio (str, optional): Diretório raiz dos arquivos. Default para METRICAS_DIR.
+        """
+        self.diretorio = diretorio
+        self._lock = threading.Lock()
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def _caminhos(self, account_id: str, nivel: str) -> Tuple[str, str]:
+        pasta = os.path.join(self.diretorio, str(account_id))
+        os.makedirs(pasta, exist_ok=True)
+        return os.path.join(pasta, f"{nivel}.npy"), os.path.join(pasta, f"{nivel}.json")
+
+    def _ler_dados(self, account_id: str, nivel: str, mmap: bool = True) -> np.ndarray:
+        caminho, _ = self._caminhos(account_id, nivel)
+        if not os.path.exists(caminho):
+            return np.empty(0, dtype=DTYPE_METRICAS)
+        return np.load(caminho, mmap_mode="r" if mmap else None)
+
+    def _ler_metadados(self, account_id: str, nivel: str) -> Dict[str, Any]:
+        _, caminho = self._caminhos(account_id, nivel)
+        if not os.path.exists(caminho):
+            return {"dias_sincronizados": {}}
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _gravar(self, account_id: str, nivel: str, dados: np.ndarray, metadados: Dict[str, Any]):
+        caminho_dados, caminho_meta = self._caminhos(account_id, nivel)
+
+        # Gravação atômica: leitores concorrentes veem a versão antiga ou a nova inteira
+        temporario = f"{caminho_dados}.tmp.npy"
+        np.save(temporario, dados)
+        os.replace(temporario, caminho_dados)
+
+        temporario = f"{caminho_meta}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(metadados, f)
+        os.replace(temporario, caminho_meta)
+
+    def dias_sincronizados(self, account_id: str, nivel: str) -> Dict[int, float]:
+        """
+        Retorna os dias já sincronizados e o instante (epoch) da última sincronização de cada um.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            nivel (str): Nível (campaign, adset, ad)
+
+        Returns:
+            Dict[int, float]: Dia (desde 1970-01-01) -> instante da sincronização
+        """
+        metadados = self._ler_metadados(account_id, nivel)
+        return {int(dia): instante for dia, instante in metadados["dias_sincronizados"].items()}
+
+    def cobre_periodo(self, account_id: str, nivel: str, data_inicio, data_fim,
+                      janela_atribuicao: int = META_JANELA_ATRIBUICAO_DIAS, hoje: Optional[date] = None) -> bool:
+        """
+        Indica se todos os dias do período já foram sincronizados localmente na versão final.
+
+        Dias ainda dentro da janela de atribuição (ou sincronizados enquanto estavam nela)
+        podem ter dados parciais e não contam como cobertos.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            nivel (str): Nível (campaign, adset, ad)
+            data_inicio (date): Data inicial
+            data_fim (date): Data final
+            janela_atribuicao (int, optional): Dias em que as métricas ainda podem mudar
+            hoje (date, optional): Data de referência. Default para hoje
+
+        Returns:
+            bool: True se o período pode ser consultado sem acessar a Graph API
+        """
+        hoje_dia = data_para_dia(hoje or date.today())
+        sincronizados = self.dias_sincronizados(account_id, nivel)
+        return all(_dia_final(dia, sincronizados.get(dia), hoje_dia, janela_atribuicao)
+                   for dia in range(data_para_dia(data_inicio), data_para_dia(data_fim) + 1))
+
+    def gravar_dias(self, account_id: str, nivel: str, dias: Iterable[int], registros: List[tuple]):
+        """
+        Substitui as linhas dos dias informados pelos novos registros.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            nivel (str): Nível (campaign, adset, ad)
+            dias (Iterable[int]): Dias (desde 1970-01-01) cobertos pelos registros
+            registros (List[tuple]): Registros no formato de DTYPE_METRICAS
+        """
+        dias = np.fromiter(set(dias), dtype="i4")
+        novos = np.array(registros, dtype=DTYPE_METRICAS)
+
+        with self._lock:
+            atuais = self._ler_dados(account_id, nivel, mmap=False)
+            mantidos = atuais[~np.isin(atuais["data"], dias)]
+            dados = np.concatenate([mantidos, novos])
+            dados = dados[np.lexsort([dados[c] for c in ("data",) + CHAVES[::-1]])]
+
+            metadados = self._ler_metadados(account_id, nivel)
+            agora = time.time()
+            for dia in dias.tolist():
+                metadados["dias_sincronizados"][str(dia)] = agora
+
+            self._gravar(account_id, nivel, dados, metadados)
+
+    def consultar(self, account_id: str, nivel: str, data_inicio=None, data_fim=None,
+                  campaign_ids: Optional[List] = None, adset_ids: Optional[List] = None,
+                  ad_ids: Optional[List] = None) -> np.ndarray:
+        """
+        Consulta as métricas diárias armazenadas localmente.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            nivel (str): Nível (campaign, adset, ad)
+            data_inicio (date, optional): Data inicial (inclusiva)
+            data_fim (date, optional): Data final (inclusiva)
+            campaign_ids (List, optional): Filtrar por campanhas
+            adset_ids (List, optional): Filtrar por conjuntos de anúncios
+            ad_ids (List, optional): Filtrar por anúncios
+
+        Returns:
+            np.ndarray: Array estruturado (DTYPE_METRICAS) com as linhas selecionadas
+        """
+        dados = self._ler_dados(account_id, nivel)
+        if not len(dados):
+            return np.empty(0, dtype=DTYPE_METRICAS)
+
+        filtro = np.ones(len(dados), dtype=bool)
+        if data_inicio is not None:
+            filtro &= dados["data"] >= data_para_dia(data_inicio)
+        if data_fim is not None:
+            filtro &= dados["data"] <= data_para_dia(data_fim)
+        for coluna, ids in (("campaign_id", campaign_ids), ("adset_id", adset_ids), ("ad_id", ad_ids)):
+            if ids:
+                filtro &= np.isin(dados[coluna], np.asarray(ids, dtype="i8"))
+
+        return np.array(dados[filtro])
+
+    def consultar_df(self, account_id: str, nivel: str, **filtros):
+        """
+        Consulta as métricas e retorna um DataFrame do pandas com a coluna de data convertida.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            nivel (str): Nível (campaign, adset, ad)
+            **filtros: Mesmos filtros de consultar
+
+        Returns:
+            pandas.DataFrame: Métricas diárias
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(self.consultar(account_id, nivel, **filtros))
+        if not df.empty:
+            df["data"] = pd.to_datetime(df["data"], unit="D")
+        return df
+
+    def metricas_campanha(self, account_id: str, campanha_id, data_inicio=None, data_fim=None) -> Dict[str, Any]:
+        """
+        Agrega as métricas locais de uma campanha no período, no formato de obter_metricas_campanha.
+
+        O alcance único do período não pode ser obtido somando os dias, por isso reach e
+        frequency ficam de fora; quem precisar deles deve consultar a Graph API.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            campanha_id (str): ID da campanha
+            data_inicio (date, optional): Data inicial. Default para 30 dias atrás
+            data_fim (date, optional): Data final. Default para hoje
+
+        Returns:
+            Dict[str, Any]: Métricas agregadas sem reach e frequency (vazio se não houver dados)
+        """
+        data_inicio = data_inicio or date.today() - timedelta(days=30)
+        data_fim = data_fim or date.today()
+        linhas = self.consultar(account_id, "campaign", data_inicio, data_fim, campaign_ids=[campanha_id])
+        if not len(linhas):
+            return {}
+
+        impressoes = int(linhas["impressions"].sum())
+        cliques = int(linhas["clicks"].sum())
+        gasto = float(linhas["spend"].sum())
+        return {
+            "impressions": impressoes,
+            "clicks": cliques,
+            "spend": round(gasto, 2),
+            "conversions": float(linhas["conversions"].sum()),
+            "ctr": round(cliques / impressoes * 100, 4) if impressoes else 0.0,
+            "cpc": round(gasto / cliques, 4) if cliques else 0.0,
+            "cpm": round(gasto / impressoes * 1000, 4) if impressoes else 0.0,
+            "date_start": dia_para_data(linhas["data"].min()).isoformat(),
+            "date_stop": dia_para_data(linhas["data"].max()).isoformat(),
+        }
+
+    def dias_pendentes(self, account_id: str, nivel: str, dias_historico: int = METRICAS_DIAS_HISTORICO,
+                       janela_atribuicao: int = META_JANELA_ATRIBUICAO_DIAS, hoje: Optional[date] = None) -> List[int]:
+        """
+        Calcula os dias que precisam ser buscados: os ausentes e os ainda mutáveis.
+
+        Args:
+            account_id (str): ID da conta publicitária
+            nivel (str): Nível (campaign, adset, ad)
+            dias_historico (int, optional): Quantos dias de histórico manter
+            janela_atribuicao (int, optional): Dias em que as métricas ainda podem mudar
+            hoje (date, optional): Data de referência. Default para hoje
+
+        Returns:
+            List[int]: Dias (desde 1970-01-01) a serem buscados, em ordem
+        """
+        hoje_dia = data_para_dia(hoje or date.today())
+        sincronizados = self.dias_sincronizados(account_id, nivel)
+        return [dia for dia in range(hoje_dia - dias_historico + 1, hoje_dia + 1)
+                if not _dia_final(dia, sincronizados.get(dia), hoje_dia, janela_atribuicao)]
+
+    def sincronizar(self, api, nivel: str = "ad", dias_historico: int = METRICAS_DIAS_HISTORICO,
+                    janela_atribuicao: int = META_JANELA_ATRIBUICAO_DIAS, hoje: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Sincroniza incrementalmente as métricas diárias de uma conta.
+
+        Busca apenas os dias ausentes ou ainda mutáveis, agrupados em intervalos
+        contíguos, cada um em uma única consulta de insights da conta.
+
+        Args:
+            api (MetaAdsAPI): Cliente da conta a ser sincronizada
+            nivel (str, optional): Nível (campaign, adset, ad). Default para "ad"
+            dias_historico (int, optional): Quantos dias de histórico manter
+            janela_atribuicao (int, optional): Dias em que as métricas ainda podem mudar
+            hoje (date, optional): Data de referência. Default para hoje
+
+        Returns:
+            Dict[str, Any]: Dias buscados, linhas gravadas e consultas feitas
+        """
+        account_id = api.account_id
+        pendentes = self.dias_pendentes(account_id, nivel, dias_historico, janela_atribuicao, hoje)
+
+        linhas = 0
+        intervalos = _intervalos(pendentes)
+        # A sincronização cede a vez às chamadas interativas na fila da conta
+        with prioridade(PRIORIDADE_SEGUNDO_PLANO):
+            for inicio, fim in intervalos:
+                registros = [
+                    linha_para_registro(linha)
+                    for linha in api.obter_insights_conta(
+                        nivel=nivel,
+                        data_inicio=dia_para_data(inicio),
+                        data_fim=dia_para_data(fim),
+                        incremento_tempo=1,
+                        metricas=METRICAS_SINCRONIZADAS
+                    )
+                ]
+                self.gravar_dias(account_id, nivel, range(inicio, fim + 1), registros)
+                linhas += len(registros)
+
+        logger.info(f"Métricas da conta {account_id} ({nivel}) sincronizadas: "
+                    f"{len(pendentes)} dias, {linhas} linhas, {len(intervalos)} consultas")
+        return {"dias": len(pendentes), "linhas": linhas, "consultas": len(intervalos)}
+
+
+# Armazenamento compartilhado pelo processo
+armazem_metricas = ArmazemMetricas()
+
+
+if __name__ == "__main__":
+    # Sincronização diária: python -m backend.trafego_ai.utils.metricas_locais [nivel]
+    import sys
+    from backend.trafego_ai.tools.meta_ads_api import MetaAdsAPI
+
+    for nivel_sincronizado in sys.argv[1:] or ["campaign", "adset", "ad"]:
+        armazem_metricas.sincronizar(MetaAdsAPI(), nivel=nivel_sincronizado)